@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Importación diferida de dependencias pesadas u opcionales.
+
+Los módulos de pytc2 declaran sus dependencias pesadas (scipy.signal, sympy)
+y las opcionales (matplotlib, IPython, schemdraw) mediante :func:`lazy_import`,
+de forma que sólo se importan la primera vez que se usa alguno de sus
+atributos. Así, un proceso que sólo hace cálculo numérico no paga el costo de
+importar las bibliotecas de graficación o de visualización en notebooks.
+
+@author: mariano
+"""
+
+import importlib
+
+# extra de instalación que provee cada dependencia opcional.
+# Ver [tool.poetry.extras] en pyproject.toml
+_EXTRAS = {
+    'matplotlib': 'plot',
+    'IPython': 'notebook',
+    'schemdraw': 'dibujar',
+    }
+
+
+class _LazyModule:
+    '''
+    Representante de un módulo que se importa al acceder a su primer atributo.
+
+    '''
+
+    def __init__(self, name):
+
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+
+        module = self.__dict__['_module']
+
+        if module is None:
+
+            name = self.__dict__['_name']
+
+            try:
+                module = importlib.import_module(name)
+
+            except ImportError as err:
+
+                extra = _EXTRAS.get(name.split('.')[0])
+
+                if extra is None:
+                    raise
+
+                raise ImportError('{:s} es una dependencia opcional de pytc2 y no está instalada. '
+                                  'Instalala con: pip install "pytc2[{:s}]"'.format(name, extra)) from err
+
+            self.__dict__['_module'] = module
+
+        return(module)
+
+    def __getattr__(self, attr):
+
+        return(getattr(self._load(), attr))
+
+    def __setattr__(self, attr, value):
+
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+
+        return(dir(self._load()))
+
+    def __repr__(self):
+
+        estado = 'cargado' if self.__dict__['_module'] is not None else 'diferido'
+
+        return('<módulo {:s} ({:s})>'.format(self.__dict__['_name'], estado))
+
+
+def lazy_import(name):
+    '''
+    Devuelve un representante del módulo *name* que lo importa recién
+    cuando se accede a alguno de sus atributos.
+
+    Parameters
+    ----------
+    name : string
+        Nombre completo del módulo, por ejemplo 'scipy.signal'.
+
+    Returns
+    -------
+    module : _LazyModule
+        Objeto que se comporta como el módulo una vez importado. Si el módulo
+        es una dependencia opcional ausente, el primer acceso levanta un
+        ImportError que indica el extra de pytc2 a instalar.
+
+    Ejemplo
+    -------
+
+    >>> from pytc2._lazy import lazy_import
+    >>> plt = lazy_import('matplotlib.pyplot')
+    >>> # matplotlib aún no fue importado
+    >>> fig = plt.figure()
+
+    '''
+
+    return(_LazyModule(name))
@@ -6,12 +6,25 @@ Created on Thu Mar  2 14:14:13 2023
 @author: mariano
 """
 
+from functools import lru_cache
+
 import numpy as np
 
 import sympy as sp
 
+from sympy.polys.matrices import DomainMatrix
+
+from ._lazy import lazy_import
+
 from .general import print_latex
 
+# sólo para el análisis numérico mediante MAI
+sps = lazy_import('scipy.sparse')
+spla = lazy_import('scipy.sparse.linalg')
+
+# determinante de la matriz del modelo de origen, en Model_conversion
+_DELTA = sp.Symbol('\\Delta')
+
 
 '''
     Funciones de conversión de matrices de cuadripolos lineales
@@ -148,8 +161,8 @@ def S2Tabcd_s(Spar, Z0 = sp.Rational('1') ):
     
     Tabcd = sp.Matrix([[0, 0], [0, 0]])
     
-    # A = Z11/Z21
-    Tabcd[0,0] = (1 - Spar[0,0]) * (1 + Spar[1,1]) + Spar[1,0] * Spar[0,1]
+    # A = ((1 + S11)(1 - S22) + S12.S21) / 2.S21
+    Tabcd[0,0] = (1 + Spar[0,0]) * (1 - Spar[1,1]) + Spar[1,0] * Spar[0,1]
     # B = DZ/Z21
     Tabcd[0,1] = Z0*((1 + Spar[0,0]) * (1 + Spar[1,1]) - Spar[1,0] * Spar[0,1])
     # C = 1/Z21
@@ -388,8 +401,8 @@ def Y2Tabcd_s(YY):
     TT[0,1] = sp.simplify(sp.expand(-1/YY[1,0]))
     # C = -DY/Y21
     TT[1,0] = sp.simplify(sp.expand(-sp.Determinant(YY)/YY[1,0]))
-    # D = Y11/Y21
-    TT[1,1] = sp.simplify(sp.expand(-YY[1,1]/YY[1,0]))
+    # D = -Y11/Y21
+    TT[1,1] = sp.simplify(sp.expand(-YY[0,0]/YY[1,0]))
     
     return(TT)
 
@@ -522,7 +535,9 @@ def I2Tabcd_s(gamma, z01, z02 = None):
 
 def Model_conversion( src_model, dst_model  ):
     '''
-    Convierte modelos de cuadripolos lineales.
+    Convierte modelos de cuadripolos lineales. La conversión entre cada par 
+    de modelos se resuelve una única vez, para parámetros genéricos, y 
+    luego se aplica directamente a los parámetros del modelo de origen.
 
     Parameters
     ----------
@@ -534,8 +549,10 @@ def Model_conversion( src_model, dst_model  ):
 
     Returns
     -------
-    YY : Symbolic Matrix
-        Matriz admitancia 
+    dict
+        Diccionario con la matriz del modelo de salida ('matrix'), en 
+        función de los parámetros del modelo de origen y de su determinante 
+        Delta, y el nombre de la conversión ('name').
 
     Example
     -------
@@ -581,177 +598,280 @@ def Model_conversion( src_model, dst_model  ):
     else:
         src_matrix = src_model['matrix']
     
-    aa = sp.solve([ src_matrix * src_model['indep_var'] - src_model['dep_var']
-                ], 
-                dst_model['dep_var'])
-
-    
-    # reemplazaremos el determinante por Delta.
-    det_src_matrix = sp.det(src_matrix)
-    
-    # i2 se define al revés en este modelo
-    if 'neg_i2_current' in src_model:
-        det_src_matrix = -det_src_matrix
+    # forma cerrada de la conversión, generada una única vez por cada par 
+    # de modelos
+    qq, QQ, QQ_delta = _conversion_template(tuple(src_model['dep_var']), tuple(src_model['indep_var']), 
+                                            'neg_i2_current' in src_model, 
+                                            tuple(dst_model['dep_var']), tuple(dst_model['indep_var']), 
+                                            'neg_i2_current' in dst_model)
     
+    src_params = dict(zip(qq, src_matrix))
     
-    dd = sp.Symbol('\Delta')
-    jj = 0
+    if _son_parametros(src_matrix):
+        
+        # parámetros simbólicos: la forma cerrada ya está simplificada y 
+        # expresada en función de Delta.
+        QQ = QQ_delta.xreplace(src_params)
     
-    QQ = sp.Matrix([[0,0],[0,0]])
-
-
-
-
-    for dep_var in dst_model['dep_var']:
-
-        jj += 1
+    else:
+        
+        # reemplazaremos el determinante por Delta.
+        det_src_matrix = sp.det(src_matrix)
         
-        yyy = sp.collect(sp.expand(aa[dep_var]), dst_model['indep_var'][0])
-        yyy = sp.collect(yyy, dst_model['indep_var'][1])
-
         # i2 se define al revés en este modelo
-        if dep_var.name == 'i2' and 'neg_i2_current' in dst_model:
-            yyy = -yyy
+        if 'neg_i2_current' in src_model:
+            det_src_matrix = -det_src_matrix
+        
+        if det_src_matrix.is_number:
+            # un determinante constante, por ejemplo 1 en las redes 
+            # recíprocas, no se reemplaza: se confundiría con cualquier 
+            # otra constante.
+            QQ = QQ.xreplace(src_params).applyfunc(sp.cancel)
+        else:
+            QQ = QQ.xreplace(src_params).applyfunc(lambda bb: sp.cancel(bb).subs(det_src_matrix, _DELTA))
 
-        kk = 0
-        for indep_var in dst_model['indep_var']:
-            kk += 1
-            
-            bb = sp.cancel(yyy.coeff(indep_var,1))
-            # i2 se define al revés en este modelo
-            if indep_var.name == 'i2' and 'neg_i2_current' in dst_model:
-                bb = -bb
-                
-            QQ[jj-1,kk-1] = bb.subs(det_src_matrix, dd)
-            #print_latex(a_equal_b_latex_s( param_lab + '{:d}{:d}'.format(jj,kk), QQ[jj-1,kk-1] ))
+    QQ = sp.Matrix(QQ)
 
     return({'matrix': QQ, 'name': dst_model['model_name'] + '_{' + src_model['model_name'] + '}' })
 
 
 def Y2Tabcd(YY):
-    """
-    
+    '''
+    Convierte una matriz admitancia (Y) numérica al modelo ABCD (Tabcd). 
+    Se admite una pila de matrices, por ejemplo una por cada frecuencia de 
+    un barrido, y se convierten todas de una vez.
+
     Parameters
     ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+    YY : array_like
+        Matriz de parámetros Y de (2, 2), o una pila de ellas de (..., 2, 2).
 
     Returns
     -------
-    None.
+    TT : ndarray
+        Matriz de parámetros ABCD, de la misma forma que YY.
 
     Example
     -------
 
-    """
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import Y2Tabcd
+    >>> # red Pi: 2 S en serie y 1 S en cada derivación
+    >>> YY = np.array([[3., -2.], [-2., 3.]])
+    >>> Y2Tabcd(YY)
+    array([[1.5, 0.5],
+           [2.5, 1.5]])
+    >>> # un barrido en frecuencia se convierte de una vez
+    >>> Y2Tabcd(np.stack([YY, 2*YY])).shape
+    (2, 2, 2)
+
+    '''
     
-    TT = np.zeros_like(YY)
+    YY = _como_cuadripolo(YY)
+    TT = np.empty_like(YY)
     
-    # A = Y22/Y21
-    TT[0,0] = -YY[1,1]/YY[1,0]
+    # A = -Y22/Y21
+    TT[..., 0, 0] = -YY[..., 1, 1]/YY[..., 1, 0]
     # B = -1/Y21
-    TT[0,1] = -1/YY[1,0]
+    TT[..., 0, 1] = -1/YY[..., 1, 0]
     # C = -DY/Y21
-    TT[1,0] = -np.linalg.det(YY)/YY[1,0]
-    # D = Y11/Y21
-    TT[1,1] = -YY[1,1]/YY[1,0]
+    TT[..., 1, 0] = -_det2(YY)/YY[..., 1, 0]
+    # D = -Y11/Y21
+    TT[..., 1, 1] = -YY[..., 0, 0]/YY[..., 1, 0]
     
     return(TT)
 
 def Z2Tabcd(ZZ):
     '''
-    Convierte la MAD en MAI luego de levantar de referencia.
+    Convierte una matriz impedancia (Z) numérica al modelo ABCD (Tabcd). 
+    Se admite una pila de matrices, como en :func:`Y2Tabcd`.
 
     Parameters
     ----------
-    Ymai : Symbolic Matrix
-        Matriz admitancia indefinida.
-    nodes2del : list or integer
-        Nodos que se van a eliminar.
+    ZZ : array_like
+        Matriz de parámetros Z de (2, 2), o una pila de ellas de (..., 2, 2).
 
     Returns
     -------
-    YY : Symbolic Matrix
-        Matriz admitancia 
+    TT : ndarray
+        Matriz de parámetros ABCD, de la misma forma que ZZ.
 
     '''
     
-    TT = np.zeros_like(ZZ)
+    ZZ = _como_cuadripolo(ZZ)
+    TT = np.empty_like(ZZ)
     
     # A = Z11/Z21
-    TT[0,0] = ZZ[0,0]/ZZ[1,0]
+    TT[..., 0, 0] = ZZ[..., 0, 0]/ZZ[..., 1, 0]
     # B = DZ/Z21
-    TT[0,1] = np.linalg.det(ZZ)/ZZ[1,0]
+    TT[..., 0, 1] = _det2(ZZ)/ZZ[..., 1, 0]
     # C = 1/Z21
-    TT[1,0] = 1/ZZ[1,0]
+    TT[..., 1, 0] = 1/ZZ[..., 1, 0]
     # D = Z22/Z21
-    TT[1,1] = ZZ[1,1]/ZZ[1,0]
+    TT[..., 1, 1] = ZZ[..., 1, 1]/ZZ[..., 1, 0]
     
     return(TT)
 
 def Tabcd2Z(TT):
     '''
-    Convierte la MAD en MAI luego de levantar de referencia.
+    Convierte una matriz de parámetros ABCD (Tabcd) numérica al modelo 
+    impedancia (Z). Se admite una pila de matrices, como en :func:`Y2Tabcd`.
 
     Parameters
     ----------
-    Ymai : Symbolic Matrix
-        Matriz admitancia indefinida.
-    nodes2del : list or integer
-        Nodos que se van a eliminar.
+    TT : array_like
+        Matriz de parámetros ABCD de (2, 2), o una pila de ellas de 
+        (..., 2, 2).
 
     Returns
     -------
-    YY : Symbolic Matrix
-        Matriz admitancia 
+    ZZ : ndarray
+        Matriz de parámetros Z, de la misma forma que TT.
 
     '''
     
-    ZZ = np.zeros_like(TT)
+    TT = _como_cuadripolo(TT)
+    ZZ = np.empty_like(TT)
     
     # Z11 = A/C
-    ZZ[0,0] = TT[0,0]/TT[1,0]
-    # Z11 = DT/C
-    ZZ[0,1] = np.linalg.det(TT)/TT[1,0]
+    ZZ[..., 0, 0] = TT[..., 0, 0]/TT[..., 1, 0]
+    # Z12 = DT/C
+    ZZ[..., 0, 1] = _det2(TT)/TT[..., 1, 0]
     # Z21 = 1/C
-    ZZ[1,0] = 1/TT[1,0]
+    ZZ[..., 1, 0] = 1/TT[..., 1, 0]
     # Z22 = D/C
-    ZZ[1,1] = TT[1,1]/TT[1,0]
+    ZZ[..., 1, 1] = TT[..., 1, 1]/TT[..., 1, 0]
     
     return(ZZ)
 
 def Tabcd2Y(TT):
     '''
-    Convierte la MAD en MAI luego de levantar de referencia.
+    Convierte una matriz de parámetros ABCD (Tabcd) numérica al modelo 
+    admitancia (Y). Se admite una pila de matrices, como en :func:`Y2Tabcd`.
 
     Parameters
     ----------
-    Ymai : Symbolic Matrix
-        Matriz admitancia indefinida.
-    nodes2del : list or integer
-        Nodos que se van a eliminar.
+    TT : array_like
+        Matriz de parámetros ABCD de (2, 2), o una pila de ellas de 
+        (..., 2, 2).
 
     Returns
     -------
-    YY : Symbolic Matrix
-        Matriz admitancia 
+    YY : ndarray
+        Matriz de parámetros Y, de la misma forma que TT.
 
     '''
-    YY = np.zeros_like(TT)
+
+    TT = _como_cuadripolo(TT)
+    YY = np.empty_like(TT)
     
     # Y11 = D/B
-    YY[0,0] = TT[1,1]/TT[0,1]
+    YY[..., 0, 0] = TT[..., 1, 1]/TT[..., 0, 1]
     # Y12 = -DT/B
-    YY[0,1] = -np.linalg.det(TT)/TT[0,1]
+    YY[..., 0, 1] = -_det2(TT)/TT[..., 0, 1]
     # Y21 = -1/B
-    YY[1,0] = -1/TT[0,1]
+    YY[..., 1, 0] = -1/TT[..., 0, 1]
     # Y22 = A/B
-    YY[1,1] = TT[0,0]/TT[0,1]
+    YY[..., 1, 1] = TT[..., 0, 0]/TT[..., 0, 1]
     
     return(YY)
 
+def S2Tabcd(Spar, Z0 = 1.):
+    '''
+    Convierte una matriz de parámetros scattering (S) numérica al modelo 
+    ABCD (Tabcd). Se admite una pila de matrices, como en :func:`Y2Tabcd`.
+
+    Parameters
+    ----------
+    Spar : array_like
+        Matriz de parámetros S de (2, 2), o una pila de ellas de (..., 2, 2).
+    Z0 : float or array_like, optional
+        Impedancia de referencia de ambos puertos. Puede ser un array de 
+        forma (...), por ejemplo una impedancia por cada frecuencia. 
+        Default: 1.
+
+    Returns
+    -------
+    TT : ndarray
+        Matriz de parámetros ABCD, de la misma forma que Spar.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import S2Tabcd, Tabcd2S
+    >>> # una línea adaptada de 90 grados, a tres frecuencias
+    >>> Spar = np.zeros((3, 2, 2), dtype = complex)
+    >>> Spar[:, 0, 1] = Spar[:, 1, 0] = np.exp(-1j*np.pi/2 * np.array([0.5, 1., 1.5]))
+    >>> np.allclose(Tabcd2S(S2Tabcd(Spar)), Spar)
+    True
+
+    '''
+
+    Spar = _como_cuadripolo(Spar)
+    TT = np.empty(Spar.shape, dtype = np.result_type(Spar, Z0))
+    
+    S11 = Spar[..., 0, 0]
+    S12 = Spar[..., 0, 1]
+    S21 = Spar[..., 1, 0]
+    S22 = Spar[..., 1, 1]
+    
+    S12S21 = S12 * S21
+    
+    # A = ((1 + S11)(1 - S22) + S12.S21) / 2.S21
+    TT[..., 0, 0] = (1 + S11) * (1 - S22) + S12S21
+    # B = Z0.((1 + S11)(1 + S22) - S12.S21) / 2.S21
+    TT[..., 0, 1] = Z0 * ((1 + S11) * (1 + S22) - S12S21)
+    # C = ((1 - S11)(1 - S22) - S12.S21) / 2.S21.Z0
+    TT[..., 1, 0] = ((1 - S11) * (1 - S22) - S12S21) / Z0
+    # D = ((1 - S11)(1 + S22) + S12.S21) / 2.S21
+    TT[..., 1, 1] = (1 - S11) * (1 + S22) + S12S21
+    
+    return( TT / (2 * S21)[..., np.newaxis, np.newaxis] )
+
+def Tabcd2S(TT, Z0 = 1.):
+    '''
+    Convierte una matriz de parámetros ABCD (Tabcd) numérica al modelo de
+    parámetros scattering (S). Se admite una pila de matrices, como en 
+    :func:`Y2Tabcd`.
+
+    Parameters
+    ----------
+    TT : array_like
+        Matriz de parámetros ABCD de (2, 2), o una pila de ellas de 
+        (..., 2, 2).
+    Z0 : float or array_like, optional
+        Impedancia de referencia de ambos puertos, como en :func:`S2Tabcd`.
+        Default: 1.
+
+    Returns
+    -------
+    Spar : ndarray
+        Matriz de parámetros S, de la misma forma que TT.
+
+    '''
+
+    TT = _como_cuadripolo(TT)
+    Spar = np.empty(TT.shape, dtype = np.result_type(TT, Z0))
+
+    AA = TT[..., 0, 0]
+    BB = TT[..., 0, 1] / Z0
+    CC = TT[..., 1, 0] * Z0
+    DD = TT[..., 1, 1]
+    
+    # S11 = (A + B/Z0 - C.Z0 - D) / common
+    Spar[..., 0, 0] = AA + BB - CC - DD
+    # S12 = 2.DT / common
+    Spar[..., 0, 1] = 2 * _det2(TT)
+    # S21 = 2 / common
+    Spar[..., 1, 0] = 2
+    # S22 = (-A + B/Z0 - C.Z0 + D) / common
+    Spar[..., 1, 1] = -AA + BB - CC + DD
+    
+    common = AA + BB + CC + DD
+    
+    return( Spar / common[..., np.newaxis, np.newaxis] )
+
 def y2mai(YY):
     '''
     Convierte la MAD en MAI luego de levantar de referencia.
@@ -812,31 +932,34 @@ def TabcdLYZ(Yexc, Zexc):
 
     Parameters
     ----------
-    Yexc : Symbolic admitance
-           Función de excitación de la admitancia a representar.
+    Yexc : complex or array_like
+           Valor de la admitancia a representar. Puede ser un array, por 
+           ejemplo la admitancia evaluada en cada frecuencia de un barrido.
     
-    Zexc : Symbolic impedance
-           Función de excitación de la impedancia a representar.
+    Zexc : complex or array_like
+           Valor de la impedancia a representar, de forma compatible con 
+           Yexc.
 
     Returns
     -------
-    Tabcd : Symbolic Matrix
-           Matriz de parámetros ABCD.
+    Tabcd : ndarray
+           Matriz de parámetros ABCD de (2, 2), o una pila de (F, 2, 2) si 
+           Yexc o Zexc son arrays. Es compleja si alguno de ellos lo es.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import TabcdLYZ
+    >>> ww = np.array([0.5, 1., 2.])
+    >>> # C = 1 F en derivación y L = 1 H en serie
+    >>> TabcdLYZ(1j*ww, 1j*ww).shape
+    (3, 2, 2)
 
     '''
     
-    Tpar = np.array([[0, 0], [0, 0]])
-    
-    # A = Z11/Z21
-    Tpar[0,0] = 1 
-    # B = DZ/Z21
-    Tpar[0,1] = Zexc
-    # C = 1/Z21
-    Tpar[1,0] = Yexc
-    # D = Z22/Z21
-    Tpar[1,1] = 1 + Zexc * Yexc
-    
-    return( Tpar ) 
+    # A = 1, B = Z, C = Y, D = 1 + Z.Y
+    return( _tabcd_stack(1, Zexc, Yexc, 1 + np.multiply(Zexc, Yexc)) ) 
 
 def TabcdLZY(Zexc, Yexc):
     '''
@@ -846,31 +969,23 @@ def TabcdLZY(Zexc, Yexc):
 
     Parameters
     ----------
-    Zexc : Symbolic impedance
-           Función de excitación de la impedancia a representar.
+    Zexc : complex or array_like
+           Valor de la impedancia a representar. Puede ser un array, como 
+           en :func:`TabcdLYZ`.
     
-    Yexc : Symbolic admitance
-           Función de excitación de la admitancia a representar.
+    Yexc : complex or array_like
+           Valor de la admitancia a representar, de forma compatible con 
+           Zexc.
 
     Returns
     -------
-    Tabcd : Symbolic Matrix
-           Matriz de parámetros ABCD.
+    Tabcd : ndarray
+           Matriz de parámetros ABCD de (2, 2), o una pila de (F, 2, 2).
 
     '''
     
-    Tpar = np.array([[0.0, 0], [0, 0]])
-    
-    # A = Z11/Z21
-    Tpar[0,0] = 1 + Zexc * Yexc 
-    # B = DZ/Z21
-    Tpar[0,1] = Zexc
-    # C = 1/Z21
-    Tpar[1,0] = Yexc
-    # D = Z22/Z21
-    Tpar[1,1] = 1
-    
-    return( Tpar ) 
+    # A = 1 + Z.Y, B = Z, C = Y, D = 1
+    return( _tabcd_stack(1 + np.multiply(Zexc, Yexc), Zexc, Yexc, 1) ) 
 
 def TabcdZ(Zexc):
     '''
@@ -879,29 +994,19 @@ def TabcdZ(Zexc):
 
     Parameters
     ----------
-    Zexc : Symbolic impedance
-           Función de excitación de la impedancia a representar.
-
+    Zexc : complex or array_like
+           Valor de la impedancia a representar. Puede ser un array, como 
+           en :func:`TabcdLYZ`.
 
     Returns
     -------
-    Tabcd : Symbolic Matrix
-           Matriz de parámetros ABCD.
+    Tabcd : ndarray
+           Matriz de parámetros ABCD de (2, 2), o una pila de (F, 2, 2).
 
     '''
     
-    Tpar = np.array([[0.0, 0.0], [0, 0]])
-    
-    # A = Z11/Z21
-    Tpar[0,0] = 1 
-    # B = DZ/Z21
-    Tpar[0,1] = Zexc
-    # C = 1/Z21
-    Tpar[1,0] = 0
-    # D = Z22/Z21
-    Tpar[1,1] = 1
-
-    return( Tpar ) 
+    # A = 1, B = Z, C = 0, D = 1
+    return( _tabcd_stack(1, Zexc, 0, 1) ) 
 
 def TabcdY(Yexc):
     '''
@@ -910,29 +1015,60 @@ def TabcdY(Yexc):
 
     Parameters
     ----------
-    Yexc : Symbolic admitance
-           Función de excitación de la admitancia a representar.
-
+    Yexc : complex or array_like
+           Valor de la admitancia a representar. Puede ser un array, como 
+           en :func:`TabcdLYZ`.
 
     Returns
     -------
-    Tabcd : Symbolic Matrix
-           Matriz de parámetros ABCD.
+    Tabcd : ndarray
+           Matriz de parámetros ABCD de (2, 2), o una pila de (F, 2, 2).
 
     '''
     
-    Tpar = np.array([[0.0, 0], [0, 0]])
+    # A = 1, B = 0, C = Y, D = 1
+    return( _tabcd_stack(1, 0, Yexc, 1) ) 
+
+def Tabcd_cascade(*all_Tabcd):
+    '''
+    Matriz ABCD de la conexión en cascada de varios cuadripolos, en el orden
+    en que se indican. Cada uno puede ser una matriz de (2, 2), o una pila 
+    de (F, 2, 2) evaluada en un barrido de F frecuencias. Los productos se 
+    realizan de una vez para todo el barrido.
+
+    Parameters
+    ----------
+    *all_Tabcd : array_like
+           Matrices de parámetros ABCD de cada cuadripolo, desde la entrada 
+           hacia la salida.
+
+    Returns
+    -------
+    Tabcd : ndarray
+           Matriz de parámetros ABCD de la cascada, de (2, 2) o (F, 2, 2).
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import Tabcd_cascade, TabcdZ, TabcdY, Tabcd2Z
+    >>> ss = 1j*np.logspace(-1, 1, 50)
+    >>> # escalera LC de 3er orden: L - C - L
+    >>> TT = Tabcd_cascade(TabcdZ(ss), TabcdY(2*ss), TabcdZ(ss))
+    >>> TT.shape
+    (50, 2, 2)
+
+    '''
+
+    if len(all_Tabcd) == 0:
+        raise ValueError('Se necesita al menos un cuadripolo')
+
+    TT = np.asarray(all_Tabcd[0])
     
-    # A = Z11/Z21
-    Tpar[0,0] = 1 
-    # B = DZ/Z21
-    Tpar[0,1] = 0
-    # C = 1/Z21
-    Tpar[1,0] = Yexc
-    # D = Z22/Z21
-    Tpar[1,1] = 1
+    for this_Tabcd in all_Tabcd[1:]:
+        TT = np.matmul(TT, this_Tabcd)
     
-    return( Tpar ) 
+    return( TT ) 
 
 def I2Tabcd(gamma, z01, z02 = None):
     '''
@@ -964,6 +1100,163 @@ def I2Tabcd(gamma, z01, z02 = None):
     return(TT)
 
 
+class AnalisisMAI:
+    '''
+    Análisis simbólico de una red a partir de su matriz admitancia 
+    indefinida (MAI). Se construye una única vez a partir de Ymai, y 
+    permite consultar transferencias e impedancias entre cualquier par de 
+    nodos reutilizando los cofactores ya calculados.
+    
+    Las filas de la MAI se multiplican por el mínimo común denominador de 
+    sus elementos, de forma que todos los menores se calculan como 
+    determinantes de matrices de polinomios, mediante un método libre de 
+    fracciones (Bareiss), sin cocientes intermedios. Cada menor se calcula 
+    una sola vez, y los resultados sólo se simplifican al final de cada 
+    consulta.
+
+    Los cofactores siguen la convención habitual de la MAI: para una 
+    corriente unitaria que entra por el nodo m y sale por el nodo n, la 
+    tensión entre los nodos i y j es
+    
+        V_ij = Y^{mn}_{ij} / Y^{n}_{n}
+    
+    siendo Y^{mn}_{ij} el cofactor de 2do orden que resulta de quitar las 
+    filas m, n y las columnas i, j. Esta convención coincide con la de 
+    :func:`elementos2mai`, incluso en redes activas (MAI no simétrica).
+
+    Parameters
+    ----------
+    Ymai : Symbolic Matrix
+        Matriz admitancia indefinida de la red, de (N, N).
+
+    Example
+    -------
+
+    >>> import sympy as sp
+    >>> from pytc2.cuadripolos import AnalisisMAI
+    >>> G = sp.symbols('G', positive=True)
+    >>> # divisor resistivo: 0 -- G -- 2 -- G -- 1
+    >>> mai = AnalisisMAI(sp.Matrix([[G, 0, -G], [0, G, -G], [-G, -G, 2*G]]))
+    >>> mai.impedancia(0, 1), mai.vtransf(2, 1, 0, 1), mai.ztransf(2, 1, 0, 1)
+    (2/G, 1/2, 1/G)
+
+    See Also
+    --------
+
+    :func:`calc_MAI_ztransf_ij_mn`
+    :func:`calc_MAI_ztransf_ij_mn_num`
+
+    '''
+
+    def __init__(self, Ymai):
+
+        self.Ymai = sp.ImmutableMatrix(Ymai)
+        
+        if not self.Ymai.is_square:
+            raise ValueError('Ymai must be a square matrix, not %s' % (self.Ymai.shape,))
+        
+        self.nodos = self.Ymai.shape[0]
+        
+        # cada fila multiplicada por el mcm de sus denominadores
+        self._escala = [ sp.lcm_list([ sp.fraction(sp.cancel(yy))[1] for yy in self.Ymai.row(ii) ])
+                         for ii in range(self.nodos) ]
+
+        self._YY = DomainMatrix.from_Matrix(
+                        sp.Matrix(self.nodos, self.nodos,
+                                  lambda ii, jj: sp.cancel(self.Ymai[ii, jj] * self._escala[ii])))
+
+        self._menores = {}
+        self._resultados = {}
+
+    def menor(self, filas, columnas):
+        '''
+        Determinante (sin signo) del menor de Ymai que resulta de quitar 
+        *filas* y *columnas*. Se calcula una sola vez por cada par de 
+        conjuntos de índices.
+
+        '''
+        
+        clave = (tuple(sorted(set(filas))), tuple(sorted(set(columnas))))
+        
+        det = self._menores.get(clave)
+        
+        if det is None:
+            
+            quedan_f = [ii for ii in range(self.nodos) if ii not in clave[0]]
+            quedan_c = [ii for ii in range(self.nodos) if ii not in clave[1]]
+            
+            if len(quedan_f) != len(quedan_c):
+                raise ValueError('must remove as many rows as columns, not %d and %d'
+                                 % (len(clave[0]), len(clave[1])))
+            
+            if len(quedan_f) == 0:
+                det = sp.S.One
+            else:
+                det_pol = self._YY.extract(quedan_f, quedan_c).det()
+                det = sp.cancel(self._YY.domain.to_sympy(det_pol) / 
+                                sp.Mul(*[self._escala[ii] for ii in quedan_f]))
+            
+            self._menores[clave] = det
+        
+        return(det)
+
+    def cofactor(self, filas, columnas):
+        '''
+        Cofactor de 1er o 2do orden de Ymai, con el signo que corresponde al 
+        orden en que se indican *filas* y *columnas* quitadas.
+
+        '''
+
+        if len(filas) != len(columnas) or len(filas) not in (1, 2):
+            raise ValueError('cofactor order must be 1 or 2, not %s and %s' % (filas, columnas))
+        
+        if len(set(filas)) != len(filas) or len(set(columnas)) != len(columnas):
+            return(sp.S.Zero)
+
+        signo = (-1)**(sum(filas) + sum(columnas))
+        
+        if len(filas) == 2:
+            signo *= np.sign(filas[1] - filas[0]) * np.sign(columnas[1] - columnas[0])
+        
+        return(int(signo) * self.menor(filas, columnas))
+
+    def ztransf(self, ii=2, jj=3, mm=0, nn=1):
+        '''
+        Transferencia de impedancia V_ij / I_mn, siendo I_mn la corriente 
+        que entra por el nodo mm y sale por el nodo nn.
+
+        '''
+
+        return(self._consulta(('Tz', ii, jj, mm, nn), (mm, nn), (ii, jj), (nn,), (nn,)))
+
+    def vtransf(self, ii=2, jj=3, mm=0, nn=1):
+        '''
+        Transferencia de tensión V_ij / V_mn.
+
+        '''
+
+        return(self._consulta(('T', ii, jj, mm, nn), (mm, nn), (ii, jj), (mm, nn), (mm, nn)))
+
+    def impedancia(self, ii=0, jj=1):
+        '''
+        Impedancia vista entre los nodos ii y jj.
+
+        '''
+
+        return(self._consulta(('Z', ii, jj), (ii, jj), (ii, jj), (jj,), (jj,)))
+
+    def _consulta(self, clave, num_f, num_c, den_f, den_c):
+
+        res = self._resultados.get(clave)
+        
+        if res is None:
+            
+            res = sp.simplify(sp.cancel(self.cofactor(num_f, num_c) / 
+                                        self.cofactor(den_f, den_c)))
+            self._resultados[clave] = res
+        
+        return(res)
+
 def calc_MAI_ztransf_ij_mn(Ymai, ii=2, jj=3, mm=0, nn=1, verbose=False):
     """Calcula la transferencia de impedancia V_ij / I_mn
 
@@ -1000,26 +1293,27 @@ def calc_MAI_ztransf_ij_mn(Ymai, ii=2, jj=3, mm=0, nn=1, verbose=False):
         max_input_idx = nn
         min_input_idx = mm
     
-    # cofactor de 2do orden
-    num = Ymai.minor_submatrix(max_ouput_idx, max_input_idx).minor_submatrix(min_ouput_idx, min_input_idx)
-    # cualquier cofactor de primer orden
-    den = Ymai.minor_submatrix(min_input_idx, min_input_idx)
-
-    num_det = sp.simplify(num.det())
-    den_det = sp.simplify(den.det())
+    mai = _analisis_mai(sp.ImmutableMatrix(Ymai))
     
-    sign_correction = mm+nn+ii+jj
-    Tz = sp.simplify(-1**(sign_correction) * num_det/den_det)
+    Tz = mai.ztransf(ii, jj, mm, nn)
     
     if( verbose ):
     
+        # cofactor de 2do orden: sin las filas de entrada ni las columnas de salida
+        num_det = mai.cofactor((mm, nn), (ii, jj))
+        # cualquier cofactor de primer orden
+        den_det = mai.cofactor((min_input_idx,), (min_input_idx,))
+
+        num = Ymai.minor_submatrix(max_input_idx, max_ouput_idx).minor_submatrix(min_input_idx, min_ouput_idx)
+        den = Ymai.minor_submatrix(min_input_idx, min_input_idx)
+    
         print_latex(r' [Y_{MAI}] = ' + sp.latex(Ymai) )
         
         print_latex(r' [Y^{{ {:d}{:d} }}_{{ {:d}{:d} }} ] = '.format(mm,nn,ii,jj) + sp.latex(num) )
     
-        print_latex(r'[Y^{{ {:d} }}_{{ {:d} }}] = '.format(mm,mm) + sp.latex(den) )
+        print_latex(r'[Y^{{ {:d} }}_{{ {:d} }}] = '.format(min_input_idx,min_input_idx) + sp.latex(den) )
     
-        print_latex(r'\mathrm{{Tz}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} = \frac{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }}{{ \underline{{Y}}^{{ {:d} }}_{{ {:d} }} }} = '.format(ii,jj,mm,nn,mm,nn,ii,jj,mm,mm) + r' -1^{{ {:d} }} '.format(sign_correction)  + r'\frac{{ ' + sp.latex(num_det) + r'}}{{' + sp.latex(den_det) + r'}} = ' + sp.latex(Tz))
+        print_latex(r'\mathrm{{Tz}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} = \frac{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }}{{ \underline{{Y}}^{{ {:d} }}_{{ {:d} }} }} = '.format(ii,jj,mm,nn,mm,nn,ii,jj,min_input_idx,min_input_idx) + r'\frac{{ ' + sp.latex(num_det) + r'}}{{' + sp.latex(den_det) + r'}} = ' + sp.latex(Tz))
     
     return(Tz)
 
@@ -1056,26 +1350,26 @@ def calc_MAI_vtransf_ij_mn(Ymai, ii=2, jj=3, mm=0, nn=1, verbose=False):
         max_input_idx = nn
         min_input_idx = mm
     
-    # cofactores de 2do orden
-    num = Ymai.minor_submatrix(max_ouput_idx, max_input_idx).minor_submatrix(min_ouput_idx, min_input_idx)
-
-    den = Ymai.minor_submatrix(max_input_idx, max_input_idx).minor_submatrix(min_input_idx, min_input_idx)
+    mai = _analisis_mai(sp.ImmutableMatrix(Ymai))
     
-    num_det = sp.simplify(num.det())
-    den_det = sp.simplify(den.det())
-    
-    sign_correction = mm+nn+ii+jj
-    Av = sp.simplify(-1**(sign_correction) * num_det/den_det)
+    Av = mai.vtransf(ii, jj, mm, nn)
     
     if( verbose ):
     
+        # cofactores de 2do orden
+        num_det = mai.cofactor((mm, nn), (ii, jj))
+        den_det = mai.cofactor((mm, nn), (mm, nn))
+
+        num = Ymai.minor_submatrix(max_input_idx, max_ouput_idx).minor_submatrix(min_input_idx, min_ouput_idx)
+        den = Ymai.minor_submatrix(max_input_idx, max_input_idx).minor_submatrix(min_input_idx, min_input_idx)
+    
         print_latex(r' [Y_{MAI}] = ' + sp.latex(Ymai) )
         
         print_latex(r' [Y^{{ {:d}{:d} }}_{{ {:d}{:d} }} ] = '.format(mm,nn,ii,jj) + sp.latex(num) )
     
         print_latex(r'[Y^{{ {:d}{:d} }}_{{ {:d}{:d} }} ] = '.format(mm,nn,mm,nn) + sp.latex(den) )
     
-        print_latex(r'T^{{ {:d}{:d} }}_{{ {:d}{:d} }} = \frac{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }}{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }} = '.format(ii,jj,mm,nn,mm,nn,ii,jj,mm,nn,mm,nn) + r' -1^{{ {:d} }} '.format(sign_correction)  + r'\frac{{ ' + sp.latex(num_det) + r'}}{{' + sp.latex(den_det) + r'}} = ' + sp.latex(Av) )
+        print_latex(r'T^{{ {:d}{:d} }}_{{ {:d}{:d} }} = \frac{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }}{{ \underline{{Y}}^{{ {:d}{:d} }}_{{ {:d}{:d} }} }} = '.format(ii,jj,mm,nn,mm,nn,ii,jj,mm,nn,mm,nn) + r'\frac{{ ' + sp.latex(num_det) + r'}}{{' + sp.latex(den_det) + r'}} = ' + sp.latex(Av) )
     
     return(Av)
 
@@ -1105,15 +1399,17 @@ def calc_MAI_impedance_ij(Ymai, ii=0, jj=1, verbose=False):
         max_idx = jj
         min_idx = ii
  
-    # cofactor de 2do orden
-    num = Ymai.minor_submatrix(max_idx, max_idx).minor_submatrix(min_idx, min_idx)
-    # cualquier cofactor de primer orden
-    den = Ymai.minor_submatrix(min_idx, min_idx)
+    mai = _analisis_mai(sp.ImmutableMatrix(Ymai))
     
-    ZZ = sp.simplify(num.det()/den.det())
+    ZZ = mai.impedancia(ii, jj)
     
     if( verbose ):
 
+        # cofactor de 2do orden
+        num = Ymai.minor_submatrix(max_idx, max_idx).minor_submatrix(min_idx, min_idx)
+        # cualquier cofactor de primer orden
+        den = Ymai.minor_submatrix(min_idx, min_idx)
+
         print_latex(r' [Y_{MAI}] = ' + sp.latex(Ymai) )
         
         print_latex(r' [Y^{{ {:d}{:d} }}_{{ {:d}{:d} }} ] = '.format(ii,ii,jj,jj) + sp.latex(num) )
@@ -1124,3 +1420,428 @@ def calc_MAI_impedance_ij(Ymai, ii=0, jj=1, verbose=False):
 
     return(ZZ)
 
+def elementos2mai(elementos, s0):
+    '''
+    Arma la matriz admitancia indefinida (MAI) numérica de una red, a 
+    partir de la lista de sus elementos, evaluada en la frecuencia compleja 
+    s0. La matriz es dispersa, por lo que se admiten redes de cientos de 
+    nodos.
+
+    Parameters
+    ----------
+    elementos : list
+        Lista de elementos de la red. Cada uno es una tupla
+        
+            (tipo, nodo_a, nodo_b, valor)
+        
+        con tipo 'R', 'L', 'C' o 'G' (conductancia), o bien 'Y' o 'Z' 
+        para una admitancia o impedancia arbitraria. En este caso, valor 
+        puede ser una función de s, que debe admitir un array de valores de 
+        s. Las fuentes de corriente controladas por tensión se indican como
+        
+            ('VCCS', nodo_a, nodo_b, nodo_c, nodo_d, gm)
+        
+        y entregan una corriente gm.(Vc - Vd) que sale del nodo a y entra 
+        al nodo b. Los nodos se numeran desde 0.
+    s0 : complex
+        Frecuencia compleja donde se evalúa la MAI.
+
+    Returns
+    -------
+    Ymai : scipy.sparse.csc_matrix
+        Matriz admitancia indefinida de (N, N), siendo N la cantidad de 
+        nodos.
+
+    Example
+    -------
+
+    >>> from pytc2.cuadripolos import elementos2mai
+    >>> # divisor resistivo
+    >>> Ymai = elementos2mai([('R', 0, 1, 1.), ('R', 1, 2, 1.)], 1j)
+    >>> Ymai.toarray().real
+    array([[ 1., -1.,  0.],
+           [-1.,  2., -1.],
+           [ 0., -1.,  1.]])
+
+    See Also
+    --------
+
+    :func:`calc_MAI_impedance_ij_num`
+    :func:`y2mai`
+
+    '''
+    
+    red = _mai_estampas(elementos)
+    
+    vals = _mai_valores(red, np.atleast_1d(complex(s0)))[:, 0]
+    
+    return( sps.csc_matrix((vals, (red['filas'], red['columnas'])), shape = (red['nodos'], red['nodos'])) )
+
+def calc_MAI_ztransf_ij_mn_num(elementos, ww, ii=2, jj=3, mm=0, nn=1):
+    '''
+    Calcula numéricamente la transferencia de impedancia V_ij / I_mn de una
+    red, en cada frecuencia de ww. Es la versión numérica de 
+    :func:`calc_MAI_ztransf_ij_mn`: en lugar de calcular cofactores 
+    simbólicos, en cada frecuencia se arma la MAI dispersa a partir de los 
+    elementos (ver :func:`elementos2mai`), se la reduce tomando como 
+    referencia al nodo nn, y se resuelve el sistema mediante la 
+    factorización LU dispersa.
+
+    Parameters
+    ----------
+    elementos : list
+        Lista de elementos de la red, como en :func:`elementos2mai`.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúa, en s = jw.
+    ii, jj : int
+        Nodos de salida: V_ij = V_i - V_j.
+    mm, nn : int
+        Nodos de entrada: I_mn es la corriente que ingresa al nodo mm y 
+        sale del nodo nn.
+
+    Returns
+    -------
+    Tz : ndarray
+        Transferencia de impedancia en cada frecuencia. Vale NaN en las 
+        frecuencias donde la red reducida es singular.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import calc_MAI_ztransf_ij_mn_num
+    >>> # red T resistiva: 1 Ohm en cada rama
+    >>> elementos = [('R', 0, 2, 1.), ('R', 2, 1, 1.), ('R', 2, 3, 1.)]
+    >>> calc_MAI_ztransf_ij_mn_num(elementos, np.array([1.]), ii=2, jj=1, mm=0, nn=1).real
+    array([1.])
+
+    '''
+
+    VV = _mai_tensiones(elementos, ww, mm, nn)
+
+    return( VV[:, ii] - VV[:, jj] )
+
+def calc_MAI_vtransf_ij_mn_num(elementos, ww, ii=2, jj=3, mm=0, nn=1):
+    '''
+    Calcula numéricamente la transferencia de tensión V_ij / V_mn de una 
+    red, en cada frecuencia de ww, del mismo modo que 
+    :func:`calc_MAI_ztransf_ij_mn_num`. Es la versión numérica de 
+    :func:`calc_MAI_vtransf_ij_mn`.
+
+    Parameters
+    ----------
+    elementos : list
+        Lista de elementos de la red, como en :func:`elementos2mai`.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúa, en s = jw.
+    ii, jj : int
+        Nodos de salida: V_ij = V_i - V_j.
+    mm, nn : int
+        Nodos de entrada: V_mn = V_m - V_n.
+
+    Returns
+    -------
+    Av : ndarray
+        Transferencia de tensión en cada frecuencia.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import calc_MAI_vtransf_ij_mn_num
+    >>> # pasabajos RC
+    >>> elementos = [('R', 0, 2, 1.), ('C', 2, 1, 1.)]
+    >>> np.abs(calc_MAI_vtransf_ij_mn_num(elementos, np.array([1.]), ii=2, jj=1, mm=0, nn=1))**2
+    array([0.5])
+
+    '''
+
+    VV = _mai_tensiones(elementos, ww, mm, nn)
+
+    return( (VV[:, ii] - VV[:, jj]) / (VV[:, mm] - VV[:, nn]) )
+
+def calc_MAI_impedance_ij_num(elementos, ww, ii=0, jj=1):
+    '''
+    Calcula numéricamente la impedancia vista entre los nodos ii y jj de 
+    una red, en cada frecuencia de ww, del mismo modo que 
+    :func:`calc_MAI_ztransf_ij_mn_num`. Es la versión numérica de 
+    :func:`calc_MAI_impedance_ij`.
+
+    Parameters
+    ----------
+    elementos : list
+        Lista de elementos de la red, como en :func:`elementos2mai`.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúa, en s = jw.
+    ii, jj : int
+        Nodos entre los que se calcula la impedancia.
+
+    Returns
+    -------
+    ZZ : ndarray
+        Impedancia en cada frecuencia.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.cuadripolos import calc_MAI_impedance_ij_num
+    >>> # T puenteado de R constante, con Ya.Yb = G² = 1
+    >>> elementos = [('R', 0, 2, 1.), ('R', 2, 3, 1.), ('R', 3, 1, 1.)]
+    >>> elementos += [('C', 0, 3, 1.), ('L', 2, 1, 1.)]
+    >>> ZZ = calc_MAI_impedance_ij_num(elementos, np.array([0.5, 1., 2.]), 0, 1)
+    >>> np.allclose(ZZ, 1.)
+    True
+
+    '''
+
+    VV = _mai_tensiones(elementos, ww, ii, jj)
+
+    return( VV[:, ii] - VV[:, jj] )
+
+########################
+#%% Funciones internas #
+########################
+
+def _como_cuadripolo(MM):
+    '''
+    Convierte *MM* en un array de (..., 2, 2) de punto flotante, sobre el 
+    que operan las conversiones numéricas.
+
+    '''
+
+    MM = np.asarray(MM)
+    
+    if MM.ndim < 2 or MM.shape[-2:] != (2, 2):
+        raise ValueError('Se esperaba una matriz de (..., 2, 2), no de %s' % (MM.shape,))
+
+    if not np.issubdtype(MM.dtype, np.inexact):
+        MM = MM.astype(float)
+    
+    return(MM)
+
+def _tabcd_stack(AA, BB, CC, DD):
+    '''
+    Arma la matriz ABCD de (..., 2, 2) a partir de sus cuatro parámetros, 
+    que pueden ser escalares o arrays de formas compatibles. El tipo de 
+    dato es el más amplio entre ellos, para no truncar valores complejos.
+
+    '''
+
+    all_par = np.broadcast_arrays(AA, BB, CC, DD)
+
+    TT = np.empty(all_par[0].shape + (2, 2), dtype = np.result_type(float, *all_par))
+    
+    TT[..., 0, 0] = all_par[0]
+    TT[..., 0, 1] = all_par[1]
+    TT[..., 1, 0] = all_par[2]
+    TT[..., 1, 1] = all_par[3]
+    
+    return(TT)
+
+def _det2(MM):
+    '''
+    Determinante de cada matriz de 2x2 de la pila *MM* de (..., 2, 2).
+
+    '''
+
+    return(MM[..., 0, 0] * MM[..., 1, 1] - MM[..., 0, 1] * MM[..., 1, 0])
+
+@lru_cache(maxsize = 64)
+def _conversion_template(src_dep, src_indep, src_neg_i2, dst_dep, dst_indep, dst_neg_i2):
+    '''
+    Forma cerrada de la conversión entre dos modelos de cuadripolos, para 
+    :func:`Model_conversion`. Se resuelve una única vez el sistema de un 
+    modelo de origen genérico, de parámetros qq, y se devuelve 
+    (qq, QQ, QQ_delta), siendo QQ la matriz del modelo de destino en 
+    función de qq, y QQ_delta la misma matriz simplificada y con el 
+    determinante de qq reemplazado por Delta.
+    
+    '''
+
+    qq = sp.Matrix(2, 2, sp.symbols('q11 q12 q21 q22', cls = sp.Dummy))
+
+    aa = sp.solve(list(qq * sp.Matrix(src_indep) - sp.Matrix(src_dep)), dst_dep, dict = True)
+    
+    if len(aa) != 1:
+        raise ValueError('can not express %s in terms of %s' % (dst_dep, dst_indep))
+    
+    QQ = sp.zeros(2, 2)
+
+    for jj, dep_var in enumerate(dst_dep):
+        for kk, indep_var in enumerate(dst_indep):
+
+            bb = sp.diff(aa[0][dep_var], indep_var)
+            
+            # i2 se define al revés en este modelo
+            if dst_neg_i2 and (dep_var.name == 'i2') != (indep_var.name == 'i2'):
+                bb = -bb
+            
+            QQ[jj, kk] = bb
+
+    det_qq = qq.det()
+    
+    # i2 se define al revés en este modelo
+    if src_neg_i2:
+        det_qq = -det_qq
+    
+    QQ_delta = QQ.applyfunc(lambda bb: sp.cancel(bb).subs(det_qq, _DELTA))
+
+    return(tuple(qq), sp.ImmutableMatrix(QQ), sp.ImmutableMatrix(QQ_delta))
+
+def _son_parametros(MM):
+    '''
+    Indica si todos los elementos de MM son símbolos distintos, 
+    eventualmente cambiados de signo, como en las tablas de conversión.
+    
+    '''
+
+    simbolos = [ (-bb if bb.could_extract_minus_sign() else bb) for bb in MM ]
+
+    return( all(bb.is_Symbol for bb in simbolos) and len(set(simbolos)) == len(simbolos) )
+
+@lru_cache(maxsize = 32)
+def _analisis_mai(Ymai):
+    '''
+    :class:`AnalisisMAI` de cada Ymai (inmutable), para que las sucesivas 
+    consultas de las funciones calc_MAI_* sobre la misma red reutilicen los 
+    cofactores ya calculados.
+    
+    '''
+
+    return(AnalisisMAI(Ymai))
+
+def _mai_estampas(elementos):
+    '''
+    Estampas de los elementos en la MAI, para :func:`elementos2mai`. Cada 
+    entrada (fila, columna) de la MAI suma signo.y_e(s) de algún elemento 
+    e, con y_e(s) = k0 + k1.s + k_1/s, o bien dada por una función de s.
+    
+    '''
+
+    filas = []
+    columnas = []
+    signos = []
+    indices = []
+    kk = []
+    funciones = []
+    nodos = 0
+
+    for ee, this_el in enumerate(elementos):
+        
+        tipo = this_el[0]
+        
+        if tipo == 'VCCS':
+            
+            _, aa, bb, cc, dd, gm = this_el
+            
+            filas += [aa, aa, bb, bb]
+            columnas += [cc, dd, cc, dd]
+            signos += [1, -1, -1, 1]
+            kk += [(gm, 0., 0.)]
+            nodos = max(nodos, aa, bb, cc, dd)
+        
+        else:
+            
+            _, aa, bb, valor = this_el
+            
+            filas += [aa, bb, aa, bb]
+            columnas += [aa, bb, bb, aa]
+            signos += [1, 1, -1, -1]
+            nodos = max(nodos, aa, bb)
+            
+            if tipo == 'R':
+                kk += [(1/valor, 0., 0.)]
+            elif tipo == 'G':
+                kk += [(valor, 0., 0.)]
+            elif tipo == 'C':
+                kk += [(0., valor, 0.)]
+            elif tipo == 'L':
+                kk += [(0., 0., 1/valor)]
+            elif tipo in ('Y', 'Z'):
+                
+                if callable(valor):
+                    kk += [(0., 0., 0.)]
+                    funciones += [(ee, valor, tipo == 'Z')]
+                elif tipo == 'Y':
+                    kk += [(valor, 0., 0.)]
+                else:
+                    kk += [(1/valor, 0., 0.)]
+            else:
+                valid_types = ['R', 'L', 'C', 'G', 'Y', 'Z', 'VCCS']
+                raise ValueError('element type must be one of %s, not %s'
+                                 % (valid_types, tipo))
+        
+        indices += [ee] * 4
+    
+    return({'filas': np.array(filas, dtype = int), 
+            'columnas': np.array(columnas, dtype = int), 
+            'signos': np.array(signos, dtype = float), 
+            'indices': np.array(indices, dtype = int), 
+            'k': np.array(kk, dtype = complex).reshape((-1, 3)), 
+            'funciones': funciones, 
+            'nodos': nodos + 1})
+
+def _mai_valores(red, ss):
+    '''
+    Valores de las estampas de la MAI en cada frecuencia compleja de ss. 
+    Devuelve un array de (estampas, F).
+    
+    '''
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        
+        # admitancia de cada elemento en cada frecuencia
+        yy = red['k'][:, 0:1] + red['k'][:, 1:2] * ss + red['k'][:, 2:3] / ss
+        
+        for ee, func, bZ in red['funciones']:
+            
+            this_val = np.broadcast_to(np.asarray(func(ss), dtype = complex), ss.shape)
+            
+            yy[ee] = 1 / this_val if bZ else this_val
+
+    return( red['signos'][:, np.newaxis] * yy[red['indices']] )
+
+def _mai_tensiones(elementos, ww, mm, nn):
+    '''
+    Tensiones de todos los nodos de la red, de (F, N), en cada frecuencia 
+    de ww, cuando se inyecta una corriente unitaria en el nodo mm y se 
+    extrae del nodo nn, que se toma como referencia.
+    
+    '''
+
+    red = _mai_estampas(elementos)
+    NN = red['nodos']
+    
+    ss = 1j * np.atleast_1d(np.asarray(ww, dtype = float))
+    
+    # MAI reducida: sin la fila ni la columna del nodo de referencia
+    bRed = np.logical_and(red['filas'] != nn, red['columnas'] != nn)
+    filas = red['filas'][bRed]
+    columnas = red['columnas'][bRed]
+    filas = filas - (filas > nn)
+    columnas = columnas - (columnas > nn)
+    
+    vals = _mai_valores(red, ss)[bRed]
+    
+    II = np.zeros(NN - 1, dtype = complex)
+    II[mm - (mm > nn)] = 1.
+    
+    VV = np.zeros((ss.size, NN), dtype = complex)
+    
+    for ff in range(ss.size):
+
+        Yred = sps.csc_matrix((vals[:, ff], (filas, columnas)), shape = (NN - 1, NN - 1))
+        
+        try:
+            if not np.all(np.isfinite(Yred.data)):
+                raise RuntimeError('MAI no finita')
+            
+            VV[ff, np.arange(NN) != nn] = spla.splu(Yred).solve(II)
+            
+        except RuntimeError:
+            # red reducida singular en esta frecuencia
+            VV[ff, :] = np.nan
+
+    return(VV)
+
@@ -10,10 +10,29 @@ import numpy as np
 
 import sympy as sp
 
-from IPython.display import display
+from ._lazy import lazy_import
 
-from schemdraw import Drawing
-from schemdraw.elements import  Resistor, ResistorIEC, Capacitor, Inductor, Line, Dot, Gap, Arrow
+# dependencias opcionales: se importan recién al dibujar.
+ipd = lazy_import('IPython.display')
+schemdraw = lazy_import('schemdraw')
+elm = lazy_import('schemdraw.elements')
+
+# nombres que históricamente se importaban desde este módulo, por ej.
+# from pytc2.dibujar import display, Capacitor, Resistor, Inductor
+_ELEMENTOS = ('Resistor', 'ResistorIEC', 'Capacitor', 'Inductor', 'Line', 'Dot', 'Gap', 'Arrow')
+
+def __getattr__(name):
+
+    if name == 'display':
+        return(ipd.display)
+
+    if name == 'Drawing':
+        return(schemdraw.Drawing)
+
+    if name in _ELEMENTOS:
+        return(getattr(elm, name))
+
+    raise AttributeError('module {:s} has no attribute {:s}'.format(__name__, name))
 
 
 ##########################################
@@ -48,7 +67,7 @@ def dibujar_Tee(ZZ, return_components = False):
     
     # Dibujo la red Tee
     
-    d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     d = dibujar_puerto_entrada(d, port_name = '' )
 
@@ -66,18 +85,18 @@ def dibujar_Tee(ZZ, return_components = False):
 
     
     if( not Za.is_zero ):
-        d = dibujar_elemento_serie(d, ResistorIEC, Za )
+        d = dibujar_elemento_serie(d, elm.ResistorIEC, Za )
 
     if( not Zb.is_zero ):
-        d = dibujar_elemento_derivacion(d, ResistorIEC, Zb )
+        d = dibujar_elemento_derivacion(d, elm.ResistorIEC, Zb )
     
     if( not Zc.is_zero ):
-        d = dibujar_elemento_serie(d, ResistorIEC, Zc )
+        d = dibujar_elemento_serie(d, elm.ResistorIEC, Zc )
         
     
     d = dibujar_puerto_salida(d, port_name = '')
 
-    display(d)        
+    ipd.display(d)        
     
     if(return_components):
         return([Za,Zb,Zc])
@@ -102,7 +121,7 @@ def dibujar_Pi(YY, return_components = False):
     
     # Dibujo la red Tee
     
-    d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     d = dibujar_puerto_entrada(d, port_name = '')
     
@@ -125,17 +144,17 @@ def dibujar_Pi(YY, return_components = False):
         Zc = 1/Yc
     
     if( bSymbolic and (not Ya.is_zero) or (not bSymbolic) and Ya != 0 ):
-        d = dibujar_elemento_derivacion(d, ResistorIEC, Za )
+        d = dibujar_elemento_derivacion(d, elm.ResistorIEC, Za )
 
     if( bSymbolic and (not Yb.is_zero) or (not bSymbolic) and Yb != 0 ):
-        d = dibujar_elemento_serie(d, ResistorIEC, Zb )
+        d = dibujar_elemento_serie(d, elm.ResistorIEC, Zb )
 
     if( bSymbolic and (not Yc.is_zero) or (not bSymbolic) and Yc != 0 ):
-        d = dibujar_elemento_derivacion(d, ResistorIEC, Zc )
+        d = dibujar_elemento_derivacion(d, elm.ResistorIEC, Zc )
     
     d = dibujar_puerto_salida(d, port_name = '')
     
-    display(d)        
+    ipd.display(d)        
 
     if(return_components):
         return([Ya, Yb, Yc])
@@ -190,33 +209,33 @@ def dibujar_lattice(ZZ=None, return_components = False):
 
     # Dibujo la red Lattice    
     
-    with Drawing() as d:
+    with schemdraw.Drawing() as d:
         
         d.config(fontsize=16, unit=4)
 
         d = dibujar_puerto_entrada(d, port_name = '' )
 
         if( bSymbolic and (not Za.is_zero) or (not bSymbolic) and Za != 0 ):
-            d += (Za_d := ResistorIEC().right().label(Za_lbl).dot().idot())
+            d += (Za_d := elm.ResistorIEC().right().label(Za_lbl).dot().idot())
         else:
-            d += (Za_d := Line().right().dot())
+            d += (Za_d := elm.Line().right().dot())
 
         d.push()
         
-        d += Gap().down().label('')
+        d += elm.Gap().down().label('')
 
-        d += (line_down := Line(ls='dotted').left().dot().idot())
+        d += (line_down := elm.Line(ls='dotted').left().dot().idot())
 
         cross_line_vec = line_down.end - Za_d.end
 
-        d += Line(ls='dotted').endpoints(Za_d.end, Za_d.end + 0.25*cross_line_vec )
+        d += elm.Line(ls='dotted').endpoints(Za_d.end, Za_d.end + 0.25*cross_line_vec )
 
-        d += Line(ls='dotted').endpoints(Za_d.end + 0.6*cross_line_vec, line_down.end )
+        d += elm.Line(ls='dotted').endpoints(Za_d.end + 0.6*cross_line_vec, line_down.end )
 
         if( bSymbolic and (not Zb.is_zero) or (not bSymbolic) and Zb != 0 ):
-            d += (Zb_d := ResistorIEC().label(Zb_lbl).endpoints(Za_d.start, line_down.start).dot())
+            d += (Zb_d := elm.ResistorIEC().label(Zb_lbl).endpoints(Za_d.start, line_down.start).dot())
         else:
-            d += (Zb_d := Line().endpoints(Za_d.start, line_down.start).dot())
+            d += (Zb_d := elm.Line().endpoints(Za_d.start, line_down.start).dot())
             
         d.pop()
 
@@ -269,7 +288,7 @@ def dibujar_cauer_RC_RL(ki = None, y_exc = None, z_exc = None):
     if not(ki is None) or len(ki) > 0:
         # si hay algo para dibujar ...
         
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
         d = dibujar_puerto_entrada(d,
                                        voltage_lbl = ('+', '$V$', '-'), 
@@ -306,11 +325,11 @@ def dibujar_cauer_RC_RL(ki = None, y_exc = None, z_exc = None):
             if bSeries:
                 
                 if sp.degree(kii*s) == 1:
-                    d = dibujar_elemento_serie(d, Resistor, kii)
+                    d = dibujar_elemento_serie(d, elm.Resistor, kii)
                 elif sp.degree(kii*s) == 0:
-                    d = dibujar_elemento_serie(d, Capacitor, 1/(s*kii))
+                    d = dibujar_elemento_serie(d, elm.Capacitor, 1/(s*kii))
                 else:
-                    d = dibujar_elemento_serie(d, Inductor, kii/s)
+                    d = dibujar_elemento_serie(d, elm.Inductor, kii/s)
                     
                 bComponenteDibujadoDerivacion = False
 
@@ -321,11 +340,11 @@ def dibujar_cauer_RC_RL(ki = None, y_exc = None, z_exc = None):
                     dibujar_espacio_derivacion(d)
 
                 if sp.degree(kii*s) == 1:
-                    d = dibujar_elemento_derivacion(d, Resistor, 1/kii)
+                    d = dibujar_elemento_derivacion(d, elm.Resistor, 1/kii)
                 elif sp.degree(kii*s) == 2:
-                    d = dibujar_elemento_derivacion(d, Capacitor, kii/s)
+                    d = dibujar_elemento_derivacion(d, elm.Capacitor, kii/s)
                 else:
-                    d = dibujar_elemento_derivacion(d, Inductor, 1/(s*kii))
+                    d = dibujar_elemento_derivacion(d, elm.Inductor, 1/(s*kii))
                 
                 bComponenteDibujadoDerivacion = True
 
@@ -333,11 +352,11 @@ def dibujar_cauer_RC_RL(ki = None, y_exc = None, z_exc = None):
 
         if not bComponenteDibujadoDerivacion:
             
-            d += Line().right().length(d.unit*.25)
-            d += Line().down()
-            d += Line().left().length(d.unit*.25)
+            d += elm.Line().right().length(d.unit*.25)
+            d += elm.Line().down()
+            d += elm.Line().left().length(d.unit*.25)
         
-        display(d)
+        ipd.display(d)
 
     else:    
         
@@ -386,7 +405,7 @@ def dibujar_cauer_LC(ki = None, y_exc = None, z_exc = None):
     if not(ki is None) or len(ki) > 0:
         # si hay algo para dibujar ...
         
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
         d = dibujar_puerto_entrada(d,
                                        voltage_lbl = ('+', '$V$', '-'), 
@@ -430,9 +449,9 @@ def dibujar_cauer_LC(ki = None, y_exc = None, z_exc = None):
             if bSeries:
                 
                 if bCauer1:
-                    d = dibujar_elemento_serie(d, Inductor, kii/s)
+                    d = dibujar_elemento_serie(d, elm.Inductor, kii/s)
                 else:
-                    d = dibujar_elemento_serie(d, Capacitor, 1/(s*kii))
+                    d = dibujar_elemento_serie(d, elm.Capacitor, 1/(s*kii))
                     
                 bComponenteDibujadoDerivacion = False
 
@@ -443,9 +462,9 @@ def dibujar_cauer_LC(ki = None, y_exc = None, z_exc = None):
                     dibujar_espacio_derivacion(d)
 
                 if bCauer1:
-                    d = dibujar_elemento_derivacion(d, Capacitor, kii/s)
+                    d = dibujar_elemento_derivacion(d, elm.Capacitor, kii/s)
                 else:
-                    d = dibujar_elemento_derivacion(d, Inductor, 1/(s*kii))
+                    d = dibujar_elemento_derivacion(d, elm.Inductor, 1/(s*kii))
                 
                 bComponenteDibujadoDerivacion = True
 
@@ -453,11 +472,11 @@ def dibujar_cauer_LC(ki = None, y_exc = None, z_exc = None):
 
         if not bComponenteDibujadoDerivacion:
             
-            d += Line().right().length(d.unit*.25)
-            d += Line().down()
-            d += Line().left().length(d.unit*.25)
+            d += elm.Line().right().length(d.unit*.25)
+            d += elm.Line().down()
+            d += elm.Line().left().length(d.unit*.25)
         
-        display(d)
+        ipd.display(d)
 
     else:    
         
@@ -509,7 +528,7 @@ def dibujar_foster_derivacion(k0 = None, koo = None, ki = None, kk = None, y_exc
         
         # si hay algo para dibujar ...
         
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
         bComponenteDibujado = False
 
@@ -527,7 +546,7 @@ def dibujar_foster_derivacion(k0 = None, koo = None, ki = None, kk = None, y_exc
 
         if not(kk is None):
             
-            d = dibujar_elemento_derivacion(d, Resistor, 1/kk)
+            d = dibujar_elemento_derivacion(d, elm.Resistor, 1/kk)
 
             bComponenteDibujado = True
 
@@ -537,7 +556,7 @@ def dibujar_foster_derivacion(k0 = None, koo = None, ki = None, kk = None, y_exc
                 
                 dibujar_espacio_derivacion(d)
 
-            d = dibujar_elemento_derivacion(d, Inductor, 1/k0)
+            d = dibujar_elemento_derivacion(d, elm.Inductor, 1/k0)
             
             bComponenteDibujado = True
             
@@ -548,7 +567,7 @@ def dibujar_foster_derivacion(k0 = None, koo = None, ki = None, kk = None, y_exc
                 
                 dibujar_espacio_derivacion(d)
                     
-            d = dibujar_elemento_derivacion(d, Capacitor, koo)
+            d = dibujar_elemento_derivacion(d, elm.Capacitor, koo)
 
             bComponenteDibujado = True
             
@@ -575,7 +594,7 @@ def dibujar_foster_derivacion(k0 = None, koo = None, ki = None, kk = None, y_exc
                     bComponenteDibujado = True
 
         
-        display(d)
+        ipd.display(d)
 
     else:    
         
@@ -628,7 +647,7 @@ def dibujar_foster_serie(k0 = None, koo = None, ki = None, kk = None, z_exc = No
         
         # si hay algo para dibujar ...
         
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
         d = dibujar_puerto_entrada(d,
                                        voltage_lbl = ('+', '$V$', '-'), 
@@ -643,15 +662,15 @@ def dibujar_foster_serie(k0 = None, koo = None, ki = None, kk = None, z_exc = No
 
         if not(kk is None):
             
-            d = dibujar_elemento_serie(d, Resistor, kk)
+            d = dibujar_elemento_serie(d, elm.Resistor, kk)
             
         if not(k0 is None):
         
-            d = dibujar_elemento_serie(d, Capacitor, 1/k0)
+            d = dibujar_elemento_serie(d, elm.Capacitor, 1/k0)
             
         if not(koo is None):
         
-            d = dibujar_elemento_serie(d, Inductor, koo)
+            d = dibujar_elemento_serie(d, elm.Inductor, koo)
             
         if not(ki is None):
 
@@ -670,11 +689,11 @@ def dibujar_foster_serie(k0 = None, koo = None, ki = None, kk = None, z_exc = No
                 dibujar_espacio_derivacion(d)
 
 
-        d += Line().right().length(d.unit*.25)
-        d += Line().down()
-        d += Line().left().length(d.unit*.25)
+        d += elm.Line().right().length(d.unit*.25)
+        d += elm.Line().down()
+        d += elm.Line().left().length(d.unit*.25)
         
-        display(d)
+        ipd.display(d)
 
     else:    
         
@@ -701,33 +720,33 @@ def dibujar_puerto_entrada(d, port_name = None, voltage_lbl = None, current_lbl
 
     '''
     
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
-    d += Dot(open=True)
+    d += elm.Dot(open=True)
     
     if voltage_lbl is None:
-        d += Gap().down().label( '' )
+        d += elm.Gap().down().label( '' )
     else:
-        d += Gap().down().label( voltage_lbl, fontsize=16)
+        d += elm.Gap().down().label( voltage_lbl, fontsize=16)
     
     d.push()
 
     if not(port_name is None):
-        d += Gap().left().label( '' ).length(d.unit*.35)
-        d += Gap().up().label( port_name, fontsize=22)
+        d += elm.Gap().left().label( '' ).length(d.unit*.35)
+        d += elm.Gap().up().label( port_name, fontsize=22)
         d.pop()
         
-    d += Dot(open=True)
-    d += Line().right().length(d.unit*.5)
-    d += Gap().up().label( '' )
+    d += elm.Dot(open=True)
+    d += elm.Line().right().length(d.unit*.5)
+    d += elm.Gap().up().label( '' )
     d.push()
     
     if current_lbl is None:
-        d += Line().left().length(d.unit*.5)
+        d += elm.Line().left().length(d.unit*.5)
     else:
-        d += Line().left().length(d.unit*.25)
-        d += Arrow(reverse=True).left().label( current_lbl, fontsize=16).length(d.unit*.25)
+        d += elm.Line().left().length(d.unit*.25)
+        d += elm.Arrow(reverse=True).left().label( current_lbl, fontsize=16).length(d.unit*.25)
     
     d.pop()
 
@@ -749,33 +768,33 @@ def dibujar_puerto_salida(d, port_name = None, voltage_lbl = None, current_lbl =
         Matriz de parámetros de transferencia scattering.
 
     '''
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if current_lbl is None:
-        d += Line().right().length(d.unit*.5)
+        d += elm.Line().right().length(d.unit*.5)
     else:
-        d += Line().right().length(d.unit*.25)
-        d += Arrow(reverse=True).right().label( current_lbl, fontsize=16).length(d.unit*.25)
+        d += elm.Line().right().length(d.unit*.25)
+        d += elm.Arrow(reverse=True).right().label( current_lbl, fontsize=16).length(d.unit*.25)
     
-    d += Dot(open=True)
+    d += elm.Dot(open=True)
     
     d.push()
 
     if voltage_lbl is None:
-        d += Gap().down().label( '' )
+        d += elm.Gap().down().label( '' )
     else:
-        d += Gap().down().label( voltage_lbl, fontsize=16)
+        d += elm.Gap().down().label( voltage_lbl, fontsize=16)
 
 
     if not(port_name is None):
         d.push()
-        d += Gap().right().label( '' ).length(d.unit*.35)
-        d += Gap().up().label( port_name, fontsize=22)
+        d += elm.Gap().right().label( '' ).length(d.unit*.35)
+        d += elm.Gap().up().label( port_name, fontsize=22)
         d.pop()
 
-    d += Dot(open=True)
-    d += Line().left().length(d.unit*.5)
+    d += elm.Dot(open=True)
+    d += elm.Line().left().length(d.unit*.5)
 
     d.pop()
 
@@ -798,16 +817,16 @@ def dibujar_espaciador( d ):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
-    d += Line().right().length(d.unit*.5)
+    d += elm.Line().right().length(d.unit*.5)
 
     d.push()
 
-    d += Gap().down().label( '' )
+    d += elm.Gap().down().label( '' )
 
-    d += Line().left().length(d.unit*.5)
+    d += elm.Line().left().length(d.unit*.5)
 
     d.pop()
 
@@ -830,14 +849,14 @@ def dibujar_funcion_exc_abajo(d, func_label, sym_func, k_gap_width=0.5, hacia_sa
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
     half_width = d.unit*k_gap_width/2
     
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
     d.push()
-    d += Gap().down().label('')
+    d += elm.Gap().down().label('')
     d.push()
     
     if isinstance(sym_func, sp.Basic ):
@@ -849,27 +868,27 @@ def dibujar_funcion_exc_abajo(d, func_label, sym_func, k_gap_width=0.5, hacia_sa
     else:
         sym_func = '$ ' + func_label + ' = ?? $'
     
-    lbl = d.add(Gap().down().label( sym_func, fontsize=22 ).length(0.5*half_width))
-    d += Gap().down().label('').length(0.5*half_width)
+    lbl = d.add(elm.Gap().down().label( sym_func, fontsize=22 ).length(0.5*half_width))
+    d += elm.Gap().down().label('').length(0.5*half_width)
     d.pop()
     d.push()
-    d += Line().up().at( (d.here.x, d.here.y - .2 * half_width) ).length(half_width).linewidth(1)
+    d += elm.Line().up().at( (d.here.x, d.here.y - .2 * half_width) ).length(half_width).linewidth(1)
     
     if( hacia_salida ):
         d.push()
-        d += Arrow().right().length(.5*half_width).linewidth(1)
+        d += elm.Arrow().right().length(.5*half_width).linewidth(1)
         d.pop()
         
     if( hacia_entrada ):
-        d += Arrow().left().length(.5*half_width).linewidth(1)
+        d += elm.Arrow().left().length(.5*half_width).linewidth(1)
         
     d.pop()
     d.push()
-    d += Line().left().length(half_width)
+    d += elm.Line().left().length(half_width)
     d.pop()
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
     d.pop()
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
 
     return([d, lbl])
 
@@ -889,12 +908,12 @@ def dibujar_funcion_exc_arriba(d, func_label, sym_func, k_gap_width=0.5, hacia_s
         Matriz de parámetros de transferencia scattering.
 
     '''
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
     half_width = d.unit*k_gap_width/2
     
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
     d.push()
     
     if isinstance(sym_func, sp.Basic ):
@@ -907,28 +926,28 @@ def dibujar_funcion_exc_arriba(d, func_label, sym_func, k_gap_width=0.5, hacia_s
         sym_func = '$ ' + func_label + ' = ?? $'
 
     
-    lbl = d.add(Gap().up().label( sym_func, fontsize=22 ).length(3* half_width))
+    lbl = d.add(elm.Gap().up().label( sym_func, fontsize=22 ).length(3* half_width))
     d.pop()
     d.push()
-    d += Line().down().at( (d.here.x, d.here.y + .2 * half_width) ).length(half_width).linewidth(1)
+    d += elm.Line().down().at( (d.here.x, d.here.y + .2 * half_width) ).length(half_width).linewidth(1)
     
     if( hacia_salida ):
         d.push()
-        d += Arrow().right().length(.5*half_width).linewidth(1)
+        d += elm.Arrow().right().length(.5*half_width).linewidth(1)
         d.pop()
         
     if( hacia_entrada ):
-        d += Arrow().left().length(.5*half_width).linewidth(1)
+        d += elm.Arrow().left().length(.5*half_width).linewidth(1)
         
     d.pop()
     d.push()
-    d += Gap().down().label('')
+    d += elm.Gap().down().label('')
     d.push()
-    d += Line().left().length(half_width)
+    d += elm.Line().left().length(half_width)
     d.pop()
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
     d.pop()
-    d += Line().right().length(half_width)
+    d += elm.Line().right().length(half_width)
 
 
 
@@ -951,8 +970,8 @@ def dibujar_elemento_serie(d, elemento, sym_label=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_label, sp.Basic ):
         sym_label = to_latex(sym_label)
@@ -966,8 +985,8 @@ def dibujar_elemento_serie(d, elemento, sym_label=''):
     
     d += elemento().right().label(sym_label, fontsize=16)
     d.push()
-    d += Gap().down().label( '' )
-    d += Line().left()
+    d += elm.Gap().down().label( '' )
+    d += elm.Line().left()
     d.pop()
 
     return(d)
@@ -988,13 +1007,13 @@ def dibujar_espacio_derivacion(d):
         Matriz de parámetros de transferencia scattering.
 
     '''
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
-    d += Line().right().length(d.unit*.5)
+    d += elm.Line().right().length(d.unit*.5)
     d.push()
-    d += Gap().down().label( '' )
-    d += Line().left().length(d.unit*.5)
+    d += elm.Gap().down().label( '' )
+    d += elm.Line().left().length(d.unit*.5)
     d.pop()
 
     return(d)
@@ -1016,13 +1035,13 @@ def dibujar_cierre(d):
         Matriz de parámetros de transferencia scattering.
 
     '''
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
 
-    d += Line().right().length(d.unit*.5)
+    d += elm.Line().right().length(d.unit*.5)
     d.push()
-    d += Line().down()
-    d += Line().left().length(d.unit*.5)
+    d += elm.Line().down()
+    d += elm.Line().left().length(d.unit*.5)
     d.pop()
 
     return(d)
@@ -1045,8 +1064,8 @@ def dibujar_elemento_derivacion(d, elemento, sym_label=''):
 
     '''
     
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_label, sp.Basic ):
         sym_label = to_latex(sym_label)
@@ -1057,10 +1076,10 @@ def dibujar_elemento_derivacion(d, elemento, sym_label=''):
     else:
         sym_label = '$ ?? $'
     
-    d += Dot()
+    d += elm.Dot()
     d.push()
     d += elemento().down().label(sym_label, fontsize=16)
-    d += Dot()
+    d += elm.Dot()
     d.pop()
 
     return(d)
@@ -1082,8 +1101,8 @@ def dibujar_tanque_RC_serie(d, sym_R_label='', capacitor_lbl=''):
 
     '''
     
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_R_label, sp.Basic ):
         sym_R_label = to_latex(sym_R_label)
@@ -1096,16 +1115,16 @@ def dibujar_tanque_RC_serie(d, sym_R_label='', capacitor_lbl=''):
         capacitor_lbl = str_to_latex(capacitor_lbl)
     
     d.push()
-    d += Dot()
-    d += Capacitor().right().label(capacitor_lbl, fontsize=16)
+    d += elm.Dot()
+    d += elm.Capacitor().right().label(capacitor_lbl, fontsize=16)
     d.pop()
-    d += Line().up().length(d.unit*.5)
-    d += Resistor().right().label(sym_R_label, fontsize=16)
-    d += Line().down().length(d.unit*.5)
-    d += Dot()
+    d += elm.Line().up().length(d.unit*.5)
+    d += elm.Resistor().right().label(sym_R_label, fontsize=16)
+    d += elm.Line().down().length(d.unit*.5)
+    d += elm.Dot()
     d.push()
-    d += Gap().down().label( '' )
-    d += Line().left()
+    d += elm.Gap().down().label( '' )
+    d += elm.Line().left()
     d.pop()
 
     return(d)
@@ -1127,8 +1146,8 @@ def dibujar_tanque_RC_derivacion(d, sym_R_label='', capacitor_lbl=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_R_label, sp.Basic ):
         sym_R_label = to_latex(sym_R_label)
@@ -1141,10 +1160,10 @@ def dibujar_tanque_RC_derivacion(d, sym_R_label='', capacitor_lbl=''):
         capacitor_lbl = str_to_latex(capacitor_lbl)
     
     d.push()
-    d += Dot()
-    d += Capacitor().down().label(capacitor_lbl, fontsize=16).length(d.unit*.5)
-    d += Resistor().down().label(sym_R_label, fontsize=16).length(d.unit*.5)
-    d += Dot()
+    d += elm.Dot()
+    d += elm.Capacitor().down().label(capacitor_lbl, fontsize=16).length(d.unit*.5)
+    d += elm.Resistor().down().label(sym_R_label, fontsize=16).length(d.unit*.5)
+    d += elm.Dot()
     d.pop()
 
     return(d)
@@ -1166,8 +1185,8 @@ def dibujar_tanque_RL_serie(d, sym_R_label='', sym_ind_label=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_R_label, sp.Basic ):
         sym_R_label = to_latex(sym_R_label)
@@ -1180,16 +1199,16 @@ def dibujar_tanque_RL_serie(d, sym_R_label='', sym_ind_label=''):
         sym_ind_label = str_to_latex(sym_ind_label)
     
     d.push()
-    d += Dot()
-    d += Inductor().right().label(sym_ind_label, fontsize=16)
+    d += elm.Dot()
+    d += elm.Inductor().right().label(sym_ind_label, fontsize=16)
     d.pop()
-    d += Line().up().length(d.unit*.5)
-    d += Resistor().right().label(sym_R_label, fontsize=16)
-    d += Line().down().length(d.unit*.5)
-    d += Dot()
+    d += elm.Line().up().length(d.unit*.5)
+    d += elm.Resistor().right().label(sym_R_label, fontsize=16)
+    d += elm.Line().down().length(d.unit*.5)
+    d += elm.Dot()
     d.push()
-    d += Gap().down().label( '' )
-    d += Line().left()
+    d += elm.Gap().down().label( '' )
+    d += elm.Line().left()
     d.pop()
 
     return(d)
@@ -1211,8 +1230,8 @@ def dibujar_tanque_RL_derivacion(d, sym_R_label='', sym_ind_label=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_R_label, sp.Basic ):
         sym_R_label = to_latex(sym_R_label)
@@ -1225,10 +1244,10 @@ def dibujar_tanque_RL_derivacion(d, sym_R_label='', sym_ind_label=''):
         sym_ind_label = str_to_latex(sym_ind_label)
     
     d.push()
-    d += Dot()
-    d += Inductor().down().label(sym_ind_label, fontsize=16).length(d.unit*.5)
-    d += Resistor().down().label(sym_R_label, fontsize=16).length(d.unit*.5)
-    d += Dot()
+    d += elm.Dot()
+    d += elm.Inductor().down().label(sym_ind_label, fontsize=16).length(d.unit*.5)
+    d += elm.Resistor().down().label(sym_R_label, fontsize=16).length(d.unit*.5)
+    d += elm.Dot()
     d.pop()
 
     return(d)
@@ -1250,8 +1269,8 @@ def dibujar_tanque_serie(d, sym_ind_label='', sym_cap_label=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(sym_cap_label, sp.Basic ):
         sym_cap_label = to_latex(sym_cap_label)
@@ -1264,16 +1283,16 @@ def dibujar_tanque_serie(d, sym_ind_label='', sym_cap_label=''):
         sym_ind_label = str_to_latex(sym_ind_label)
     
     d.push()
-    d += Dot()
-    d += Inductor().right().label(sym_ind_label, fontsize=16)
+    d += elm.Dot()
+    d += elm.Inductor().right().label(sym_ind_label, fontsize=16)
     d.pop()
-    d += Line().up().length(d.unit*.5)
-    d += Capacitor().right().label(sym_cap_label, fontsize=16)
-    d += Line().down().length(d.unit*.5)
-    d += Dot()
+    d += elm.Line().up().length(d.unit*.5)
+    d += elm.Capacitor().right().label(sym_cap_label, fontsize=16)
+    d += elm.Line().down().length(d.unit*.5)
+    d += elm.Dot()
     d.push()
-    d += Gap().down().label( '' )
-    d += Line().left()
+    d += elm.Gap().down().label( '' )
+    d += elm.Line().left()
     d.pop()
 
     return(d)
@@ -1295,8 +1314,8 @@ def dibujar_tanque_derivacion(d, inductor_lbl='', capacitor_lbl=''):
 
     '''
 
-    if not isinstance(d, Drawing):
-        d = Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
+    if not isinstance(d, schemdraw.Drawing):
+        d = schemdraw.Drawing(unit=4)  # unit=2 makes elements have shorter than normal leads
     
     if isinstance(inductor_lbl, sp.Basic ):
         inductor_lbl = to_latex(inductor_lbl)
@@ -1309,10 +1328,10 @@ def dibujar_tanque_derivacion(d, inductor_lbl='', capacitor_lbl=''):
         capacitor_lbl = str_to_latex(capacitor_lbl)
     
     d.push()
-    d += Dot()
-    d += Capacitor().down().label(capacitor_lbl, fontsize=16).length(d.unit*.5)
-    d += Inductor().down().label(inductor_lbl, fontsize=16).length(d.unit*.5)
-    d += Dot()
+    d += elm.Dot()
+    d += elm.Capacitor().down().label(capacitor_lbl, fontsize=16).length(d.unit*.5)
+    d += elm.Inductor().down().label(inductor_lbl, fontsize=16).length(d.unit*.5)
+    d += elm.Dot()
     d.pop()
 
     return(d)
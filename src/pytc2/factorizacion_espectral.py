@@ -0,0 +1,738 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Factorización espectral de funciones de módulo cuadrado.
+
+Dado el polinomio P(s) = H(s).H(-s), por ejemplo el numerador o el
+denominador de |H(jω)|² con ω² = -s², se obtiene el factor H(s) con sus
+raíces en el semiplano izquierdo cerrado.
+
+@author: mariano
+"""
+
+import numpy as np
+
+import sympy as sp
+
+from ._lazy import lazy_import
+
+from .general import s
+
+# precisión extendida, sólo para las factorizaciones mal condicionadas
+mpmath = lazy_import('mpmath')
+
+
+def factor_espectral( aa, metodo = 'auto', tol = 10**-6, maxiter = 100, dps = None ):
+    '''
+    Factorización espectral numérica: obtiene H(s), de raíces en el semiplano
+    izquierdo cerrado, tal que H(s).H(-s) = P(s).
+
+    Las raíces se calculan sobre Q(x) = P(s) con x = s², de la mitad de
+    grado que P, y cada raíz x_i aporta la raíz -√x_i de H. Las raíces de Q
+    sobre el semieje real negativo son ceros de H sobre el eje jω, de 
+    multiplicidad par en Q: como están mal condicionadas, se buscan entre 
+    las raíces de Q'(x) que anulan a Q, con la tolerancia relativa *tol*, y 
+    se toma la mitad de su multiplicidad. Luego se refinan los coeficientes 
+    del resto de H con iteraciones de Newton sobre H(s).H(-s) = P(s).
+
+    Parameters
+    ----------
+    aa : array_like
+        Coeficientes de P(s), en potencias decrecientes de s. Los de las
+        potencias impares deben ser nulos.
+    metodo : string, optional
+        'raices': sólo la clasificación de raíces.
+        'newton': iteración de Newton (Wilson) desde un polinomio de Hurwitz
+        inicial, sin calcular raíces. Sólo para órdenes moderados, hasta 
+        20 aproximadamente, y sin ceros sobre el eje jω: el sistema lineal 
+        de cada paso, sobre los coeficientes de H, está cada vez peor 
+        condicionado con el orden, y la iteración deja de converger.
+        'auto': raíces refinadas con Newton, o con dps dígitos si se indica.
+        Es la opción por defecto.
+    tol : float, optional
+        Tolerancia relativa para clasificar y agrupar las raíces sobre el eje
+        jω. Por defecto 10**-6.
+    maxiter : int, optional
+        Máxima cantidad de iteraciones de Newton. Por defecto 100.
+    dps : int, optional
+        Si se indica, las raíces se calculan con mpmath y dps dígitos 
+        decimales, tomando como exactos los coeficientes dados. La 
+        representación por coeficientes de órdenes altos, por ejemplo un 
+        Chebyshev de orden 30 o más, está tan mal condicionada que en punto 
+        flotante sólo se garantiza que H(s).H(-s) reproduce a P(s) con error 
+        de redondeo, pero no la ubicación de sus raíces.
+
+    Returns
+    -------
+    hh : ndarray
+        Coeficientes de H(s), en potencias decrecientes de s.
+
+    Raises
+    ------
+    ValueError
+        Si P(s) no es de la forma H(s).H(-s), metodo no es válido, o la 
+        factorización está mal condicionada y dps es None.
+
+    Ejemplo
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.factorizacion_espectral import factor_espectral
+    >>> # |H(jω)|² = 1 + ω**6, Butterworth de orden 3: P(s) = 1 - s**6
+    >>> np.round(factor_espectral([-1, 0, 0, 0, 0, 0, 1]), 12)
+    array([1., 2., 2., 1.])
+
+    '''
+
+    valid = ['auto', 'raices', 'newton']
+    if metodo not in valid:
+        raise ValueError('metodo must be one of %s, not %s' % (valid, metodo))
+
+    qq = _coeffs_en_x(aa, tol)
+
+    # raíces en x = 0: ceros de H en s = 0
+    orden_cero = 0
+    while qq.size > 1 and qq[-1] == 0:
+        qq = qq[:-1]
+        orden_cero += 1
+
+    nn = qq.size - 1
+    pp = _coeffs_en_s(qq)
+
+    # ganancia: (-1)^n.h_n² es el coeficiente principal de P
+    signo = (-1)**(nn + orden_cero)
+    if qq[0] * signo <= 0 or qq[-1] * (-1)**orden_cero <= 0:
+        raise ValueError('P(s) no es de la forma H(s).H(-s): P(jω) < 0')
+
+    ganancia = np.sqrt(qq[0] * signo)
+
+    if metodo == 'newton':
+        hh_eje = np.array([1.])
+        hh = _newton_espectral(pp, _hurwitz_inicial(qq), maxiter)
+
+        if hh is None:
+            raise ValueError("La iteración de Newton no converge: probar con metodo = 'auto'")
+
+        # el error de los coeficientes de H crece con el condicionamiento 
+        # del sistema lineal de Newton, aun si el residuo es mínimo
+        if _condicion_newton(hh) * np.finfo(np.float64).eps > tol:
+            raise ValueError("La iteración de Newton está mal condicionada para este orden: probar con metodo = 'auto'")
+
+    else:
+
+        if dps is None:
+            hh_eje, hh, qq = _factor_raices(list(qq), tol, np.roots, np.sqrt, np.finfo(np.float64).eps / 2)
+        else:
+            with mpmath.workdps(dps):
+                hh_eje, hh, qq = _factor_raices([ mpmath.mpf(cc) for cc in qq ], tol, 
+                                                lambda cc: _raices_mp(cc, dps), mpmath.sqrt, mpmath.mpf(10)**-dps)
+
+        hh = ganancia * hh
+
+        if metodo == 'auto' and dps is None:
+            # refinamiento de la parte sin ceros sobre el eje jω
+            hh_newton = _newton_espectral(_coeffs_en_s(qq), hh, maxiter)
+
+            if hh_newton is not None:
+                hh = hh_newton
+
+    hh = np.convolve(hh_eje, hh)
+
+    # H(s).H(-s) debe reproducir a P(s) salvo el redondeo
+    if _error_espectral(pp, hh) > np.sqrt(np.finfo(np.float64).eps):
+        
+        if dps is None:
+            raise ValueError('Factorización mal condicionada: probar con dps = 30 o más.')
+        
+        raise ValueError('P(s) no es de la forma H(s).H(-s) con la precisión de sus coeficientes')
+
+    return( np.concatenate((hh, np.zeros(orden_cero))) )
+
+def factor_espectral_s( pp ):
+    '''
+    Factorización espectral simbólica: obtiene H(s), de raíces en el
+    semiplano izquierdo cerrado, tal que H(s).H(-s) = P(s).
+
+    P(s) se factoriza en forma exacta sobre los racionales. Cada factor
+    irreducible g(s) de multiplicidad m aporta a H:
+
+        g(s)^m, si g es estrictamente de Hurwitz,
+
+        nada, si lo es g(-s),
+
+        g(s)^(m/2), si todas sus raíces están sobre el eje jω.
+
+    Los factores con raíces a ambos lados del eje jω, que no se pueden
+    separar sobre los racionales, se separan en forma exacta con sus raíces
+    de sp.roots hasta grado 4, y con sus raíces numéricas en los demás 
+    casos.
+
+    Parameters
+    ----------
+    pp : Symbolic polynomial
+        P(s), polinomio par en s de coeficientes racionales o de punto
+        flotante.
+
+    Returns
+    -------
+    hh : Symbolic polynomial
+        H(s), o None si los coeficientes de P no son numéricos.
+
+    Raises
+    ------
+    ValueError
+        Si P(s) no es de la forma H(s).H(-s), por ejemplo si P(jω) < 0.
+
+    Ejemplo
+    -------
+
+    >>> from pytc2.factorizacion_espectral import factor_espectral_s
+    >>> from pytc2.general import s
+    >>> factor_espectral_s(-s**6 + 1)
+    s**3 + 2*s**2 + 2*s + 1
+
+    '''
+
+    pp = sp.Poly(pp, s)
+
+    if not pp.domain.is_Numerical:
+        return(None)
+
+    if not pp.domain.is_Exact:
+        # punto flotante: factorización numérica
+        hh = factor_espectral(np.array(pp.all_coeffs(), dtype=np.float64))
+
+        return( sp.Poly([ sp.Float(cc) for cc in hh ], s).as_expr() )
+
+    if pp.is_zero or any( cc != 0 for cc in pp.all_coeffs()[-2::-2] ):
+        raise ValueError('P(s) no es de la forma H(s).H(-s): tiene potencias impares de s')
+
+    nn = (pp.degree()) // 2
+
+    # P(jω) = |H(jω)|² para ω grande
+    if pp.LC() * (-1)**nn < 0:
+        raise ValueError('P(s) no es de la forma H(s).H(-s): P(jω) < 0')
+
+    _, factores = sp.factor_list(pp)
+
+    hh = sp.Poly(1, s)
+    hh_alg = []
+    raices_num = []
+
+    for gg, mult in factores:
+
+        gg = sp.Poly(gg, s)
+
+        if _routh_hurwitz(gg.all_coeffs()):
+            hh = hh * gg**mult
+
+        elif _routh_hurwitz(gg.compose(sp.Poly(-s, s)).all_coeffs()):
+            continue
+
+        elif _raices_en_eje(gg):
+
+            if mult % 2:
+                raise ValueError('P(s) no es de la forma H(s).H(-s): ceros de multiplicidad impar sobre el eje jω')
+
+            hh = hh * gg**(mult // 2)
+
+        elif _factor_izquierdo_exacto(gg) is not None:
+            # raíces a ambos lados del eje jω, exactas
+            hh_alg += [ _factor_izquierdo_exacto(gg) ] * mult
+
+        else:
+            # raíces a ambos lados del eje jω: en precisión extendida, con 
+            # más dígitos cuanto mayor es el rango de los coeficientes
+            coeffs = gg.all_coeffs()
+            
+            # si g es par, g(s) = e(s²) y basta con las raíces de e
+            par = all( cc == 0 for cc in coeffs[-2::-2] )
+            
+            if par:
+                coeffs = coeffs[::2]
+
+            rango = [ abs(cc) for cc in coeffs if cc != 0 ]
+            dps = 30 + int(sp.log(max(rango) / min(rango), 10)) 
+
+            with mpmath.workdps(dps):
+                
+                raices = _raices_mp([ mpmath.mpf(cc.p) / cc.q for cc in coeffs ], dps)
+                
+                if par:
+                    raices = [ -mpmath.sqrt(rr) for rr in raices ]
+
+            raices_num += [ complex(rr) for rr in raices if rr.real < 0 ] * mult
+
+    grado_alg = sum( sp.degree(gg_izq, s) for gg_izq in hh_alg )
+
+    if hh.degree() + grado_alg + len(raices_num) != nn:
+        raise ValueError('P(s) no es de la forma H(s).H(-s)')
+
+    # los factores de hh_alg son mónicos
+    ganancia = sp.sqrt(pp.LC() * (-1)**nn / hh.LC()**2)
+
+    hh = ganancia * hh.as_expr()
+
+    if hh_alg:
+        hh = sp.expand(hh * sp.Mul(*hh_alg))
+
+    if raices_num:
+        coeffs = np.real(np.polynomial.polynomial.polyfromroots(raices_num))[::-1]
+        hh = sp.expand(hh * sp.Poly([ sp.Float(cc) for cc in coeffs ], s).as_expr())
+
+    return(hh)
+
+
+########################
+#%% Funciones internas #
+########################
+
+def _routh_hurwitz( cc ):
+    '''
+    Prueba exacta de Routh: el polinomio de coeficientes *cc* es
+    estrictamente de Hurwitz si toda la primer columna de la tabla es
+    positiva. Un cero en la primer columna implica raíces en el semiplano
+    derecho o sobre el eje jω.
+
+    '''
+
+    cc = list(cc)
+
+    while cc and cc[0] == 0:
+        cc.pop(0)
+
+    if not cc:
+        return(False)
+
+    if cc[0] < 0:
+        cc = [ -xx for xx in cc ]
+
+    aa = cc[0::2]
+    bb = cc[1::2]
+
+    for _ in range(len(cc) - 1):
+
+        bb = bb + [0] * (len(aa) - len(bb))
+
+        if not bb[0] > 0:
+            return(False)
+
+        aa, bb = bb, [ aa[ii+1] - aa[0] / bb[0] * bb[ii+1] for ii in range(len(aa) - 1) ]
+
+    return(True)
+
+def _factor_izquierdo_exacto( gg ):
+    '''
+    Factor mónico exacto con las raíces del semiplano izquierdo del
+    polinomio irreducible *gg*, de grado 4 o menor, con raíces a ambos lados
+    del eje jω. Para gg(s) = s^4 + a.s² + b, par, es
+
+        s² + √(2√b - a).s + √b,
+
+    y de lo contrario se obtiene de las raíces de sp.roots. Devuelve None 
+    si gg tiene raíces sobre el eje jω, o no se pudieron separar en forma 
+    exacta con coeficientes reales.
+
+    '''
+
+    if gg.degree() > 4:
+        return(None)
+
+    gg = gg.monic()
+    coeffs = gg.all_coeffs()
+
+    if all( cc == 0 for cc in coeffs[-2::-2] ):
+
+        if gg.degree() == 2:
+            # s² - x, x > 0
+            return( s + sp.sqrt(-coeffs[2]) if coeffs[2] < 0 else None )
+
+        aa, bb = coeffs[2], coeffs[4]
+
+        if bb > 0 and 2 * sp.sqrt(bb) - aa > 0:
+            return( s**2 + sp.sqrt(2 * sp.sqrt(bb) - aa) * s + sp.sqrt(bb) )
+
+        return(None)
+
+    raices = sp.roots(gg, multiple = True)
+
+    if len(raices) != gg.degree():
+        return(None)
+
+    izquierda = []
+
+    for rr in raices:
+
+        parte_real = sp.re(rr)
+
+        if parte_real.is_zero:
+            return(None)
+
+        if parte_real.is_negative or (parte_real.is_negative is None and parte_real.evalf(30) < 0):
+            izquierda += [rr]
+
+    cc = [ sp.simplify(cc) for cc in sp.Poly(sp.expand(sp.Mul(*[ s - rr for rr in izquierda ])), s).all_coeffs() ]
+
+    if any( sp.im(this_cc) != 0 for this_cc in cc ):
+        return(None)
+
+    return( sp.Add(*[ this_cc * s**kk for kk, this_cc in enumerate(cc[::-1]) ]) )
+
+def _raices_en_eje( gg ):
+    '''
+    Verifica si todas las raíces del polinomio exacto *gg* están sobre el
+    eje jω: gg(s) = s o gg(s) = e(s²) con todas las raíces de e reales y
+    negativas.
+
+    '''
+
+    coeffs = gg.all_coeffs()
+
+    if coeffs == [1, 0] or coeffs == [-1, 0]:
+        return(True)
+
+    if any( cc != 0 for cc in coeffs[-2::-2] ):
+        return(False)
+
+    xx = sp.Dummy('x')
+    ee = sp.Poly(coeffs[::2], xx)
+
+    return( ee.count_roots(sp.S.NegativeInfinity, 0) == ee.degree() and ee.eval(0) != 0 )
+
+def _coeffs_en_x( aa, tol ):
+    '''
+    Coeficientes de Q(x) = P(s), x = s², en potencias decrecientes de x. Los
+    coeficientes de potencias impares de P deben ser despreciables.
+
+    '''
+
+    aa = np.trim_zeros(np.atleast_1d(np.array(aa, dtype=np.float64)), 'f')
+
+    if aa.size == 0:
+        raise ValueError('P(s) no es de la forma H(s).H(-s): es nulo')
+
+    # potencias decrecientes desde s^0
+    aa = aa[::-1]
+
+    if np.any(np.abs(aa[1::2]) > tol * np.max(np.abs(aa))) or aa.size % 2 == 0:
+        raise ValueError('P(s) no es de la forma H(s).H(-s): tiene potencias impares de s')
+
+    return( aa[0::2][::-1] )
+
+def _coeffs_en_s( qq ):
+    '''
+    Coeficientes de P(s) = Q(s²), de potencias decrecientes.
+
+    '''
+
+    pp = np.zeros(2 * qq.size - 1)
+    pp[0::2] = qq
+
+    return(pp)
+
+def _factor_raices( qq, tol, raices, raiz_cuadrada, uu ):
+    '''
+    Factor H de P a partir de las raíces de Q(x), calculadas con la función 
+    *raices* sobre coeficientes float o mpmath.mpf, con redondeo unitario *uu*. Devuelve los coeficientes
+    float del factor con los ceros sobre el eje jω, del factor mónico con 
+    los ceros restantes, -√x_i, y de Q(x) sin los ceros sobre el eje.
+
+    '''
+
+    eje, qq = _ceros_en_eje(qq, tol, raices, uu)
+
+    hh_eje = np.array([1.])
+
+    for omega, mult in eje:
+        for _ in range(mult):
+            hh_eje = np.convolve(hh_eje, [1., 0., float(omega)**2])
+
+    xx = raices(qq)
+
+    # las raíces simples sobre el semieje real negativo están bien 
+    # condicionadas: son ceros simples sobre el eje jω
+    if any( x_i.real < 0 and abs(x_i.imag) <= tol * abs(x_i) for x_i in xx ):
+        raise ValueError('P(s) no es de la forma H(s).H(-s): ceros de multiplicidad impar sobre el eje jω')
+
+    hh = _poly_desde_raices([ -raiz_cuadrada(x_i) for x_i in xx ])
+
+    return( hh_eje, np.array([ float(cc.real) for cc in hh ]), np.array([ float(cc) for cc in qq ]) )
+
+def _ceros_en_eje( qq, tol, raices, uu ):
+    '''
+    Ceros de H sobre el eje jω: raíces de Q(x) sobre el semieje real negativo,
+    de multiplicidad par. Como raíces múltiples de Q están mal condicionadas, 
+    se buscan entre las raíces de Q'(x) donde Q se anula, salvo la 
+    tolerancia *tol* y el error de redondeo con unidad *uu*. Devuelve una 
+    lista de (ω, multiplicidad en H) y Q(x) deflacionado por ellas.
+
+    '''
+
+    nn = len(qq) - 1
+
+    if nn < 2:
+        return( [], qq )
+
+    # las raíces múltiples de Q' se separan más que tol
+    umbral = tol**(2/3)
+
+    xx = raices([ cc * (nn - ii) for ii, cc in enumerate(qq[:-1]) ])
+    xx = sorted( [ x_i.real for x_i in xx if x_i.real < 0 and abs(x_i.imag) <= umbral * abs(x_i) ], reverse = True )
+
+    grupos = []
+
+    for x_i in xx:
+
+        if grupos and grupos[-1][-1] - x_i <= umbral * abs(x_i):
+            grupos[-1].append(x_i)
+        else:
+            grupos.append([x_i])
+
+    dd2 = [ cc * (nn - ii) * (nn - ii - 1) for ii, cc in enumerate(qq[:-2]) ]
+    escala = [ abs(cc) for cc in qq ]
+
+    centros = [ sum(grupo) / len(grupo) for grupo in grupos ]
+    valores = [ abs(_polyval(qq, x_0)) for x_0 in centros ]
+
+    # Q en sus extremos y en x = 0
+    referencia = max([abs(qq[-1])] + valores)
+
+    eje = []
+
+    for grupo, x_0, valor in zip(grupos, centros, valores):
+
+        # Q se anula si es despreciable frente a sus demás extremos y no 
+        # supera la cota del error de redondeo. En un extremo simple de Q' 
+        # debe ser un mínimo: los máximos entre ceros muy cercanos también 
+        # pueden ser muy chicos
+        if valor > tol * referencia or \
+           valor > 2 * nn * uu * _polyval(escala, abs(x_0)) or \
+           (len(grupo) == 1 and not _polyval(dd2, x_0) > 0):
+            continue
+
+        # multiplicidad en Q, una más que en Q'
+        mult = len(grupo) + 1
+
+        if mult % 2:
+            raise ValueError('P(s) no es de la forma H(s).H(-s): ceros de multiplicidad impar sobre el eje jω')
+
+        eje.append( (x_0, mult) )
+
+    for x_0, mult in eje:
+        for _ in range(mult):
+            qq = _deflar(qq, x_0)
+
+    eje = [ (abs(x_0)**0.5, mult // 2) for x_0, mult in eje ]
+
+    return( eje, qq )
+
+def _polyval( cc, xx ):
+    '''
+    Horner, para coeficientes float o mpmath.mpf.
+
+    '''
+
+    yy = 0
+
+    for coef in cc:
+        yy = yy * xx + coef
+
+    return(yy)
+
+def _deflar( cc, x_0 ):
+    '''
+    Cociente de la división sintética por (x - x_0).
+
+    '''
+
+    cociente = [cc[0]]
+
+    for coef in cc[1:-1]:
+        cociente.append(coef + x_0 * cociente[-1])
+
+    return(cociente)
+
+def _poly_desde_raices( raices ):
+    '''
+    Coeficientes, de mayor a menor potencia, del polinomio mónico de raíces
+    *raices*, para complejos de numpy o mpmath.mpc.
+
+    '''
+
+    cc = [1]
+
+    for rr in raices:
+        cc = [ aa - rr * bb for aa, bb in zip(cc + [0], [0] + cc) ]
+
+    return(cc)
+
+def _raices_mp( cc, dps, maxiter = 100 ):
+    '''
+    Raíces con dps dígitos: las de punto flotante refinadas con la 
+    iteración de Aberth-Ehrlich en mpmath, que converge aun si aquellas 
+    están lejos por el mal condicionamiento.
+
+    '''
+
+    # raíces en cero
+    ceros = 0
+    while len(cc) > 1 and cc[-1] == 0:
+        cc = cc[:-1]
+        ceros += 1
+
+    nn = len(cc) - 1
+    
+    raices = [ mpmath.mpc(complex(rr)) for rr in np.roots([ float(coef) for coef in cc ]) ]
+    
+    dd = [ coef * (nn - ii) for ii, coef in enumerate(cc[:-1]) ]
+    # con convergencia cúbica, el paso que es menor que la mitad de los 
+    # dígitos deja a la raíz con todos ellos
+    umbral = mpmath.mpf(10)**-(dps // 2)
+    pendientes = list(range(nn))
+
+    for _ in range(maxiter):
+
+        if not pendientes:
+            break
+
+        for ii in list(pendientes):
+
+            rr = raices[ii]
+            
+            derivada = _polyval(dd, rr)
+            
+            if derivada == 0:
+                pendientes.remove(ii)
+                continue
+
+            ww = _polyval(cc, rr) / derivada
+            
+            suma = sum( 1 / (rr - raices[jj]) for jj in range(nn) if jj != ii and raices[jj] != rr )
+
+            paso = ww / (1 - ww * suma)
+            raices[ii] = rr - paso
+
+            if abs(paso) <= umbral * abs(raices[ii]):
+                pendientes.remove(ii)
+
+    else:
+        raise ValueError('Las raíces no convergen con dps = {:d}: probar con más dígitos.'.format(dps))
+
+    return( raices + [mpmath.mpc(0)] * ceros )
+
+def _hurwitz_inicial( qq ):
+    '''
+    Polinomio de Hurwitz inicial para la iteración de Newton:
+    h_n.(s + r)^n, con el coeficiente principal y el término independiente
+    de H.
+
+    '''
+
+    nn = qq.size - 1
+
+    h_n = np.sqrt(np.abs(qq[0]))
+    h_0 = np.sqrt(np.abs(qq[-1]))
+
+    rr = (h_0 / h_n)**(1 / nn) if nn else 1.
+
+    return( h_n * np.real(np.polynomial.polynomial.polyfromroots(-rr * np.ones(nn)))[::-1] )
+
+def _error_espectral( pp, hh ):
+    '''
+    Máximo error relativo de los coeficientes de H(s).H(-s) respecto de los
+    de P(s), ambos de mayor a menor potencia.
+
+    '''
+
+    hh_neg = hh * (-1.)**np.arange(hh.size - 1, -1, -1)
+
+    escala = np.convolve(np.abs(hh), np.abs(hh))
+
+    return( np.max(np.abs(np.convolve(hh, hh_neg) - pp) / np.where(escala > 0, escala, 1.)) )
+
+def _newton_espectral( pp, hh, maxiter ):
+    '''
+    Iteración de Newton sobre las potencias pares de H(s).H(-s) = P(s). En
+    cada paso se resuelve el sistema lineal δ(s).H(-s) + H(s).δ(-s) = P(s) -
+    H(s).H(-s). Si H es de Hurwitz el sistema es no singular y la
+    convergencia es cuadrática. Devuelve None si no converge.
+
+    '''
+
+    nn = hh.size - 1
+
+    # potencias crecientes
+    pp = pp[::-1]
+    hh = hh[::-1].astype(np.float64)
+
+    alterna = (-1.)**np.arange(nn + 1)
+
+    mejor, error_mejor = hh, np.inf
+
+    for _ in range(maxiter):
+
+        hh_neg = hh * alterna
+
+        residuo = (pp - np.convolve(hh, hh_neg))[0::2]
+        error = np.max(np.abs(residuo) / np.convolve(np.abs(hh), np.abs(hh))[0::2])
+
+        if error < error_mejor:
+            mejor, error_mejor = hh, error
+
+        elif error_mejor < np.sqrt(np.finfo(np.float64).eps):
+            # convergencia cuadrática: el redondeo ya no permite mejorar
+            break
+
+        if error < 10 * np.finfo(np.float64).eps:
+            break
+
+        try:
+            delta = np.linalg.solve(_jacobiano_espectral(hh), residuo)
+        except np.linalg.LinAlgError:
+            break
+
+        hh = hh + delta
+
+        if not np.all(np.isfinite(hh)):
+            break
+
+    if not error_mejor < np.sqrt(np.finfo(np.float64).eps):
+        return(None)
+
+    return(mejor[::-1])
+
+def _jacobiano_espectral( hh ):
+    '''
+    Jacobiano de las potencias pares de H(s).H(-s) respecto de los 
+    coeficientes de H, ambos en potencias crecientes. La columna k es 
+    s^k.H(-s) + (-1)^k.s^k.H(s).
+
+    '''
+
+    nn = hh.size - 1
+
+    alterna = (-1.)**np.arange(nn + 1)
+    hh_neg = hh * alterna
+
+    jac = np.zeros((2 * nn + 1, nn + 1))
+
+    for kk in range(nn + 1):
+        jac[kk:kk + nn + 1, kk] = hh_neg + alterna[kk] * hh
+
+    return(jac[0::2])
+
+def _condicion_newton( hh ):
+    '''
+    Número de condición relativo del sistema lineal de Newton en H, de
+    coeficientes en potencias decrecientes: el del jacobiano con las 
+    columnas escaladas por los coeficientes de H y las filas por los de
+    |H|.|H|.
+
+    '''
+
+    hh = hh[::-1]
+
+    escala = np.convolve(np.abs(hh), np.abs(hh))[0::2]
+    jac = _jacobiano_espectral(hh) * hh[np.newaxis, :] / np.where(escala > 0, escala, 1.)[:, np.newaxis]
+
+    return( np.linalg.cond(jac[:, hh != 0]) )
@@ -10,10 +10,15 @@ by Mariano Llamedo llamedom _at_ frba_utn_edu_ar
 @author: marianux
 """
 
+from functools import lru_cache
+
 import sympy as sp
 import numpy as np
 
-from IPython.display import display, Math, Markdown
+from ._lazy import lazy_import
+
+# dependencia opcional: sólo se importa al mostrar resultados en un notebook.
+ipd = lazy_import('IPython.display')
 
 ##########################################
 #%% Variables para el análisis simbólico #
@@ -110,7 +115,7 @@ def print_subtitle(strAux):
 
     '''
     
-    display(Markdown('#### ' + strAux))
+    ipd.display(ipd.Markdown('#### ' + strAux))
 
 
 def a_equal_b_latex_s( a, b):
@@ -219,7 +224,7 @@ def print_latex(strAux):
 
     '''
     
-    display(Math(strAux))
+    ipd.display(ipd.Math(strAux))
 
 def Chebyshev_polynomials(nn):
     '''
@@ -258,6 +263,92 @@ def Chebyshev_polynomials(nn):
             
     return(sp.simplify(sp.expand(Cn)))
 
+def expr2func(expr, params = None, var = s):
+    '''
+    Compila una expresión, o una matriz de expresiones, simbólica en una 
+    función numérica vectorizada con NumPy, aplicando eliminación de 
+    subexpresiones comunes (CSE). Permite evaluar los resultados de 
+    :func:`pytc2.cuadripolos.S2Tabcd_s`, 
+    :func:`pytc2.cuadripolos.calc_MAI_ztransf_ij_mn`, etc. en miles de 
+    frecuencias y valores de componentes, sin recurrir a subs/evalf. Cada 
+    expresión se compila una única vez.
+
+    Parameters
+    ----------
+    expr : Symbolic expression or Matrix
+        Expresión o matriz a compilar.
+    params : list of Symbols, optional
+        Símbolos de los parámetros (valores de componentes), en el orden 
+        en que se pasan a la función. Por defecto, todos los símbolos 
+        libres de expr, salvo var, ordenados por nombre.
+    var : Symbol, optional
+        Variable independiente. Por defecto, la variable compleja s. Los 
+        símbolos de expr con el mismo nombre que var, aunque se hayan 
+        definido con otras suposiciones, por ejemplo sp.symbols('s'), se 
+        toman como var.
+
+    Returns
+    -------
+    ff : function
+        Función ff(ss, *valores), que admite arrays para ss y para el 
+        valor de cada parámetro. Devuelve un array de la forma que resulta 
+        de combinarlos (broadcasting), seguida de la forma de expr si es una 
+        matriz, por ejemplo (..., 2, 2). El orden de los parámetros queda 
+        en ff.params.
+
+    Raises
+    ------
+    ValueError
+        Si expr depende de símbolos que no están en params, o dos de los
+        símbolos de params, o alguno y var, tienen el mismo nombre.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> import sympy as sp
+    >>> from pytc2.general import expr2func, s
+    >>> R, C = sp.symbols('R C', positive=True)
+    >>> ff = expr2func(1/(s*R*C + 1))
+    >>> ff.params
+    (C, R)
+    >>> ff(1j*np.array([0., 1.]), 1., np.array([[1.], [2.]])).shape
+    (2, 2)
+    >>> expr2func(sp.Matrix([[1, 1/(s*C)], [0, 1]]))(1j, 2.)
+    array([[1.+0.j , 0.-0.5j],
+           [0.+0.j , 1.+0.j ]])
+
+    '''
+
+    if isinstance(expr, sp.MatrixBase):
+        expr = sp.ImmutableMatrix(expr.doit())
+    else:
+        expr = sp.sympify(expr).doit()
+    
+    # la variable definida sin complex=True es la misma variable
+    otras_var = {xx: var for xx in expr.free_symbols if xx.name == var.name and xx != var}
+    
+    if len(otras_var) > 0:
+        expr = expr.xreplace(otras_var)
+    
+    if params is None:
+        params = sorted(expr.free_symbols - {var}, key = lambda xx: xx.name)
+    
+    params = tuple(params)
+    
+    nombres = [xx.name for xx in (var,) + params]
+    
+    if len(set(nombres)) != len(nombres):
+        raise ValueError('var and params must have distinct names, not %s' % nombres)
+    
+    faltan = expr.free_symbols - {var} - set(params)
+    
+    if len(faltan) > 0:
+        raise ValueError('expr depends on %s, not included in params %s' 
+                         % (sorted(faltan, key = lambda xx: xx.name), params))
+    
+    return(_expr2func(expr, params, var))
+
 
 
 '''
@@ -305,4 +396,45 @@ def nepper2db(at_en_np):
     
     return( at_en_np*(20*np.log10(np.exp(1))) )
 
-    
\ No newline at end of file
+    
+
+
+
+########################
+#%% Funciones internas #
+########################
+
+@lru_cache(maxsize = 64)
+def _expr2func(expr, params, var):
+    '''
+    Función compilada de :func:`expr2func`, una por cada expresión, 
+    parámetros y variable.
+    
+    '''
+
+    forma = expr.shape if isinstance(expr, sp.MatrixBase) else ()
+    
+    ff_cse = sp.lambdify((var,) + params, list(expr) if forma else [expr], 
+                         modules = 'numpy', cse = True)
+
+    def ff(ss, *valores):
+        
+        if len(valores) != len(params):
+            raise ValueError('expected %d parameter values for %s, not %d' 
+                             % (len(params), params, len(valores)))
+        
+        ss = np.asarray(ss)
+        valores = [np.asarray(vv) for vv in valores]
+        
+        dims = np.broadcast_shapes(ss.shape, *[vv.shape for vv in valores])
+        
+        res = ff_cse(ss, *valores)
+        
+        # los elementos constantes se extienden a todo el barrido
+        res = np.stack([np.broadcast_to(rr, dims) for rr in res], axis = -1)
+        
+        return(res.reshape(dims + forma))
+
+    ff.params = params
+
+    return(ff)
@@ -10,12 +10,18 @@ import numpy as np
 
 import sympy as sp
 
+import inspect
+from functools import wraps
+from collections import OrderedDict
+
 ##########################################
 #%% Variables para el análisis simbólico #
 ##########################################
 
 from .general import s, a_equal_b_latex_s, print_latex, print_console_alert
 
+from .factorizacion_espectral import factor_espectral, factor_espectral_s, _routh_hurwitz
+
 # versión simbólica de sigma
 sig = sp.symbols('sig', real=True)
 
@@ -23,6 +29,164 @@ sig = sp.symbols('sig', real=True)
 sig_pos = sp.symbols('sig_pos', real=True, positive = True)
 
 
+###############################
+#%% Memoización de remociones #
+###############################
+
+class _CacheRemociones:
+    '''
+    Cache LRU de los resultados de las remociones, con estadísticas de 
+    aciertos y fallos.
+
+    '''
+
+    def __init__(self, maxsize = 256):
+
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default = None):
+
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return(default)
+
+        self.data.move_to_end(key)
+        self.hits += 1
+
+        return(value)
+
+    def put(self, key, value):
+
+        if self.maxsize <= 0:
+            return
+        
+        self.data[key] = value
+        self.data.move_to_end(key)
+
+        while len(self.data) > self.maxsize:
+            # se descarta el usado menos recientemente
+            self.data.popitem(last = False)
+
+_cache_remociones = _CacheRemociones()
+
+# marca de resultado ausente, ya que None o False son resultados válidos
+_NO_ENCONTRADO = object()
+
+def remociones_cache_info():
+    '''
+    Estadísticas del cache de las funciones de remoción.
+
+    Returns
+    -------
+    info : dict
+        Diccionario con las claves 'hits' (llamadas resueltas por el cache), 
+        'misses' (llamadas que debieron calcularse), 'currsize' (resultados
+        almacenados) y 'maxsize' (capacidad del cache).
+
+    Ejemplo
+    -------
+    
+    >>> from pytc2.remociones import remover_polo_infinito, remociones_cache_info
+    >>> from pytc2.general import s
+    >>> ZZ = (2*s**4 + 20*s**2 + 18)/(s**3 + 4*s)
+    >>> _ = remover_polo_infinito(ZZ)
+    >>> _ = remover_polo_infinito(ZZ)
+    >>> remociones_cache_info()
+    {'hits': 1, 'misses': 1, 'currsize': 1, 'maxsize': 256}
+
+    '''
+
+    return({'hits': _cache_remociones.hits, 
+            'misses': _cache_remociones.misses, 
+            'currsize': len(_cache_remociones.data), 
+            'maxsize': _cache_remociones.maxsize})
+
+def remociones_cache_clear( maxsize = None ):
+    '''
+    Vacía el cache de las funciones de remoción y reinicia sus estadísticas.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Nueva capacidad del cache, en cantidad de resultados. Con 0 se 
+        deshabilita el cache. Por defecto se conserva la capacidad actual.
+
+    '''
+    
+    _cache_remociones.data.clear()
+    _cache_remociones.hits = 0
+    _cache_remociones.misses = 0
+
+    if maxsize is not None:
+        _cache_remociones.maxsize = maxsize
+
+def _forma_canonica( imit ):
+    '''
+    Clave de cache de una imitancia: los coeficientes de numerador y 
+    denominador en s luego de cancelar factores comunes, de forma que 
+    expresiones distintas de la misma función racional compartan la clave.
+
+    '''
+
+    try:
+        num, den = sp.fraction(sp.cancel(imit, s))
+
+        return( (tuple(sp.Poly(num, s).all_coeffs()), tuple(sp.Poly(den, s).all_coeffs())) )
+
+    except sp.PolynomialError:
+        # no es racional en s
+        return(imit)
+
+def _memoizar_remocion( func ):
+    '''
+    Decorador que guarda en el cache LRU de remociones los resultados de 
+    *func*, con la forma canónica de la imitancia y el resto de los 
+    parámetros como clave. Las llamadas repetidas devuelven el resultado 
+    guardado sin volver a simplificar.
+
+    '''
+    
+    firma = inspect.signature(func)
+
+    @wraps(func)
+    def func_memo(imit, *args, **kwargs):
+
+        if _cache_remociones.maxsize <= 0:
+            return(func(imit, *args, **kwargs))
+
+        params = firma.bind(imit, *args, **kwargs)
+        params.apply_defaults()
+
+        key = (func.__name__, _forma_canonica(imit), tuple(params.arguments.values())[1:])
+        
+        try:
+            hash(key)
+        except TypeError:
+            # parámetros no hasheables: no se usa el cache
+            return(func(imit, *args, **kwargs))
+
+        result = _cache_remociones.get(key, _NO_ENCONTRADO)
+        
+        if result is _NO_ENCONTRADO:
+            result = func(imit, *args, **kwargs)
+            _cache_remociones.put(key, result)
+        
+        # copia, para que el llamador no altere el resultado guardado
+        if isinstance(result, list):
+            return(list(result))
+        
+        if isinstance(result, dict):
+            return(dict(result))
+
+        return(result)
+
+    return(func_memo)
+
 ##########################################
 #%% Funciones generales para la remoción #
 ##########################################
@@ -138,23 +302,49 @@ def trim_func_s( rat_func, tol = 10**-6 ):
 
 def modsq2mod_s( aa ):
     '''
-    Convierte una matriz de parámetros scattering (S) simbólica 
-    al modelo de parámetros transferencia de scattering (Ts).
+    Obtiene H(s) a partir de la función de módulo cuadrado simbólica 
+    aa = H(s).H(-s), con polos y ceros en el semiplano izquierdo cerrado.
+
+    Si los coeficientes son numéricos, numerador y denominador se factorizan
+    con :func:`pytc2.factorizacion_espectral.factor_espectral_s`, en forma 
+    exacta salvo los factores que no se pueden separar sobre los racionales.
+    De lo contrario se recurre a sp.roots, sólo útil hasta grado 4.
 
     Parameters
     ----------
-    Spar : Symbolic Matrix
-        Matriz de parámetros S.
+    aa : Symbolic
+        Función racional H(s).H(-s).
 
     Returns
     -------
-    Ts : Symbolic Matrix
-        Matriz de parámetros de transferencia scattering.
+    H : Symbolic
+        Función racional H(s).
+
+    Ejemplo
+    -------
+    
+    >>> from pytc2.remociones import modsq2mod_s
+    >>> from pytc2.general import s
+    >>> modsq2mod_s(1/(1 - s**6))
+    1/(s**3 + 2*s**2 + 2*s + 1)
 
     '''
 
     num, den = sp.fraction(aa)
 
+    # el signo de aa puede quedar en el denominador: se lo pasa al numerador
+    den_p = sp.Poly(den, s)
+
+    if den_p.domain.is_Numerical and den_p.LC() * (-1)**(den_p.degree() // 2) < 0:
+        num, den = -num, -den
+
+    # coeficientes numéricos: factorización espectral exacta o numérica
+    num_h = factor_espectral_s(num)
+    den_h = factor_espectral_s(den)
+    
+    if num_h is not None and den_h is not None:
+        return( num_h / den_h )
+
     k = sp.poly(num,s).LC() / sp.poly(den,s).LC()
     
     # roots_num = num.as_poly(s).all_roots()
@@ -222,27 +412,34 @@ def modsq2mod_s( aa ):
 
 def modsq2mod( aa ):
     '''
-    Convierte una matriz de parámetros scattering (S) simbólica 
-    al modelo de parámetros transferencia de scattering (Ts).
+    Obtiene el polinomio mónico H(s), con raíces en el semiplano izquierdo 
+    cerrado, a partir de los coeficientes de P(s) = H(s).H(-s). Ver 
+    :func:`pytc2.factorizacion_espectral.factor_espectral`.
 
     Parameters
     ----------
-    Spar : Symbolic Matrix
-        Matriz de parámetros S.
+    aa : array_like
+        Coeficientes de P(s), en potencias decrecientes de s.
 
     Returns
     -------
-    Ts : Symbolic Matrix
-        Matriz de parámetros de transferencia scattering.
+    bb : ndarray
+        Coeficientes de H(s) mónico, en potencias decrecientes de s.
+
+    Ejemplo
+    -------
+    
+    >>> import numpy as np
+    >>> from pytc2.remociones import modsq2mod
+    >>> np.round(modsq2mod([-1, 0, 0, 0, 0, 0, 1]), 12)
+    array([1., 2., 2., 1.])
 
     '''
     
-    rr = np.roots(aa)
-    bb = rr[np.real(rr) == 0]
-    bb = bb[ :(bb.size//2)]
-    bb = np.concatenate( [bb, rr[np.real(rr) < 0]])
+    # factorización espectral, normalizada a polinomio mónico
+    hh = factor_espectral(aa)
     
-    return np.flip(np.real(np.polynomial.polynomial.polyfromroots(bb)))
+    return( hh / hh[0] )
 
 
 ################################################################
@@ -250,12 +447,107 @@ def modsq2mod( aa ):
 ################################################################
 
 
+@_memoizar_remocion
+def verificar_FRP( Imm, exacto = None, tol = 10**-9 ):
+    '''
+    Verifica si Imm es una función positiva real (FRP) y en caso contrario 
+    explica qué condición no se cumple.
+
+    Para funciones racionales de coeficientes reales F(s) = N(s)/D(s), con N 
+    y D coprimos, se verifica en orden:
+
+        1. Coeficientes reales y no negativos en N y D (condición necesaria 
+           para que ambos sean polinomios de Hurwitz).
+        2. Grados de N y D, y órdenes en s = 0, que difieran a lo sumo en uno: 
+           polos y ceros simples en infinito y en continua.
+        3. N(s) + D(s) estrictamente de Hurwitz (tabla de Routh): F(s) es 
+           analítica en el semiplano derecho y sus polos sobre el eje jω son 
+           simples y de residuo real positivo.
+        4. Re{F(jω)} >= 0 para todo ω, contando mediante una secuencia de 
+           Sturm las raíces positivas de multiplicidad impar del polinomio 
+           en ω² que es el numerador de Re{F(jω)}.
+
+    Las condiciones 3 y 4 son necesarias y suficientes; 1 y 2 son pruebas 
+    baratas que anticipan el diagnóstico más común.
+    
+    Con coeficientes racionales la verificación es exacta. Con coeficientes 
+    en punto flotante se usa un camino numérico: las raíces de N + D y el 
+    signo de Re{F(jω)} entre sus raíces, con tolerancia *tol*. Si Imm no es 
+    racional en s o tiene otros símbolos, se recurre a la prueba simbólica 
+    de :func:`isFRP` de versiones anteriores.
+
+    Parameters
+    ----------
+    Imm : symbolic rational function
+        La inmitancia a verificar.
+    exacto : bool, optional
+        Forzar el camino exacto (True) o el numérico (False). Por defecto se 
+        elige el exacto si los coeficientes son racionales.
+    tol : float, optional
+        Tolerancia relativa del camino numérico. Por defecto 10**-9.
+
+    Returns
+    -------
+    diagnostico : dict
+        Diccionario con las claves 'FRP' (bool), 'condicion' (None si es FRP, 
+        o la condición que falló: 'coeficientes', 'grados', 'orden_dc', 
+        'hurwitz', 'parte_real' o 'simbolico'), 'motivo' (explicación) y 
+        'metodo' ('exacto', 'numerico' o 'simbolico').
+
+    Ejemplo
+    -------
+    
+    >>> from pytc2.remociones import verificar_FRP
+    >>> from pytc2.general import s
+    >>> verificar_FRP((s**2 + 4*s + 3)/(s**2 + 2*s))['FRP']
+    True
+    >>> diag = verificar_FRP((s**2 + 1)/(s**2 + s + 4))
+    >>> diag['condicion']
+    'parte_real'
+    >>> diag['motivo']
+    'Re{F(jω)} es negativa para ω en torno a 1.414.'
+
+    '''
+
+    Imm = sp.sympify(Imm)
+    
+    try:
+        num, den = sp.fraction(sp.cancel(Imm, s))
+        num = sp.Poly(num, s)
+        den = sp.Poly(den, s)
+        
+        racional = num.domain.is_Numerical and den.domain.is_Numerical
+        
+    except sp.PolynomialError:
+        racional = False
+
+    if not racional:
+        
+        if _isFRP_simbolico(Imm):
+            return( {'FRP': True, 'condicion': None, 
+                     'motivo': 'Re{F(σ)} >= 0 para σ > 0.', 'metodo': 'simbolico'} )
+        else:
+            return( {'FRP': False, 'condicion': 'simbolico', 
+                     'motivo': 'No pudo probarse que F(σ) sea real y Re{F(σ)} >= 0 para σ > 0.', 
+                     'metodo': 'simbolico'} )
+
+    if exacto is None:
+        exacto = num.domain.is_Exact and den.domain.is_Exact
+
+    condicion, motivo = _diagnostico_FRP(num.all_coeffs(), den.all_coeffs(), exacto, tol)
+
+    return( {'FRP': condicion is None, 'condicion': condicion, 'motivo': motivo, 
+             'metodo': 'exacto' if exacto else 'numerico'} )
+
 def isFRP( Imm ):
     '''
     Description
     -----------
     Check if Imm is a function is positive real function (FRP).
 
+    La verificación la realiza :func:`verificar_FRP`, que además informa 
+    qué condición no se cumple.
+
     Parameters
     ----------
     Imm : symbolic rational function
@@ -279,30 +571,9 @@ def isFRP( Imm ):
 
     '''   
 
-    # F(s) should give real values for all real values of s.
-    
-    if  (sp.simplify(sp.expand(sp.im(Imm.subs(s,sig))))).is_zero and  \
-        (sp.simplify(sp.expand(sp.re(Imm.subs(s,sig_pos))))).is_nonnegative:
-
-        return(True)
-    
-    else:
-        return(False)
-   
-        # num, den = Imm.as_numer_denom()
-        
-        # if is_hurwitz(num) and is_hurwitz(den):
-            
-            
-
-        
-    # If we substitute s = jω then on separating the real and imaginary parts, the real part of the function should be greater than or equal to zero, means it should be non negative. This most important condition and we will frequently use this condition in order to find out the whether the function is positive real or not.
-    # On substituting s = jω, F(s) should posses simple poles and the residues should be real and positive.
-    
-    
-    
-    
+    return( verificar_FRP(Imm)['FRP'] )
 
+@_memoizar_remocion
 def remover_polo_sigma( imm, sigma, isImpedance = True,  isRC = True,  sigma_zero = None ):
     '''
     Se removerá el residuo en sobre el eje $\sigma$ (sigma) de la impedancia (zz) 
@@ -424,6 +695,7 @@ def remover_polo_sigma( imm, sigma, isImpedance = True,  isRC = True,  sigma_zer
 
     return( [imit_r, kk, R, CoL] )
 
+@_memoizar_remocion
 def remover_polo_jw( imit, omega = None , isImpedance = True, omega_zero = None ):
     '''
     Se removerá el residuo en sobre el eje $j.\omega$ (omega) de la imitancia 
@@ -507,6 +779,7 @@ def remover_polo_jw( imit, omega = None , isImpedance = True, omega_zero = None
 
 
 
+@_memoizar_remocion
 def remover_polo_dc( imit, omega_zero = None, isSigma = False ):
     '''
     Se removerá el residuo en continua (s=0) de la imitancia ($I$) de forma 
@@ -577,6 +850,7 @@ def remover_polo_dc( imit, omega_zero = None, isSigma = False ):
     return( [imit_r, k_cero] )
 
 
+@_memoizar_remocion
 def remover_polo_infinito( imit, omega_zero = None, isSigma = False ):
     '''
     Se removerá el residuo en infinito de la imitancia ($I$) de forma 
@@ -678,21 +952,9 @@ def remover_valor( imit, sigma_zero):
         Valor del residuo en infinito
     '''
 
-    # remoción parcial
-    k_prima = sp.simplify(sp.expand(imit)).subs(s, -sp.Abs(sigma_zero))
-    
-    rem_aux = imit - k_prima
+    imit_r, k_prima, bFRP = _remover_valor(imit, sigma_zero)
     
-    bFRP = isFRP(rem_aux)
-    
-    if bFRP:
-        
-        rem = rem_aux
-
-        # extraigo k_prima
-        imit_r = sp.factor(sp.simplify(sp.expand( rem )))
-        
-    else:    
+    if not bFRP:
         # falla la remoción        
         # error
         print_console_alert('Fallo la remoción')
@@ -733,28 +995,9 @@ def remover_valor_en_infinito( imit, sigma_zero = None ):
         Valor del residuo en infinito
     '''
 
-    if sigma_zero is None:
-        # remoción total
-        k_inf = sp.limit(imit, s, sp.oo)
-        
-    else:
-        # remoción parcial
-        k_inf = sp.simplify(sp.expand(imit)).subs(s, - sp.Abs(sigma_zero) )
-
-
-    assert not k_inf.is_negative, 'Residuo negativo. Verificar Z/Y RC/RL'
-
-    rem_aux = imit - k_inf
-    
-    bFRP = isFRP(rem_aux)
-    
-    if bFRP:
+    imit_r, k_inf, bFRP = _remover_valor_en_infinito(imit, sigma_zero)
 
-        rem = rem_aux
-        # extraigo k_inf
-        imit_r = sp.factor(sp.simplify(sp.expand( rem )))
-
-    else:    
+    if not bFRP:
         # falla la remoción        
         # error
         print_console_alert('Fallo la remoción en infinito')
@@ -768,6 +1011,7 @@ def remover_valor_en_infinito( imit, sigma_zero = None ):
 
     return( [imit_r, k_inf] )
 
+@_memoizar_remocion
 def remover_valor_en_dc( imit, sigma_zero = None):
     '''
     Se removerá un valor constante en continua (s=0) de la imitancia ($I$) de forma 
@@ -811,3 +1055,339 @@ def remover_valor_en_dc( imit, sigma_zero = None):
 
     return( [imit_r, k0] )
 
+
+########################
+#%% Funciones internas #
+########################
+
+@_memoizar_remocion
+def _remover_valor( imit, sigma_zero):
+    '''
+    Cálculo de :func:`remover_valor`, sin los mensajes de error, para que 
+    pueda guardarse en el cache de remociones. Devuelve además si el resto 
+    de la remoción es FRP; de lo contrario imit_r es None.
+
+    '''
+
+    # remoción parcial
+    k_prima = sp.simplify(sp.expand(imit)).subs(s, -sp.Abs(sigma_zero))
+    
+    rem_aux = imit - k_prima
+    
+    bFRP = isFRP(rem_aux)
+    
+    if bFRP:
+        # extraigo k_prima
+        imit_r = sp.factor(sp.simplify(sp.expand( rem_aux )))
+    else:
+        imit_r = None
+
+    return( [imit_r, k_prima, bFRP] )
+
+@_memoizar_remocion
+def _remover_valor_en_infinito( imit, sigma_zero = None ):
+    '''
+    Cálculo de :func:`remover_valor_en_infinito`, sin los mensajes de error, 
+    para que pueda guardarse en el cache de remociones. Devuelve además si el
+    resto de la remoción es FRP; de lo contrario imit_r es None.
+
+    '''
+
+    if sigma_zero is None:
+        # remoción total
+        k_inf = sp.limit(imit, s, sp.oo)
+        
+    else:
+        # remoción parcial
+        k_inf = sp.simplify(sp.expand(imit)).subs(s, - sp.Abs(sigma_zero) )
+
+
+    assert not k_inf.is_negative, 'Residuo negativo. Verificar Z/Y RC/RL'
+
+    rem_aux = imit - k_inf
+    
+    bFRP = isFRP(rem_aux)
+    
+    if bFRP:
+        # extraigo k_inf
+        imit_r = sp.factor(sp.simplify(sp.expand( rem_aux )))
+    else:
+        imit_r = None
+
+    return( [imit_r, k_inf, bFRP] )
+
+def _isFRP_simbolico( Imm ):
+    '''
+    Prueba simbólica de FRP para inmitancias que no son racionales en s de 
+    coeficientes numéricos: F(σ) real para σ real y Re{F(σ)} >= 0 para σ > 0.
+
+    '''
+
+    return( bool((sp.simplify(sp.expand(sp.im(Imm.subs(s,sig))))).is_zero and \
+                 (sp.simplify(sp.expand(sp.re(Imm.subs(s,sig_pos))))).is_nonnegative) )
+
+def _diagnostico_FRP( nn, dd, exacto, tol ):
+    '''
+    Condiciones de :func:`verificar_FRP` sobre los coeficientes de N y D, 
+    ordenados de mayor a menor potencia. Devuelve la condición que falla y 
+    su explicación, o None si la función es FRP.
+
+    '''
+
+    if exacto:
+        nn = [ sp.Rational(cc) for cc in nn ]
+        dd = [ sp.Rational(cc) for cc in dd ]
+    else:
+        nn = np.array([ complex(cc) for cc in nn ])
+        dd = np.array([ complex(cc) for cc in dd ])
+        
+        if np.any(np.abs(nn.imag) > tol * np.max(np.abs(nn))) or \
+           np.any(np.abs(dd.imag) > tol * np.max(np.abs(dd))):
+            return( 'coeficientes', 'F(s) tiene coeficientes complejos.' )
+        
+        nn = nn.real
+        dd = dd.real
+
+    if exacto and any( not (cc.is_real) for cc in list(nn) + list(dd) ):
+        return( 'coeficientes', 'F(s) tiene coeficientes complejos.' )
+
+    if all( cc == 0 for cc in nn ):
+        # F(s) = 0
+        return( None, 'F(s) es nula.' )
+
+    if dd[0] < 0:
+        nn = [ -cc for cc in nn ]
+        dd = [ -cc for cc in dd ]
+
+    # 1. N y D de Hurwitz: coeficientes no negativos
+    for poly, nombre in ((nn, 'numerador'), (dd, 'denominador')):
+        
+        umbral = 0 if exacto else -tol * max( abs(cc) for cc in poly )
+        
+        if any( cc < umbral for cc in poly ):
+            return( 'coeficientes', 
+                    'El {:s} tiene coeficientes de distinto signo: no es un polinomio de Hurwitz.'.format(nombre) )
+
+    # 2. polos y ceros simples en infinito y en continua
+    grado_n, grado_d = len(nn) - 1, len(dd) - 1
+
+    if abs(grado_n - grado_d) > 1:
+        return( 'grados', 
+                'Los grados del numerador ({:d}) y del denominador ({:d}) difieren en más de uno: '
+                'F(s) tiene un polo o un cero múltiple en infinito.'.format(grado_n, grado_d) )
+
+    orden_n = _orden_en_cero(nn, exacto, tol)
+    orden_d = _orden_en_cero(dd, exacto, tol)
+
+    if abs(orden_n - orden_d) > 1:
+        return( 'orden_dc', 
+                'F(s) tiene un {:s} de orden {:d} en s = 0.'.format('cero' if orden_n > orden_d else 'polo', 
+                                                                  abs(orden_n - orden_d)) )
+
+    # 3. N + D estrictamente de Hurwitz
+    pp = _sumar_coeffs(nn, dd)
+
+    if not (_routh_hurwitz(pp) if exacto else _hurwitz_num(pp, tol)):
+        return( 'hurwitz', 
+                'N(s) + D(s) no es estrictamente de Hurwitz: F(s) tiene polos en el semiplano derecho, '
+                'o polos múltiples o de residuo negativo sobre el eje jω.' )
+
+    # 4. Re{F(jω)} >= 0
+    if exacto:
+        omega = _parte_real_negativa(nn, dd)
+    else:
+        omega = _parte_real_negativa_num(np.array(nn, dtype=np.float64), 
+                                         np.array(dd, dtype=np.float64), tol)
+
+    if omega is not None:
+        
+        if np.isinf(omega):
+            return( 'parte_real', 'Re{F(jω)} es negativa para ω tendiendo a infinito.' )
+        
+        return( 'parte_real', 'Re{{F(jω)}} es negativa para ω en torno a {:.4g}.'.format(omega) )
+
+    return( None, 'F(s) es FRP.' )
+
+def _orden_en_cero( cc, exacto, tol ):
+    '''
+    Multiplicidad de la raíz en s = 0 de un polinomio de coeficientes *cc*.
+    
+    '''
+
+    umbral = 0 if exacto else tol * max( abs(xx) for xx in cc )
+    orden = 0
+    
+    for xx in cc[::-1]:
+        
+        if abs(xx) > umbral:
+            break
+        
+        orden += 1
+
+    return(orden)
+
+def _sumar_coeffs( aa, bb ):
+    '''
+    Suma de polinomios de coeficientes ordenados de mayor a menor potencia.
+    
+    '''
+
+    nn = max(len(aa), len(bb))
+    aa = [0] * (nn - len(aa)) + list(aa)
+    bb = [0] * (nn - len(bb)) + list(bb)
+
+    return( [ xx + yy for xx, yy in zip(aa, bb) ] )
+
+def _hurwitz_num( cc, tol ):
+    '''
+    Prueba numérica: las raíces del polinomio de coeficientes *cc* tienen 
+    parte real negativa, salvo la tolerancia relativa *tol*.
+    
+    '''
+
+    cc = np.trim_zeros(np.array(cc, dtype=np.float64), 'f')
+
+    if cc.size <= 1:
+        return(cc.size == 1)
+
+    if cc[0] < 0:
+        cc = -cc
+
+    if np.any(cc < 0):
+        return(False)
+
+    raices = np.roots(cc)
+
+    return( bool(np.all(raices.real < tol * np.maximum(1., np.abs(raices)))) )
+
+def _parte_real_coeffs( nn, dd, cota = False ):
+    '''
+    Coeficientes, de menor a mayor potencia de x = ω², del polinomio 
+    A(x) = Re{N(jω).D(-jω)}, que es el numerador de Re{F(jω)} con 
+    denominador |D(jω)|² > 0. Con *cota* se suman los módulos de los 
+    productos, que acotan el error de redondeo de cada coeficiente.
+    
+    '''
+
+    nn = list(nn)[::-1]
+    dd = list(dd)[::-1]
+
+    # parte par de N(s).D(-s), con s^2k = (-1)^k x^k
+    aa = [0] * ((len(nn) + len(dd)) // 2)
+
+    for ii, xx in enumerate(nn):
+        for jj, yy in enumerate(dd):
+            
+            if (ii + jj) % 2 == 0:
+                kk = (ii + jj) // 2
+                
+                if cota:
+                    aa[kk] = aa[kk] + abs(xx * yy)
+                else:
+                    aa[kk] = aa[kk] + (-1)**(kk + jj) * xx * yy
+
+    return(aa)
+
+def _parte_real_negativa( nn, dd ):
+    '''
+    Camino exacto para Re{F(jω)} >= 0. Con la secuencia de Sturm de los 
+    factores de multiplicidad impar de A(x) se cuentan sus raíces en 
+    x = ω² > 0, donde A cambia de signo. Devuelve una ω donde Re{F(jω)} es 
+    negativa, infinito si lo es para ω grande, o None si no la hay.
+    
+    '''
+
+    xx = sp.Dummy('x')
+    
+    aa = sp.Poly(_parte_real_coeffs(nn, dd)[::-1], xx)
+
+    if aa.is_zero:
+        # función reactancia
+        return(None)
+
+    # factores de multiplicidad impar, sin la raíz en x = 0
+    _, factores = aa.sqf_list()
+    
+    bb = sp.Poly(1, xx)
+    
+    for ff, mult in factores:
+        if mult % 2:
+            bb = bb * ff
+
+    while bb.degree() > 0 and bb.eval(0) == 0:
+        bb = sp.Poly(sp.quo(bb, sp.Poly(xx, xx)), xx)
+
+    if bb.degree() > 0:
+        
+        secuencia = sp.sturm(bb)
+        
+        if _variaciones([ pp.eval(0) for pp in secuencia ]) > _variaciones([ pp.LC() for pp in secuencia ]):
+            
+            # A(x) cambia de signo en x > 0: se busca dónde es negativa
+            raices = np.array([ complex(rr) for rr in bb.nroots() ])
+            raices = np.sort(raices.real[(raices.real > 0) & (np.abs(raices.imag) < 10**-8 * np.abs(raices))])
+
+            for prueba in _puntos_de_prueba(raices):
+                if aa.eval(sp.Rational(prueba)) < 0:
+                    return( float(np.sqrt(prueba)) )
+
+            return( float(np.sqrt(raices[0])) )
+
+    if aa.LC() < 0:
+        return(np.inf)
+
+    return(None)
+
+def _puntos_de_prueba( raices ):
+    '''
+    Un punto antes, entre y después de las raíces positivas *raices*, 
+    ordenadas de menor a mayor.
+    
+    '''
+
+    if raices.size == 0:
+        return(np.array([1.]))
+
+    return( np.concatenate(([raices[0] / 2], np.sqrt(raices[:-1] * raices[1:]), [2 * raices[-1]])) )
+
+def _variaciones( signos ):
+    '''
+    Cantidad de cambios de signo de una secuencia, omitiendo los ceros.
+    
+    '''
+
+    signos = [ xx for xx in signos if xx != 0 ]
+
+    return( sum( 1 for xx, yy in zip(signos[:-1], signos[1:]) if (xx > 0) != (yy > 0) ) )
+
+def _parte_real_negativa_num( nn, dd, tol ):
+    '''
+    Camino numérico para Re{F(jω)} >= 0. Se evalúa el signo de A(x) entre 
+    sus raíces positivas, despreciando los coeficientes y valores menores que 
+    el error de redondeo estimado con la tolerancia relativa *tol*.
+    
+    '''
+
+    aa = np.array(_parte_real_coeffs(nn, dd))
+    escala = np.array(_parte_real_coeffs(nn, dd, cota = True))
+    
+    aa[np.abs(aa) <= tol * escala] = 0.
+
+    if not np.any(aa):
+        # función reactancia
+        return(None)
+
+    raices = np.roots(np.trim_zeros(aa[::-1], 'f'))
+    raices = np.sort(raices.real[(raices.real > 0) & (np.abs(raices.imag) <= np.sqrt(tol) * np.abs(raices))])
+
+    prueba = _puntos_de_prueba(raices)
+
+    negativos = np.flatnonzero(np.polyval(aa[::-1], prueba) < -tol * np.polyval(escala[::-1], prueba))
+
+    if negativos.size:
+        return( float(np.sqrt(prueba[negativos[0]])) )
+
+    if aa[np.flatnonzero(aa)[-1]] < 0:
+        return(np.inf)
+
+    return(None)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sensibilidades de primer orden de las redes sintetizadas, calculadas con
+las derivadas analíticas de la transferencia. Para cada parámetro x (un
+coeficiente de una SOS o un elemento de una escalera) se calcula la
+sensibilidad relativa
+
+    S^F_x = (x / F) . dF / dx
+
+del módulo y la fase de la transferencia en toda la grilla de frecuencias,
+y de omega_0 y Q de cada polo, de una sola vez para todos los parámetros.
+"""
+
+import numpy as np
+
+from .sintesis_dipolo import _elementos_cauer
+
+
+def sensibilidad_sos(mySOS, ww):
+    '''
+    Sensibilidades de primer orden de una cascada de secciones de segundo
+    orden (SOS) analógicas respecto de cada uno de sus coeficientes. Como
+
+        S^H_x = x . s^p / N(s)     o     S^H_x = -x . s^p / D(s)
+
+    para el coeficiente x de s^p del numerador N o del denominador D de su
+    sección, todas se calculan de una vez sobre la grilla de frecuencias.
+    Los coeficientes nulos no se consideran parámetros, y su sensibilidad
+    es nula.
+
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6), como en
+        :func:`pytc2.sistemas_lineales.pretty_print_SOS`.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúan las sensibilidades.
+
+    Returns
+    -------
+    sens : dict
+        Diccionario con:
+
+        - 'modulo': array de (6N, F) con la sensibilidad relativa del
+          módulo de la transferencia, S^|H|_x = Re{S^H_x}. Una variación
+          relativa dx/x de x produce una variación de 8.69 . S^|H|_x . dx/x
+          dB en el módulo.
+        - 'fase': array de (6N, F) con x . d(fase)/dx = Im{S^H_x} [rad].
+        - 'w0', 'Q': arrays de (6N, N) con la sensibilidad relativa de
+          omega_0 y Q del denominador de cada sección, como los define
+          :func:`pytc2.sistemas_lineales.parametrize_sos`. Los polos reales
+          de las secciones de primer orden tienen Q constante.
+
+        La fila n*6 + k de cada array corresponde al coeficiente mySOS[n, k].
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.sensibilidad import sensibilidad_sos
+    >>> mySOS = np.array([[0., 0., 1., 1., 1., 1.], [0., 0., 1., 0., 1., 1.]])
+    >>> sens = sensibilidad_sos(mySOS, np.array([0.1, 1., 10.]))
+    >>> sens['modulo'].shape, sens['w0'].shape
+    ((12, 3), (12, 2))
+    >>> sens['Q'][3:6, 0]
+    array([ 0.5, -1. ,  0.5])
+
+    '''
+
+    mySOS = np.asarray(mySOS, dtype = float)
+
+    if mySOS.ndim != 2 or mySOS.shape[1] != 6:
+        raise ValueError('mySOS must be an (N, 6) matrix, not %s' % (mySOS.shape,))
+
+    ss = 1j * np.asarray(ww, dtype = float)
+    cant_sos = mySOS.shape[0]
+
+    # s^2, s, 1 para cada coeficiente de una fila de la SOS
+    ss_p = ss[np.newaxis, np.newaxis, :] ** np.array([2, 1, 0, 2, 1, 0])[np.newaxis, :, np.newaxis]
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+        terminos = mySOS[:, :, np.newaxis] * ss_p
+
+        num = np.sum(terminos[:, 0:3], axis = 1, keepdims = True)
+        den = np.sum(terminos[:, 3:6], axis = 1, keepdims = True)
+
+        SH = np.concatenate((terminos[:, 0:3] / num, -terminos[:, 3:6] / den), axis = 1)
+
+    SH = SH.reshape((6 * cant_sos, ss.size))
+
+    # omega_0 = sqrt(a0/a2) y Q = sqrt(a0.a2)/a1, u omega_0 = a0/a1 en las
+    # de primer orden: las sensibilidades son los exponentes.
+    sens_w0 = np.zeros((cant_sos, 6, cant_sos))
+    sens_Q = np.zeros((cant_sos, 6, cant_sos))
+
+    for ii, this_sos in enumerate(mySOS):
+
+        if this_sos[3] != 0:
+            sens_w0[ii, 3:6, ii] = [-1/2, 0., 1/2]
+            sens_Q[ii, 3:6, ii] = [1/2, -1., 1/2]
+        elif this_sos[4] != 0:
+            sens_w0[ii, 3:6, ii] = [0., -1., 1.]
+        else:
+            # sin polos
+            sens_w0[ii, :, ii] = np.nan
+            sens_Q[ii, :, ii] = np.nan
+
+    # los coeficientes nulos no son parámetros
+    bParam = (mySOS != 0)[:, :, np.newaxis]
+
+    return({'modulo': SH.real,
+            'fase': SH.imag,
+            'w0': np.where(bParam, sens_w0, 0.).reshape((6 * cant_sos, cant_sos)),
+            'Q': np.where(bParam, sens_Q, 0.).reshape((6 * cant_sos, cant_sos))})
+
+def sensibilidad_cauer(ko, ww, remover_en_inf = True, isRC = False):
+    '''
+    Sensibilidades de primer orden de la transferencia de una escalera
+    resultante de una expansión de Cauer, respecto de cada uno de sus
+    elementos. La transferencia es la de
+    :func:`pytc2.sintesis_dipolo.evaluar_cauer`,
+
+        T = 1 / G,    G = prod_i imm_i . imm_i+1,    i = 0, 2, 4, ...
+
+    y las derivadas de G respecto de cada elemento, y de s, se propagan
+    junto con las inmitancias imm_i a lo largo de la escalera (diferenciación
+    automática hacia adelante), para todas las frecuencias a la vez. Las
+    sensibilidades de omega_0 y Q de cada polo p resultan de
+
+        dp / dx = - (dG / dx) / (dG / ds),    en s = p.
+
+    Parameters
+    ----------
+    ko : list or array_like
+        Elementos de la expansión, como los devuelven
+        :func:`pytc2.sintesis_dipolo.cauer_LC`,
+        :func:`pytc2.sintesis_dipolo.cauer_RC` o sus versiones numéricas.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúan las sensibilidades.
+        En w = 0 los elementos k.s y k/s son nulos o infinitos, y las
+        sensibilidades resultan NaN.
+    remover_en_inf, isRC : boolean
+        Sólo para ko numérico, como en
+        :func:`pytc2.sintesis_dipolo.evaluar_cauer`.
+
+    Returns
+    -------
+    sens : dict
+        Diccionario con:
+
+        - 'modulo', 'fase': arrays de (E, F), como en
+          :func:`sensibilidad_sos`, siendo E la cantidad de elementos de ko.
+        - 'w0', 'Q': arrays de (E, P) con la sensibilidad relativa de
+          omega_0 y Q de cada uno de los P polos de 'polos'. Q es
+          infinito para los polos sobre el eje jw, y su sensibilidad NaN.
+        - 'polos': los polos de la transferencia, uno por cada par
+          complejo conjugado (el de parte imaginaria positiva).
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.general import s
+    >>> from pytc2.sensibilidad import sensibilidad_cauer
+    >>> # Butterworth de 3er orden simplemente cargado: T = 1/(s^3 + 2s^2 + 2s + 1)
+    >>> sens = sensibilidad_cauer([3*s/2, 4*s/3, s/2, 1], np.array([0.5, 1., 2.]))
+    >>> np.round(sens['polos'], 6)
+    array([-0.5+0.866025j, -1. +0.j      ])
+    >>> sens['modulo'].shape, sens['Q'].shape
+    ((4, 3), (4, 2))
+
+    '''
+
+    nominal = len(ko)
+
+    kk, pp = _elementos_cauer(ko, remover_en_inf, isRC)
+
+    kk = np.real(np.asarray(kk, dtype = complex))
+
+    ss = 1j * np.atleast_1d(np.asarray(ww, dtype = float))
+
+    GG, dGG = _cauer_forward(kk, pp, ss)
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        # S^T_x = x . d(ln T)/dx = - x . (dG/dx) / G
+        ST = -kk[:, np.newaxis] * dGG[:-1] / GG
+
+    # polos: ceros de G, raíces del numerador de la inmitancia de entrada
+    polos = np.roots(_cauer_polinomio(kk, pp))
+    polos = polos[np.abs(polos) > 1e-12 * np.max(np.abs(polos), initial = 1.)]
+    polos = polos[polos.imag >= -1e-12 * np.abs(polos)]
+    polos = np.sort_complex(polos)[::-1]
+
+    _, dGp = _cauer_forward(kk, pp, polos)
+
+    # x . dp/dx
+    dpp = -kk[:, np.newaxis] * dGp[:-1] / dGp[-1]
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        # omega_0 = |p| y Q = |p| / (-2 Re{p})
+        sens_w0 = np.real(np.conj(polos) * dpp) / np.abs(polos)**2
+        sens_Q = sens_w0 - np.real(dpp) / np.real(polos)
+
+    # el elemento nulo que descarta _elementos_cauer al comienzo
+    faltan = nominal - kk.size
+    relleno = lambda xx: np.concatenate((np.zeros((faltan, xx.shape[1])), xx))
+
+    return({'modulo': relleno(ST.real),
+            'fase': relleno(ST.imag),
+            'w0': relleno(sens_w0),
+            'Q': relleno(sens_Q),
+            'polos': polos})
+
+
+########################
+#%% Funciones internas #
+########################
+
+def _cauer_forward(kk, pp, ss):
+    '''
+    G = 1/T de la escalera de elementos kk.s^pp en cada s de ss, y sus
+    derivadas respecto de cada elemento y de s, de (E+1, F). La última fila
+    es la derivada respecto de s.
+
+    '''
+
+    cant_el = len(kk)
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+        # elementos y sus derivadas: d(k.s^p)/dk = s^p, d(k.s^p)/ds = p.k.s^(p-1)
+        el = [ this_k * ss**this_p for this_k, this_p in zip(kk, pp) ]
+        del_k = [ ss**this_p for this_p in pp ]
+        del_s = [ this_p * this_k * ss**(this_p - 1) for this_k, this_p in zip(kk, pp) ]
+
+        imm = el[-1]
+        dimm = np.zeros((cant_el + 1, ss.size), dtype = complex)
+        dimm[cant_el - 1] = del_k[-1]
+        dimm[-1] = del_s[-1]
+
+        GG = np.ones(ss.shape, dtype = complex)
+        dGG = np.zeros((cant_el + 1, ss.size), dtype = complex)
+
+        for ii in range(cant_el - 2, -1, -1):
+
+            # imm_i = ko_i + 1/imm_i+1
+            imm_i = el[ii] + 1 / imm
+            dimm_i = -dimm / imm**2
+            dimm_i[ii] += del_k[ii]
+            dimm_i[-1] += del_s[ii]
+
+            if ii % 2 == 0:
+                # G = G . imm_i . imm_i+1
+                par = imm_i * imm
+                dpar = dimm_i * imm + imm_i * dimm
+                dGG = dGG * par + GG * dpar
+                GG = GG * par
+
+            imm = imm_i
+            dimm = dimm_i
+
+    return(GG, dGG)
+
+def _cauer_polinomio(kk, pp):
+    '''
+    Numerador de la inmitancia de entrada de la escalera, como polinomio en
+    s. Cada tramo imm_i = n_i / d_i se arma como
+
+        n_i = k.s^p . n_i+1 + d_i+1,    d_i = n_i+1
+
+    multiplicando ambos por s si p = -1. Los ceros de n_0 son los polos de
+    la transferencia.
+
+    '''
+
+    nn = np.array([kk[-1], 0.]) if pp[-1] == 1 else np.array([kk[-1]])
+    dd = np.array([1., 0.]) if pp[-1] == -1 else np.array([1.])
+
+    for this_k, this_p in zip(kk[-2::-1], pp[-2::-1]):
+
+        if this_p == 1:
+            nn, dd = np.polyadd(np.polymul([this_k, 0.], nn), dd), nn
+        elif this_p == 0:
+            nn, dd = np.polyadd(this_k * nn, dd), nn
+        else:
+            nn, dd = np.polyadd(this_k * nn, np.polymul([1., 0.], dd)), np.polymul([1., 0.], nn)
+
+    return(nn)
@@ -10,6 +10,10 @@ import numpy as np
 
 import sympy as sp
 
+from fractions import Fraction
+
+from ._lazy import lazy_import
+
 from .remociones import isFRP, remover_polo_infinito, remover_valor_en_infinito, remover_polo_dc, remover_valor_en_dc, trim_func_s
 
 
@@ -18,6 +22,9 @@ from .remociones import isFRP, remover_polo_infinito, remover_valor_en_infinito,
 ##########################################
 
 from .general import s, expr_simb_expr, print_console_alert, print_latex
+
+# precisión extendida, sólo para las expansiones numéricas mal condicionadas
+mpmath = lazy_import('mpmath')
     
 
 def cauer_RC( imm, remover_en_inf=True ):
@@ -28,6 +35,10 @@ def cauer_RC( imm, remover_en_inf=True ):
 
         imm = k0_0 / s + 1 / ( k0_1 + 1/ (k0_2 / s  + 1/ ... )) 
 
+    If imm has rational coefficients, the expansion is computed exactly by 
+    polynomial long division over its coefficients, which is much faster for
+    high orders. Otherwise each step is a symbolic removal.
+
     Parameters
     ----------
     immittance : symbolic rational function
@@ -48,6 +59,12 @@ def cauer_RC( imm, remover_en_inf=True ):
 
     '''    
     
+    # camino rápido: fracción continua exacta sobre los coeficientes
+    cauer_exacto = _cauer_racional(imm, remover_en_inf = remover_en_inf, isRC = True)
+    
+    if cauer_exacto is not None:
+        return(cauer_exacto)
+    
     ko = []
 
     if remover_en_inf:
@@ -136,6 +153,10 @@ def cauer_LC( imm, remover_en_inf = True ):
 
         imm = koo_0 * s + 1 / ( koo_1 * s + 1/ (koo_2 * s  + 1/ ... )) 
 
+    If imm has rational coefficients, the expansion is computed exactly by 
+    polynomial long division over its coefficients, which is much faster for
+    high orders. Otherwise each step is a symbolic removal.
+
     Parameters
     ----------
     immittance : symbolic rational function
@@ -156,6 +177,12 @@ def cauer_LC( imm, remover_en_inf = True ):
 
     '''    
         
+    # camino rápido: fracción continua exacta sobre los coeficientes
+    cauer_exacto = _cauer_racional(imm, remover_en_inf = remover_en_inf, isRC = False)
+    
+    if cauer_exacto is not None:
+        return(cauer_exacto)
+
     rem = imm
     ko = []
 
@@ -223,6 +250,128 @@ def cauer_LC( imm, remover_en_inf = True ):
 
 
 
+def cauer_LC_num( num, den, remover_en_inf = True, pivot_tol = 10**-6, dps = None ):
+    '''
+    Description
+    -----------
+    Numeric twin of :func:`cauer_LC`. Perform continued fraction expansion 
+    over an LC immittance given by its coefficient vectors, following Cauer 1 
+    (removals at infinity) or Cauer 2 (removals at DC) synthesis methods.
+
+        imm = ko_0 * s + 1 / ( ko_1 * s + 1/ (ko_2 * s  + 1/ ... ))   (remover_en_inf = True)
+
+        imm = ko_0 / s + 1 / ( ko_1 / s + 1/ (ko_2 / s  + 1/ ... ))   (remover_en_inf = False)
+
+    Each removal is a step of polynomial long division over the coefficients.
+    Instead of trimming small coefficients with an absolute tolerance, a 
+    bound of the rounding error of every coefficient is carried along the 
+    expansion: a remainder coefficient is taken as cancellation noise only 
+    when it does not exceed its own error, and the leading coefficient of 
+    every remainder (the next pivot) must be accurate to pivot_tol.
+
+    Parameters
+    ----------
+    num : array_like
+        Numerator coefficients, in decreasing powers of s.
+    den : array_like
+        Denominator coefficients, in decreasing powers of s.
+    remover_en_inf : boolean
+        Removals at infinity (True) or at DC (False).
+    pivot_tol : float
+        Maximum estimated relative error of the leading coefficient of every
+        remainder (the next pivot). Above it the step is ill-conditioned.
+    dps : int, optional
+        If given, ill-conditioned expansions are repeated with mpmath using 
+        dps decimal digits. By default they raise ValueError.
+
+    Returns
+    -------
+    ko : ndarray
+        The i-th ko_i resulted from continued fraction expansion.
+
+    Raises
+    ------
+    ValueError
+        If imm is not an LC immittance, or the expansion is ill-conditioned
+        and dps is None.
+
+    Ejemplo
+    -------
+    
+    # Sea la siguiente función de excitación
+    Imm = (2*s**4 + 20*s**2 + 18)/(s**3 + 4*s)
+    
+    # Implementaremos Imm mediante Cauer 1 o remociones continuas en infinito
+    ko = cauer_LC_num([2, 0, 20, 0, 18], [1, 0, 4, 0])
+
+    '''
+
+    ko, _ = _cauer_num(num, den, remover_en_inf, False, pivot_tol, dps)
+
+    return(ko)
+
+def cauer_RC_num( num, den, remover_en_inf = True, pivot_tol = 10**-6, dps = None ):
+    '''
+    Description
+    -----------
+    Numeric twin of :func:`cauer_RC`. Perform continued fraction expansion 
+    over an RC/RL immittance given by its coefficient vectors, alternating 
+    removals of constant values and poles at infinity or at DC.
+
+        imm = ko_0 + 1 / ( ko_1 * s + 1/ (ko_2 + 1/ (ko_3 * s + ... ))) (remover_en_inf = True)
+
+        imm = ko_0 + 1 / ( ko_1 / s + 1/ (ko_2 + 1/ (ko_3 / s + ... ))) (remover_en_inf = False)
+
+    If imm starts with a pole instead of a constant value, ko_0 is zero and 
+    the expansion starts with ko_1. The remainders are handled as in 
+    :func:`cauer_LC_num`.
+
+    Parameters
+    ----------
+    num : array_like
+        Numerator coefficients, in decreasing powers of s.
+    den : array_like
+        Denominator coefficients, in decreasing powers of s.
+    remover_en_inf : boolean
+        Removals at infinity (True) or at DC (False).
+    pivot_tol : float
+        Maximum estimated relative error of the leading coefficient of every
+        remainder (the next pivot). Above it the step is ill-conditioned.
+    dps : int, optional
+        If given, ill-conditioned expansions are repeated with mpmath using 
+        dps decimal digits. By default they raise ValueError.
+
+    Returns
+    -------
+    ko : ndarray
+        The i-th ko_i resulted from continued fraction expansion.
+
+    Raises
+    ------
+    ValueError
+        If imm is not an RC/RL immittance, or the expansion is 
+        ill-conditioned and dps is None.
+
+    Ejemplo
+    -------
+    
+    # Sea la siguiente función de excitación
+    Imm = (s**2 + 4*s + 3)/(s**2 + 2*s)
+    
+    # Implementaremos Imm mediante Cauer 1 o remociones continuas en infinito
+    ko = cauer_RC_num([1, 4, 3], [1, 2, 0])
+
+    '''
+
+    ko, bPolo = _cauer_num(num, den, remover_en_inf, True, pivot_tol, dps)
+
+    if bPolo[0]:
+        # la expansión comienza con un polo: no hay valor constante
+        ko = np.concatenate(([0.], ko))
+
+    return(ko)
+
+
 def foster_zRC2yRC( k0 = None, koo = None, ki_wi = None, kk = None, ZRC_foster = None ):
     '''
     Parameters
@@ -298,6 +447,12 @@ def foster( imm ):
     imm_list = [ k0, koo, [k00, koo0], [k01, koo1], ..., [k0N, kooN]  ]
     
     Si algún elemento no está presente, su valor será de "None".
+    
+    Si los polos de Imm son simples y están en el origen, sobre el eje 
+    $\\sigma$ o sobre el eje $j\\omega$ (inmitancias LC, RC y RL), los 
+    residuos se calculan directamente a partir de los polos, en forma exacta,
+    si los coeficientes son racionales. De lo contrario se recurre a 
+    sp.apart.
 
     Ejemplo
     -------
@@ -311,6 +466,12 @@ def foster( imm ):
 
     '''    
 
+    # camino rápido: residuos calculados directamente a partir de los polos
+    foster_residuos = _foster_residuos(imm)
+    
+    if foster_residuos is not None:
+        return(foster_residuos)
+
     num, den = imm.as_numer_denom()
     
     # grados de P y Q
@@ -394,3 +555,626 @@ def foster( imm ):
     return([k0, koo, ki, kk, foster_form])
 
 
+def evaluar_cauer( ko, ww, remover_en_inf = True, isRC = False ):
+    '''
+    Description
+    -----------
+    Evaluate numerically, over a frequency grid, the ladder network 
+    resulting from a Cauer expansion:
+
+        imm = ko_0 + 1 / ( ko_1 + 1/ (ko_2 + 1/ ... + 1/ko_N )) 
+
+    The continued fraction is evaluated from the load end (ko_N) towards 
+    the input, for all the frequencies at once, without SymPy. The last 
+    element is the load of the ladder, and the transfer function is the 
+    ratio between the voltage over the load and the input voltage when 
+    imm is an impedance (or between the currents, when imm is an 
+    admittance). It is the product of the divider of each pair of elements:
+        
+        T = prod_i 1 / (1 + ko_i . imm_i+1),   i = 0, 2, 4, ... < N
+    
+    being imm_i+1 the immittance seen from the (i+1)-th element towards the
+    load. For instance, a voltage divider Z = z_0 + 1/y_1 results in 
+    T = 1/(1 + z_0.y_1).
+
+    Parameters
+    ----------
+    ko : list or array_like
+        The elements of the expansion, as returned by :func:`cauer_LC`, 
+        :func:`cauer_RC` (symbolic terms of the form k, k.s or k/s), 
+        :func:`cauer_LC_num` or :func:`cauer_RC_num` (numeric values).
+    ww : array_like
+        Angular frequencies [rad/s] where imm and T are evaluated, at s = jw.
+    remover_en_inf : boolean
+        Only for numeric ko: removals at infinity (True, elements k.s) or at 
+        DC (False, elements k/s), as in :func:`cauer_LC_num`.
+    isRC : boolean
+        Only for numeric ko: elements alternate constant values and poles, 
+        starting from the constant ko_0, as in :func:`cauer_RC_num`.
+
+    Returns
+    -------
+    imm : ndarray
+        Input immittance, evaluated at each frequency.
+    T : ndarray
+        Transfer function of the ladder, evaluated at each frequency.
+
+    Raises
+    ------
+    ValueError
+        If a symbolic element is not of the form k, k.s or k/s with numeric k.
+
+    Ejemplo
+    -------
+    
+    >>> import numpy as np
+    >>> from pytc2.sintesis_dipolo import cauer_RC, evaluar_cauer
+    >>> from pytc2.general import s
+    >>> # pasabajos RC: Z = 1 + 1/s, T = 1/(s + 1)
+    >>> ko, _, _ = cauer_RC(1 + 1/s)
+    >>> imm, T = evaluar_cauer(ko, np.array([0., 1.]))
+    >>> np.round(np.abs(T)**2, 6)
+    array([1. , 0.5])
+
+    '''
+
+    kk, pp = _elementos_cauer(ko, remover_en_inf, isRC)
+
+    ww = np.asarray(ww, dtype = float)
+
+    # una única escalera, de (1, E)
+    imm, TT = _escalera_cauer(np.array([kk], dtype = complex), pp, ww.ravel())
+
+    return(imm.reshape(ww.shape), TT.reshape(ww.shape))
+
+def evaluar_foster( k0, koo, ki, kk, ww, isRC = False ):
+    '''
+    Description
+    -----------
+    Evaluate numerically, over a frequency grid, the immittance resulting 
+    from a Foster expansion (see :func:`foster`):
+        
+        imm = k0 / s + koo * s + kk + sum_i 1 / ( k0_i / s + koo_i * s )         (LC)
+        
+        imm = k0 / s + koo * s + kk + sum_i 1 / ( kk_i + koo_i * s )             (RC, RL)
+
+    All the terms are evaluated for all the frequencies at once, without 
+    SymPy.
+
+    Parameters
+    ----------
+    k0, koo, ki, kk : 
+        The elements of the expansion, as returned by :func:`foster`. Absent
+        elements are None.
+    ww : array_like
+        Angular frequencies [rad/s] where imm is evaluated, at s = jw.
+    isRC : boolean
+        The pairs of ki are [kk_i, koo_i] of a dissipative network (True) 
+        or [k0_i, koo_i] of an LC tank (False).
+
+    Returns
+    -------
+    imm : ndarray
+        The immittance, evaluated at each frequency.
+
+    Ejemplo
+    -------
+    
+    >>> import numpy as np
+    >>> from pytc2.sintesis_dipolo import foster, evaluar_foster
+    >>> from pytc2.general import s
+    >>> Imm = (2*s**4 + 20*s**2 + 18)/(s**3 + 4*s)
+    >>> k0, koo, ki, kk, _ = foster(Imm)
+    >>> imm = evaluar_foster(k0, koo, ki, kk, np.array([1., 3.]))
+
+    '''
+
+    ww = np.asarray(ww, dtype = float)
+
+    imm = np.zeros(ww.shape, dtype = complex)
+    
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+        if k0 is not None:
+            imm += _monomio_jw(float(k0), -1, ww)
+        
+        if koo is not None:
+            imm += _monomio_jw(float(koo), 1, ww)
+        
+        if kk is not None:
+            imm += float(kk)
+        
+        if ki is not None:
+            
+            for this_a, this_b in ki:
+                
+                if isRC:
+                    imm += _reciproco(float(this_a) + _monomio_jw(float(this_b), 1, ww))
+                else:
+                    imm += _reciproco(_monomio_jw(float(this_a), -1, ww) + _monomio_jw(float(this_b), 1, ww))
+
+    return(imm)
+
+
+########################
+#%% Funciones internas #
+########################
+
+def _cauer_racional( imm, remover_en_inf = True, isRC = False ):
+    '''
+    Expansión en fracción continua de Cauer, exacta, para inmitancias con 
+    coeficientes racionales. La inmitancia se representa como un par de 
+    listas de coeficientes (fractions.Fraction) de numerador y denominador, 
+    y cada remoción es un paso de división larga de polinomios, sin 
+    simplificaciones simbólicas.
+    
+    La remoción en continua se resuelve igual que la remoción en infinito, 
+    con el cambio de variable s -> 1/s, que sólo invierte el orden de los 
+    coeficientes.
+
+    Parameters
+    ----------
+    imm : symbolic rational function
+        La inmitancia a sintetizar.
+    remover_en_inf : boolean
+        Remociones en infinito (True) o en continua (False).
+    isRC : boolean
+        Remociones alternadas de polo y de valor constante, como en 
+        :func:`cauer_RC` (True), o sólo de polos, como en :func:`cauer_LC`
+        (False).
+
+    Returns
+    -------
+    None si la inmitancia no tiene coeficientes racionales, o si alguna 
+    remoción no es la esperada para una red LC o RC (residuo no positivo o
+    grados que no corresponden). En ese caso corresponde el cálculo 
+    simbólico. De lo contrario, la misma terna (ko, imm_as_cauer, rem) que
+    :func:`cauer_LC` o :func:`cauer_RC`.
+    
+    Al ser exacta, no hace falta recortar coeficientes residuales con 
+    :func:`trim_func_s` como en el cálculo simbólico.
+
+    '''
+    
+    try:
+        num, den = sp.fraction(sp.together(imm))
+        num = sp.Poly(num, s)
+        den = sp.Poly(den, s)
+    except sp.PolynomialError:
+        return(None)
+
+    if not all( this_poly.domain.is_ZZ or this_poly.domain.is_QQ for this_poly in (num, den) ):
+        return(None)
+    
+    # sin factores comunes
+    _, num, den = num.cancel(den)
+    
+    nn = [ Fraction(int(cc.p), int(cc.q)) for cc in num.all_coeffs() ]
+    dd = [ Fraction(int(cc.p), int(cc.q)) for cc in den.all_coeffs() ]
+
+    if not remover_en_inf:
+        # s -> 1/s: los coeficientes de igual longitud, en orden inverso
+        nn = [Fraction(0)] * (len(dd) - len(nn)) + nn
+        dd = [Fraction(0)] * (len(nn) - len(dd)) + dd
+        nn = _sin_ceros_iniciales(nn[::-1])
+        dd = _sin_ceros_iniciales(dd[::-1])
+
+    if len(nn) == 0 or len(dd) == 0:
+        return(None)
+    
+    # polo (True) o valor constante (False) en infinito
+    bRemoverPolo = len(nn) == len(dd) + 1
+    
+    if not bRemoverPolo and not (isRC and len(nn) == len(dd)):
+        return(None)
+    
+    ko = []
+    
+    while True:
+
+        if len(nn) != len(dd) + int(bRemoverPolo):
+            return(None)
+        
+        kk = nn[0] / dd[0]
+        
+        if kk <= 0:
+            return(None)
+        
+        # resto: N - kk.s.D para un polo, N - kk.D para un valor constante
+        rr = [ nc - kk * dc for nc, dc in zip(nn, dd + [Fraction(0)] * int(bRemoverPolo)) ]
+        rr = _sin_ceros_iniciales(rr[1:])
+        
+        if bRemoverPolo:
+            if remover_en_inf:
+                ko += [ sp.Rational(kk.numerator, kk.denominator) * s ]
+            else:
+                ko += [ sp.Rational(kk.numerator, kk.denominator) / s ]
+        else:
+            ko += [ sp.Rational(kk.numerator, kk.denominator) ]
+        
+        if len(rr) == 0:
+            break
+        
+        # se invierte el resto y se alterna la remoción en redes RC
+        nn, dd = dd, rr
+        
+        if isRC:
+            bRemoverPolo = not bRemoverPolo
+
+    rem = sp.Integer(0)
+
+    if isRC:
+        imm_as_cauer = ko[-1]
+    else:
+        imm_as_cauer = ko[-1] + rem
+    
+    for ii in np.flipud(np.arange(len(ko)-1)):
+
+        imm_as_cauer = ko[ii] + 1/imm_as_cauer
+    
+    return(ko, imm_as_cauer, rem)
+
+def _sin_ceros_iniciales( coeffs ):
+    '''
+    Quita los coeficientes nulos de mayor orden.
+    '''
+
+    ii = 0
+    
+    while ii < len(coeffs) and coeffs[ii] == 0:
+        ii += 1
+    
+    return(coeffs[ii:])
+
+class _PivoteChico(ValueError):
+    '''
+    Paso de la expansión numérica mal condicionado.
+    '''
+
+def _cauer_num( num, den, remover_en_inf, isRC, pivot_tol, dps ):
+    '''
+    Expansión en fracción continua numérica de :func:`cauer_LC_num` y 
+    :func:`cauer_RC_num`. Primero en punto flotante y, si algún paso está
+    mal condicionado y se indicó *dps*, nuevamente con mpmath.
+
+    Returns
+    -------
+    ko : ndarray
+        Valores removidos.
+    bPolo : ndarray
+        True donde se removió un polo, False donde un valor constante.
+
+    '''
+
+    nn = np.atleast_1d(np.asarray(num, dtype = np.float64))
+    dd = np.atleast_1d(np.asarray(den, dtype = np.float64))
+
+    if not remover_en_inf:
+        # s -> 1/s: los coeficientes de igual longitud, en orden inverso
+        nn = np.concatenate((np.zeros(max(dd.size - nn.size, 0)), nn))[::-1]
+        dd = np.concatenate((np.zeros(max(nn.size - dd.size, 0)), dd))[::-1]
+
+    try:
+        ko = _cauer_coeffs(nn, dd, isRC, pivot_tol, np.finfo(np.float64).eps / 2)
+
+    except _PivoteChico as err:
+        
+        if dps is None:
+            raise ValueError(str(err) + '. Expansión mal condicionada: probar con dps = 30 o más.') from err
+
+        with mpmath.workdps(dps):
+            
+            # los coeficientes dados se toman como exactos
+            ko = _cauer_coeffs(np.array([mpmath.mpf(cc) for cc in nn], dtype = object),
+                               np.array([mpmath.mpf(cc) for cc in dd], dtype = object),
+                               isRC, pivot_tol, mpmath.mpf(10)**-dps)
+
+    return( np.array([float(kk) for kk, _ in ko]), np.array([bb for _, bb in ko]) )
+
+def _cauer_coeffs( nn, dd, isRC, pivot_tol, uu ):
+    '''
+    Remociones sucesivas en infinito, por división larga sobre los 
+    coeficientes *nn* y *dd* (float o mpmath.mpf), de mayor a menor 
+    potencia, con redondeo unitario *uu*. Junto a cada coeficiente se 
+    propaga una cota (de primer orden) de su error absoluto: los coeficientes
+    del resto que no superan su propio error son ruido de la cancelación y 
+    se anulan, y el error relativo de cada pivote debe ser menor a 
+    *pivot_tol*. Devuelve la lista de pares (k, bPolo).
+    '''
+    
+    nn = _sin_ceros_iniciales(nn)
+    dd = _sin_ceros_iniciales(dd)
+    
+    if len(nn) == 0 or len(dd) == 0:
+        raise ValueError('La inmitancia es nula o infinita')
+
+    # error de representación de los coeficientes
+    en = uu * np.abs(nn)
+    ed = uu * np.abs(dd)
+
+    # polo (True) o valor constante (False) en infinito
+    bPolo = len(nn) == len(dd) + 1
+
+    if not bPolo and not (isRC and len(nn) == len(dd)):
+        raise ValueError('No hay polo que remover: verificar que la inmitancia sea LC' if not isRC else
+                         'No hay polo ni valor constante que remover: verificar que la inmitancia sea RC/RL')
+
+    ko = []
+    
+    while True:
+        
+        if len(nn) != len(dd) + int(bPolo):
+            raise ValueError('Los grados del resto no corresponden a una inmitancia ' + ('RC/RL' if isRC else 'LC'))
+
+        kk = nn[0] / dd[0]
+        
+        if not kk > 0:
+            raise ValueError('Elemento no positivo ({:g}): verificar que la inmitancia sea '.format(float(kk)) + ('RC/RL' if isRC else 'LC'))
+
+        ek = en[0] / np.abs(nn[0]) + ed[0] / np.abs(dd[0]) + uu
+        
+        # resto: N - kk.s.D para un polo, N - kk.D para un valor constante
+        zeros = np.zeros(int(bPolo), dtype = dd.dtype)
+        kd = kk * np.concatenate((dd, zeros))
+        rr = nn - kd
+        er = en + ek * np.abs(kd) + kk * np.concatenate((ed, zeros)) + uu * (np.abs(nn) + np.abs(kd))
+        
+        # los coeficientes que no superan su error son ruido de la cancelación
+        bRuido = np.abs(rr) <= er
+        rr[bRuido] = 0
+        er[bRuido] = 0
+
+        ko += [(kk, bPolo)]
+        
+        rr = rr[1:]
+        er = er[1:]
+        
+        ii = 0
+        while ii < len(rr) and rr[ii] == 0:
+            ii += 1
+
+        if ii == len(rr):
+            break
+        
+        if er[ii] > pivot_tol * np.abs(rr[ii]):
+            raise _PivoteChico('Error relativo estimado del pivote de la remoción {:d}: {:g}'.format(len(ko) + 1, float(er[ii] / np.abs(rr[ii]))))
+        
+        # se invierte el resto y se alterna la remoción en redes RC
+        nn, dd, en, ed = dd, rr[ii:], ed, er[ii:]
+        
+        if isRC:
+            bPolo = not bPolo
+
+    return(ko)
+
+def _foster_residuos( imm ):
+    '''
+    Expansión de Foster de :func:`foster` calculando los residuos a partir 
+    de los polos, sin sp.apart. Los términos son los mismos que devolvería 
+    sp.apart, y se clasifican en el orden de foster_form.as_ordered_terms().
+
+    Returns
+    -------
+    None si la inmitancia no es racional en s con coeficientes racionales, 
+    tiene polos múltiples, o polos fuera del origen y de los ejes $\\sigma$ 
+    y $j\\omega$. En ese caso corresponde sp.apart. De lo contrario, la misma lista 
+    [k0, koo, ki, kk, foster_form] que :func:`foster`.
+
+    '''
+    
+    try:
+        num, den = sp.fraction(sp.together(imm))
+        num = sp.Poly(num, s)
+        den = sp.Poly(den, s)
+    except sp.PolynomialError:
+        return(None)
+
+    # con coeficientes de punto flotante, sp.apart normaliza los términos a
+    # su manera: sólo se reproduce la expansión exacta
+    if not all( this_poly.domain.is_ZZ or this_poly.domain.is_QQ for this_poly in (num, den) ):
+        return(None)
+
+    terms = _foster_terminos_racional(num, den)
+
+    if terms is None:
+        return(None)
+    
+    # clasificación de cada término, en el orden de foster_form
+    foster_form = sp.Add(*[this_term for this_term, _, _ in terms])
+    clase = { this_term: (this_kind, this_val) for this_term, this_kind, this_val in terms }
+    
+    kk = None
+    k0 = None
+    koo = None
+    ki = []
+    
+    for this_term in foster_form.as_ordered_terms():
+        
+        this_kind, this_val = clase[this_term]
+        
+        if this_kind == 'kk':
+            kk = this_val
+        elif this_kind == 'koo':
+            koo = this_val
+        elif this_kind == 'k0':
+            k0 = this_val
+        else:
+            ki += [this_val]
+
+    if len(ki) == 0:
+        ki = None
+
+    return([k0, koo, ki, kk, foster_form])
+
+def _foster_terminos_racional( num, den ):
+    '''
+    Términos de la expansión en fracciones simples, exacta, de num/den con
+    coeficientes racionales. Como sp.apart, se usan los factores primitivos
+    con coeficientes enteros del denominador. Devuelve una lista de ternas 
+    (término, clase, valor) o None si algún polo no es simple, o no está en
+    el origen ni en los ejes.
+    '''
+
+    _, num, den = num.cancel(den)
+    
+    qq, rr = num.div(den)
+    
+    if qq.degree() > 1:
+        return(None)
+    
+    terms = []
+    
+    koo = qq.coeff_monomial(s)
+    kk = qq.coeff_monomial(1)
+    
+    if koo != 0:
+        terms += [(koo * s, 'koo', koo)]
+    
+    if kk != 0:
+        terms += [(kk, 'kk', kk)]
+    
+    _, factors = den.clear_denoms(convert = True)[1].factor_list()
+    
+    for ff, mult in factors:
+        
+        if mult > 1:
+            return(None)
+        
+        gg = den.exquo(ff.set_domain(den.domain))
+        ff_coeffs = ff.all_coeffs()
+        
+        if ff.degree() == 1:
+            
+            # polo en -ff[1]/ff[0]: término cc/ff
+            pole = -sp.Rational(ff_coeffs[1], ff_coeffs[0])
+            cc = rr.eval(pole) / gg.eval(pole)
+            
+            if cc == 0:
+                return(None)
+            
+            if ff_coeffs[1] == 0:
+                # red no disipativa
+                terms += [(cc / s, 'k0', cc / ff_coeffs[0])]
+            else:
+                # red disipativa - tanque RC-RL
+                terms += [(cc / ff.as_expr(), 'ki', [ff_coeffs[1] / cc, ff_coeffs[0] / cc])]
+                
+        elif ff.degree() == 2 and ff_coeffs[1] == 0:
+            
+            # par de polos en jw: término (aa.s + bb)/ff, con 
+            # aa.s + bb = rr/gg módulo ff
+            ab = (rr * gg.invert(ff.set_domain(den.domain))).rem(ff.set_domain(den.domain))
+            aa = ab.coeff_monomial(s)
+            
+            if ab.coeff_monomial(1) != 0 or aa == 0:
+                return(None)
+            
+            # tanque: ff/(aa.s) = ff[0].s/aa + ff[2]/(aa.s)
+            terms += [(aa * s / ff.as_expr(), 'ki', [sp.Rational(ff_coeffs[2]) / aa, sp.Rational(ff_coeffs[0]) / aa])]
+            
+        else:
+            return(None)
+
+    return(terms)
+
+def _elementos_cauer( ko, remover_en_inf, isRC ):
+    '''
+    Coeficientes k y exponentes p de los elementos k.s^p de una expansión 
+    de Cauer, para :func:`evaluar_cauer`.
+    '''
+
+    if len(ko) > 0 and isinstance(ko[0], sp.Basic):
+
+        kk = []
+        pp = []
+        
+        for this_ko in ko:
+            
+            this_k, this_p = sp.sympify(this_ko).as_coeff_exponent(s)
+            
+            if not this_k.is_number or this_p not in (-1, 0, 1):
+                raise ValueError('Los elementos deben ser de la forma k, k.s o k/s, no %s' % this_ko)
+            
+            kk += [complex(this_k)]
+            pp += [int(this_p)]
+        
+        return(kk, pp)
+
+    kk = [ float(this_ko) for this_ko in ko ]
+    
+    # exponente de los polos removidos
+    p_polo = 1 if remover_en_inf else -1
+
+    if isRC:
+        pp = [ p_polo * (ii % 2) for ii in range(len(kk)) ]
+        
+        if len(kk) > 1 and kk[0] == 0:
+            # la expansión comienza con el polo ko_1
+            kk = kk[1:]
+            pp = pp[1:]
+    else:
+        pp = [ p_polo ] * len(kk)
+    
+    return(kk, pp)
+
+def _escalera_cauer( kk, pp, ww ):
+    '''
+    Imitancia de entrada y transferencia en s = jw de las escaleras de
+    elementos k.s^p, una por cada fila de coeficientes kk, de (M, E).
+    Devuelve dos arrays de (M, F). La fracción continua se evalúa desde la
+    carga hacia la entrada, para todas las filas y frecuencias a la vez,
+    tanto en :func:`evaluar_cauer` como en
+    :func:`pytc2.tolerancias.montecarlo_cauer`.
+    '''
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+        # k.s^p en s = jw, de (M, F)
+        el = [ _monomio_jw(kk[:, ee:ee+1], this_p, ww) for ee, this_p in enumerate(pp) ]
+
+        imm = el[-1]
+        TT = np.ones(imm.shape, dtype = complex)
+
+        for ii in range(len(el)-2, -1, -1):
+
+            if ii % 2 == 0:
+                # divisor entre ko_i y lo que resta hacia la carga
+                TT = TT * _reciproco(1 + el[ii] * imm)
+
+            imm = el[ii] + _reciproco(imm)
+
+    return(imm, TT)
+
+def _monomio_jw( kk, pp, ww ):
+    '''
+    Evalúa k.s^p, con p en (-1, 0, 1), en s = jw. Se arma la parte real e
+    imaginaria por separado para que el polo en w = 0 sea un infinito
+    imaginario y no un NaN. kk puede ser un array, que se combina
+    (broadcasting) con ww.
+    '''
+
+    kk = np.asarray(kk, dtype = complex)
+    dims = np.broadcast(kk, ww).shape
+
+    if pp == 0:
+        return(np.array(np.broadcast_to(kk, dims)))
+
+    # j.w o -j/w
+    jw = ww if pp == 1 else -1 / ww
+
+    val = np.zeros(dims, dtype = complex)
+    val.imag = kk.real * jw
+
+    with np.errstate(invalid = 'ignore'):
+        # sólo donde k es complejo, para no multiplicar 0 por infinito
+        val.real = np.where(kk.imag != 0, -kk.imag * jw, 0.)
+
+    return(val)
+
+def _reciproco( zz ):
+    '''
+    1/zz, nulo donde zz es infinito (en un polo).
+    '''
+    
+    return(np.where(np.isinf(zz), 0, 1 / zz))
+
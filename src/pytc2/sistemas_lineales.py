@@ -8,22 +8,86 @@ Created on Thu Mar  2 14:15:44 2023
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-from matplotlib import patches
-from matplotlib.colors import rgb2hex
 from collections import defaultdict
-from scipy.signal import tf2zpk, TransferFunction, zpk2tf
-import sympy as sp
-
-from IPython.display import display, Math
+import weakref
 
 from fractions import Fraction
 
-##########################################
-#%% Variables para el análisis simbólico #
-##########################################
+from ._lazy import lazy_import
+
+# dependencias pesadas u opcionales: se importan recién al usarlas.
+sig = lazy_import('scipy.signal')
+opt = lazy_import('scipy.optimize')
+sp = lazy_import('sympy')
+ipd = lazy_import('IPython.display')
+plt = lazy_import('matplotlib.pyplot')
+patches = lazy_import('matplotlib.patches')
+colors = lazy_import('matplotlib.colors')
+
+
+#############################
+#%% Cache de singularidades #
+#############################
+
+class _CacheZPK:
+    """
+    Cache de polos, ceros, ganancia, omega_0 y Q de cada sistema, con 
+    estadísticas de aciertos y fallos. Las entradas se indexan por el objeto
+    del sistema mediante referencias débiles, y se descartan solas cuando 
+    el sistema deja de existir.
+    
+    """
+
+    def __init__(self):
+
+        self.data = weakref.WeakKeyDictionary()
+        # las matrices de SOS no son hasheables: se indexan por su id
+        self.data_id = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, obj):
+
+        try:
+            return(self.data.get(obj))
+        except TypeError:
+            entrada = self.data_id.get(id(obj))
+
+        if entrada is not None and entrada[0]() is obj:
+            return(entrada[1])
+
+        return(None)
+
+    def put(self, obj, value):
+
+        try:
+            self.data[obj] = value
+            return
+        except TypeError:
+            pass
 
-from .general import s
+        key = id(obj)
+        
+        try:
+            ref = weakref.ref(obj, lambda _, key = key: self.data_id.pop(key, None))
+        except TypeError:
+            # no admite referencias débiles
+            return
+        
+        self.data_id[key] = (ref, value)
+
+    def __len__(self):
+        
+        return(len(self.data) + len(self.data_id))
+
+    def clear(self):
+
+        self.data.clear()
+        self.data_id.clear()
+        self.hits = 0
+        self.misses = 0
+
+_cache_zpk = _CacheZPK()
 
 
 
@@ -44,6 +108,8 @@ def simplify_n_monic(tt):
 
     '''
     
+    from .general import s
+
     num, den = sp.fraction(sp.simplify(sp.expand(tt)))
     
     num = sp.poly(num,s)
@@ -107,6 +173,8 @@ def parametrize_sos(num, den):
 
     '''    
     
+    from .general import s
+
     w_od = sp.Rational('0')
     Q_d = sp.Rational('0')
     w_on = sp.Rational('0')
@@ -245,50 +313,82 @@ def parametrize_sos(num, den):
 
     return( num, den, w_on, Q_n, w_od, Q_d, K )
 
-def tfcascade(tfa, tfb):
+def tfcascade(tfa, tfb, *args):
     """
+    Transferencia de la conexión en cascada de dos o más sistemas. Los 
+    polinomios se multiplican en un árbol balanceado, de modo que el error 
+    de redondeo crece con el logaritmo de la cantidad de sistemas y no en 
+    forma lineal.
     
     Parameters
     ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+    tfa : TransferFunction
+        Primer sistema de la cascada.
+    tfb : TransferFunction
+        Segundo sistema de la cascada.
+    *args : TransferFunction, optional
+        El resto de los sistemas de la cascada.
 
     Returns
     -------
-    None.
+    tfc : TransferFunction
+        La transferencia de la cascada, Ta . Tb . ...
 
     Example
     -------
 
+    >>> from scipy import signal as sig
+    >>> from pytc2.sistemas_lineales import tfcascade
+    >>> T1 = sig.TransferFunction([1.], [1., 1.])
+    >>> T2 = sig.TransferFunction([1.], [1., 2.])
+    >>> tfcascade(T1, T2, T1).den
+    array([1., 4., 5., 2.])
+
     """
     
-    tfc = TransferFunction( np.polymul(tfa.num, tfb.num), np.polymul(tfa.den, tfb.den) )
+    all_tf = (tfa, tfb) + args
+    
+    tfc = sig.TransferFunction( _polymul_tree([tt.num for tt in all_tf]), 
+                                _polymul_tree([tt.den for tt in all_tf]) )
 
     return tfc
 
-def tfadd(tfa, tfb):
+def tfadd(tfa, tfb, *args):
     """
+    Transferencia de la conexión en paralelo (suma) de dos o más sistemas.
+    Las sumas parciales se combinan en un árbol balanceado, como en 
+    :func:`tfcascade`.
     
     Parameters
     ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+    tfa : TransferFunction
+        Primer sumando.
+    tfb : TransferFunction
+        Segundo sumando.
+    *args : TransferFunction, optional
+        El resto de los sumandos.
 
     Returns
     -------
-    None.
+    tfc : TransferFunction
+        La transferencia suma, Ta + Tb + ...
 
     Example
     -------
 
+    >>> from scipy import signal as sig
+    >>> from pytc2.sistemas_lineales import tfadd
+    >>> T1 = sig.TransferFunction([1.], [1., 1.])
+    >>> T2 = sig.TransferFunction([1.], [1., 2.])
+    >>> tfadd(T1, T2).num
+    array([2., 3.])
+
     """
 
-    tfc = TransferFunction( np.polyadd( np.polymul(tfa.num,tfb.den),np.polymul(tfa.den,tfb.num)),
-                                        np.polymul(tfa.den,tfb.den) )
+    num, den = _tfadd_tree([(tt.num, tt.den) for tt in (tfa, tfb) + args])
+
+    tfc = sig.TransferFunction( num, den )
+    
     return tfc
 
 def pretty_print_lti(num, den = None, displaystr = True):
@@ -313,7 +413,7 @@ def pretty_print_lti(num, den = None, displaystr = True):
     if den is None:
         this_lti = num
     else:
-        this_lti = TransferFunction(num, den)
+        this_lti = sig.TransferFunction(num, den)
     
     num_str_aux = _build_poly_str(this_lti.num)
     den_str_aux = _build_poly_str(this_lti.den)
@@ -321,7 +421,7 @@ def pretty_print_lti(num, den = None, displaystr = True):
     strout = r'\frac{' + num_str_aux + '}{' + den_str_aux + '}'
 
     if displaystr:
-        display(Math(strout))
+        ipd.display(ipd.Math(strout))
     else:
         return strout
 
@@ -381,7 +481,7 @@ def pretty_print_bicuad_omegayq(num, den = None, displaystr = True):
     strout = r'\frac{' + num_str_aux + '}{' + den_str_aux + '}'
 
     if displaystr:
-        display(Math(strout))
+        ipd.display(ipd.Math(strout))
     else:   
         return strout
 
@@ -434,13 +534,13 @@ def pretty_print_SOS(mySOS, mode = 'default', displaystr = True):
             sos_str += r' . ' + pretty_print_bicuad_omegayq(mySOS[ii,:], displaystr = False )
         else:
             num, den = _one_sos2tf(mySOS[ii,:])
-            this_tf = TransferFunction(num, den)
+            this_tf = sig.TransferFunction(num, den)
             sos_str += r' . ' + pretty_print_lti(this_tf, displaystr = False)
 
     sos_str = sos_str[2:]
 
     if displaystr:
-        display(Math( r' ' + sos_str))
+        ipd.display(ipd.Math( r' ' + sos_str))
     else:
         return sos_str
 
@@ -532,18 +632,10 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
         raise ValueError('Image extension must be one of %s, not %s'
                          % (valid_ext, img_ext))
     
+    # all the numbers first, then plot them
+    all_data = analyze_sys_data(all_sys, sys_name = sys_name)
     
-    if isinstance(all_sys, list):
-        cant_sys = len(all_sys)
-    else:
-        all_sys = [all_sys]
-        cant_sys = 1
-
-    if sys_name is None:
-        sys_name = [str(ii) for ii in range(cant_sys)]
-        
-    if not isinstance(sys_name, list):
-        sys_name = [sys_name]
+    sys_name = [this_data['name'] for this_data in all_data]
         
     #%% BODE plots
     return_values = []
@@ -554,13 +646,12 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
         fig_id = 'none'
     axes_hdl = ()
 
-    for ii in range(cant_sys):
-        if all_sys[ii].dt is None:
-            this_digital = False
-        else:
-            this_digital = True
+    for this_data in all_data:
 
-        fig_id, axes_hdl = bodePlot(all_sys[ii], fig_id, axes_hdl, filter_description = sys_name[ii], digital = this_digital, xaxis = xaxis, fs = fs)
+        cant_sos, filter_description, mag = _sos_data2plot(this_data, 'mag')
+        _, _, phase = _sos_data2plot(this_data, 'phase')
+
+        fig_id, axes_hdl = _bode_draw(this_data['freq'], mag, phase, cant_sos, fig_id, axes_hdl, filter_description = filter_description, digital = this_data['dt'] is not None, xaxis = xaxis, fs = fs, dt = this_data['dt'])
 
 
     if img_ext != 'none':
@@ -592,21 +683,13 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
     analog_axes_hdl = ()
     digital_axes_hdl = ()
     
-    for ii in range(cant_sys):
+    for this_data in all_data:
     
-        if isinstance(all_sys[ii], np.ndarray):
-            
-            thisFilter = sos2tf_analog(all_sys[ii])
-
-            analog_fig_id, analog_axes_hdl = pzmap(thisFilter, filter_description=sys_name[ii], fig_id = analog_fig_id, axes_hdl=analog_axes_hdl, annotations = annotations, digital = digital, fs = fs)
+        if this_data['dt'] is None:
+            analog_fig_id, analog_axes_hdl = _pzmap_draw(this_data['zeros'], this_data['poles'], filter_description=this_data['name'], fig_id = analog_fig_id, annotations = annotations, digital = False)
             
         else:
-                
-            if all_sys[ii].dt is None:
-                analog_fig_id, analog_axes_hdl = pzmap(all_sys[ii], filter_description=sys_name[ii], fig_id = analog_fig_id, axes_hdl=analog_axes_hdl, annotations = annotations)
-                
-            else:
-                digital_fig_id, digital_axes_hdl = pzmap(all_sys[ii], filter_description=sys_name[ii], fig_id = digital_fig_id, axes_hdl=digital_axes_hdl, annotations = annotations)
+            digital_fig_id, digital_axes_hdl = _pzmap_draw(this_data['zeros'], this_data['poles'], filter_description=this_data['name'], fig_id = digital_fig_id, annotations = annotations, digital = True)
 
 
     return_values += [ [analog_fig_id, analog_axes_hdl] ]
@@ -614,7 +697,7 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
     return_values += [ [digital_fig_id, digital_axes_hdl] ]
 
 
-    if isinstance(all_sys[ii], np.ndarray) or ( isinstance(all_sys[ii], TransferFunction) and all_sys[ii].dt is None) :
+    if all_data[-1]['dt'] is None:
         analog_axes_hdl.legend()
         if img_ext != 'none':
             plt.figure(analog_fig_id)
@@ -635,14 +718,11 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
     else:
         fig_id = 'none'
     
-    for ii in range(cant_sys):
+    for this_data in all_data:
         
-        if all_sys[ii].dt is None:
-            this_digital = False
-        else:
-            this_digital = True
+        cant_sos, filter_description, groupDelay = _sos_data2plot(this_data, 'group_delay')
         
-        fig_id, axes_hdl = GroupDelay(all_sys[ii], fig_id, filter_description = sys_name[ii], digital = this_digital, xaxis = xaxis, fs = fs)
+        fig_id, axes_hdl = _group_delay_draw(this_data['freq'], groupDelay, cant_sos, fig_id, filter_description = filter_description, digital = this_data['dt'] is not None, xaxis = xaxis, fs = fs, dt = this_data['dt'])
     
     return_values += [ [fig_id, axes_hdl] ]
     
@@ -656,6 +736,238 @@ def analyze_sys( all_sys, sys_name = None, img_ext = 'none', same_figs=True, ann
 
     return(return_values)
 
+def analyze_sys_data( all_sys, sys_name = None, npoints = None, tol = 0.05 ):
+    """ Computes the same analysis as :func:`analyze_sys` without plotting 
+        anything (matplotlib is never imported), and returns the results 
+        of each system:
+        
+          * Magnitude, phase and group delay over a frequency grid
+          * Poles, zeros and gain
+          * omega_0 and Q of each pole
+        
+        The group delay is calculated analytically from the singularities 
+        (see :func:`group_delay_zpk`) over the same grid of the magnitude 
+        and phase responses.
+    
+    Parameters
+    ----------
+    all_sys : list or (Nx6) matrix
+        The linear system to analyze, as in :func:`analyze_sys`.
+    sys_name : string or list.
+        The labels or system description. Default: None
+    npoints : int
+        Number of points of a fixed frequency grid. By default, an adaptive 
+        grid is used, dense only around high-Q singularities and notches 
+        (see :func:`adaptive_freq_grid`).
+    tol : float
+        Tolerance [dB] of the adaptive grid. Default: 0.05 dB.
+    
+    Returns
+    -------
+    
+    all_data : list
+        A dictionary for each system with keys:
+            
+            * 'name': label of the system.
+            * 'dt': sampling period, or None for analog systems.
+            * 'freq': frequency grid [rad/s].
+            * 'mag': magnitude response [dB].
+            * 'phase': phase response [rad].
+            * 'group_delay': group delay [s].
+            * 'zeros', 'poles', 'gain': ZPK description of the system.
+            * 'w0', 'Q': omega_0 [rad/s] and Q of each pole. Digital 
+              poles are mapped to the s-plane as ln(z)/dt.
+            
+        When the system is a SOS matrix, the keys 'sos_mag', 'sos_phase' 
+        and 'sos_group_delay' hold the response of each section, as columns
+        of (F, N) matrices, being F the size of 'freq'. The rest of the keys refer to the cascade.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from scipy import signal as sig
+    >>> from pytc2.sistemas_lineales import analyze_sys_data
+    >>> H1 = sig.TransferFunction( [1.], [1., np.sqrt(2), 1.] )
+    >>> H2 = sig.TransferFunction( [1.], [1., 1/5, 1.] )
+    >>> all_data = analyze_sys_data([H1, H2], sys_name=['H1', 'H2'])
+    >>> all_data[1]['Q']
+
+    See Also
+    --------
+
+    :func:`analyze_sys`
+
+    """
+    
+    if isinstance(all_sys, list):
+        cant_sys = len(all_sys)
+    else:
+        all_sys = [all_sys]
+        cant_sys = 1
+
+    if sys_name is None:
+        sys_name = [str(ii) for ii in range(cant_sys)]
+        
+    if not isinstance(sys_name, list):
+        sys_name = [sys_name]
+
+    all_data = []
+
+    for this_sys, this_name in zip(all_sys, sys_name):
+
+        this_data = {'name': this_name}
+
+        zpk = zpk_data(this_sys)
+
+        if isinstance(this_sys, np.ndarray):
+            # SOS matrix, always analog
+            dt = None
+            
+            ww, mag, phase = _bode_data(this_sys, npoints, digital = False, tol = tol)
+
+            sos_gd = group_delay_zpk(zpk['sos_zeros'], zpk['sos_poles'], ww).transpose()
+            
+            this_data['sos_mag'] = mag[:, :-1]
+            this_data['sos_phase'] = phase[:, :-1]
+            this_data['sos_group_delay'] = sos_gd
+
+            mag = mag[:, -1]
+            phase = phase[:, -1]
+            gd = np.sum(sos_gd, axis = 1)
+            
+        else:
+            dt = this_sys.dt
+            
+            ww, mag, phase = _bode_data(this_sys, npoints, digital = dt is not None, tol = tol)
+            gd = group_delay(ww, myFilter = this_sys)
+
+        this_data['dt'] = dt
+        this_data['freq'] = ww
+        this_data['mag'] = mag
+        this_data['phase'] = phase
+        this_data['group_delay'] = gd
+        # copias, ya que los del cache son de sólo lectura
+        this_data['zeros'] = zpk['zeros'].copy()
+        this_data['poles'] = zpk['poles'].copy()
+        this_data['gain'] = zpk['gain']
+        this_data['w0'] = zpk['w0'].copy()
+        this_data['Q'] = zpk['Q'].copy()
+        
+        all_data += [this_data]
+
+    return(all_data)
+
+def zpk_data(myFilter):
+    """
+    Polos, ceros y ganancia de un sistema, junto con la frecuencia 
+    :math:`\\omega_0` y el Q de cada singularidad. El resultado se guarda en 
+    un cache asociado al objeto del sistema, de modo que :func:`pzmap`, 
+    :func:`bodePlot`, :func:`GroupDelay`, :func:`group_delay` y 
+    :func:`analyze_sys` buscan las raíces una única vez por sistema. Si los
+    coeficientes del sistema se modifican, el cache lo detecta y vuelve a 
+    calcular.
+    
+    Las raíces de los polinomios de hasta segundo orden se calculan con la 
+    resolvente (ver :func:`_quad_roots`), sin recurrir a los autovalores de
+    la matriz compañera.
+    
+    Parameters
+    ----------
+    myFilter : TransferFunction, dlti o matriz de SOS
+        El sistema a analizar. Las matrices de SOS son siempre analógicas.
+
+    Returns
+    -------
+    zpk : dict
+        Diccionario con las claves:
+            
+            * 'zeros', 'poles', 'gain': descripción ZPK del sistema.
+            * 'dt': período de muestreo, o None para sistemas analógicos.
+            * 'w0', 'Q': omega_0 [rad/s] y Q de cada polo. Los polos 
+              digitales se llevan al plano S como ln(z)/dt.
+            * 'w0_zeros', 'Q_zeros': ídem para cada cero.
+        
+        Para las matrices de SOS, las claves 'sos_zeros' y 'sos_poles' 
+        contienen las singularidades de cada sección, de (N, 2), completadas
+        con NaN. Los arrays son de sólo lectura, ya que se comparten entre 
+        todas las llamadas.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from scipy import signal as sig
+    >>> from pytc2.sistemas_lineales import zpk_data
+    >>> H = sig.TransferFunction( [1.], [1., 1/5, 1.] )
+    >>> zpk_data(H)['Q']
+    array([5., 5.])
+
+    See Also
+    --------
+
+    :func:`zpk_cache_info`
+    :func:`analyze_sys_data`
+
+    """
+    
+    clave = _clave_zpk(myFilter)
+
+    entrada = _cache_zpk.get(myFilter)
+    
+    if entrada is not None and _misma_clave_zpk(entrada[0], clave):
+        _cache_zpk.hits += 1
+        return(entrada[1])
+    
+    _cache_zpk.misses += 1
+    
+    zpk = _zpk_calc(myFilter)
+
+    for this_val in zpk.values():
+        if isinstance(this_val, np.ndarray):
+            this_val.setflags(write = False)
+
+    _cache_zpk.put(myFilter, (clave, zpk))
+
+    return(zpk)
+
+def zpk_cache_info():
+    """
+    Estadísticas del cache de :func:`zpk_data`.
+
+    Returns
+    -------
+    info : dict
+        Diccionario con las claves 'hits' (llamadas resueltas por el cache), 
+        'misses' (llamadas que debieron buscar las raíces) y 'currsize' 
+        (sistemas almacenados).
+
+    Example
+    -------
+
+    >>> from scipy import signal as sig
+    >>> from pytc2.sistemas_lineales import zpk_data, zpk_cache_clear, zpk_cache_info
+    >>> zpk_cache_clear()
+    >>> H = sig.TransferFunction( [1.], [1., 1., 1.] )
+    >>> _ = zpk_data(H)
+    >>> _ = zpk_data(H)
+    >>> zpk_cache_info()
+    {'hits': 1, 'misses': 1, 'currsize': 1}
+
+    """
+
+    return({'hits': _cache_zpk.hits, 
+            'misses': _cache_zpk.misses, 
+            'currsize': len(_cache_zpk)})
+
+def zpk_cache_clear():
+    """
+    Vacía el cache de :func:`zpk_data` y reinicia sus estadísticas.
+
+    """
+
+    _cache_zpk.clear()
+
 def pzmap(myFilter, annotations = False, filter_description = None, fig_id='none', axes_hdl='none', digital = False, fs = 2*np.pi):
     """
     
@@ -675,273 +987,209 @@ def pzmap(myFilter, annotations = False, filter_description = None, fig_id='none
 
     """
 
-    if fig_id == 'none':
-        fig_hdl = plt.figure()
-        fig_id = fig_hdl.number
-    else:
-        if plt.fignum_exists(fig_id):
-            fig_hdl = plt.figure(fig_id)
-        else:
-            fig_hdl = plt.figure(fig_id)
-            fig_id = fig_hdl.number
+    # Get the poles and zeros
+    zpk = zpk_data(myFilter)
 
-    axes_hdl = plt.gca()
+    return _pzmap_draw(zpk['zeros'], zpk['poles'], annotations = annotations, filter_description = filter_description, fig_id = fig_id, digital = myFilter.dt is not None)
     
-        # Get the poles and zeros
-    z, p, k = tf2zpk(myFilter.num, myFilter.den)
+def group_delay( freq, phase = None, myFilter = None ):
+    """
+    Calcula el retardo de grupo de un sistema. Si se indica el sistema 
+    (*myFilter*), el retardo se calcula de forma analítica a partir de sus 
+    polos y ceros (ver :func:`group_delay_zpk`). De lo contrario, se estima 
+    como la derivada numérica de la fase (*phase*).
+    
+    Parameters
+    ----------
+    freq : NP array
+        La grilla de frecuencia [rad/s] a la que se calcula el retardo.
+    phase : NP array, optional
+        La fase de la función a calcular el retardo de grupo. 
+    myFilter : TransferFunction, dlti o matriz de SOS, optional
+        El sistema del que se calcula el retardo de grupo.
+
+    Returns
+    -------
+    gd : NP array.
+        Devuelve el retardo de grupo del sistema, o una estimación de 
+        la derivada de la fase respecto a la frecuencia cambiada de 
+        signo.
 
+    Example
+    -------
 
-    # Add unit circle and zero axes    
-    unit_circle = patches.Circle((0,0), radius=1, fill=False,
-                                 color='gray', ls='dotted', lw = 2)
-    axes_hdl.add_patch(unit_circle)
-    plt.axvline(0, color='0.7')
-    plt.axhline(0, color='0.7')
+    >>> import numpy as np
+    >>> from scipy.signal import TransferFunction
+    >>> from pytc2.sistemas_lineales import group_delay
+    >>> ww = np.logspace(-1, 1, 100)
+    >>> gd = group_delay(ww, myFilter = TransferFunction([1], [1, np.sqrt(2), 1]))
+    >>> # Butterworth de 2do orden: retardo de grupo √2 en continua
+    >>> bool(np.isclose(group_delay(np.array([0.]), myFilter = TransferFunction([1], [1, np.sqrt(2), 1]))[0], np.sqrt(2)))
+    True
 
+    """
     
-    #Add circle lines
+    if myFilter is None:
     
-#        maxRadius = np.abs(10*np.sqrt(p[0]))
+        groupDelay = -np.diff(phase)/np.diff(freq)
+        
+        return(np.append(groupDelay, groupDelay[-1]))
+    
+    zpk = zpk_data(myFilter)
+
+    if isinstance(myFilter, np.ndarray):
+        # SOS: la suma del retardo de cada sección
+        return np.sum(group_delay_zpk(zpk['sos_zeros'], zpk['sos_poles'], freq), axis = 0)
     
+    if myFilter.dt is None:
+        
+        return group_delay_zpk(zpk['zeros'], zpk['poles'], freq)
     
-    # Plot the poles and set marker properties
-    if filter_description is None:
-        poles = plt.plot(p.real, p.imag, 'x', markersize=9)
     else:
-        poles = plt.plot(p.real, p.imag, 'x', markersize=9, label=filter_description)
-    
-    # Plot the zeros and set marker properties
-    zeros = plt.plot(z.real, z.imag,  'o', markersize=9, 
-             color='none',
-             markeredgecolor=poles[0].get_color(), # same color as poles
-             markerfacecolor='white'
-             )
+        # freq en rad/s, como la devuelve dlti.bode
+        return myFilter.dt * group_delay_zpk(zpk['zeros'], zpk['poles'], freq * myFilter.dt, digital = True)
 
-    # add info to poles and zeros
-    # first with poles
-    w0, aux_idx = np.unique(np.abs(p), return_index=True)
-    qq = 1 / (2*np.cos(np.pi - np.angle(p[aux_idx])))
-   
-    # label distance to the datapoint
-    lab_mod = 40 
+def group_delay_zpk(zz, pp, ww, digital = False):
+    """
+    Calcula el retardo de grupo de forma analítica, como la suma de la 
+    contribución de cada polo y cada cero. Para una singularidad *r* 
+    analógica la contribución es
     
-    # sign alternance for conjugate complex sing.
-    aux_sign = np.sign(np.random.uniform(-1,1))
+        Re{r} / |jw - r|²
     
-    for ii in range(len(w0)):
+    y para una digital
+    
+        (Re{r* . exp(jw)} - 1) / |exp(jw) - r|²
+    
+    sumándose la de los ceros y restándose la de los polos. No requiere 
+    derivar la fase, por lo que el resultado es exacto en cualquier grilla.
+    
+    Parameters
+    ----------
+    zz : array_like
+        Ceros del sistema, de (..., Nz). Se admite NaN para completar 
+        sistemas de distinto orden en una misma pila.
+    pp : array_like
+        Polos del sistema, de (..., Np). Se admite NaN como en *zz*.
+    ww : array_like
+        Grilla de F frecuencias, en rad/s para los sistemas analógicos o en 
+        rad/muestra para los digitales.
+    digital : boolean
+        Indica si las singularidades pertenecen al plano Z. Default: False
 
-        rand_dir = np.random.uniform(0,2*np.pi)
-        
-        xy_coorde =   (lab_mod *  np.cos(rand_dir), lab_mod *  np.sin(rand_dir))
-        
-        if(xy_coorde[0] < 0.0):
-            halign = 'left'
-        else:
-            halign = 'right'
+    Returns
+    -------
+    gd : ndarray
+        Retardo de grupo de (..., F), en segundos o en muestras para los 
+        sistemas digitales.
 
-        if(xy_coorde[1] < 0.0):
-            valign = 'top'
-        else:
-            valign = 'bottom'
-        
-        # print(np.sqrt(np.sum(np.array(xy_coorde)**2)))
-        
-        if p[aux_idx[ii]].imag > 0.0:
-            # annotate with Q only complex conj singularities
-            
-            
-            aux_sign = aux_sign * -1
-            
-            circle = patches.Circle((0,0), radius=w0[ii], color = poles[0].get_color(), fill=False, ls= (0, (1, 10)), lw = 0.7)
-            
-            axes_hdl.add_patch(circle)
-            plt.axvline(0, color='0.7')
-            plt.axhline(0, color='0.7')
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from scipy.signal import buttap
+    >>> from pytc2.sistemas_lineales import group_delay_zpk
+    >>> zz, pp, kk = buttap(5)
+    >>> gd = group_delay_zpk(zz, pp, np.logspace(-1, 1, 100))
+
+    """
     
-            if annotations:
-                axes_hdl.annotate('$\omega$ = {:3.3g} \n Q = {:3.3g}'.format(w0[ii], qq[ii]),
-                            xy=(p[aux_idx[ii]].real, p[aux_idx[ii]].imag * aux_sign), xycoords='data',
-                            xytext = xy_coorde, textcoords='offset points',
-                            arrowprops=dict(facecolor= poles[0].get_color(), shrink=0.15,
-                                            width = 1, headwidth = 5 ),
-                            horizontalalignment = halign, verticalalignment = valign,
-                            color=poles[0].get_color(),
-                            bbox=dict(edgecolor=poles[0].get_color(), facecolor=_complementaryColor(rgb2hex(poles[0].get_color())), alpha=0.4))
+    ww = np.ravel(ww)
     
-        else:
-            # annotate with omega real singularities
-            
-            if annotations:
-                axes_hdl.annotate('$\omega$ = {:3.3g}'.format(w0[ii]),
-                            xy=(p[aux_idx[ii]].real, p[aux_idx[ii]].imag) , xycoords='data',
-                            xytext = xy_coorde, textcoords='offset points',
-                            arrowprops=dict(facecolor= poles[0].get_color(), shrink=0.15,
-                                            width = 1, headwidth = 5 ),
-                            horizontalalignment = halign, verticalalignment = valign,
-                            color=poles[0].get_color(),
-                            bbox=dict(edgecolor=poles[0].get_color(), facecolor=_complementaryColor(rgb2hex(poles[0].get_color())), alpha=0.4) )
-            
-
-    # and then zeros
-    w0, aux_idx = np.unique(np.abs(z), return_index=True)
-    qq = 1 / (2*np.cos(np.pi - np.angle(z[aux_idx])))
-
-    # sign alternance for conjugate complex sing.
-    aux_sign = np.sign(np.random.uniform(-1,1))
-
-    for ii in range(len(w0)):
-
-        aux_sign = aux_sign * -1
-
-        rand_dir = np.random.uniform(0, 2*np.pi)
-        
-        xy_coorde = (lab_mod *  np.cos(rand_dir), lab_mod *  np.sin(rand_dir))
-
-        if(xy_coorde[0] < 0.0):
-            halign = 'left'
-        else:
-            halign = 'right'
+    return _roots_group_delay(zz, ww, digital) - _roots_group_delay(pp, ww, digital)
 
-        if(xy_coorde[1] < 0.0):
-            valign = 'top'
-        else:
-            valign = 'bottom'
-
-        if z[aux_idx[ii]].imag > 0.0:
-            
-            circle = patches.Circle((0,0), radius=w0[ii], color = poles[0].get_color(), fill=False, ls= (0, (1, 10)), lw = 0.7)
-            
-            axes_hdl.add_patch(circle)
-            plt.axvline(0, color='0.7')
-            plt.axhline(0, color='0.7')
-    
-            if annotations:
-                axes_hdl.annotate('$\omega$ = {:3.3g} \n Q = {:3.3g}'.format(w0[ii], qq[ii]),
-                            xy=(z[aux_idx[ii]].real, z[aux_idx[ii]].imag * aux_sign), xycoords='data',
-                            xytext = xy_coorde, textcoords='offset points',
-                            arrowprops=dict(facecolor=poles[0].get_color(), shrink=0.15,
-                                            width = 1, headwidth = 5 ),
-                            horizontalalignment = halign, verticalalignment = valign,
-                            color=poles[0].get_color(),
-                            bbox=dict(boxstyle = 'Circle', edgecolor=poles[0].get_color(), facecolor=None, alpha=0.4) )
+def GroupDelay(myFilter, fig_id='none', filter_description=None, npoints = None, digital = False, xaxis = 'omega', fs = 2*np.pi, mode = 'analytic', tol = 0.05):
+    """
     
-        else:
-            # annotate with omega real singularities
-            
-            if annotations:
-                axes_hdl.annotate('$\omega$ = {:3.3g}'.format(w0[ii]),
-                            xy=(z[aux_idx[ii]].real, z[aux_idx[ii]].imag), xycoords='data',
-                            xytext = xy_coorde, textcoords='offset points',
-                            arrowprops=dict(facecolor=poles[0].get_color(), shrink=0.15,
-                                            width = 1, headwidth = 5 ),
-                            horizontalalignment = halign, verticalalignment = valign,
-                            color=poles[0].get_color(),
-                            bbox=dict(boxstyle = 'Circle', edgecolor=poles[0].get_color(), facecolor=None, alpha=0.4) )
+    Parameters
+    ----------
+    tfa : TYPE
+        DESCRIPTION.
+    tfb : TYPE
+        DESCRIPTION.
+    mode : string ['analytic', 'phase']
+        "analytic" calcula el retardo a partir de los polos y ceros del 
+        filtro (ver :func:`group_delay_zpk`), mientras que "phase" lo estima 
+        derivando numéricamente la fase. Default: 'analytic'
+    npoints : int
+        Puntos de una grilla de frecuencia fija. Por defecto, en el modo 
+        "analytic" se usa una grilla adaptiva (ver :func:`adaptive_freq_grid`)
+        y en el modo "phase" una fija de 1000 puntos, ya que la derivada 
+        numérica necesita una grilla densa en todo el rango.
+    tol : float
+        Tolerancia [dB] de la grilla adaptiva. Default: 0.05 dB.
 
+    Returns
+    -------
+    None.
 
-    # Scale axes to fit
-    r_old = axes_hdl.get_ylim()[1]
-    
-    r = 1.1 * np.amax(np.concatenate(([r_old/1.1], abs(z), abs(p), [1])))
-    plt.axis('scaled')
-    plt.axis([-r, r, -r, r])
-#    ticks = [-1, -.5, .5, 1]
-#    plt.xticks(ticks)
-#    plt.yticks(ticks)
+    Example
+    -------
 
     """
-    If there are multiple poles or zeros at the same point, put a 
-    superscript next to them.
-    TODO: can this be made to self-update when zoomed?
-    """
-    # Finding duplicates by same pixel coordinates (hacky for now):
-    poles_xy = axes_hdl.transData.transform(np.vstack(poles[0].get_data()).T)
-    zeros_xy = axes_hdl.transData.transform(np.vstack(zeros[0].get_data()).T)    
-
-    # dict keys should be ints for matching, but coords should be floats for 
-    # keeping location of text accurate while zooming
-
     
+    valid_modes = ['analytic', 'phase']
+    if mode not in valid_modes:
+        raise ValueError('mode must be one of %s, not %s'
+                         % (valid_modes, mode))
 
-    d = defaultdict(int)
-    coords = defaultdict(tuple)
-    for xy in poles_xy:
-        key = tuple(np.rint(xy).astype('int'))
-        d[key] += 1
-        coords[key] = xy
-    for key, value in d.items():
-        if value > 1:
-            x, y = axes_hdl.transData.inverted().transform(coords[key])
-            plt.text(x, y, 
-                        r' ${}^{' + str(value) + '}$',
-                        fontsize=13,
-                        )
-
-    d = defaultdict(int)
-    coords = defaultdict(tuple)
-    for xy in zeros_xy:
-        key = tuple(np.rint(xy).astype('int'))
-        d[key] += 1
-        coords[key] = xy
-    for key, value in d.items():
-        if value > 1:
-            x, y = axes_hdl.transData.inverted().transform(coords[key])
-            plt.text(x, y, 
-                        r' ${}^{' + str(value) + '}$',
-                        fontsize=13,
-                        )
-
-    if myFilter.dt is None:
-        digital = False
-    else:
-        digital = True
+    if npoints is None and mode == 'phase':
+        npoints = 1000
     
-    if digital:
-        plt.xlabel(r'$\Re(z)$')
-        plt.ylabel(r'$\Im(z)$')
-    else:
-        plt.xlabel(r'$\sigma$')
-        plt.ylabel('j'+r'$\omega$')
-
-    plt.grid(True, color='0.9', linestyle='-', which='both', axis='both')
+    w, groupDelay = _group_delay_data(myFilter, npoints, digital = digital, mode = mode, tol = tol)
 
-    fig_hdl.suptitle('Poles and Zeros map')
+    if isinstance(myFilter, np.ndarray):
+        # SOS section
+        cant_sos = myFilter.shape[0]
+        filter_description = _sos_labels(filter_description, cant_sos)
+        dt = None
+    else:
+        # LTI object
+        cant_sos = 0
+        dt = myFilter.dt
 
-    if not(filter_description is None):
-       axes_hdl.legend()
+    return _group_delay_draw(w, groupDelay, cant_sos, fig_id, filter_description = filter_description, digital = digital, xaxis = xaxis, fs = fs, dt = dt)
 
-    return fig_id, axes_hdl
-    
-     
-def group_delay( freq, phase):
+def bodePlot(myFilter, fig_id='none', axes_hdl='none', filter_description=None, npoints = None, digital = False, xaxis = 'omega', fs = 2*np.pi, tol = 0.05 ):
     """
-    Calcula el retardo de grupo para una función de fase.
     
     Parameters
     ----------
-    freq : NP array
-        La grilla de frecuencia a la que se calcula la fase.
-    phase : NP array
-        La fase de la función a calcular el retardo de grupo.
+    tfa : TYPE
+        DESCRIPTION.
+    tfb : TYPE
+        DESCRIPTION.
+    npoints : int
+        Puntos de una grilla de frecuencia fija. Por defecto se usa una 
+        grilla adaptiva, densa sólo cerca de las singularidades de alto Q y 
+        de las notches (ver :func:`adaptive_freq_grid`).
+    tol : float
+        Tolerancia [dB] de la grilla adaptiva. Default: 0.05 dB.
 
     Returns
     -------
-    gd : NP array.
-        Devuelve una estimación de la derivada de la fase 
-        respecto a la frecuencia cambiada de signo (retardo 
-        de grupo).
+    None.
 
     Example
     -------
 
     """
     
-    groupDelay = -np.diff(phase)/np.diff(freq)
-    
-    return(np.append(groupDelay, groupDelay[-1]))
-    
-    
-def GroupDelay(myFilter, fig_id='none', filter_description=None, npoints = 1000, digital = False, xaxis = 'omega', fs = 2*np.pi):
+    ww, mag, phase = _bode_data(myFilter, npoints, digital = digital, tol = tol)
+
+    if isinstance(myFilter, np.ndarray):
+        # SOS section
+        cant_sos = myFilter.shape[0]
+        filter_description = _sos_labels(filter_description, cant_sos)
+        dt = None
+    else:
+        # LTI object
+        cant_sos = 0
+        dt = myFilter.dt
+
+    return _bode_draw(ww, mag, phase, cant_sos, fig_id, axes_hdl, filter_description = filter_description, digital = digital, xaxis = xaxis, fs = fs, dt = dt)
+
+def plot_plantilla(filter_type = 'lowpass', fpass = 0.25, ripple = 0.5, fstop = 0.6, attenuation = 40, fs = 2 ):
     """
     
     Parameters
@@ -960,163 +1208,358 @@ def GroupDelay(myFilter, fig_id='none', filter_description=None, npoints = 1000,
 
     """
     
-    if isinstance(myFilter, np.ndarray):
-        # SOS section
-        cant_sos = myFilter.shape[0]
-        phase = np.empty((npoints, cant_sos+1))
-        sos_label = []
+    # para sobreimprimir la plantilla de diseño de un filtro
+    
+    xmin, xmax, ymin, ymax = plt.axis()
+    
+    # banda de paso digital
+    plt.fill([xmin, xmin, fs/2, fs/2],   [ymin, ymax, ymax, ymin], 'g', alpha= 0.2, lw=1, label = 'bw digital') # pass
+    
+    if filter_type == 'lowpass':
+    
+        fstop_start = fstop
+        fstop_end = xmax
         
-        for ii in range(cant_sos):
-            
-            num, den = _one_sos2tf(myFilter[ii,:])
-            thisFilter = TransferFunction(num, den)
-
-            this_zzpp = np.abs(np.concatenate([thisFilter.zeros, thisFilter.poles]))
-            this_zzpp = this_zzpp[this_zzpp > 0]
-            
-            if digital:
-                w, _, phase[:,ii] = thisFilter.bode(np.linspace(0, np.pi, npoints))
-            else:
-                w, _, phase[:,ii] = thisFilter.bode(np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints))
-            
-            sos_label += [filter_description + ' - SOS {:d}'.format(ii)]
+        fpass_start = xmin
+        fpass_end   = fpass
+    
+        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
+        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+    
+    elif filter_type == 'highpass':
+    
+        fstop_start = xmin
+        fstop_end = fstop 
         
-        # whole filter
-        thisFilter = sos2tf_analog(myFilter)
-
-        this_zzpp = np.abs(np.concatenate([thisFilter.zeros, thisFilter.poles]))
-        this_zzpp = this_zzpp[this_zzpp > 0]
+        fpass_start = fpass
+        fpass_end   = xmax
+    
+        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
+        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+    
+    
+    elif filter_type == 'bandpass':
+    
+        fstop_start = xmin
+        fstop_end = fstop[0]
         
-        if digital:
-            w, _, phase[:,cant_sos] = thisFilter.bode(np.linspace(0, np.pi, npoints))
-        else:
-            w, _, phase[:,cant_sos] = thisFilter.bode(np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints))
+        fpass_start = fpass[0]
+        fpass_end   = fpass[1]
         
-        # if digital:
-        #     w, _, phase[:,cant_sos] = thisFilter.bode(np.linspace(10**-2, w_nyq, npoints))
-        # else:
-        #     w, _, phase[:,cant_sos] = thisFilter.bode(np.logspace(-2,2,npoints))
+        fstop2_start = fstop[1]
+        fstop2_end =  xmax
         
-        sos_label += [filter_description]
+        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
+        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+        plt.fill( [fstop2_start, fstop2_end,   fstop2_end, fstop2_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k') # stop
         
-        filter_description = sos_label
-
-        phaseRad = phase * np.pi / 180.0
+    elif filter_type == 'bandstop':
+    
+        fpass_start = xmin
+        fpass_end   = fpass[0]
     
-        phaseRad = phaseRad.reshape((npoints, 1+cant_sos))
+        fstop_start = fstop[0]
+        fstop_end = fstop[1]
         
-        # filter gaps and jumps
-        all_jump_x, all_jump_y = (np.abs(np.diff(phaseRad, axis = 0)) > 4/5*np.pi).nonzero()
+        fpass2_start = fpass[1]
+        fpass2_end   = xmax
+            
+        plt.fill([fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # pass
+        plt.fill([fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k') # stop
+        plt.fill([fpass2_start, fpass2_start, fpass2_end, fpass2_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+    
+    
+    plt.axis([xmin, xmax, np.max([ymin, -100]), np.max([ymax, 5])])
+    
+    # axes_hdl = plt.gca()
+    # axes_hdl.legend()
+    
+    # plt.show()
+    
+def sos2tf_analog(mySOS):
+    """
+    Transferencia de la cascada de secciones de segundo orden (SOS) 
+    analógicas. Los polinomios de las secciones se multiplican en un árbol 
+    balanceado (ver :func:`sos2tf_coeffs`).
+    
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6), o una pila de M de ellas de 
+        (M, N, 6). Cada fila se define como en :func:`pretty_print_SOS`.
 
-        for this_jump_x, this_jump_y in zip(all_jump_x, all_jump_y ):
-            phaseRad[this_jump_x+1:, this_jump_y] = phaseRad[this_jump_x+1:, this_jump_y]  - np.pi
-        
-    else:
-        # LTI object
-        cant_sos = 0
-        
-        this_zzpp = np.abs(np.concatenate([myFilter.zeros, myFilter.poles]))
-        this_zzpp = this_zzpp[this_zzpp > 0]
-        
-        if digital:
-            w, _, phase = myFilter.bode(np.linspace(0, np.pi, npoints))
-        else:
-            w, _, phase = myFilter.bode(np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints))
+    Returns
+    -------
+    tf : TransferFunction or list
+        La transferencia de la cascada, o una lista con la de cada matriz de
+        la pila.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.sistemas_lineales import sos2tf_analog
+    >>> mySOS = np.array([[0., 0., 1., 1., np.sqrt(2), 1.],
+    >>>                   [0., 0., 1., 0., 1., 1.]])
+    >>> tf = sos2tf_analog(mySOS)
+
+    """
+    
+    num, den = sos2tf_coeffs(mySOS)
+    
+    if num.ndim == 1:
+        return sig.TransferFunction(_trim_poly(num), _trim_poly(den))
+    
+    all_num = num.reshape((-1, num.shape[-1]))
+    all_den = den.reshape((-1, den.shape[-1]))
+    
+    return [ sig.TransferFunction(_trim_poly(this_num), _trim_poly(this_den)) 
+            for this_num, this_den in zip(all_num, all_den) ]
 
-        phaseRad = phase * np.pi / 180.0
+def sos2tf_coeffs(mySOS):
+    """
+    Coeficientes del numerador y denominador de la cascada de secciones de 
+    segundo orden (SOS) analógicas, sin construir ningún objeto 
+    TransferFunction. Como en :func:`sosfreqs_analog`, se admite una pila 
+    de matrices SOS y se calculan todas las cascadas de una vez.
+    
+    Los polinomios se multiplican de a pares en un árbol balanceado: en 
+    cada nivel se multiplican todos los pares de toda la pila con una única
+    convolución vectorizada. Así se necesitan log2(N) niveles en lugar de N
+    productos sucesivos, y el error de redondeo acumulado crece en la misma
+    proporción. No se usa la convolución por FFT, ya que su error es 
+    relativo al mayor coeficiente y destruiría los coeficientes pequeños de
+    los polinomios de alto orden.
 
-        phaseRad = phaseRad.reshape((npoints, 1))
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6), o una pila de ellas de 
+        (..., N, 6).
 
-        # filter gaps and jumps
-        all_jump = np.where(np.abs(np.diff(phaseRad, axis = 0)) > 4/5*np.pi)[0]
+    Returns
+    -------
+    num : ndarray
+        Coeficientes del numerador de cada cascada, de (..., 2N+1), en 
+        potencias decrecientes de s. Las cascadas de menor orden se 
+        completan con ceros a la izquierda.
+    den : ndarray
+        Coeficientes del denominador, con la misma forma que *num*.
 
-        for this_jump_x in all_jump:
-            phaseRad[this_jump_x+1:] = phaseRad[this_jump_x+1] - np.pi
-        
-        # if myFilter.dt is None:
-        #     w, _, phase = myFilter.bode(np.logspace(-2,2,npoints))
-        # else:
-        #     digital = True
-        #     w, _, phase = myFilter.bode(np.linspace(10**-2, w_nyq, npoints))
-        
-        # if isinstance(filter_description, str):
-        #     filter_description = [filter_description]
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.sistemas_lineales import sos2tf_coeffs
+    >>> mySOS = np.array([[0., 0., 1., 1., np.sqrt(2), 1.],
+    >>>                   [0., 0., 1., 0., 1., 1.]])
+    >>> num, den = sos2tf_coeffs(np.stack((mySOS, 2*mySOS)))
+    >>> num
+    array([[0., 0., 0., 0., 1.],
+           [0., 0., 0., 0., 4.]])
+
+    """
     
-    groupDelay = -np.diff(phaseRad, axis = 0) / np.diff(w).reshape((npoints-1,1))
+    mySOS = np.asarray(mySOS)
+    
+    return _polymul_stack(mySOS[..., :3]), _polymul_stack(mySOS[..., 3:])
 
-    # ww ya está en rad/s
-    if xaxis == "freq":
-        # to Hz
-        ww = w / 2 / np.pi
-    elif xaxis == "norm":
-        if fs is None:
-            # normalizar cada respuesta a su propio nyqyuist
-            wnorm = 2*np.pi/myFilter.dt/2
-        else:
-            # normalizado a fs
-            wnorm = 2*np.pi*fs
-            
-        ww = w / wnorm
-    else:
-        ww = w
+def sosfreqs_analog(mySOS, ww):
+    """
+    Evalúa la respuesta en frecuencia de cada sección de segundo orden (SOS) 
+    y de la cascada completa, directamente sobre los coeficientes. No se 
+    construye ningún objeto TransferFunction, por lo que es posible evaluar 
+    de una sola vez una pila de muchas matrices SOS (por ejemplo, miles de 
+    filtros candidatos).
 
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6), o una pila de ellas de 
+        (..., N, 6). Cada fila se define como en :func:`pretty_print_SOS`.
+    ww : array_like
+        Grilla de F frecuencias angulares [rad/s] donde se evalúa la respuesta.
 
-    if fig_id == 'none':
-        fig_hdl = plt.figure()
-        fig_id = fig_hdl.number
-    else:
-        if plt.fignum_exists(fig_id):
-            fig_hdl = plt.figure(fig_id)
-        else:
-            fig_hdl = plt.figure(fig_id)
-            fig_id = fig_hdl.number
+    Returns
+    -------
+    H_sos : ndarray
+        Respuesta compleja de cada SOS, de (..., F, N).
+    H : ndarray
+        Respuesta compleja de la cascada de todas las SOS, de (..., F).
 
-    if digital:
-        aux_hdl = plt.plot(ww[1:], groupDelay, label=filter_description)    # Bode phase plot
-    else:
-        aux_hdl = plt.semilogx(ww[1:], groupDelay, label=filter_description)    # Bode phase plot
+    Example
+    -------
 
-    if cant_sos > 0:
-        # distinguish SOS from total response
-        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
-        aux_hdl[-1].set_linewidth(2)
+    >>> import numpy as np
+    >>> from pytc2.sistemas_lineales import sosfreqs_analog
+    >>> mySOS = np.array([[0., 0., 1., 1., np.sqrt(2), 1.],
+    >>>                   [0., 0., 1., 0., 1., 1.]])
+    >>> H_sos, H = sosfreqs_analog(mySOS, np.logspace(-1, 1, 100))
+
+    """
     
-    plt.grid(True)
+    # (..., 1, N, 6) para broadcastear contra las F frecuencias
+    mySOS = np.asarray(mySOS)[..., np.newaxis, :, :]
+    ww = np.ravel(ww)[:, np.newaxis]
+    ww2 = ww**2
     
+    # en s = jw: a1.s² + a2.s + a3 = (a3 - a1.w²) + j.a2.w
+    num = (mySOS[..., 2] - mySOS[..., 0] * ww2) + 1j * (mySOS[..., 1] * ww)
+    den = (mySOS[..., 5] - mySOS[..., 3] * ww2) + 1j * (mySOS[..., 4] * ww)
     
+    H_sos = num / den
     
-    if xaxis == "freq":
-        # to Hz
-        plt.xlabel('Frequency [Hz]')
-    elif xaxis == "norm":
-        # normalizado a fs
-        plt.gca().set_xlim([0, 1])
+    return H_sos, np.prod(H_sos, axis = -1)
+
+def adaptive_freq_grid(zz, pp, tol = 0.05, digital = False, w_lim = None, npoints_max = 5000):
+    """
+    Genera una grilla de frecuencia no uniforme para evaluar la respuesta de
+    un filtro a partir de sus polos y ceros. La grilla parte de unos pocos
+    puntos por década más los puntos que rodean a cada singularidad (su
+    frecuencia :math:`\\omega_0` y su ancho de banda :math:`\\omega_0/Q`), y
+    se refina por bisección sólo allí donde interpolar linealmente la
+    respuesta entre dos puntos consecutivos comete un error mayor a *tol*.
+    Así, un filtro suave se describe con pocas decenas de puntos, mientras
+    que las resonancias de alto Q y las notches quedan bien muestreadas.
+
+    Parameters
+    ----------
+    zz : array_like
+        Ceros del filtro. Puede ser un vector, o una matriz con una fila por
+        sección (completada con NaN), como la que devuelve :func:`_sos2zp`.
+        En ese caso la grilla respeta la tolerancia para cada sección y para
+        la cascada completa.
+    pp : array_like
+        Polos del filtro, con la misma forma que *zz*.
+    tol : float
+        Error máximo [dB] de interpolar linealmente el módulo entre puntos
+        de la grilla. A la fase se le exige el error equivalente en
+        radianes (1 neper = 1 radián). Default: 0.05 dB.
+    digital : bool
+        Si es True, las singularidades están en el plano Z y la grilla es
+        lineal en [0, π] rad/muestra. Si es False, están en el plano S y la
+        grilla es logarítmica en rad/s.
+    w_lim : tuple, optional
+        Frecuencias mínima y máxima de la grilla. Por defecto se extiende
+        una década más allá de las singularidades (filtros analógicos) o
+        [0, π] (filtros digitales).
+    npoints_max : int
+        Cantidad máxima de puntos de la grilla. Default: 5000.
+
+    Returns
+    -------
+    ww : ndarray
+        Grilla de frecuencias ordenada [rad/s o rad/muestra].
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from scipy.signal import buttap, cheb1ap
+    >>> from pytc2.sistemas_lineales import adaptive_freq_grid
+    >>> zz, pp, kk = buttap(4)
+    >>> len(adaptive_freq_grid(zz, pp))
+    >>> zz, pp, kk = cheb1ap(8, 1)
+    >>> len(adaptive_freq_grid(zz, pp))
+
+    """
+
+    zz = np.atleast_2d(np.asarray(zz, dtype = complex))
+    pp = np.atleast_2d(np.asarray(pp, dtype = complex))
+
+    # ceros con signo + y polos con signo - en el log de la respuesta
+    rr = np.hstack((zz, pp))
+    sgn = np.hstack((np.ones(zz.shape[1]), -np.ones(pp.shape[1])))
+
+    all_rr = rr[np.logical_not(np.isnan(rr))]
+
+    if digital:
+
+        # singularidades fuera del origen, con ángulo en [0, π]
+        all_rr = all_rr[all_rr != 0]
+        w0 = np.abs(np.angle(all_rr))
+        bw = np.abs(np.log(np.abs(all_rr)))
+
+        if w_lim is None:
+            w_lim = (0, np.pi)
+
+        x_lim = np.array(w_lim, dtype = float)
+        dx_min = 1e-4 * (x_lim[1] - x_lim[0])
+        x_seed = np.linspace(x_lim[0], x_lim[1], 33)
 
-        if fs is None:
-            # normalizar cada respuesta a su propio nyqyuist
-            this_fs = 1/myFilter.dt
-        else:
-            # normalizado a fs
-            this_fs = fs
-        
-        plt.xlabel('Frecuencia normalizada a fs={:3.3f} [#]'.format(this_fs))
     else:
-        plt.xlabel('Angular frequency [rad/sec]')
-    
 
-    
-    plt.ylabel('Group Delay [sec]')
-    plt.title('Group delay')
+        all_rr = all_rr[all_rr != 0]
+        w0 = np.abs(all_rr)
+        # ancho de banda de -3 dB = w0/Q
+        bw = 2*np.abs(all_rr.real)
 
-    axes_hdl = plt.gca()
-    
-    if not(filter_description is None):
-        # axes_hdl.legend( filter_description )
-        axes_hdl.legend()
+        if w_lim is None:
+            if w0.size == 0:
+                w_lim = (0.1, 10.)
+            else:
+                w_lim = (10**(np.floor(np.log10(np.min(w0)))-1), 10**(np.ceil(np.log10(np.max(w0))) + 1))
+
+        # la grilla analógica es uniforme en log10(w)
+        x_lim = np.log10(np.array(w_lim, dtype = float))
+        dx_min = 1e-4
+        x_seed = np.linspace(x_lim[0], x_lim[1], int(np.ceil(4 * (x_lim[1] - x_lim[0]))) + 1)
+
+    # puntos alrededor de cada singularidad. Las que están sobre el eje jw
+    # (o el círculo unitario) no se evalúan justo en w0, y como dx_min es 
+    # mayor que bw_min, tampoco se llega a w0 refinando.
+    bw_min = 1e-4 * np.maximum(w0, 1e-4)
+    bOnAxis = bw < bw_min
+    bw = np.maximum(bw, bw_min)
+    w_sing = w0[:, np.newaxis] + bw[:, np.newaxis] * np.array([-2., -1., -0.5, 0.5, 1., 2.])
+    w_sing = np.hstack((w_sing.ravel(), w0[np.logical_not(bOnAxis)]))
 
-    return fig_id, axes_hdl
+    if digital:
+        x_sing = w_sing
+    else:
+        x_sing = np.log10(w_sing[w_sing > 0])
+
+    xx = np.concatenate((x_seed, x_sing))
+    xx = np.unique(xx[np.logical_and(xx >= x_lim[0], xx <= x_lim[1])])
 
-def bodePlot(myFilter, fig_id='none', axes_hdl='none', filter_description=None, npoints = 1000, digital = False, xaxis = 'omega', fs = 2*np.pi ):
+    to_w = (lambda x: x) if digital else (lambda x: 10**x)
+
+    # tolerancia en nepers
+    tol_np = tol * np.log(10) / 20
+
+    LL = _log_response(rr, sgn, to_w(xx), digital)
+
+    while xx.size < npoints_max:
+
+        xm = (xx[:-1] + xx[1:]) / 2
+        Lm = _log_response(rr, sgn, to_w(xm), digital)
+
+        # desvío del punto medio respecto de la recta entre los extremos
+        d1 = Lm - LL[:-1]
+        d2 = LL[1:] - Lm
+        err = (d1 - d2) / 2
+        err = np.maximum(np.abs(err.real), np.abs(np.angle(np.exp(1j*err.imag))))
+        err = np.max(err, axis = 1)
+
+        bSplit = np.logical_and(err > tol_np, np.diff(xx) > dx_min)
+
+        if not np.any(bSplit):
+            break
+
+        # si se agota el presupuesto, se refinan los intervalos de mayor error
+        cant_split = min(np.count_nonzero(bSplit), npoints_max - xx.size)
+        split_idx = np.argsort(np.where(bSplit, -err, np.inf))[:cant_split]
+
+        xx = np.concatenate((xx, xm[split_idx]))
+        LL = np.concatenate((LL, Lm[split_idx]))
+
+        sort_idx = np.argsort(xx)
+        xx = xx[sort_idx]
+        LL = LL[sort_idx]
+
+    return to_w(xx)
+
+def tf2sos_analog(num, den, pairing='nearest', verify='roots'):
     """
     
     Parameters
@@ -1134,634 +1577,1438 @@ def bodePlot(myFilter, fig_id='none', axes_hdl='none', filter_description=None,
     -------
 
     """
+
+    z, p, k = sig.tf2zpk(num, den)
     
-    if isinstance(myFilter, np.ndarray):
-        # SOS section
+    sos = zpk2sos_analog(z, p, k, pairing = pairing, verify = verify)
+
+    return sos
         
-        wholeFilter = sos2tf_analog(myFilter)
+def zpk2sos_analog(zz, pp, kk, pairing='nearest', refine_peaks = True, verify = 'roots'):
+    """
+    From scipy.signal, modified by marianux
+    ----------------------------------------
+    
+    Return second-order sections from zeros, poles, and gain of a system
+    
+    Parameters
+    ----------
+    z : array_like
+        Zeros of the transfer function.
+    p : array_like
+        Poles of the transfer function.
+    k : float
+        System gain.
+    pairing : {'nearest', 'keep_odd'}, optional
+        The method to use to combine pairs of poles and zeros into sections.
+        See Notes below.
+    refine_peaks : bool, optional
+        If True, the peak magnitude of each partial cascade used for gain
+        ordering is refined by a local search around the grid maximum, 
+        instead of taking the maximum over the frequency grid. Default: True.
+    verify : {'roots', 'response', None}, optional
+        How the resulting sections are checked against `zz`, `pp` and `kk`.
+        'roots' compares the roots of every section with the zeros and 
+        poles, as multisets within a relative tolerance, and the overall 
+        gain. 'response' compares both frequency responses at a few 
+        frequencies. None (or False) skips the check. Default: 'roots'.
 
-        # all singularities
-        this_zzpp = np.abs(np.concatenate([wholeFilter.zeros, wholeFilter.poles]))
-        this_zzpp = this_zzpp[this_zzpp > 0]
+    Returns
+    -------
+    sos : ndarray
+        Array of second-order filter coefficients, with shape
+        ``(n_sections, 6)``. See `sosfilt` for the SOS filter format
+        specification.
 
-        # calculate the omega axis according to singularities of the whole filter
-        if digital:
-            ww = np.linspace(0, np.pi, npoints)
-        else:
-            ww = np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints)
-        
-        cant_sos = myFilter.shape[0]
-        mag = np.empty((npoints, cant_sos+1))
-        phase = np.empty_like(mag)
-        sos_label = []
+    See Also
+    --------
+    sosfilt
+
+    Raises
+    ------
+    ValueError
+        If `verify` is enabled and the sections do not reproduce the system.
+
+    Notes
+    -----
+    The algorithm used to convert ZPK to SOS format follows the suggestions
+    from R. Schaumann's "Design of analog filters". Ch. 5:
+        1- Assign zeros to closest poles
+        2- order sections by increasing Q
+        3- gains ordering to maximize dynamic range. See ch. 5.
+
+    The peak magnitudes M_i of the partial cascades (Schaumann eq. 5.76) are 
+    computed from the prefix products of the section responses, all of them
+    evaluated once on a shared frequency grid that includes the natural 
+    frequency of every pole.
+
+  
+    """
+    
+    valid_verify = ['roots', 'response', None]
+    if verify is True:
+        verify = 'roots'
+    elif verify is False:
+        verify = None
+    if verify not in valid_verify:
+        raise ValueError('verify must be one of %s, not %s'
+                         % (valid_verify, verify))
+
+    # if empty filter then
+    if len(zz) == len(pp) == 0:
+        return np.array([[0., 0., kk, 1., 0., 0.]])
+
+    assert len(zz) <= len(pp), "Filter must have more poles than zeros"
+    
+    n_sections = ( len(pp) + 1) // 2
+    sos = np.zeros((n_sections, 6))
+
+    # Ensure we have complex conjugate pairs
+    # (note that _cplxreal only gives us one element of each complex pair):
+    z = np.concatenate(_cplxreal(zz))
+    p = np.concatenate(_cplxreal(pp))
+
+    p_sos, z_sos = _zpk_pairing(z, p, n_sections)
+
+    # Construct the system, reversing order so the "worst" are last
+    p_sos = np.reshape(p_sos[::-1], (n_sections, 2))
+    z_sos = np.reshape(z_sos[::-1], (n_sections, 2))
+    
+    # asignación de ganancias para cada SOS
+    gains = np.ones(n_sections, np.array(kk).dtype)
+    
+    # SOS without gain
+    for si in range(n_sections):
+
+        num, den = sig.zpk2tf(z_sos[si, np.logical_not(np.isnan(z_sos[si])) ], p_sos[si, np.logical_not(np.isnan(p_sos[si]))], 1) # no gain
         
-        for ii in range(cant_sos):
-            
-            num, den = _one_sos2tf(myFilter[ii,:])
-            thisFilter = TransferFunction(num, den)
+        num = np.concatenate((np.zeros(np.max(3 - len(num), 0)), num))
+        den = np.concatenate((np.zeros(np.max(3 - len(den), 0)), den))
             
-            this_zzpp = np.abs(np.concatenate([thisFilter.zeros, thisFilter.poles]))
-            this_zzpp = this_zzpp[this_zzpp > 0]
+        sos[si] = np.concatenate((num,den))
+    
+    # M_i according to Schaumann eq 5.76: peak of the cascade up to the i-th SOS
+    mmi = _sos_prefix_peaks(sos, z_sos, p_sos, refine_peaks = refine_peaks)
 
-            _, mag[:, ii], phase[:,ii] = thisFilter.bode(ww)
-                
-            
-            sos_label += [filter_description + ' - SOS {:d}'.format(ii)]
-        
-        # whole filter
-        _, mag[:, cant_sos], phase[:,cant_sos] = wholeFilter.bode(ww)
+    # first gain to optimize dynamic range.
+    gains[0] = kk * (mmi[-1]/mmi[0])
 
-        sos_label += [filter_description]
-        
-        filter_description = sos_label
-        
-    else:
-        # LTI object
-        cant_sos = 0
-        
-        this_zzpp = np.abs(np.concatenate([myFilter.zeros, myFilter.poles]))
-        this_zzpp = this_zzpp[this_zzpp > 0]
-        
-        if digital:
-            ww, mag, phase = myFilter.bode(n=np.linspace(0, np.pi, npoints))
-                
-        else:
-            ww, mag, phase = myFilter.bode(np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints))
+    for si in range(n_sections):
+
+        if si > 0:
+            gains[si] = (mmi[si-1]/mmi[si])
+
+        # now with gain
+        sos[si, :3] = gains[si] * sos[si, :3]
         
-        # if myFilter.dt is None:
-        #     # filtro analógico normalizado
-        #     ww, mag, phase = myFilter.bode(np.logspace(-2,2,npoints))
-        # else:
-        #     ww, mag, phase = myFilter.bode(np.linspace(10**-2, ww_nyq, npoints))
         
-        # if isinstance(filter_description, str):
-        #     filter_description = [filter_description]
+    # verify the factorization
+    if verify is not None:
+        _verify_sos(sos, zz, pp, kk, mode = verify)
         
+    return sos
+    
+########################
+#%% Funciones internas #
+########################
 
-    # ww ya está en rad/s
-    if xaxis == "freq":
-        # to Hz
-        ww = ww / 2 / np.pi
-    elif xaxis == "norm":
-        if fs is None:
-            # normalizar cada respuesta a su propio nyqyuist
-            wnorm = 2*np.pi/myFilter.dt/2
-        else:
-            # normalizado a fs
-            wnorm = 2*np.pi*fs
-        ww = ww / wnorm
+def _zpk_pairing(z, p, n_sections):
+    """
+    Agrupa polos y ceros en secciones para :func:`zpk2sos_analog`. Las 
+    secciones se forman tomando en cada paso el polo de mayor Q y el cero más
+    cercano a él, y se devuelven en ese orden.
+    
+    Parameters
+    ----------
+    z : ndarray
+        Ceros, con un solo elemento por par complejo conjugado, como los 
+        devuelve :func:`_cplxreal`.
+    p : ndarray
+        Polos, en el mismo formato que *z*.
+    n_sections : int
+        Cantidad de secciones.
 
-    if fig_id == 'none':
-        fig_hdl, axes_hdl = plt.subplots(2, 1, sharex='col')
-        fig_id = fig_hdl.number
+    Returns
+    -------
+    p_sos : ndarray
+        Polos de cada sección, de (n_sections, 2). Las de primer orden se 
+        completan con NaN.
+    z_sos : ndarray
+        Ceros de cada sección, de (n_sections, 2), completados con NaN.
+
+    """
+
+    p_sos = np.zeros((n_sections, 2), np.complex128)
+    z_sos = np.zeros_like(p_sos)
+    
+    if n_sections == z.shape[0]:
+        one_z_per_section = True
     else:
-        if plt.fignum_exists(fig_id):
-            fig_hdl = plt.figure(fig_id)
-            axes_hdl = fig_hdl.get_axes()
-        else:
-            fig_hdl = plt.figure(fig_id)
-            axes_hdl = fig_hdl.subplots(2, 1, sharex='col')
-            fig_id = fig_hdl.number
+        one_z_per_section = False
 
-    (mag_ax_hdl, phase_ax_hdl) = axes_hdl
+    # calculate los omega_0 and Q for each pole
+    # w0 = np.abs(p)
+    with np.errstate(divide='ignore'):
+        qq = 1 / (2*np.cos(np.pi - np.angle(p)))
     
-    plt.sca(mag_ax_hdl)
+    for si in range(n_sections):
+        # Select the next "worst" pole
+        p1_idx = np.argmax(qq)
+            
+        p1 = p[p1_idx]
+        p = np.delete(p, p1_idx)
+        qq = np.delete(qq, p1_idx)
 
-    if digital:
-        if filter_description is None:
-            aux_hdl = plt.plot(ww, mag)    # Bode magnitude plot
+        # Pair that pole with a zero
+
+        if np.isreal(p1) and np.isreal(p).sum() == 0:
+            # Special case to set a first-order section
+            if z.size == 0:
+                # no zero, just poles
+                z1 = np.nan
+
+            else:            
+                z1_idx = _nearest_real_complex_idx(z, p1, 'real')
+                z1 = z[z1_idx]
+                z = np.delete(z, z1_idx)
+                
+            p2 = z2 = np.nan
+            
         else:
-            aux_hdl = plt.plot(ww, mag, label=filter_description)    # Bode magnitude plot
+            # SOS 
+            
+            if z.size == 0:
+                # no zero, just poles
+                z1 = np.nan
+                
+            else:
+                # Pair the pole with the closest zero (real or complex)
+                z1_idx = np.argmin(np.abs(p1 - z))
+                z1 = z[z1_idx]
+                z = np.delete(z, z1_idx)
+
+            # Now that we have p1 and z1, figure out what p2 and z2 need to be
+            
+            if np.isnan(z1):
+                # no zero, just poles
+                z2 = np.nan
+                
+                if np.isreal(p1):
+                    # pick the next "worst" pole to use
+                    idx = np.nonzero(np.isreal(p))[0]
+                    assert len(idx) > 0
+                    p2_idx = idx[np.argmax(qq)]
+                    p2 = p[p2_idx]
+                    p = np.delete(p, p2_idx)
+
+                else:
+                    # complex pole
+                    p2 = p1.conj()
+
+                
+            else:
+                # there are zero/s for z2
+                    
+                if np.isreal(p1):
+                    
+                    if np.isreal(z1):  
+                        
+                        # real pole, real zero
+                        # pick the next "worst" pole to use
+                        idx = np.nonzero(np.isreal(p))[0]
+                        assert len(idx) > 0
+                        p2_idx = idx[np.argmin(np.abs(np.abs(p[idx]) - 1))]
+                        p2 = p[p2_idx]
+                        # find a real zero to match the added pole
+                        assert np.isreal(p2)
+                        
+                        if one_z_per_section or len(z) == 0:
+                            # avoid picking double zero (high-pass)
+                            # prefer picking band-pass sections (Schaumann 5.3.1)
+                            z2 = np.nan
+                        else:
+                            z2_idx = _nearest_real_complex_idx(z, p2, 'real')
+                            z2 = z[z2_idx]
+                            assert np.isreal(z2)
+                            z = np.delete(z, z2_idx)
+                        
+                    else:  
+
+                        # real pole, complex zero
+                        z2 = z1.conj()
+                        p2_idx = _nearest_real_complex_idx(p, z1, 'real')
+                        p2 = p[p2_idx]
+                        assert np.isreal(p2)
+
+                    p = np.delete(p, p2_idx)
+                    
+                else:
+                    # complex pole
+
+                    p2 = p1.conj()
+                    
+                    if np.isreal(z1):  # complex pole, complex zero
+
+                        # complex pole, real zero -> possible bandpass
+                        
+                        if one_z_per_section or len(z) == 0:
+                            # avoid picking double zero (high-pass)
+                            # prefer picking band-pass sections (Schaumann 5.3.1)
+                            z2 = np.nan
+                        else:
+                            # z1 over the \sigma axis
+                            z2_idx = _nearest_real_complex_idx(z, p1, 'real')
+                            z2 = z[z2_idx]
+                            assert np.isreal(z2)
+                            z = np.delete(z, z2_idx)
+
+                    else:  
+                        # complex pole, complex zero -> SOS
+                        
+                        z2 = z1.conj()
+                    
+        p_sos[si] = [p1, p2]
+        z_sos[si] = [z1, z2]
+        
+    assert len(p) == 0  # we've consumed all poles and zeros
+
+    return p_sos, z_sos
+
+def _verify_sos(mySOS, zz, pp, kk, mode = 'roots', rtol = 1e-6):
+    """
+    Verifica que una matriz de SOS analógicas reproduzca el sistema dado por
+    sus ceros, polos y ganancia, sin expandir los polinomios completos (que 
+    pierden precisión para órdenes altos).
+    
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS de (N, 6).
+    zz, pp : array_like
+        Ceros y polos del sistema.
+    kk : float
+        Ganancia del sistema.
+    mode : {'roots', 'response'}
+        'roots' compara las raíces de las SOS con *zz* y *pp* como 
+        multiconjuntos, y la ganancia total. 'response' compara la respuesta
+        en frecuencia de ambos en algunas frecuencias.
+    rtol : float
+        Tolerancia relativa de la comparación.
+
+    Raises
+    ------
+    ValueError
+        Si las SOS no reproducen el sistema.
+
+    """
+    
+    zz = np.atleast_1d(np.asarray(zz, dtype=np.complex128))
+    pp = np.atleast_1d(np.asarray(pp, dtype=np.complex128))
+
+    if mode == 'roots':
+        
+        z_sos, p_sos = _sos2zp(mySOS)
+        z_sos = z_sos[np.logical_not(np.isnan(z_sos))]
+        p_sos = p_sos[np.logical_not(np.isnan(p_sos))]
+        
+        if not _same_roots(z_sos, zz, rtol):
+            raise ValueError('Incorrect factorization: Zeros does not match')
+        
+        if not _same_roots(p_sos, pp, rtol):
+            raise ValueError('Incorrect factorization: Poles does not match')
+
+        # ganancia: cociente de los coeficientes principales de cada SOS
+        num = mySOS[:, :3]
+        den = mySOS[:, 3:]
+        lead_num = num[np.arange(num.shape[0]), np.argmax(num != 0, axis = 1)]
+        lead_den = den[np.arange(den.shape[0]), np.argmax(den != 0, axis = 1)]
+        k_sos = np.prod(lead_num / lead_den)
+        
+        if not np.abs(k_sos - kk) <= rtol * np.abs(kk):
+            raise ValueError('Incorrect factorization: Gain does not match')
+        
     else:
-        if filter_description is None:
-            aux_hdl = plt.semilogx(ww, mag)    # Bode magnitude plot
+        
+        # frecuencias entre las singularidades, evitando caer sobre ellas
+        zzpp = np.abs(np.concatenate((zz, pp)))
+        zzpp = zzpp[zzpp > 0]
+        
+        if zzpp.size > 0:
+            ww = np.logspace(np.log10(np.min(zzpp)) - 1, np.log10(np.max(zzpp)) + 1, 7) * np.pi / 3
         else:
-            aux_hdl = plt.semilogx(ww, mag, label=filter_description)    # Bode magnitude plot
+            ww = np.logspace(-1, 1, 7) * np.pi / 3
+        
+        # respuesta de referencia como suma de logaritmos, sin desbordes
+        ss = 1j * ww[:, np.newaxis]
+        log_H = np.log(complex(kk)) + np.sum(np.log(ss - zz), axis = 1) - np.sum(np.log(ss - pp), axis = 1)
+
+        H_sos, _ = sosfreqs_analog(mySOS, ww)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_H_sos = np.sum(np.log(H_sos), axis = -1)
+
+        # diferencia de log(H) en módulo y fase, módulo 2π
+        err = log_H_sos - log_H
+        err = np.abs(err.real + 1j * np.angle(np.exp(1j * err.imag)))
+        
+        if not np.all(err <= rtol):
+            raise ValueError('Incorrect factorization: frequency response does not match')
+
+def _same_roots(aa, bb, rtol):
+    """
+    Compara dos conjuntos de raíces como multiconjuntos: deben tener la 
+    misma cantidad de elementos y cada raíz de *aa* debe corresponder a una 
+    distinta de *bb* dentro de la tolerancia relativa *rtol* (respecto de la
+    raíz, con un piso de rtol veces la mayor de ellas para las raíces en el
+    origen). Las raíces de multiplicidad m se comparan con tolerancia 
+    rtol^(1/m), pues su error numérico crece en esa proporción.
+    """
     
-    if cant_sos > 0:
-        # distinguish SOS from total response
-        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
-        aux_hdl[-1].set_linewidth(2)
+    if aa.size != bb.size:
+        return False
     
-    plt.grid(True)
-#    plt.xlabel('Angular frequency [rad/sec]')
-    plt.ylabel('Magnitude [dB]')
-    plt.title('Magnitude response')
+    if aa.size == 0:
+        return True
     
-    if not(filter_description is None):
-        # mag_ax_hdl.legend( filter_description )
-        mag_ax_hdl.legend()
+    abs_bb = np.abs(bb)
+    scale = np.max(abs_bb)
+    
+    # multiplicidad aproximada de cada raíz de bb
+    if bb.size <= 2000:
+        mult = np.sum(np.abs(bb[:, np.newaxis] - bb) <= np.sqrt(rtol) * (abs_bb + scale)[:, np.newaxis], axis = 1)
+    else:
+        mult = 1
+    
+    tol = rtol**(1/mult) * (abs_bb + rtol * scale)
 
-        
-    plt.sca(phase_ax_hdl)
+    # camino rápido: ambas ordenadas lexicográficamente (real, imag)
+    a_idx = np.argsort(aa)
+    b_idx = np.argsort(bb)
     
-    if digital:
-        if filter_description is None:
-            aux_hdl = plt.plot(ww, np.pi/180*phase)    # Bode phase plot
-        else:
-            aux_hdl = plt.plot(ww, np.pi/180*phase, label=filter_description)    # Bode phase plot
-            
+    if np.all(np.abs(aa[a_idx] - bb[b_idx]) <= tol[b_idx]):
+        return True
+
+    # si el orden no coincide, se busca la mejor asignación uno a uno
+    cost = np.abs(aa[:, np.newaxis] - bb)
+    row, col = opt.linear_sum_assignment(cost)
+    
+    return bool(np.all(cost[row, col] <= tol[col]))
+
+def _sos_prefix_peaks(mySOS, z_sos, p_sos, refine_peaks = True, npoints_dec = 25, n_iter = 6):
+    """
+    Calcula el máximo del módulo de la respuesta de cada cascada parcial 
+    (SOS 0 a i) de una matriz de SOS, para ordenar ganancias según 
+    Schaumann eq. 5.76.
+    
+    Todas las secciones se evalúan una sola vez sobre una grilla común, y las
+    respuestas de las cascadas parciales se obtienen como sumas acumuladas del
+    logaritmo del módulo (productos prefijo), que no desbordan aún en cascadas
+    largas. La grilla incluye la frecuencia natural de cada polo, cerca de la
+    cual están los picos de las secciones de alto Q.
+    
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6).
+    z_sos : ndarray
+        Ceros de cada sección, de (N, 2), completados con NaN.
+    p_sos : ndarray
+        Polos de cada sección, de (N, 2), completados con NaN.
+    refine_peaks : bool
+        Si es True (por defecto), además se agregan a la grilla puntos dentro de la banda
+        de -3 dB de cada polo complejo, y el máximo de cada 
+        cascada parcial se refina por interpolación parabólica sucesiva 
+        (en log ω) entre los puntos de la grilla vecinos al máximo.
+    npoints_dec : int
+        Puntos por década de la grilla común.
+    n_iter : int
+        Iteraciones del refinamiento.
+
+    Returns
+    -------
+    mmi : ndarray
+        Máximo del módulo de cada cascada parcial, de (N,).
+
+    """
+    
+    n_sections = mySOS.shape[0]
+    
+    zzpp = np.abs(np.concatenate([np.ravel(z_sos), np.ravel(p_sos)]))
+    zzpp = zzpp[np.logical_and(np.isfinite(zzpp), zzpp > 0)]
+    
+    if zzpp.size > 0:
+        w_lo = np.floor(np.log10(np.min(zzpp))) - 2
+        w_hi = np.ceil(np.log10(np.max(zzpp))) + 2
     else:
-        if filter_description is None:
-            aux_hdl = plt.semilogx(ww, np.pi/180*phase)    # Bode phase plot
-        else:
-            aux_hdl = plt.semilogx(ww, np.pi/180*phase, label=filter_description)    # Bode phase plot
+        w_lo, w_hi = -2., 2.
     
+    pp = np.ravel(p_sos)
+    pp = pp[np.isfinite(pp)]
+    w0 = np.abs(pp)
     
-    # Scale axes to fit
-    ylim = plt.gca().get_ylim()
+    ww = [np.logspace(w_lo, w_hi, max(100, int(npoints_dec * (w_hi - w_lo)) + 1)), w0]
+    
+    if refine_peaks:
+        # puntos dentro de la banda de -3 dB, w0 ± |Re(p)|, de cada polo complejo
+        pc = pp[pp.imag != 0]
+        ww.append( (np.abs(pc)[:, np.newaxis] + np.abs(pc.real)[:, np.newaxis] * np.array([-1, -0.5, 0.5, 1])).ravel() )
+    
+    ww = np.concatenate(ww)
+    ww = np.unique(ww[ww > 0])
 
-    # presentar la fase como fracciones de \pi
-    ticks = np.linspace(start=np.round(ylim[0]/np.pi)*np.pi, stop=np.round(ylim[1]/np.pi)*np.pi, num = 5, endpoint=True)
+    def prefix_log_mag(ww, sections):
+        # log |H| de la cascada hasta la SOS sections[k], evaluada en ww[k]
+        H_sos, _ = sosfreqs_analog(mySOS, ww)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            LL = np.cumsum(np.log(np.abs(H_sos)), axis = -1)
+        
+        return LL[np.arange(ww.size), sections]
+    
+    H_sos, _ = sosfreqs_analog(mySOS, ww)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        LL = np.cumsum(np.log(np.abs(H_sos)), axis = -1)
+    
+    LL = np.where(np.isnan(LL), -np.inf, LL)
+    
+    kmax = np.argmax(LL, axis = 0)
+    LLmax = LL[kmax, np.arange(n_sections)]
 
-    ylabs = []
-    for aa in ticks:
+    if refine_peaks:
         
-        if aa == 0:
-            ylabs += ['0'] 
-        else:
-            bb = Fraction(aa/np.pi).limit_denominator(1000000)
-            if np.abs(bb.numerator) != 1:
-                if np.abs(bb.denominator) != 1:
-                    str_aux = r'$\frac{{{:d}}}{{{:d}}} \pi$'.format(bb.numerator, bb.denominator)
-                else:
-                    str_aux = r'${:d}\pi$'.format(bb.numerator)
-                    
-            else:
-                if np.abs(bb.denominator) == 1:
-                    if np.sign(bb.numerator) == -1:
-                        str_aux = r'$-\pi$'
-                    else:
-                        str_aux = r'$\pi$'
-                else:
-                    if np.sign(bb.numerator) == -1:
-                        str_aux = r'$-\frac{{\pi}}{{{:d}}}$'.format(bb.denominator)
-                    else:
-                        str_aux = r'$\frac{{\pi}}{{{:d}}}$'.format(bb.denominator)
+        # interpolación parabólica sucesiva en log ω, partiendo del máximo de
+        # la grilla y sus dos vecinos. De a bloques para acotar la memoria (F, N)
+        xx_grid = np.log(ww)
+        block = max(1, 2**22 // max(1, n_sections))
+        
+        for b0 in range(0, n_sections, block):
+            
+            this_sect = np.arange(b0, min(b0 + block, n_sections))
+            this_k = kmax[this_sect]
+            
+            # los máximos en los extremos de la grilla no se refinan
+            bInside = np.logical_and(this_k > 0, this_k < ww.size - 1)
+            this_sect = this_sect[bInside]
+            this_k = this_k[bInside]
+            
+            if this_sect.size == 0:
+                continue
+            
+            x0, x1, x2 = xx_grid[this_k - 1], xx_grid[this_k], xx_grid[this_k + 1]
+            f0, f1, f2 = LL[this_k - 1, this_sect], LL[this_k, this_sect], LL[this_k + 1, this_sect]
+            
+            for _ in range(n_iter):
+                
+                with np.errstate(divide='ignore', invalid='ignore'):
                     
-            ylabs += [ str_aux ]
+                    num = (x1 - x0)**2 * (f1 - f2) - (x1 - x2)**2 * (f1 - f0)
+                    den = (x1 - x0) * (f1 - f2) - (x1 - x2) * (f1 - f0)
+                    xv = x1 - 0.5 * num / den
+                
+                # el vértice debe quedar dentro del intervalo [x0, x2]
+                bBad = np.logical_not(np.logical_and(xv > x0, xv < x2)) | (xv == x1)
+                xv = np.where(bBad, np.where(x2 - x1 > x1 - x0, (x1 + x2)/2, (x0 + x1)/2), xv)
+                
+                fv = prefix_log_mag(np.exp(xv), this_sect)
+                
+                bRight = xv > x1
+                bBetter = fv > f1
+                
+                # se conserva la terna que encierra al máximo
+                x0, f0 = np.where(bBetter & bRight, x1, x0), np.where(bBetter & bRight, f1, f0)
+                x2, f2 = np.where(bBetter & ~bRight, x1, x2), np.where(bBetter & ~bRight, f1, f2)
+                x0, f0 = np.where(~bBetter & ~bRight, xv, x0), np.where(~bBetter & ~bRight, fv, f0)
+                x2, f2 = np.where(~bBetter & bRight, xv, x2), np.where(~bBetter & bRight, fv, f2)
+                x1, f1 = np.where(bBetter, xv, x1), np.where(bBetter, fv, f1)
             
-    plt.yticks(ticks, labels = ylabs )
+            LLmax[this_sect] = np.fmax(LLmax[this_sect], f1)
     
-    if cant_sos > 0:
-        # distinguish SOS from total response
-        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
-        aux_hdl[-1].set_linewidth(2)
+    return np.exp(LLmax)
+
+def _nearest_real_complex_idx(fro, to, which):
+    '''
+    Get the next closest real or complex element based on distance
     
-    plt.grid(True)
+    Parameters
+    ----------
+    Spar : Symbolic Matrix
+        Matriz de parámetros S.
 
-    if xaxis == "freq":
-        # to Hz
-        plt.xlabel('Frequency [Hz]')
+    Returns
+    -------
+    Ts : Symbolic Matrix
+        Matriz de parámetros de transferencia scattering.
+
+    '''
+    
+    assert which in ('real', 'complex')
+    order = np.argsort(np.abs(fro - to))
+    mask = np.isreal(fro[order])
+    if which == 'complex':
+        mask = ~mask
+    return order[np.nonzero(mask)[0][0]]
+
+def _clave_zpk(myFilter):
+    """
+    Coeficientes que definen al sistema, para validar la entrada de 
+    :func:`zpk_data` en el cache: si el sistema se modificó, la clave cambia.
+    
+    """
+    
+    if isinstance(myFilter, np.ndarray):
+        return( (myFilter.copy(),) )
+    
+    if hasattr(myFilter, 'num'):
+        coeffs = (myFilter.num, myFilter.den)
+    elif hasattr(myFilter, 'A'):
+        coeffs = (myFilter.A, myFilter.B, myFilter.C, myFilter.D)
+    else:
+        coeffs = (myFilter.zeros, myFilter.poles, myFilter.gain)
+    
+    return( tuple(np.array(cc, copy = True) for cc in coeffs) + (myFilter.dt,) )
+
+def _misma_clave_zpk(clave_a, clave_b):
+    
+    return( len(clave_a) == len(clave_b) and 
+            all( np.array_equal(aa, bb) for aa, bb in zip(clave_a, clave_b) ) )
+
+def _zpk_calc(myFilter):
+    """
+    Calcula el diccionario de :func:`zpk_data`, sin pasar por el cache.
+    
+    """
+    
+    zpk = {}
+    
+    if isinstance(myFilter, np.ndarray):
+        # SOS matrix, always analog
+        dt = None
+
+        sos_zz, sos_pp = _sos2zp(myFilter)
         
-    elif xaxis == "norm":
-        # normalizado a fs
-        plt.gca().set_xlim([0, 1])
+        zz = sos_zz[np.logical_not(np.isnan(sos_zz))]
+        pp = sos_pp[np.logical_not(np.isnan(sos_pp))]
         
-        if fs is None:
-            # normalizar cada respuesta a su propio nyqyuist
-            this_fs = 1/myFilter.dt
-        else:
-            # normalizado a fs
-            this_fs = fs
+        # leading coefficients of each SOS
+        kk = 1.
+        for this_sos in myFilter:
+            num, den = _one_sos2tf(this_sos)
+            kk = kk * np.atleast_1d(num)[0] / np.atleast_1d(den)[0]
+
+        zpk['sos_zeros'] = sos_zz
+        zpk['sos_poles'] = sos_pp
         
-        plt.xlabel('Frecuencia normalizada a fs={:3.3f} [#]'.format(this_fs))
     else:
-        plt.xlabel('Angular frequency [rad/sec]')
-        
+        dt = myFilter.dt
         
-    plt.ylabel('Phase [rad]')
-    plt.title('Phase response')
+        if hasattr(myFilter, 'num') and np.ndim(myFilter.num) == 1:
+            zz, pp, kk = _tf2zpk(myFilter.num, myFilter.den)
+        else:
+            this_zpk = myFilter.to_zpk()
+            zz, pp, kk = this_zpk.zeros, this_zpk.poles, this_zpk.gain
+
+    zpk['zeros'] = np.array(zz)
+    zpk['poles'] = np.array(pp)
+    zpk['gain'] = kk
+    zpk['dt'] = dt
+    zpk['w0'], zpk['Q'] = _w0_Q(zpk['poles'], dt)
+    zpk['w0_zeros'], zpk['Q_zeros'] = _w0_Q(zpk['zeros'], dt)
     
-    if not(filter_description is None):
-        # phase_ax_hdl.legend( filter_description )
-        phase_ax_hdl.legend()
+    return(zpk)
+
+def _tf2zpk(num, den):
+    """
+    Equivalente a scipy.signal.tf2zpk para sistemas SISO, que resuelve los 
+    polinomios de hasta segundo orden con la resolvente en lugar de la 
+    matriz compañera.
     
-    return fig_id, axes_hdl
+    """
+    
+    bb, aa = sig.normalize(num, den)
+    
+    kk = bb[0]
+    
+    return( _poly_roots(bb / kk), _poly_roots(aa), kk )
 
-def plot_plantilla(filter_type = 'lowpass', fpass = 0.25, ripple = 0.5, fstop = 0.6, attenuation = 40, fs = 2 ):
+def _poly_roots(cc):
     """
+    Raíces de un polinomio, como np.roots. Hasta el segundo orden se usa 
+    :func:`_quad_roots`, y los pares complejos se devuelven exactamente 
+    conjugados.
+    
+    """
+    
+    cc = np.trim_zeros(np.atleast_1d(cc), 'f')
+    
+    if cc.size > 3 or np.iscomplexobj(cc):
+        return(np.roots(cc))
+    
+    rr = _quad_roots(np.concatenate((np.zeros(3 - cc.size), cc))[np.newaxis, :])[0]
+    rr = rr[np.logical_not(np.isnan(rr))]
+    
+    if rr.size == 2 and rr[0].imag != 0:
+        rr[1] = rr[0].conj()
+    
+    if np.all(rr.imag == 0):
+        rr = rr.real
+    
+    return(rr)
+
+def _w0_Q(rr, dt = None):
+    """
+    omega_0 [rad/s] y Q de cada singularidad *rr*. Las digitales se llevan 
+    al plano S como ln(z)/dt.
+    
+    """
+    
+    if dt is None:
+        rr_s = rr
+    else:
+        with np.errstate(divide='ignore'):
+            rr_s = np.log(rr.astype(complex)) / dt
+    
+    with np.errstate(divide='ignore'):
+        return( np.abs(rr_s), 1 / (2*np.cos(np.pi - np.angle(rr_s))) )
+
+def _sos2zp(mySOS):
+    """
+    Calcula los ceros y polos de cada sección de una matriz de SOS (o de una 
+    pila de ellas), resolviendo cada cuadrática de forma vectorizada.
     
     Parameters
     ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+    mySOS : ndarray
+        Matriz de SOS de (..., N, 6).
 
     Returns
     -------
-    None.
+    z : ndarray
+        Ceros de cada sección, de (..., N, 2). Las secciones de menor orden 
+        se completan con NaN.
+    p : ndarray
+        Polos de cada sección, de (..., N, 2). Las secciones de menor orden 
+        se completan con NaN.
 
-    Example
-    -------
+    """
+    
+    mySOS = np.asarray(mySOS)
+    
+    return _quad_roots(mySOS[..., :3]), _quad_roots(mySOS[..., 3:])
 
+def _quad_roots(quad_poly):
     """
+    Raíces de polinomios de hasta segundo orden [a, b, c] de (..., 3), 
+    mediante la forma numéricamente estable de la resolvente. Las raíces 
+    inexistentes (polinomios de 1er orden o constantes) se devuelven como NaN.
     
-    # para sobreimprimir la plantilla de diseño de un filtro
+    """
     
-    xmin, xmax, ymin, ymax = plt.axis()
+    aa = quad_poly[..., 0].astype(complex)
+    bb = quad_poly[..., 1].astype(complex)
+    cc = quad_poly[..., 2].astype(complex)
+
+    rr = np.full(quad_poly.shape[:-1] + (2,), np.nan, dtype = complex)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        
+        disc = np.sqrt(bb**2 - 4*aa*cc)
+        
+        # evito la cancelación entre b y el discriminante
+        sgn = np.where((bb.conj() * disc).real >= 0, 1, -1)
+        qq = -(bb + sgn * disc) / 2
+        
+        # raíz doble en el origen cuando qq == 0
+        r1 = np.where(qq != 0, qq / aa, 0)
+        r2 = np.where(qq != 0, cc / qq, 0)
+        
+        bQuad = aa != 0
+        rr[bQuad, 0] = r1[bQuad]
+        rr[bQuad, 1] = r2[bQuad]
+        
+        # secciones de 1er orden
+        bLin = np.logical_and(aa == 0, bb != 0)
+        rr[bLin, 0] = -cc[bLin] / bb[bLin]
+    
+    return rr
+
+def _roots_group_delay(rr, ww, digital = False):
+    """
+    Suma de la contribución al retardo de grupo de las raíces *rr* de 
+    (..., R), evaluada en las F frecuencias *ww*. Devuelve un array de 
+    (..., F). Las raíces NaN no contribuyen, al igual que las singularidades
+    sobre el eje jw (o el círculo unitario) justo en su frecuencia, donde la
+    fase salta y el retardo no está definido.
+    
+    """
+
+    rr = np.asarray(rr, dtype = complex)[..., np.newaxis, :]
+    ww = ww[:, np.newaxis]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        if digital:
+            zz = np.exp(1j*ww)
+            gd = ((rr.conj() * zz).real - 1) / np.abs(zz - rr)**2
+        else:
+            gd = rr.real / np.abs(1j*ww - rr)**2
+    
+    return np.sum(np.where(np.isnan(gd), 0., gd), axis = -1)
+
+def _log_response(rr, sgn, ww, digital = False):
+    """
+    Logaritmo complejo de la respuesta en frecuencia, ln|H| + j.fase, de cada 
+    grupo de singularidades (filas de *rr*, completadas con NaN) y de todos 
+    ellos juntos, sin la constante de ganancia. *sgn* vale +1 para los ceros
+    y -1 para los polos. Devuelve un array de (F, G+1).
+    
+    """
+
+    if digital:
+        ss = np.exp(1j*ww)
+    else:
+        ss = 1j*ww
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = sgn * np.log(ss[:, np.newaxis, np.newaxis] - rr)
+
+    LL = np.sum(np.where(np.isnan(terms), 0., terms), axis = -1)
+    
+    # las singularidades justo sobre la grilla no aportan error finito
+    LL = np.where(np.isfinite(LL), LL, 0.)
+
+    return np.hstack((LL, np.sum(LL, axis = 1, keepdims = True)))
+
+def _pzmap_draw(z, p, annotations = False, filter_description = None, fig_id='none', digital = False):
+    """
+    Dibuja el diagrama de polos (*p*) y ceros (*z*) de :func:`pzmap`.
     
-    # banda de paso digital
-    plt.fill([xmin, xmin, fs/2, fs/2],   [ymin, ymax, ymax, ymin], 'g', alpha= 0.2, lw=1, label = 'bw digital') # pass
+    """
     
-    if filter_type == 'lowpass':
+    if fig_id == 'none':
+        fig_hdl = plt.figure()
+        fig_id = fig_hdl.number
+    else:
+        if plt.fignum_exists(fig_id):
+            fig_hdl = plt.figure(fig_id)
+        else:
+            fig_hdl = plt.figure(fig_id)
+            fig_id = fig_hdl.number
+
+    axes_hdl = plt.gca()
     
-        fstop_start = fstop
-        fstop_end = xmax
-        
-        fpass_start = xmin
-        fpass_end   = fpass
+
+    # Add unit circle and zero axes    
+    unit_circle = patches.Circle((0,0), radius=1, fill=False,
+                                 color='gray', ls='dotted', lw = 2)
+    axes_hdl.add_patch(unit_circle)
+    plt.axvline(0, color='0.7')
+    plt.axhline(0, color='0.7')
+
     
-        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
-        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+    #Add circle lines
     
-    elif filter_type == 'highpass':
+#        maxRadius = np.abs(10*np.sqrt(p[0]))
     
-        fstop_start = xmin
-        fstop_end = fstop 
-        
-        fpass_start = fpass
-        fpass_end   = xmax
     
-        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
-        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
+    # Plot the poles and set marker properties
+    if filter_description is None:
+        poles = plt.plot(p.real, p.imag, 'x', markersize=9)
+    else:
+        poles = plt.plot(p.real, p.imag, 'x', markersize=9, label=filter_description)
     
+    # Plot the zeros and set marker properties
+    zeros = plt.plot(z.real, z.imag,  'o', markersize=9, 
+             color='none',
+             markeredgecolor=poles[0].get_color(), # same color as poles
+             markerfacecolor='white'
+             )
+
+    # add info to poles and zeros
+    # first with poles
+    w0, aux_idx = np.unique(np.abs(p), return_index=True)
+    qq = 1 / (2*np.cos(np.pi - np.angle(p[aux_idx])))
+   
+    # label distance to the datapoint
+    lab_mod = 40 
     
-    elif filter_type == 'bandpass':
+    # sign alternance for conjugate complex sing.
+    aux_sign = np.sign(np.random.uniform(-1,1))
     
-        fstop_start = xmin
-        fstop_end = fstop[0]
-        
-        fpass_start = fpass[0]
-        fpass_end   = fpass[1]
+    for ii in range(len(w0)):
+
+        rand_dir = np.random.uniform(0,2*np.pi)
         
-        fstop2_start = fstop[1]
-        fstop2_end =  xmax
+        xy_coorde =   (lab_mod *  np.cos(rand_dir), lab_mod *  np.sin(rand_dir))
         
-        plt.fill( [fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # stop
-        plt.fill( [fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
-        plt.fill( [fstop2_start, fstop2_end,   fstop2_end, fstop2_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k') # stop
+        if(xy_coorde[0] < 0.0):
+            halign = 'left'
+        else:
+            halign = 'right'
+
+        if(xy_coorde[1] < 0.0):
+            valign = 'top'
+        else:
+            valign = 'bottom'
         
-    elif filter_type == 'bandstop':
-    
-        fpass_start = xmin
-        fpass_end   = fpass[0]
-    
-        fstop_start = fstop[0]
-        fstop_end = fstop[1]
+        # print(np.sqrt(np.sum(np.array(xy_coorde)**2)))
         
-        fpass2_start = fpass[1]
-        fpass2_end   = xmax
+        if p[aux_idx[ii]].imag > 0.0:
+            # annotate with Q only complex conj singularities
             
-        plt.fill([fpass_start, fpass_start, fpass_end, fpass_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k', label = 'plantilla') # pass
-        plt.fill([fstop_start, fstop_end,   fstop_end, fstop_start], [-attenuation, -attenuation, ymax, ymax], '0.9', lw=1, ls = '--', ec = 'k') # stop
-        plt.fill([fpass2_start, fpass2_start, fpass2_end, fpass2_end],   [ymin, -ripple, -ripple, ymin], '0.9', lw=1, ls = '--', ec = 'k') # pass
-    
-    
-    plt.axis([xmin, xmax, np.max([ymin, -100]), np.max([ymax, 5])])
-    
-    # axes_hdl = plt.gca()
-    # axes_hdl.legend()
-    
-    # plt.show()
+            
+            aux_sign = aux_sign * -1
+            
+            circle = patches.Circle((0,0), radius=w0[ii], color = poles[0].get_color(), fill=False, ls= (0, (1, 10)), lw = 0.7)
+            
+            axes_hdl.add_patch(circle)
+            plt.axvline(0, color='0.7')
+            plt.axhline(0, color='0.7')
     
-def sos2tf_analog(mySOS):
-    """
+            if annotations:
+                axes_hdl.annotate('$\omega$ = {:3.3g} \n Q = {:3.3g}'.format(w0[ii], qq[ii]),
+                            xy=(p[aux_idx[ii]].real, p[aux_idx[ii]].imag * aux_sign), xycoords='data',
+                            xytext = xy_coorde, textcoords='offset points',
+                            arrowprops=dict(facecolor= poles[0].get_color(), shrink=0.15,
+                                            width = 1, headwidth = 5 ),
+                            horizontalalignment = halign, verticalalignment = valign,
+                            color=poles[0].get_color(),
+                            bbox=dict(edgecolor=poles[0].get_color(), facecolor=_complementaryColor(colors.rgb2hex(poles[0].get_color())), alpha=0.4))
     
-    Parameters
-    ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+        else:
+            # annotate with omega real singularities
+            
+            if annotations:
+                axes_hdl.annotate('$\omega$ = {:3.3g}'.format(w0[ii]),
+                            xy=(p[aux_idx[ii]].real, p[aux_idx[ii]].imag) , xycoords='data',
+                            xytext = xy_coorde, textcoords='offset points',
+                            arrowprops=dict(facecolor= poles[0].get_color(), shrink=0.15,
+                                            width = 1, headwidth = 5 ),
+                            horizontalalignment = halign, verticalalignment = valign,
+                            color=poles[0].get_color(),
+                            bbox=dict(edgecolor=poles[0].get_color(), facecolor=_complementaryColor(colors.rgb2hex(poles[0].get_color())), alpha=0.4) )
+            
 
-    Returns
-    -------
-    None.
+    # and then zeros
+    w0, aux_idx = np.unique(np.abs(z), return_index=True)
+    qq = 1 / (2*np.cos(np.pi - np.angle(z[aux_idx])))
 
-    Example
-    -------
+    # sign alternance for conjugate complex sing.
+    aux_sign = np.sign(np.random.uniform(-1,1))
 
-    """
-    
-    SOSnumber, _ = mySOS.shape
+    for ii in range(len(w0)):
+
+        aux_sign = aux_sign * -1
+
+        rand_dir = np.random.uniform(0, 2*np.pi)
+        
+        xy_coorde = (lab_mod *  np.cos(rand_dir), lab_mod *  np.sin(rand_dir))
+
+        if(xy_coorde[0] < 0.0):
+            halign = 'left'
+        else:
+            halign = 'right'
+
+        if(xy_coorde[1] < 0.0):
+            valign = 'top'
+        else:
+            valign = 'bottom'
+
+        if z[aux_idx[ii]].imag > 0.0:
+            
+            circle = patches.Circle((0,0), radius=w0[ii], color = poles[0].get_color(), fill=False, ls= (0, (1, 10)), lw = 0.7)
+            
+            axes_hdl.add_patch(circle)
+            plt.axvline(0, color='0.7')
+            plt.axhline(0, color='0.7')
     
-    num = 1
-    den = 1
+            if annotations:
+                axes_hdl.annotate('$\omega$ = {:3.3g} \n Q = {:3.3g}'.format(w0[ii], qq[ii]),
+                            xy=(z[aux_idx[ii]].real, z[aux_idx[ii]].imag * aux_sign), xycoords='data',
+                            xytext = xy_coorde, textcoords='offset points',
+                            arrowprops=dict(facecolor=poles[0].get_color(), shrink=0.15,
+                                            width = 1, headwidth = 5 ),
+                            horizontalalignment = halign, verticalalignment = valign,
+                            color=poles[0].get_color(),
+                            bbox=dict(boxstyle = 'Circle', edgecolor=poles[0].get_color(), facecolor=None, alpha=0.4) )
     
-    for ii in range(SOSnumber):
-        
-        sos_num, sos_den = _one_sos2tf(mySOS[ii,:])
-        num = np.polymul(num, sos_num)
-        den = np.polymul(den, sos_den)
+        else:
+            # annotate with omega real singularities
+            
+            if annotations:
+                axes_hdl.annotate('$\omega$ = {:3.3g}'.format(w0[ii]),
+                            xy=(z[aux_idx[ii]].real, z[aux_idx[ii]].imag), xycoords='data',
+                            xytext = xy_coorde, textcoords='offset points',
+                            arrowprops=dict(facecolor=poles[0].get_color(), shrink=0.15,
+                                            width = 1, headwidth = 5 ),
+                            horizontalalignment = halign, verticalalignment = valign,
+                            color=poles[0].get_color(),
+                            bbox=dict(boxstyle = 'Circle', edgecolor=poles[0].get_color(), facecolor=None, alpha=0.4) )
 
-    tf = TransferFunction(num, den)
+
+    # Scale axes to fit
+    r_old = axes_hdl.get_ylim()[1]
     
-    return tf
+    r = 1.1 * np.amax(np.concatenate(([r_old/1.1], abs(z), abs(p), [1])))
+    plt.axis('scaled')
+    plt.axis([-r, r, -r, r])
+#    ticks = [-1, -.5, .5, 1]
+#    plt.xticks(ticks)
+#    plt.yticks(ticks)
 
-def tf2sos_analog(num, den, pairing='nearest'):
     """
-    
-    Parameters
-    ----------
-    tfa : TYPE
-        DESCRIPTION.
-    tfb : TYPE
-        DESCRIPTION.
+    If there are multiple poles or zeros at the same point, put a 
+    superscript next to them.
+    TODO: can this be made to self-update when zoomed?
+    """
+    # Finding duplicates by same pixel coordinates (hacky for now):
+    poles_xy = axes_hdl.transData.transform(np.vstack(poles[0].get_data()).T)
+    zeros_xy = axes_hdl.transData.transform(np.vstack(zeros[0].get_data()).T)    
 
-    Returns
-    -------
-    None.
+    # dict keys should be ints for matching, but coords should be floats for 
+    # keeping location of text accurate while zooming
 
-    Example
-    -------
+    
 
-    """
+    d = defaultdict(int)
+    coords = defaultdict(tuple)
+    for xy in poles_xy:
+        key = tuple(np.rint(xy).astype('int'))
+        d[key] += 1
+        coords[key] = xy
+    for key, value in d.items():
+        if value > 1:
+            x, y = axes_hdl.transData.inverted().transform(coords[key])
+            plt.text(x, y, 
+                        r' ${}^{' + str(value) + '}$',
+                        fontsize=13,
+                        )
+
+    d = defaultdict(int)
+    coords = defaultdict(tuple)
+    for xy in zeros_xy:
+        key = tuple(np.rint(xy).astype('int'))
+        d[key] += 1
+        coords[key] = xy
+    for key, value in d.items():
+        if value > 1:
+            x, y = axes_hdl.transData.inverted().transform(coords[key])
+            plt.text(x, y, 
+                        r' ${}^{' + str(value) + '}$',
+                        fontsize=13,
+                        )
 
-    z, p, k = tf2zpk(num, den)
-    
-    sos = zpk2sos_analog(z, p, k, pairing = pairing)
+    if digital:
+        plt.xlabel(r'$\Re(z)$')
+        plt.ylabel(r'$\Im(z)$')
+    else:
+        plt.xlabel(r'$\sigma$')
+        plt.ylabel('j'+r'$\omega$')
 
-    return sos
-        
-def zpk2sos_analog(zz, pp, kk, pairing='nearest'):
-    """
-    From scipy.signal, modified by marianux
-    ----------------------------------------
-    
-    Return second-order sections from zeros, poles, and gain of a system
-    
-    Parameters
-    ----------
-    z : array_like
-        Zeros of the transfer function.
-    p : array_like
-        Poles of the transfer function.
-    k : float
-        System gain.
-    pairing : {'nearest', 'keep_odd'}, optional
-        The method to use to combine pairs of poles and zeros into sections.
-        See Notes below.
+    plt.grid(True, color='0.9', linestyle='-', which='both', axis='both')
 
-    Returns
-    -------
-    sos : ndarray
-        Array of second-order filter coefficients, with shape
-        ``(n_sections, 6)``. See `sosfilt` for the SOS filter format
-        specification.
+    fig_hdl.suptitle('Poles and Zeros map')
 
-    See Also
-    --------
-    sosfilt
+    if not(filter_description is None):
+       axes_hdl.legend()
 
-    Notes
-    -----
-    The algorithm used to convert ZPK to SOS format follows the suggestions
-    from R. Schaumann's "Design of analog filters". Ch. 5:
-        1- Assign zeros to closest poles
-        2- order sections by increasing Q
-        3- gains ordering to maximize dynamic range. See ch. 5.
+    return fig_id, axes_hdl
 
-  
+def _group_delay_data(myFilter, npoints, digital = False, mode = 'analytic', tol = 0.05):
     """
+    Calcula el retardo de grupo que dibuja :func:`GroupDelay`. Devuelve la 
+    grilla de frecuencia [rad/s] y el retardo de grupo, con una columna por 
+    cada SOS y la cascada completa en la última.
     
-    # if empty filter then
-    if len(zz) == len(pp) == 0:
-        return np.array([[0., 0., kk, 1., 0., 0.]])
-
-    assert len(zz) <= len(pp), "Filter must have more poles than zeros"
+    """
     
-    n_sections = ( len(pp) + 1) // 2
-    sos = np.zeros((n_sections, 6))
-
-    # Ensure we have complex conjugate pairs
-    # (note that _cplxreal only gives us one element of each complex pair):
-    z = np.concatenate(_cplxreal(zz))
-    p = np.concatenate(_cplxreal(pp))
+    if isinstance(myFilter, np.ndarray):
+        # SOS section
+        # all singularities, from each section of the whole filter
+        zpk = zpk_data(myFilter)
+        zz, pp = zpk['sos_zeros'], zpk['sos_poles']
+        
+        # the same omega axis for every SOS and the whole filter
+        w = _freq_grid(myFilter, npoints, digital = digital, tol = tol)
 
-    # calculate los omega_0 and Q for each pole
-    # w0 = np.abs(p)
-    qq = 1 / (2*np.cos(np.pi - np.angle(p)))
+        if mode == 'analytic':
+            
+            # every SOS and then the whole filter
+            groupDelay = group_delay_zpk(zz, pp, w).transpose()
+            groupDelay = np.hstack((groupDelay, np.sum(groupDelay, axis = 1, keepdims = True)))
+        
+        else:
 
-    p_sos = np.zeros((n_sections, 2), np.complex128)
-    z_sos = np.zeros_like(p_sos)
+            H_sos, H_filt = sosfreqs_analog(myFilter, w)
+            H_all = np.hstack((H_sos, H_filt.reshape((w.size,1))))
     
-    if n_sections == z.shape[0]:
-        one_z_per_section = True
-    else:
-        one_z_per_section = False
+            phaseRad = np.unwrap(np.angle(H_all), axis = 0)
             
+            # filter gaps and jumps
+            all_jump_x, all_jump_y = (np.abs(np.diff(phaseRad, axis = 0)) > 4/5*np.pi).nonzero()
     
-    for si in range(n_sections):
-        # Select the next "worst" pole
-        p1_idx = np.argmax(qq)
-            
-        p1 = p[p1_idx]
-        p = np.delete(p, p1_idx)
-        qq = np.delete(qq, p1_idx)
-
-        # Pair that pole with a zero
-
-        if np.isreal(p1) and np.isreal(p).sum() == 0:
-            # Special case to set a first-order section
-            if z.size == 0:
-                # no zero, just poles
-                z1 = np.nan
+            for this_jump_x, this_jump_y in zip(all_jump_x, all_jump_y ):
+                phaseRad[this_jump_x+1:, this_jump_y] = phaseRad[this_jump_x+1:, this_jump_y]  - np.pi
+        
+    else:
+        # LTI object
+        w_eval = _freq_grid(myFilter, npoints, digital = digital, tol = tol)
 
-            else:            
-                z1_idx = _nearest_real_complex_idx(z, p1, 'real')
-                z1 = z[z1_idx]
-                z = np.delete(z, z1_idx)
-                
-            p2 = z2 = np.nan
+        if mode == 'analytic':
             
-        else:
-            # SOS 
-            
-            if z.size == 0:
-                # no zero, just poles
-                z1 = np.nan
-                
+            # en rad/s, del mismo modo que lo devuelve bode()
+            if myFilter.dt is None:
+                w = w_eval
             else:
-                # Pair the pole with the closest zero (real or complex)
-                z1_idx = np.argmin(np.abs(p1 - z))
-                z1 = z[z1_idx]
-                z = np.delete(z, z1_idx)
-
-            # Now that we have p1 and z1, figure out what p2 and z2 need to be
+                w = w_eval / myFilter.dt
             
-            if np.isnan(z1):
-                # no zero, just poles
-                z2 = np.nan
-                
-                if np.isreal(p1):
-                    # pick the next "worst" pole to use
-                    idx = np.nonzero(np.isreal(p))[0]
-                    assert len(idx) > 0
-                    p2_idx = idx[np.argmax(qq)]
-                    p2 = p[p2_idx]
-                    p = np.delete(p, p2_idx)
+            groupDelay = group_delay(w, myFilter = myFilter).reshape((w.size, 1))
+            
+        else:
+            
+            w, _, phase = myFilter.bode(w_eval)
+    
+            phaseRad = phase * np.pi / 180.0
+    
+            phaseRad = phaseRad.reshape((w.size, 1))
+    
+            # filter gaps and jumps
+            all_jump = np.where(np.abs(np.diff(phaseRad, axis = 0)) > 4/5*np.pi)[0]
+    
+            for this_jump_x in all_jump:
+                phaseRad[this_jump_x+1:] = phaseRad[this_jump_x+1] - np.pi
+        
+    if mode == 'phase':
+        
+        groupDelay = -np.diff(phaseRad, axis = 0) / np.diff(w).reshape((w.size-1,1))
+        
+        # the derivative is one sample shorter
+        w = w[1:]
 
-                else:
-                    # complex pole
-                    p2 = p1.conj()
+    return w, groupDelay
 
-                
-            else:
-                # there are zero/s for z2
-                    
-                if np.isreal(p1):
-                    
-                    if np.isreal(z1):  
-                        
-                        # real pole, real zero
-                        # pick the next "worst" pole to use
-                        idx = np.nonzero(np.isreal(p))[0]
-                        assert len(idx) > 0
-                        p2_idx = idx[np.argmin(np.abs(np.abs(p[idx]) - 1))]
-                        p2 = p[p2_idx]
-                        # find a real zero to match the added pole
-                        assert np.isreal(p2)
-                        
-                        if one_z_per_section or len(z) == 0:
-                            # avoid picking double zero (high-pass)
-                            # prefer picking band-pass sections (Schaumann 5.3.1)
-                            z2 = np.nan
-                        else:
-                            z2_idx = _nearest_real_complex_idx(z, p2, 'real')
-                            z2 = z[z2_idx]
-                            assert np.isreal(z2)
-                            z = np.delete(z, z2_idx)
-                        
-                    else:  
+def _group_delay_draw(w, groupDelay, cant_sos, fig_id='none', filter_description=None, digital = False, xaxis = 'omega', fs = 2*np.pi, dt = None):
+    """
+    Dibuja el retardo de grupo de :func:`GroupDelay`, calculado en la 
+    grilla *w* [rad/s].
+    
+    """
+    
+    # ww ya está en rad/s
+    if xaxis == "freq":
+        # to Hz
+        ww = w / 2 / np.pi
+    elif xaxis == "norm":
+        if fs is None:
+            # normalizar cada respuesta a su propio nyqyuist
+            wnorm = 2*np.pi/dt/2
+        else:
+            # normalizado a fs
+            wnorm = 2*np.pi*fs
+            
+        ww = w / wnorm
+    else:
+        ww = w
 
-                        # real pole, complex zero
-                        z2 = z1.conj()
-                        p2_idx = _nearest_real_complex_idx(p, z1, 'real')
-                        p2 = p[p2_idx]
-                        assert np.isreal(p2)
 
-                    p = np.delete(p, p2_idx)
-                    
-                else:
-                    # complex pole
+    if fig_id == 'none':
+        fig_hdl = plt.figure()
+        fig_id = fig_hdl.number
+    else:
+        if plt.fignum_exists(fig_id):
+            fig_hdl = plt.figure(fig_id)
+        else:
+            fig_hdl = plt.figure(fig_id)
+            fig_id = fig_hdl.number
 
-                    p2 = p1.conj()
-                    
-                    if np.isreal(z1):  # complex pole, complex zero
+    if digital:
+        aux_hdl = plt.plot(ww, groupDelay, label=filter_description)    # Bode phase plot
+    else:
+        aux_hdl = plt.semilogx(ww, groupDelay, label=filter_description)    # Bode phase plot
 
-                        # complex pole, real zero -> possible bandpass
-                        
-                        if one_z_per_section or len(z) == 0:
-                            # avoid picking double zero (high-pass)
-                            # prefer picking band-pass sections (Schaumann 5.3.1)
-                            z2 = np.nan
-                        else:
-                            # z1 over the \sigma axis
-                            z2_idx = _nearest_real_complex_idx(z, p1, 'real')
-                            z2 = z[z2_idx]
-                            assert np.isreal(z2)
-                            z = np.delete(z, z2_idx)
+    if cant_sos > 0:
+        # distinguish SOS from total response
+        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
+        aux_hdl[-1].set_linewidth(2)
+    
+    plt.grid(True)
+    
+    
+    
+    if xaxis == "freq":
+        # to Hz
+        plt.xlabel('Frequency [Hz]')
+    elif xaxis == "norm":
+        # normalizado a fs
+        plt.gca().set_xlim([0, 1])
 
-                    else:  
-                        # complex pole, complex zero -> SOS
-                        
-                        z2 = z1.conj()
-                    
-        p_sos[si] = [p1, p2]
-        z_sos[si] = [z1, z2]
+        if fs is None:
+            # normalizar cada respuesta a su propio nyqyuist
+            this_fs = 1/dt
+        else:
+            # normalizado a fs
+            this_fs = fs
         
-    assert len(p) == 0  # we've consumed all poles and zeros
-    del p, z
+        plt.xlabel('Frecuencia normalizada a fs={:3.3f} [#]'.format(this_fs))
+    else:
+        plt.xlabel('Angular frequency [rad/sec]')
+    
 
-    # Construct the system, reversing order so the "worst" are last
-    p_sos = np.reshape(p_sos[::-1], (n_sections, 2))
-    z_sos = np.reshape(z_sos[::-1], (n_sections, 2))
     
-    # asignación de ganancias para cada SOS
-    mmi = np.ones(n_sections)
-    gains = np.ones(n_sections, np.array(kk).dtype)
+    plt.ylabel('Group Delay [sec]')
+    plt.title('Group delay')
+
+    axes_hdl = plt.gca()
+    
+    if not(filter_description is None):
+        # axes_hdl.legend( filter_description )
+        axes_hdl.legend()
+
+    return fig_id, axes_hdl
+
+def _bode_data(myFilter, npoints, digital = False, tol = 0.05):
+    """
+    Calcula la respuesta de módulo [dB] y fase [rad] que dibuja 
+    :func:`bodePlot`, junto con la grilla de frecuencia [rad/s]. Para las 
+    matrices de SOS se devuelve una columna por cada SOS y la cascada 
+    completa en la última.
     
-    tf_j = TransferFunction(1.0, 1.0)
+    """
     
-    for si in range(n_sections):
+    if isinstance(myFilter, np.ndarray):
+        # SOS section
         
-        this_zz = z_sos[si, np.logical_not( np.isnan(z_sos[si])) ]
-        this_pp = p_sos[si, np.logical_not(np.isnan(p_sos[si]))]
+        # calculate the omega axis according to singularities of the whole filter
+        ww = _freq_grid(myFilter, npoints, digital = digital, tol = tol)
+
+        # every SOS and the whole filter in one pass
+        H_sos, H_filt = sosfreqs_analog(myFilter, ww)
+        H_all = np.hstack((H_sos, H_filt.reshape((ww.size,1))))
         
-        num, den = zpk2tf(this_zz, this_pp, 1) # no gain
+        mag = 20 * np.log10(np.abs(H_all))
+        phase = np.unwrap(np.angle(H_all), axis = 0)
         
-        tf_j = tfcascade(tf_j, TransferFunction(num, den))
-
-        this_zzpp = np.abs(np.concatenate([this_zz, this_pp]))
-        this_zzpp = this_zzpp[this_zzpp > 0]
+    else:
+        # LTI object
+        if digital:
+            ww, mag, phase = myFilter.bode(n=_freq_grid(myFilter, npoints, digital = digital, tol = tol))
+                
+        else:
+            ww, mag, phase = myFilter.bode(_freq_grid(myFilter, npoints, digital = digital, tol = tol))
         
-        _, mag, _ = tf_j.bode(np.logspace(np.floor(np.log10(np.min(this_zzpp)))-2, np.ceil(np.log10(np.max(this_zzpp)))+2, 100))
+        # if myFilter.dt is None:
+        #     # filtro analógico normalizado
+        #     ww, mag, phase = myFilter.bode(np.logspace(-2,2,npoints))
+        # else:
+        #     ww, mag, phase = myFilter.bode(np.linspace(10**-2, ww_nyq, npoints))
         
-        # bode in dB
-        mmi[si] = 10**(np.max(mag)/20) # M_i according to Schaumann eq 5.76
+        # in rad
+        phase = phase * np.pi / 180.0
+
+    return ww, mag, phase
+
+def _freq_grid(myFilter, npoints = None, digital = False, tol = 0.05):
+    """
+    Grilla de frecuencia de :func:`bodePlot` y :func:`GroupDelay` [rad/s, o 
+    rad/muestra para filtros digitales]. Si *npoints* es None se genera con 
+    :func:`adaptive_freq_grid` para la tolerancia *tol* [dB]; si no, es una 
+    grilla fija de *npoints* puntos que abarca una década más allá de las 
+    singularidades (o [0, π] para filtros digitales).
+    
+    """
     
+    zpk = zpk_data(myFilter)
 
-    # first gain to optimize dynamic range.
-    gains[0] = kk * (mmi[-1]/mmi[0])
+    if isinstance(myFilter, np.ndarray):
+        # SOS section: cada sección es un grupo de singularidades
+        zz, pp = zpk['sos_zeros'], zpk['sos_poles']
+    else:
+        # LTI object
+        zz, pp = zpk['zeros'], zpk['poles']
 
-    for si in range(n_sections):
+    if npoints is None:
+        return adaptive_freq_grid(zz, pp, tol = tol, digital = digital)
+    
+    if digital:
+        return np.linspace(0, np.pi, npoints)
+    
+    this_zzpp = np.abs(np.concatenate((zz, pp), axis=None))
+    this_zzpp = this_zzpp[this_zzpp > 0]
+    
+    return np.logspace(np.floor(np.log10(np.min(this_zzpp)))-1, np.ceil(np.log10(np.max(this_zzpp))) + 1 ,npoints)
 
-        if si > 0:
-            gains[si] = (mmi[si-1]/mmi[si])
+def _bode_draw(ww, mag, phase, cant_sos, fig_id='none', axes_hdl='none', filter_description=None, digital = False, xaxis = 'omega', fs = 2*np.pi, dt = None):
+    """
+    Dibuja las respuestas de módulo [dB] y fase [rad] de :func:`bodePlot`, 
+    calculadas en la grilla *ww* [rad/s].
+    
+    """
+    
+    # ww ya está en rad/s
+    if xaxis == "freq":
+        # to Hz
+        ww = ww / 2 / np.pi
+    elif xaxis == "norm":
+        if fs is None:
+            # normalizar cada respuesta a su propio nyqyuist
+            wnorm = 2*np.pi/dt/2
+        else:
+            # normalizado a fs
+            wnorm = 2*np.pi*fs
+        ww = ww / wnorm
+
+    if fig_id == 'none':
+        fig_hdl, axes_hdl = plt.subplots(2, 1, sharex='col')
+        fig_id = fig_hdl.number
+    else:
+        if plt.fignum_exists(fig_id):
+            fig_hdl = plt.figure(fig_id)
+            axes_hdl = fig_hdl.get_axes()
+        else:
+            fig_hdl = plt.figure(fig_id)
+            axes_hdl = fig_hdl.subplots(2, 1, sharex='col')
+            fig_id = fig_hdl.number
+
+    (mag_ax_hdl, phase_ax_hdl) = axes_hdl
+    
+    plt.sca(mag_ax_hdl)
+
+    if digital:
+        if filter_description is None:
+            aux_hdl = plt.plot(ww, mag)    # Bode magnitude plot
+        else:
+            aux_hdl = plt.plot(ww, mag, label=filter_description)    # Bode magnitude plot
+    else:
+        if filter_description is None:
+            aux_hdl = plt.semilogx(ww, mag)    # Bode magnitude plot
+        else:
+            aux_hdl = plt.semilogx(ww, mag, label=filter_description)    # Bode magnitude plot
+    
+    if cant_sos > 0:
+        # distinguish SOS from total response
+        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
+        aux_hdl[-1].set_linewidth(2)
+    
+    plt.grid(True)
+#    plt.xlabel('Angular frequency [rad/sec]')
+    plt.ylabel('Magnitude [dB]')
+    plt.title('Magnitude response')
+    
+    if not(filter_description is None):
+        # mag_ax_hdl.legend( filter_description )
+        mag_ax_hdl.legend()
 
-        num, den = zpk2tf(z_sos[si, np.logical_not(np.isnan(z_sos[si])) ], p_sos[si, np.logical_not(np.isnan(p_sos[si]))], gains[si]) # now with gain
         
-        num = np.concatenate((np.zeros(np.max(3 - len(num), 0)), num))
-        den = np.concatenate((np.zeros(np.max(3 - len(den), 0)), den))
+    plt.sca(phase_ax_hdl)
+    
+    if digital:
+        if filter_description is None:
+            aux_hdl = plt.plot(ww, phase)    # Bode phase plot
+        else:
+            aux_hdl = plt.plot(ww, phase, label=filter_description)    # Bode phase plot
             
-        sos[si] = np.concatenate((num,den))
-        
-        
-    # verify the factorization
-    tf_verif = sos2tf_analog(sos)
-    z_v, p_v, k_v = tf2zpk(tf_verif.num, tf_verif.den)
+    else:
+        if filter_description is None:
+            aux_hdl = plt.semilogx(ww, phase)    # Bode phase plot
+        else:
+            aux_hdl = plt.semilogx(ww, phase, label=filter_description)    # Bode phase plot
     
-    num_t, den_t = zpk2tf(zz, pp, kk)
     
-    if np.std(num_t - tf_verif.num) > 1e-10:
+    # Scale axes to fit
+    ylim = plt.gca().get_ylim()
 
-        raise ValueError('Incorrect factorization: Zeros does not match')
+    # presentar la fase como fracciones de \pi
+    ticks = np.linspace(start=np.round(ylim[0]/np.pi)*np.pi, stop=np.round(ylim[1]/np.pi)*np.pi, num = 5, endpoint=True)
 
-    if np.std(den_t - tf_verif.den) > 1e-10:
+    ylabs = []
+    for aa in ticks:
+        
+        if aa == 0:
+            ylabs += ['0'] 
+        else:
+            bb = Fraction(aa/np.pi).limit_denominator(1000000)
+            if np.abs(bb.numerator) != 1:
+                if np.abs(bb.denominator) != 1:
+                    str_aux = r'$\frac{{{:d}}}{{{:d}}} \pi$'.format(bb.numerator, bb.denominator)
+                else:
+                    str_aux = r'${:d}\pi$'.format(bb.numerator)
+                    
+            else:
+                if np.abs(bb.denominator) == 1:
+                    if np.sign(bb.numerator) == -1:
+                        str_aux = r'$-\pi$'
+                    else:
+                        str_aux = r'$\pi$'
+                else:
+                    if np.sign(bb.numerator) == -1:
+                        str_aux = r'$-\frac{{\pi}}{{{:d}}}$'.format(bb.denominator)
+                    else:
+                        str_aux = r'$\frac{{\pi}}{{{:d}}}$'.format(bb.denominator)
+                    
+            ylabs += [ str_aux ]
+            
+    plt.yticks(ticks, labels = ylabs )
+    
+    if cant_sos > 0:
+        # distinguish SOS from total response
+        [ aa.set_linestyle(':') for aa in  aux_hdl[:-1]]
+        aux_hdl[-1].set_linewidth(2)
+    
+    plt.grid(True)
 
-        raise ValueError('Incorrect factorization: Poles does not match')
+    if xaxis == "freq":
+        # to Hz
+        plt.xlabel('Frequency [Hz]')
+        
+    elif xaxis == "norm":
+        # normalizado a fs
+        plt.gca().set_xlim([0, 1])
         
+        if fs is None:
+            # normalizar cada respuesta a su propio nyqyuist
+            this_fs = 1/dt
+        else:
+            # normalizado a fs
+            this_fs = fs
         
-    return sos
+        plt.xlabel('Frecuencia normalizada a fs={:3.3f} [#]'.format(this_fs))
+    else:
+        plt.xlabel('Angular frequency [rad/sec]')
+        
+        
+    plt.ylabel('Phase [rad]')
+    plt.title('Phase response')
     
-########################
-#%% Funciones internas #
-########################
-
-def _nearest_real_complex_idx(fro, to, which):
-    '''
-    Get the next closest real or complex element based on distance
+    if not(filter_description is None):
+        # phase_ax_hdl.legend( filter_description )
+        phase_ax_hdl.legend()
     
-    Parameters
-    ----------
-    Spar : Symbolic Matrix
-        Matriz de parámetros S.
+    return fig_id, axes_hdl
 
-    Returns
-    -------
-    Ts : Symbolic Matrix
-        Matriz de parámetros de transferencia scattering.
+def _sos_labels(filter_description, cant_sos):
+    """
+    Etiquetas de cada SOS y de la cascada completa.
+    
+    """
+    
+    sos_label = [filter_description + ' - SOS {:d}'.format(ii) for ii in range(cant_sos)]
+    sos_label += [filter_description]
+    
+    return sos_label
 
-    '''
+def _sos_data2plot(this_data, key):
+    """
+    Acomoda un resultado de :func:`analyze_sys_data` como lo dibujan 
+    :func:`bodePlot` y :func:`GroupDelay`: una columna por cada SOS y la 
+    cascada completa en la última.
     
-    assert which in ('real', 'complex')
-    order = np.argsort(np.abs(fro - to))
-    mask = np.isreal(fro[order])
-    if which == 'complex':
-        mask = ~mask
-    return order[np.nonzero(mask)[0][0]]
+    """
+    
+    if 'sos_' + key in this_data:
+        cant_sos = this_data['sos_' + key].shape[1]
+        return cant_sos, _sos_labels(this_data['name'], cant_sos), np.column_stack((this_data['sos_' + key], this_data[key]))
+    else:
+        return 0, this_data['name'], this_data[key]
 
 def _cplxreal(z, tol=None):
     """
@@ -1866,6 +3113,91 @@ def _cplxreal(z, tol=None):
 
     return zc, zr
 
+def _polymul_stack(polys):
+    """
+    Producto de los N polinomios de (..., N, L) en un árbol balanceado. 
+    Devuelve los coeficientes del producto, de (..., N.(L-1)+1).
+    
+    """
+    
+    if polys.shape[-2] == 0:
+        return np.ones(polys.shape[:-2] + (1,), dtype = polys.dtype)
+
+    largo = polys.shape[-2] * (polys.shape[-1] - 1) + 1
+
+    while polys.shape[-2] > 1:
+        
+        if polys.shape[-2] % 2:
+            # se completa con el polinomio unidad
+            unit = np.zeros(polys.shape[:-2] + (1, polys.shape[-1]), dtype = polys.dtype)
+            unit[..., -1] = 1
+            polys = np.concatenate((polys, unit), axis = -2)
+
+        polys = _polymul_vec(polys[..., 0::2, :], polys[..., 1::2, :])
+
+    # los polinomios unidad sólo agregan ceros a la izquierda
+    return polys[..., 0, -largo:]
+
+def _polymul_vec(aa, bb):
+    """
+    Producto de los polinomios *aa* y *bb* de (..., L), de forma vectorizada
+    sobre todas las dimensiones previas.
+    
+    """
+
+    LL = aa.shape[-1]
+    
+    cc = np.zeros(aa.shape[:-1] + (2*LL - 1,), dtype = np.result_type(aa, bb))
+    
+    for ii in range(LL):
+        cc[..., ii:ii+LL] += aa[..., ii:ii+1] * bb
+    
+    return cc
+
+def _polymul_tree(all_poly):
+    """
+    Producto de una lista de polinomios de distinto orden, de a pares en un 
+    árbol balanceado.
+    
+    """
+    
+    while len(all_poly) > 1:
+        all_poly = [ np.polymul(*all_poly[ii:ii+2]) if ii+1 < len(all_poly) else all_poly[ii] 
+                    for ii in range(0, len(all_poly), 2) ]
+    
+    return all_poly[0]
+
+def _tfadd_tree(all_numden):
+    """
+    Suma de una lista de transferencias (num, den), combinando las sumas 
+    parciales de cada mitad de la lista.
+    
+    """
+    
+    if len(all_numden) == 1:
+        return all_numden[0]
+    
+    mid = len(all_numden) // 2
+
+    num_a, den_a = _tfadd_tree(all_numden[:mid])
+    num_b, den_b = _tfadd_tree(all_numden[mid:])
+
+    return np.polyadd( np.polymul(num_a, den_b), np.polymul(den_a, num_b) ), np.polymul(den_a, den_b)
+
+def _trim_poly(cc):
+    """
+    Quita los ceros a la izquierda de los coeficientes *cc*, dejando al 
+    menos uno.
+    
+    """
+    
+    nonzero = np.flatnonzero(cc)
+    
+    if nonzero.size == 0:
+        return cc[-1:]
+    
+    return cc[nonzero[0]:]
+
 def _one_sos2tf(mySOS):
     """
     
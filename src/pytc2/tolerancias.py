@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análisis de Monte-Carlo de la tolerancia de los componentes de las redes
+sintetizadas. Los valores de los elementos se perturban en bloque, se
+evalúan las respuestas de todas las muestras a la vez sobre la grilla de
+frecuencias, y se cuenta qué fracción de ellas cumple con una plantilla
+como la de :func:`pytc2.sistemas_lineales.plot_plantilla`.
+"""
+
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .sintesis_dipolo import _elementos_cauer, _escalera_cauer
+
+
+def muestras_tolerancia(valores, tol = 0.05, n_muestras = 1000, distribucion = 'uniform', rng = None):
+    '''
+    Sortea n_muestras instancias de los valores de los elementos de una
+    red, cada uno con una desviación relativa aleatoria acotada por su
+    tolerancia.
+
+    Parameters
+    ----------
+    valores : array_like
+        Valores nominales de los elementos.
+    tol : float or array_like
+        Tolerancia relativa de cada elemento, por ejemplo 0.05 para 5 %.
+        Debe poder combinarse (broadcasting) con valores.
+    n_muestras : int
+        Cantidad de instancias a sortear.
+    distribucion : string
+        'uniform': desviación uniforme en [-tol, tol]. 'normal': desviación
+        normal de desvío tol/3, es decir que tol abarca 3 sigmas.
+    rng : numpy.random.Generator, optional
+        Generador de números aleatorios. Por defecto, uno nuevo.
+
+    Returns
+    -------
+    muestras : ndarray
+        Array de (n_muestras, ...) con los valores perturbados, de la forma
+        de valores en cada muestra.
+
+    Raises
+    ------
+    ValueError
+        Si la distribución no es una de las admitidas.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.tolerancias import muestras_tolerancia
+    >>> mm = muestras_tolerancia([1., 2., 3.], tol = 0.1, n_muestras = 500)
+    >>> mm.shape, bool(np.all(np.abs(mm / [1., 2., 3.] - 1) <= 0.1))
+    ((500, 3), True)
+
+    '''
+
+    valid_dist = ['uniform', 'normal']
+
+    if distribucion not in valid_dist:
+        raise ValueError('distribucion must be one of %s, not %s' % (valid_dist, distribucion))
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    valores = np.asarray(valores, dtype = float)
+    tol = np.broadcast_to(np.asarray(tol, dtype = float), valores.shape)
+
+    dims = (n_muestras,) + valores.shape
+
+    if distribucion == 'uniform':
+        desvio = rng.uniform(-1., 1., size = dims)
+    else:
+        desvio = rng.normal(0., 1/3, size = dims)
+
+    return(valores * (1 + tol * desvio))
+
+def montecarlo_cauer(ko, ww, tol = 0.05, n_muestras = 1000, plantilla = None, remover_en_inf = True, isRC = False, distribucion = 'uniform', chunk = 10000, n_procesos = None, seed = None):
+    '''
+    Análisis de Monte-Carlo de la transferencia de una escalera resultante
+    de una expansión de Cauer, cuando sus elementos tienen tolerancia. La
+    transferencia de cada muestra se calcula como en
+    :func:`pytc2.sintesis_dipolo.evaluar_cauer`, para todas las muestras y
+    frecuencias a la vez.
+
+    Parameters
+    ----------
+    ko : list or array_like
+        Elementos de la expansión, como los devuelven
+        :func:`pytc2.sintesis_dipolo.cauer_LC`,
+        :func:`pytc2.sintesis_dipolo.cauer_RC` o sus versiones numéricas.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúa la transferencia.
+    tol : float or array_like
+        Tolerancia relativa de todos los elementos, o de cada uno.
+    n_muestras : int
+        Cantidad de instancias de la red a sortear.
+    plantilla : dict, optional
+        Plantilla de diseño, con las claves de
+        :func:`pytc2.sistemas_lineales.plot_plantilla`: 'filter_type',
+        'fpass', 'ripple', 'fstop' y 'attenuation', con las frecuencias en
+        las mismas unidades que ww.
+    remover_en_inf, isRC : boolean
+        Sólo para ko numérico, como en
+        :func:`pytc2.sintesis_dipolo.evaluar_cauer`.
+    distribucion : string
+        Distribución de las desviaciones, ver :func:`muestras_tolerancia`.
+    chunk : int
+        Cantidad máxima de muestras que se evalúan juntas. Acota la memoria
+        en chunk x len(ww) valores complejos, aun para millones de muestras.
+    n_procesos : int, optional
+        Si se indica, los bloques de muestras se reparten entre
+        n_procesos procesos. En Windows y macOS, el script debe estar
+        protegido por ``if __name__ == '__main__':``.
+    seed : int, optional
+        Semilla. Los resultados no dependen de n_procesos.
+
+    Returns
+    -------
+    resultados : dict
+        Ver :func:`montecarlo_sos`.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.sintesis_dipolo import cauer_RC
+    >>> from pytc2.tolerancias import montecarlo_cauer
+    >>> from pytc2.general import s
+    >>> # pasabajos RC: Z = 1 + 1/s, T = 1/(s + 1)
+    >>> ko, _, _ = cauer_RC(1 + 1/s)
+    >>> plantilla = {'filter_type': 'lowpass', 'fpass': 0.5, 'ripple': 1., 'fstop': 100., 'attenuation': 30}
+    >>> res = montecarlo_cauer(ko, np.logspace(-2, 3, 200), tol = 0.2, n_muestras = 2000, plantilla = plantilla, seed = 0)
+    >>> 0.5 < res['rendimiento'] < 1.
+    True
+
+    '''
+
+    kk, pp = _elementos_cauer(ko, remover_en_inf, isRC)
+
+    nominal = np.real(np.asarray(kk, dtype = complex))
+
+    evaluar = partial(_mod2_cauer, pp = tuple(pp))
+
+    return(_montecarlo(evaluar, nominal, ww, tol, n_muestras, plantilla, distribucion, chunk, n_procesos, seed))
+
+def montecarlo_sos(mySOS, ww, tol = 0.05, n_muestras = 1000, plantilla = None, distribucion = 'uniform', chunk = 10000, n_procesos = None, seed = None):
+    '''
+    Análisis de Monte-Carlo de la transferencia de una cascada de
+    secciones de segundo orden (SOS) analógicas. Cada coeficiente no nulo
+    de las secciones se trata como el valor de un elemento con tolerancia,
+    y los coeficientes nulos se conservan, de forma que se mantiene la
+    estructura de cada sección.
+
+    Parameters
+    ----------
+    mySOS : ndarray
+        Matriz de SOS analógicas de (N, 6), como en
+        :func:`pytc2.sistemas_lineales.pretty_print_SOS`.
+    ww : array_like
+        Frecuencias angulares [rad/s] donde se evalúa la transferencia.
+    tol : float or array_like
+        Tolerancia relativa de todos los coeficientes, o de cada uno, de
+        forma (N, 6).
+    n_muestras, plantilla, distribucion, chunk, n_procesos, seed :
+        Ver :func:`montecarlo_cauer`.
+
+    Returns
+    -------
+    resultados : dict
+        Diccionario con:
+
+        - 'mag_min', 'mag_max', 'mag_media': envolventes y media del
+          módulo de la transferencia [dB] sobre todas las muestras, en
+          cada frecuencia de ww.
+        - 'cumple': array de n_muestras booleanos, que indica si cada
+          muestra cumple con la plantilla, o None si no se indicó.
+        - 'rendimiento': fracción de las muestras que cumplen con la
+          plantilla (yield), o None.
+        - 'n_muestras': cantidad de muestras.
+
+    Example
+    -------
+
+    >>> import numpy as np
+    >>> from pytc2.tolerancias import montecarlo_sos
+    >>> # Butterworth de 3er orden
+    >>> mySOS = np.array([[0., 0., 1., 1., 1., 1.], [0., 0., 1., 0., 1., 1.]])
+    >>> res = montecarlo_sos(mySOS, np.logspace(-1, 1, 100), tol = 0.05, n_muestras = 10000, seed = 0)
+    >>> res['mag_min'].shape, res['rendimiento'] is None
+    ((100,), True)
+
+    '''
+
+    mySOS = np.asarray(mySOS, dtype = float)
+
+    if mySOS.ndim != 2 or mySOS.shape[1] != 6:
+        raise ValueError('mySOS must be an (N, 6) matrix, not %s' % (mySOS.shape,))
+
+    # los coeficientes nulos no se perturban
+    tol = np.where(mySOS != 0, np.broadcast_to(np.asarray(tol, dtype = float), mySOS.shape), 0.)
+
+    return(_montecarlo(_mod2_sos, mySOS, ww, tol, n_muestras, plantilla, distribucion, chunk, n_procesos, seed))
+
+
+########################
+#%% Funciones internas #
+########################
+
+def _montecarlo(evaluar, nominal, ww, tol, n_muestras, plantilla, distribucion, chunk, n_procesos, seed):
+    '''
+    Motor de Monte-Carlo. Las muestras se procesan en bloques de a lo sumo
+    chunk, cada uno con su propia semilla derivada de seed, y sólo se
+    acumulan las envolventes y el cumplimiento de la plantilla de cada
+    muestra. evaluar(valores, ww) devuelve el módulo al cuadrado de la
+    transferencia de cada muestra, de (M, F).
+
+    '''
+
+    ww = np.asarray(ww, dtype = float)
+
+    bloques = [ min(chunk, n_muestras - ii) for ii in range(0, n_muestras, chunk) ]
+    semillas = np.random.SeedSequence(seed).spawn(len(bloques))
+
+    tareas = [ partial(_montecarlo_bloque, evaluar, nominal, ww, tol, this_n, plantilla, distribucion, this_semilla)
+               for this_n, this_semilla in zip(bloques, semillas) ]
+
+    if n_procesos is None:
+        parciales = [ this_tarea() for this_tarea in tareas ]
+    else:
+        with ProcessPoolExecutor(max_workers = n_procesos) as pool:
+            parciales = list(pool.map(_ejecutar, tareas))
+
+    mag_min = np.fmin.reduce([ this_p[0] for this_p in parciales ], axis = 0)
+    mag_max = np.fmax.reduce([ this_p[1] for this_p in parciales ], axis = 0)
+    mag_media = np.sum([ this_p[2] for this_p in parciales ], axis = 0) / n_muestras
+
+    if plantilla is None:
+        cumple = None
+        rendimiento = None
+    else:
+        cumple = np.concatenate([ this_p[3] for this_p in parciales ])
+        rendimiento = float(np.count_nonzero(cumple) / n_muestras)
+
+    return({'mag_min': mag_min,
+            'mag_max': mag_max,
+            'mag_media': mag_media,
+            'cumple': cumple,
+            'rendimiento': rendimiento,
+            'n_muestras': n_muestras})
+
+def _ejecutar(tarea):
+    '''
+    Ejecuta un bloque en el proceso del pool.
+    '''
+
+    return(tarea())
+
+def _montecarlo_bloque(evaluar, nominal, ww, tol, n_muestras, plantilla, distribucion, semilla):
+    '''
+    Un bloque de muestras: devuelve el mínimo, el máximo y la suma del
+    módulo [dB] en cada frecuencia, y el cumplimiento de la plantilla.
+
+    '''
+
+    valores = muestras_tolerancia(nominal, tol, n_muestras, distribucion, np.random.default_rng(semilla))
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        mag_db = 10 * np.log10(evaluar(valores, ww))
+
+    cumple = None if plantilla is None else _cumple_plantilla(mag_db, ww, plantilla)
+
+    return(np.fmin.reduce(mag_db, axis = 0), np.fmax.reduce(mag_db, axis = 0), np.sum(mag_db, axis = 0), cumple)
+
+def _cumple_plantilla(mag_db, ww, plantilla):
+    '''
+    Cumplimiento de la plantilla de cada fila de mag_db, de (M, F). En la
+    banda de paso el módulo no debe caer por debajo de -ripple, y en la de
+    detención no debe superar -attenuation, como en
+    :func:`pytc2.sistemas_lineales.plot_plantilla`.
+
+    '''
+
+    filter_type = plantilla.get('filter_type', 'lowpass')
+    fpass = plantilla.get('fpass', 0.25)
+    ripple = plantilla.get('ripple', 0.5)
+    fstop = plantilla.get('fstop', 0.6)
+    attenuation = plantilla.get('attenuation', 40)
+
+    if filter_type == 'lowpass':
+        bPaso = ww <= fpass
+        bStop = ww >= fstop
+    elif filter_type == 'highpass':
+        bPaso = ww >= fpass
+        bStop = ww <= fstop
+    elif filter_type == 'bandpass':
+        bPaso = np.logical_and(ww >= fpass[0], ww <= fpass[1])
+        bStop = np.logical_or(ww <= fstop[0], ww >= fstop[1])
+    elif filter_type == 'bandstop':
+        bPaso = np.logical_or(ww <= fpass[0], ww >= fpass[1])
+        bStop = np.logical_and(ww >= fstop[0], ww <= fstop[1])
+    else:
+        valid_types = ['lowpass', 'highpass', 'bandpass', 'bandstop']
+        raise ValueError('filter_type must be one of %s, not %s' % (valid_types, filter_type))
+
+    # los NaN no cumplen
+    return(np.logical_and(np.all(mag_db[:, bPaso] >= -ripple, axis = 1),
+                          np.all(mag_db[:, bStop] <= -attenuation, axis = 1)))
+
+def _mod2_cauer(kk, ww, pp):
+    '''
+    Módulo al cuadrado de la transferencia de la escalera en s = jw, de (M, F), para cada fila de
+    elementos kk, de (M, E). Cada elemento es k.s^p, como en
+    :func:`pytc2.sintesis_dipolo.evaluar_cauer`.
+
+    '''
+
+    _, TT = _escalera_cauer(kk, pp, ww)
+
+    return(np.abs(TT)**2)
+
+def _mod2_sos(mySOS, ww):
+    '''
+    Módulo al cuadrado de la transferencia de la cascada en s = jw, de 
+    (M, F), para cada matriz de SOS de la pila mySOS, de (M, N, 6). Como 
+    s es imaginario, |a2.s^2 + a1.s + a0|^2 = (a0 - a2.w^2)^2 + (a1.w)^2 
+    se calcula sólo con reales, reutilizando los buffers.
+
+    '''
+
+    w2 = ww**2
+
+    dims = (mySOS.shape[0], ww.size)
+
+    NUM = np.ones(dims)
+    DEN = np.ones(dims)
+    aux = np.empty(dims)
+    aux2 = np.empty(dims)
+
+    for this_sos in np.moveaxis(mySOS, 1, 0):
+
+        for acc, cc in ((NUM, this_sos[:, 0:3]), (DEN, this_sos[:, 3:6])):
+
+            np.multiply(cc[:, 0:1], w2, out = aux)
+            np.subtract(cc[:, 2:3], aux, out = aux)
+            np.square(aux, out = aux)
+            np.multiply(cc[:, 1:2], ww, out = aux2)
+            np.square(aux2, out = aux2)
+            aux += aux2
+            acc *= aux
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return(NUM / DEN)
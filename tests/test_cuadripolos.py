@@ -0,0 +1,467 @@
+#!/usr/bin/env python
+
+"""Tests de los cuadripolos y del análisis de redes mediante la MAI."""
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pytc2.general import s
+from pytc2.cuadripolos import (calc_MAI_ztransf_ij_mn, calc_MAI_vtransf_ij_mn, calc_MAI_impedance_ij,
+                               calc_MAI_ztransf_ij_mn_num, calc_MAI_vtransf_ij_mn_num, calc_MAI_impedance_ij_num,
+                               elementos2mai, AnalisisMAI, _analisis_mai, Y2Tabcd, Z2Tabcd, Tabcd2Y, Tabcd2Z, S2Tabcd, Tabcd2S,
+                               Y2Tabcd_s, S2Tabcd_s, Tabcd2S_s,
+                               TabcdLYZ, TabcdLZY, TabcdZ, TabcdY, Tabcd_cascade, _tabcd_stack,
+                               Model_conversion, I2Tabcd_s, _DELTA)
+
+
+def _mai_simbolica(elementos):
+    """MAI simbólica en s de la misma lista de elementos que elementos2mai."""
+
+    nodos = 1 + max(max(ee[1:-1]) for ee in elementos)
+    Ymai = sp.zeros(nodos, nodos)
+
+    for ee in elementos:
+
+        if ee[0] == 'VCCS':
+            _, aa, bb, cc, dd, gm = ee
+            gm = sp.nsimplify(gm)
+            Ymai[aa, cc] += gm
+            Ymai[aa, dd] -= gm
+            Ymai[bb, cc] -= gm
+            Ymai[bb, dd] += gm
+            continue
+
+        tipo, aa, bb, valor = ee
+        valor = sp.nsimplify(valor)
+        yy = {'R': 1/valor, 'G': valor, 'C': valor*s, 'L': 1/(valor*s)}[tipo]
+
+        Ymai[aa, aa] += yy
+        Ymai[bb, bb] += yy
+        Ymai[aa, bb] -= yy
+        Ymai[bb, aa] -= yy
+
+    return Ymai
+
+
+def _evaluar(expr, ww):
+
+    ff = sp.lambdify(s, expr, 'numpy')
+
+    return np.broadcast_to(ff(1j * ww), ww.shape)
+
+
+# escalera pasiva de 5 nodos, referencia en el nodo 0
+ESCALERA = [('R', 1, 2, 1.), ('C', 2, 0, 2.), ('L', 2, 3, 0.5), ('C', 3, 0, 1.),
+            ('R', 3, 4, 2.), ('C', 4, 0, 0.5)]
+
+# la misma escalera con una fuente controlada: corriente 3.(V2 - V0) de 4 a 0
+ACTIVA = ESCALERA + [('VCCS', 4, 0, 2, 0, 3.)]
+
+CONSULTAS = [(3, 1, 0, 1), (1, 4, 0, 3), (4, 0, 1, 0), (2, 3, 1, 0), (0, 4, 2, 1)]
+
+WW = np.array([0.1, 0.7, 1.3, 5.])
+
+
+@pytest.mark.parametrize('elementos', [ESCALERA, ACTIVA], ids=['pasiva', 'activa'])
+@pytest.mark.parametrize('ii, jj, mm, nn', CONSULTAS)
+def test_MAI_simbolico_igual_numerico(elementos, ii, jj, mm, nn):
+    """calc_MAI_* y sus versiones numéricas dan la misma transferencia."""
+
+    Ymai = _mai_simbolica(elementos)
+
+    np.testing.assert_allclose(_evaluar(calc_MAI_ztransf_ij_mn(Ymai, ii, jj, mm, nn), WW),
+                               calc_MAI_ztransf_ij_mn_num(elementos, WW, ii, jj, mm, nn), rtol=1e-9, atol=1e-12)
+
+    np.testing.assert_allclose(_evaluar(calc_MAI_vtransf_ij_mn(Ymai, ii, jj, mm, nn), WW),
+                               calc_MAI_vtransf_ij_mn_num(elementos, WW, ii, jj, mm, nn), rtol=1e-9, atol=1e-12)
+
+    np.testing.assert_allclose(_evaluar(calc_MAI_impedance_ij(Ymai, ii, jj), WW),
+                               calc_MAI_impedance_ij_num(elementos, WW, ii, jj), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('elementos', [ESCALERA, ACTIVA], ids=['pasiva', 'activa'])
+def test_elementos2mai(elementos):
+    """La MAI dispersa coincide con la simbólica evaluada en s0, y sus filas y columnas suman cero."""
+
+    Ymai_s = _mai_simbolica(elementos)
+
+    for s0 in (1j, 0.3 + 2j, -1.):
+
+        Ymai = elementos2mai(elementos, s0)
+
+        assert Ymai.format == 'csc'
+        assert Ymai.shape == Ymai_s.shape
+
+        referencia = np.array(Ymai_s.subs(s, complex(s0)).evalf(), dtype=complex)
+
+        np.testing.assert_allclose(Ymai.toarray(), referencia, rtol=1e-12, atol=1e-14)
+        np.testing.assert_allclose(Ymai.sum(axis=0), 0., atol=1e-12)
+        np.testing.assert_allclose(Ymai.sum(axis=1), 0., atol=1e-12)
+
+
+def test_elementos2mai_tipo_invalido():
+    """Un tipo de elemento desconocido se rechaza."""
+
+    with pytest.raises(ValueError, match='element type must be one of'):
+        elementos2mai([('R', 0, 1, 1.), ('X', 1, 2, 1.)], 1j)
+
+
+def test_MAI_elementos_funcion():
+    """Los elementos 'Y' y 'Z', constantes o funciones de s, equivalen a los R, L y C."""
+
+    # la escalera con R, L y C reemplazados por admitancias e impedancias
+    equivalente = [('Z', 1, 2, 1.), ('Y', 2, 0, lambda ss: 2. * ss), ('Z', 2, 3, lambda ss: 0.5 * ss),
+                   ('Y', 3, 0, lambda ss: ss), ('Y', 3, 4, 0.5), ('Z', 4, 0, lambda ss: 2. / ss)]
+
+    for s0 in (1j, 0.3 + 2j):
+        np.testing.assert_allclose(elementos2mai(equivalente, s0).toarray(), elementos2mai(ESCALERA, s0).toarray(),
+                                   rtol=1e-12)
+
+    for ii, jj, mm, nn in CONSULTAS:
+        np.testing.assert_allclose(calc_MAI_ztransf_ij_mn_num(equivalente, WW, ii, jj, mm, nn),
+                                   calc_MAI_ztransf_ij_mn_num(ESCALERA, WW, ii, jj, mm, nn), rtol=1e-12)
+
+
+def test_MAI_num_frecuencia_singular():
+    """Donde la red reducida es singular o no finita el resultado es NaN, y el resto se calcula igual."""
+
+    # tanque LC: impedancia infinita en w = 1
+    tanque = [('L', 0, 1, 1.), ('C', 0, 1, 1.)]
+    ww = np.array([0.5, 1., 2.])
+
+    ZZ = calc_MAI_impedance_ij_num(tanque, ww, 0, 1)
+
+    assert np.isnan(ZZ[1])
+    np.testing.assert_allclose(ZZ[[0, 2]], 1 / (1j * ww[[0, 2]] + 1 / (1j * ww[[0, 2]])), rtol=1e-12)
+
+    # en continua la admitancia del inductor no es finita
+    divisor = [('R', 0, 1, 1.), ('L', 1, 2, 1.), ('R', 1, 2, 1.)]
+    Av = calc_MAI_vtransf_ij_mn_num(divisor, np.array([0., 1.]), ii=1, jj=2, mm=0, nn=2)
+
+    # L y R en paralelo, en serie con R
+    Zp = 1j / (1 + 1j)
+
+    assert np.isnan(Av[0])
+    np.testing.assert_allclose(Av[1], Zp / (1 + Zp), rtol=1e-12)
+
+    # una impedancia de función que se anula en w = 2
+    muesca = [('R', 0, 1, 1.), ('Z', 1, 2, lambda ss: ss**2 + 4.)]
+    Tz = calc_MAI_ztransf_ij_mn_num(muesca, np.array([1., 2.]), ii=1, jj=2, mm=1, nn=2)
+
+    assert np.isnan(Tz[1])
+    np.testing.assert_allclose(Tz[0], 3., rtol=1e-12)
+
+
+def test_MAI_menores_reutilizados():
+    """Cada menor se calcula una sola vez, y sólo se agregan los de conjuntos de índices nuevos."""
+
+    mai = AnalisisMAI(_mai_simbolica(ACTIVA))
+
+    mai.ztransf(1, 4, 0, 3)
+    # Y^{03}_{14} y Y^{3}_{3}
+    assert set(mai._menores) == {((0, 3), (1, 4)), ((3,), (3,))}
+
+    menores = dict(mai._menores)
+
+    # la misma consulta no calcula nada
+    mai.ztransf(1, 4, 0, 3)
+    assert mai._menores == menores
+
+    # otra salida con la misma entrada: sólo el cofactor de 2do orden nuevo
+    mai.ztransf(2, 4, 0, 3)
+    assert set(mai._menores) - set(menores) == {((0, 3), (2, 4))}
+
+    # los menores ya calculados no se recalculan
+    assert all(mai._menores[clave] is det for clave, det in menores.items())
+
+    # la impedancia entre 0 y 3 reutiliza Y^{3}_{3}
+    cant = len(mai._menores)
+    mai.impedancia(0, 3)
+    assert len(mai._menores) == cant + 1
+
+    # V_14 / V_03: Y^{03}_{03} es nuevo, Y^{03}_{14} no
+    mai.vtransf(1, 4, 0, 3)
+    assert len(mai._menores) == cant + 1
+
+
+def test_MAI_calc_reutiliza_analisis():
+    """Las llamadas sucesivas de calc_MAI_* sobre la misma Ymai comparten el AnalisisMAI."""
+
+    Ymai = _mai_simbolica(ACTIVA)
+
+    _analisis_mai.cache_clear()
+
+    calc_MAI_ztransf_ij_mn(Ymai, 1, 4, 0, 3)
+    mai = _analisis_mai(sp.ImmutableMatrix(Ymai))
+    menores = dict(mai._menores)
+
+    calc_MAI_ztransf_ij_mn(Ymai, 1, 4, 0, 3)
+    calc_MAI_impedance_ij(Ymai, 0, 3)
+
+    info = _analisis_mai.cache_info()
+    assert info.misses == 1 and info.hits == 3
+
+    # la impedancia sólo agregó su cofactor de 2do orden al mismo análisis
+    assert _analisis_mai(sp.ImmutableMatrix(Ymai)) is mai
+    assert set(mai._menores) - set(menores) == {((0, 3), (0, 3))}
+
+    # una Ymai igual, construida de nuevo, también lo reutiliza
+    calc_MAI_vtransf_ij_mn(_mai_simbolica(ACTIVA), 1, 4, 0, 3)
+    assert _analisis_mai.cache_info().misses == 1
+
+
+def _pila_aleatoria(forma, seed):
+    """Pila de matrices complejas aleatorias de (..., 2, 2)."""
+
+    rng = np.random.default_rng(seed)
+
+    return rng.normal(size=forma + (2, 2)) + 1j * rng.normal(size=forma + (2, 2))
+
+
+IDA_Y_VUELTA = [(Y2Tabcd, Tabcd2Y), (Z2Tabcd, Tabcd2Z), (S2Tabcd, Tabcd2S)]
+
+
+@pytest.mark.parametrize('a_T, desde_T', IDA_Y_VUELTA, ids=['Y', 'Z', 'S'])
+@pytest.mark.parametrize('forma', [(), (50,), (4, 3)])
+def test_conversion_ida_y_vuelta(a_T, desde_T, forma):
+    """Y->T->Y, Z->T->Z y S->T->S devuelven la misma matriz, de a una o apiladas."""
+
+    MM = _pila_aleatoria(forma, 11)
+
+    TT = a_T(MM)
+
+    assert TT.shape == MM.shape
+    np.testing.assert_allclose(desde_T(TT), MM, rtol=1e-9, atol=1e-12)
+
+    # la pila se convierte igual que cada matriz por separado
+    for idx in np.ndindex(*forma):
+        np.testing.assert_allclose(TT[idx], a_T(MM[idx]), rtol=1e-12)
+
+
+def test_conversion_S_con_Z0_por_frecuencia():
+    """S->T->S con una impedancia de referencia distinta para cada matriz de la pila."""
+
+    Spar = _pila_aleatoria((20,), 12)
+    Z0 = np.linspace(0.5, 50., 20)
+
+    TT = S2Tabcd(Spar, Z0)
+
+    np.testing.assert_allclose(Tabcd2S(TT, Z0), Spar, rtol=1e-9, atol=1e-12)
+
+    for ii in range(Z0.size):
+        np.testing.assert_allclose(TT[ii], S2Tabcd(Spar[ii], Z0[ii]), rtol=1e-12)
+
+
+def test_Y2Tabcd_igual_Z2Tabcd():
+    """La ABCD de Y es la de su inversa Z = Y^-1, D = -Y11/Y21 incluido."""
+
+    YY = _pila_aleatoria((30,), 13)
+
+    np.testing.assert_allclose(Y2Tabcd(YY), Z2Tabcd(np.linalg.inv(YY)), rtol=1e-9)
+
+    # red Pi asimétrica: 2 S en serie, 1 S a la entrada y 3 S a la salida
+    np.testing.assert_allclose(Y2Tabcd(np.array([[3., -2.], [-2., 5.]])),
+                               [[2.5, 0.5], [5.5, 1.5]])
+
+
+def test_conversion_simbolica():
+    """Y2Tabcd_s y S2Tabcd_s coinciden con las conversiones numéricas."""
+
+    y11, y12, y21, y22 = sp.symbols('y11 y12 y21 y22')
+    s11, s12, s21, s22 = sp.symbols('s11 s12 s21 s22')
+
+    YY = _pila_aleatoria((), 14)
+    Spar = _pila_aleatoria((), 15)
+
+    valores_Y = dict(zip((y11, y12, y21, y22), map(complex, YY.ravel())))
+    valores_S = dict(zip((s11, s12, s21, s22), map(complex, Spar.ravel())))
+
+    TT_Y = Y2Tabcd_s(sp.Matrix([[y11, y12], [y21, y22]]))
+    TT_S = S2Tabcd_s(sp.Matrix([[s11, s12], [s21, s22]]))
+
+    np.testing.assert_allclose(np.array(TT_Y.subs(valores_Y), dtype=complex), Y2Tabcd(YY), rtol=1e-12)
+    np.testing.assert_allclose(np.array(TT_S.subs(valores_S), dtype=complex), S2Tabcd(Spar), rtol=1e-12)
+
+    # y la vuelta simbólica S->T->S
+    assert sp.simplify(Tabcd2S_s(TT_S) - sp.Matrix([[s11, s12], [s21, s22]])) == sp.zeros(2, 2)
+
+
+def test_conversion_forma_invalida():
+    """Las conversiones numéricas rechazan lo que no es una pila de (..., 2, 2)."""
+
+    with pytest.raises(ValueError):
+        Y2Tabcd(np.eye(3))
+
+    with pytest.raises(ValueError):
+        S2Tabcd(np.ones(4))
+
+
+def test_tabcd_stack_complejo():
+    """Las matrices ABCD conservan la parte imaginaria, con escalares o barridos."""
+
+    TT = _tabcd_stack(1, 2j, 0, 1)
+
+    assert TT.shape == (2, 2)
+    assert np.iscomplexobj(TT)
+    np.testing.assert_array_equal(TT, [[1, 2j], [0, 1]])
+
+    # enteros: se promueven a punto flotante
+    assert _tabcd_stack(1, 2, 0, 1).dtype == np.float64
+
+    ss = 1j * np.array([0.5, 1., 2.])
+
+    for TT, esperada in ((TabcdZ(ss), [[1, ss], [0, 1]]),
+                         (TabcdY(ss), [[1, 0], [ss, 1]]),
+                         (TabcdLZY(ss, 2*ss), [[1 + 2*ss**2, ss], [2*ss, 1]]),
+                         (TabcdLYZ(2*ss, ss), [[1, ss], [2*ss, 1 + 2*ss**2]])):
+
+        assert TT.shape == (3, 2, 2)
+        assert np.iscomplexobj(TT)
+
+        for ii in range(2):
+            for jj in range(2):
+                np.testing.assert_allclose(TT[:, ii, jj], np.broadcast_to(esperada[ii][jj], ss.shape))
+
+    # un escalar complejo devuelve una única matriz
+    np.testing.assert_allclose(TabcdLZY(1j, 1j), [[0, 1j], [1j, 1]])
+
+
+def test_Tabcd_cascade():
+    """La cascada de Z en serie e Y en derivación es TabcdLZY, con matrices fijas y barridos mezclados."""
+
+    ss = 1j * np.logspace(-1, 1, 20)
+
+    np.testing.assert_allclose(Tabcd_cascade(TabcdZ(ss), TabcdY(2*ss)), TabcdLZY(ss, 2*ss))
+    np.testing.assert_allclose(Tabcd_cascade(TabcdY(2*ss), TabcdZ(ss)), TabcdLYZ(2*ss, ss))
+
+    # un resistor fijo de 1 ohm seguido del barrido
+    TT = Tabcd_cascade(TabcdZ(1.), TabcdLZY(ss, 2*ss), TabcdY(0.5))
+
+    assert TT.shape == (20, 2, 2)
+    np.testing.assert_allclose(TT, np.matmul(np.matmul(TabcdZ(1.), TabcdLZY(ss, 2*ss)), TabcdY(0.5)))
+
+    # escalera L-C-L: la impedancia de entrada con la salida abierta es A/C
+    TT = Tabcd_cascade(TabcdZ(ss), TabcdY(2*ss), TabcdZ(ss))
+    np.testing.assert_allclose(TT[:, 0, 0] / TT[:, 1, 0], ss + 1/(2*ss))
+
+    with pytest.raises(ValueError):
+        Tabcd_cascade()
+
+
+def _modelos():
+    """Los modelos Z, Y, h, g, T e inverso Ti de las tablas de conversión."""
+
+    y11, y12, y21, y22 = sp.symbols('y11, y12, y21, y22', complex=True)
+    z11, z12, z21, z22 = sp.symbols('z11, z12, z21, z22', complex=True)
+    A, B, C, D = sp.symbols('A, B, C, D', complex=True)
+    Ai, Bi, Ci, Di = sp.symbols('Ai, Bi, Ci, Di', complex=True)
+    h11, h12, h21, h22 = sp.symbols('h11, h12, h21, h22', complex=True)
+    g11, g12, g21, g22 = sp.symbols('g11, g12, g21, g22', complex=True)
+    v1, v2, i1, i2 = sp.symbols('v1, v2, i1, i2', complex=True)
+
+    vv = sp.Matrix([[v1], [v2]])
+    ii = sp.Matrix([[i1], [i2]])
+
+    return [{'model_name': 'Z', 'matrix': sp.Matrix([[z11, z12], [z21, z22]]), 'dep_var': vv, 'indep_var': ii},
+            {'model_name': 'Y', 'matrix': sp.Matrix([[y11, y12], [y21, y22]]), 'dep_var': ii, 'indep_var': vv},
+            {'model_name': 'H', 'matrix': sp.Matrix([[h11, h12], [h21, h22]]),
+             'dep_var': sp.Matrix([[v1], [i2]]), 'indep_var': sp.Matrix([[i1], [v2]])},
+            {'model_name': 'G', 'matrix': sp.Matrix([[g11, g12], [g21, g22]]),
+             'dep_var': sp.Matrix([[i1], [v2]]), 'indep_var': sp.Matrix([[v1], [i2]])},
+            {'model_name': 'T', 'matrix': sp.Matrix([[A, -B], [C, -D]]),
+             'dep_var': sp.Matrix([[v1], [i1]]), 'indep_var': sp.Matrix([[v2], [i2]]), 'neg_i2_current': True},
+            {'model_name': 'Ti', 'matrix': sp.Matrix([[Ai, Bi], [-Ci, -Di]]),
+             'dep_var': sp.Matrix([[v2], [i2]]), 'indep_var': sp.Matrix([[v1], [i1]]), 'neg_i2_current': True}]
+
+
+def _conversion_sp_solve(src_model, dst_model):
+    """La conversión resolviendo el sistema del modelo de origen con sp.solve, en cada llamada."""
+
+    src_matrix = src_model.get('proxy_matrix', src_model['matrix'])
+
+    aa = sp.solve(list(src_matrix * src_model['indep_var'] - src_model['dep_var']), list(dst_model['dep_var']), dict=True)[0]
+
+    QQ = sp.zeros(2, 2)
+
+    for jj, dep_var in enumerate(dst_model['dep_var']):
+        for kk, indep_var in enumerate(dst_model['indep_var']):
+
+            bb = sp.diff(aa[dep_var], indep_var)
+
+            if 'neg_i2_current' in dst_model and (dep_var.name == 'i2') != (indep_var.name == 'i2'):
+                bb = -bb
+
+            QQ[jj, kk] = bb
+
+    return QQ
+
+
+def _sin_delta(src_model, QQ):
+    """Reemplaza Delta por el determinante de la matriz del modelo de origen."""
+
+    det_src = sp.det(src_model.get('proxy_matrix', src_model['matrix']))
+
+    if 'neg_i2_current' in src_model:
+        det_src = -det_src
+
+    return QQ.xreplace({_DELTA: det_src})
+
+
+def _misma_matriz(aa, bb):
+
+    return sp.simplify(aa - bb) == sp.zeros(2, 2)
+
+
+MODELOS = [mm['model_name'] for mm in _modelos()]
+
+
+@pytest.mark.parametrize('src', MODELOS)
+def test_Model_conversion_tablas(src):
+    """Las conversiones de las tablas Z/Y/h/g/T/Ti coinciden con resolver el sistema con sp.solve."""
+
+    modelos = {mm['model_name']: mm for mm in _modelos()}
+    src_model = modelos[src]
+
+    for dst_model in modelos.values():
+
+        QQ = Model_conversion(src_model, dst_model)
+
+        assert QQ['name'] == dst_model['model_name'] + '_{' + src + '}'
+
+        if dst_model is src_model:
+            assert QQ['matrix'] == src_model['matrix']
+            continue
+
+        assert _misma_matriz(_sin_delta(src_model, QQ['matrix']), _conversion_sp_solve(src_model, dst_model))
+
+
+def test_Model_conversion_red():
+    """Con matrices que no son parámetros sueltos: una red en s, los parámetros imagen y S."""
+
+    modelos = {mm['model_name']: mm for mm in _modelos()}
+
+    # escalera L serie - C derivación, T con la convención -B, -D de la tabla
+    red = dict(modelos['T'], matrix=sp.Matrix([[1 + s**2, -s], [s, -1]]))
+
+    gamma, z1, z2 = sp.symbols('gamma, z1, z2', positive=True)
+    Tim = I2Tabcd_s(gamma, z1, z2)
+    Tim[:, 1] = -Tim[:, 1]
+    imagen = dict(modelos['T'], model_name='Im', matrix=Tim)
+
+    Spar = sp.Matrix(2, 2, sp.symbols('s11, s12, s21, s22', complex=True))
+    Zo = sp.symbols('Zo', positive=True)
+    S_model = dict(modelos['T'], model_name='S', matrix=Spar, proxy_matrix=S2Tabcd_s(Spar, Zo))
+
+    for src_model in (red, imagen, S_model):
+        for dst in ('Z', 'Y', 'H'):
+
+            QQ = Model_conversion(src_model, modelos[dst])['matrix']
+
+            assert _misma_matriz(_sin_delta(src_model, QQ), _conversion_sp_solve(src_model, modelos[dst]))
+
+    # escalera L - C: z11 = s + 1/s, z12 = z21 = z22 = 1/s. Su determinante
+    # es 1, y no debe reemplazarse por Delta.
+    ZZ = Model_conversion(red, modelos['Z'])['matrix']
+    assert ZZ.free_symbols == {s}
+    assert _misma_matriz(ZZ, sp.Matrix([[s + 1/s, 1/s], [1/s, 1/s]]))
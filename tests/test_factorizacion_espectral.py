@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+"""Tests de la factorización espectral, numérica y simbólica."""
+
+import numpy as np
+import pytest
+import sympy as sp
+from scipy import signal as sig
+
+from pytc2.general import s
+from pytc2.factorizacion_espectral import factor_espectral, factor_espectral_s
+from pytc2.remociones import modsq2mod_s
+
+
+def _butter_P(orden):
+    """P(s) = 1 + (-s²)^orden, de |H(jω)|² = 1 + ω^(2.orden)."""
+
+    pp = np.zeros(2 * orden + 1)
+    pp[0] = (-1)**orden
+    pp[-1] = 1.
+
+    return pp
+
+
+def _butter_H(orden):
+
+    return np.real(np.poly(sig.buttap(orden)[1]))
+
+
+@pytest.mark.parametrize('orden', [3, 20, 50])
+def test_factor_espectral_butterworth(orden):
+    """Butterworth, aun en órdenes altos."""
+
+    np.testing.assert_allclose(factor_espectral(_butter_P(orden)), _butter_H(orden), rtol=1e-8)
+
+
+@pytest.mark.parametrize('orden', [3, 10, 20])
+def test_factor_espectral_newton(orden):
+    """La iteración de Newton, sin raíces, para órdenes moderados."""
+
+    np.testing.assert_allclose(factor_espectral(_butter_P(orden), metodo='newton'), _butter_H(orden), rtol=1e-8)
+
+
+@pytest.mark.parametrize('orden', [30, 50])
+def test_factor_espectral_newton_orden_alto(orden):
+    """En órdenes altos la iteración de Newton se rechaza."""
+
+    with pytest.raises(ValueError, match="metodo = 'auto'"):
+        factor_espectral(_butter_P(orden), metodo='newton')
+
+
+def test_factor_espectral_ceros_en_eje():
+    """Ceros dobles sobre el eje jω: (s² + 1)².(s² + 4)².(1 - s²)."""
+
+    pp = sp.Poly(sp.expand((s**2 + 1)**2 * (s**2 + 4)**2 * (1 - s**2)), s)
+    hh = sp.Poly(sp.expand((s**2 + 1) * (s**2 + 4) * (s + 1)), s)
+
+    np.testing.assert_allclose(factor_espectral(np.array(pp.all_coeffs(), dtype=float)),
+                               np.array(hh.all_coeffs(), dtype=float), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('pp', [
+    (s**2 + 1) * (s**2 + 4),
+    (s**2 + 1)**3 * (s**2 + 4),
+    ])
+def test_factor_espectral_multiplicidad_impar(pp):
+    """Los ceros de multiplicidad impar sobre el eje jω se rechazan."""
+
+    coeffs = np.array(sp.Poly(sp.expand(pp), s).all_coeffs(), dtype=float)
+
+    with pytest.raises(ValueError, match='multiplicidad impar'):
+        factor_espectral(coeffs)
+
+    with pytest.raises(ValueError, match='multiplicidad impar'):
+        factor_espectral_s(pp)
+
+
+@pytest.mark.parametrize('aa, esperado', [
+    (1/(1 - s**6), 1/(s**3 + 2*s**2 + 2*s + 1)),
+    (-1/(s**6 - 1), 1/(s**3 + 2*s**2 + 2*s + 1)),
+    ((s**2 + 1)**2/(1 - s**6), (s**2 + 1)/(s**3 + 2*s**2 + 2*s + 1)),
+    ((s**4 + 2*s**2 + 1)/(s**4 + s**2/4 + 1), (s**2 + 1)/(s**2 + sp.sqrt(7)*s/2 + 1)),
+    (1/(s**4 - 10*s**2 + 1), 1/(s**2 + 2*sp.sqrt(3)*s + 1)),
+    ])
+def test_modsq2mod_s_exacto(aa, esperado):
+    """Los factores que se separan en forma exacta conservan los coeficientes exactos."""
+
+    hh = modsq2mod_s(aa)
+
+    assert not hh.atoms(sp.Float)
+    assert sp.simplify(hh - esperado) == 0
+
+
+@pytest.mark.parametrize('aa', [
+    -(s**4 + 1)/(1 - s**6),
+    (s**4 + 1)/(s**6 - 1),
+    ])
+def test_modsq2mod_s_negativo(aa):
+    """P(jω) < 0 no es un módulo cuadrado."""
+
+    with pytest.raises(ValueError, match='P\\(jω\\) < 0'):
+        modsq2mod_s(aa)
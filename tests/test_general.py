@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+"""Tests de las funciones generales."""
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pytc2.general import expr2func, s
+
+
+def test_expr2func_variable_sin_suposiciones():
+    """Una s definida con sp.symbols('s') se toma como la variable."""
+
+    s_plain, R = sp.symbols('s R')
+
+    ff = expr2func(1/(s_plain*R + 1))
+
+    assert ff.params == (R,)
+    np.testing.assert_allclose(ff(1j*np.array([0., 1.]), 2.), 1/(2j*np.array([0., 1.]) + 1))
+
+    # la misma función con la s de pytc2
+    np.testing.assert_allclose(ff(0.5j, 3.), expr2func(1/(s*R + 1))(0.5j, 3.))
+
+
+def test_expr2func_matriz_sin_suposiciones():
+
+    s_plain, C = sp.symbols('s C')
+
+    ff = expr2func(sp.Matrix([[1, 1/(s_plain*C)], [0, 1]]))
+
+    np.testing.assert_allclose(ff(1j, 2.), np.array([[1, -0.5j], [0, 1]]))
+
+
+def test_expr2func_nombres_repetidos():
+    """Los parámetros no pueden llamarse como la variable."""
+
+    s_plain, R = sp.symbols('s R')
+
+    with pytest.raises(ValueError, match='distinct names'):
+        expr2func(1/(s_plain*R + 1), params=[s_plain, R])
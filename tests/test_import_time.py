@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+"""Tests de importación diferida y presupuesto de tiempo de importación."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+# Presupuesto para importar pytc2.sistemas_lineales, descontando numpy que
+# se importa antes. Medido en frío: ~0.05 s con importación diferida, contra
+# ~2.3 s cuando se importaban scipy.signal, sympy, IPython y matplotlib.
+IMPORT_BUDGET_S = 0.5
+
+HEAVY_MODULES = ['matplotlib', 'IPython', 'sympy', 'scipy.signal', 'schemdraw']
+
+
+def _import_en_proceso_nuevo(module):
+    """Importa *module* en un intérprete nuevo, devuelve tiempo y módulos pesados cargados."""
+
+    code = ('import sys, time, json\n'
+            'import numpy\n'
+            't0 = time.perf_counter()\n'
+            'import {:s}\n'
+            'dt = time.perf_counter() - t0\n'
+            'print(json.dumps([dt, [m for m in {!r} if m in sys.modules]]))\n').format(module, HEAVY_MODULES)
+
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    return json.loads(out.stdout)
+
+
+@pytest.mark.parametrize('module, allowed', [
+    ('pytc2.sistemas_lineales', []),
+    ('pytc2.general', ['sympy']),
+    ('pytc2.dibujar', ['sympy']),
+    ])
+def test_heavy_modules_are_lazy(module, allowed):
+    """Las dependencias pesadas u opcionales no se importan con el módulo."""
+
+    _, loaded = _import_en_proceso_nuevo(module)
+
+    assert sorted(loaded) == sorted(allowed)
+
+
+def test_import_time_budget():
+    """Importar pytc2.sistemas_lineales cabe en el presupuesto."""
+
+    # el mejor de varios intentos, para no depender de la carga de la máquina
+    dt = min(_import_en_proceso_nuevo('pytc2.sistemas_lineales')[0] for _ in range(3))
+
+    assert dt < IMPORT_BUDGET_S
+
+
+def test_first_use_loads_dependency():
+    """El primer uso importa la dependencia y el resultado es el de siempre."""
+
+    from pytc2.sistemas_lineales import tfcascade
+    import scipy.signal as sig
+
+    tf = tfcascade(sig.TransferFunction([1], [1, 1]), sig.TransferFunction([1], [1, 2]))
+
+    assert isinstance(tf, sig.TransferFunction)
+    assert list(tf.den) == [1, 3, 2]
+
+
+def test_analyze_sys_data_sin_matplotlib():
+    """analyze_sys_data no importa matplotlib.pyplot, ni siquiera al usarse."""
+
+    code = ('import sys, json\n'
+            'from scipy import signal as sig\n'
+            'from pytc2.sistemas_lineales import analyze_sys_data, zpk2sos_analog\n'
+            'H = sig.TransferFunction([1.], [1., 1/5, 1.])\n'
+            'Hd = sig.TransferFunction([1., 1.], [1., -0.5], dt=1.)\n'
+            'sos = zpk2sos_analog(*sig.ellip(6, 0.5, 40, 1, analog=True, output="zpk"))\n'
+            'all_data = analyze_sys_data([H, Hd, sos])\n'
+            'assert len(all_data) == 3\n'
+            'print(json.dumps([m for m in sys.modules if m.startswith("matplotlib")]))\n')
+
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    assert json.loads(out.stdout) == []
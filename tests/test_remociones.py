@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+"""Tests de la verificación de funciones positivas reales y del cache de remociones."""
+
+import pytest
+import sympy as sp
+
+from pytc2.general import s
+from pytc2.remociones import verificar_FRP, isFRP, _diagnostico_FRP, remover_polo_infinito
+from pytc2.remociones import remociones_cache_info, remociones_cache_clear, _memoizar_remocion, _forma_canonica
+
+
+FRP = [
+    # LC
+    (s**4 + 4*s**2 + 3)/(s**3 + 2*s),
+    # RC
+    (s + 2)*(s + 4)/((s + 1)*(s + 3)),
+    # RL
+    (s + 1)*(s + 3)/((s + 2)*(s + 4)),
+    # RLC, con polo en continua
+    (s**2 + 4*s + 3)/(s**2 + 2*s),
+    ]
+
+# función y condición que no cumple
+NO_FRP = [
+    ((s**2 - s + 1)/(s + 1), 'coeficientes'),
+    (1/(s**3 + 1), 'grados'),
+    ((s**2 + s + 1)/(s**2*(s + 2)), 'orden_dc'),
+    # polos en el semiplano derecho con coeficientes positivos
+    ((s**3 + s**2 + s + 1)/(s**3 + s**2 + 2*s + 8), 'hurwitz'),
+    ((s**2 + 1)/(s**2 + s + 4), 'parte_real'),
+    ((s**4 + s**3 + 3*s**2 + s + 1)/(s**2 + 1)**2, 'parte_real'),
+    ]
+
+
+@pytest.mark.parametrize('Imm', FRP)
+def test_verificar_FRP(Imm):
+    """Las inmitancias LC, RC y RL son FRP, con coeficientes racionales o de punto flotante."""
+
+    diag = verificar_FRP(Imm)
+
+    assert diag['FRP'] and diag['condicion'] is None
+    assert diag['metodo'] == 'exacto'
+    assert isFRP(Imm)
+
+    diag = verificar_FRP(sp.N(Imm))
+
+    assert diag['FRP'] and diag['condicion'] is None
+    assert diag['metodo'] == 'numerico'
+
+
+@pytest.mark.parametrize('Imm, condicion', NO_FRP)
+def test_verificar_no_FRP(Imm, condicion):
+    """Cada condición que no se cumple se informa igual en los caminos exacto y numérico."""
+
+    for this_Imm, exacto, metodo in ((Imm, None, 'exacto'), (Imm, False, 'numerico'), (sp.N(Imm), None, 'numerico')):
+
+        diag = verificar_FRP(this_Imm, exacto=exacto)
+
+        assert not diag['FRP']
+        assert diag['condicion'] == condicion
+        assert diag['metodo'] == metodo
+
+    assert not isFRP(Imm)
+
+
+def test_verificar_FRP_motivo():
+    """El motivo indica dónde Re{F(jω)} es negativa."""
+
+    assert verificar_FRP((s**2 + 1)/(s**2 + s + 4))['motivo'] == 'Re{F(jω)} es negativa para ω en torno a 1.414.'
+
+    # coeficientes de N y D, de mayor a menor potencia
+    assert _diagnostico_FRP([-1, 0, 1], [1, 1], True, 1e-9)[0] == 'coeficientes'
+    assert _diagnostico_FRP([1., 1., 1.], [1., 1.], False, 1e-9) == (None, 'F(s) es FRP.')
+    assert _diagnostico_FRP([0, 0], [1, 1], True, 1e-9) == (None, 'F(s) es nula.')
+
+
+R, L, C = sp.symbols('R L C', positive=True)
+aa = sp.symbols('a', real=True)
+
+
+@pytest.mark.parametrize('Imm, esFRP', [(R*s + 1/(C*s), True), (R + L*s, True),
+                                        (aa*s, False), (-R*s, False), (sp.sqrt(s), False)])
+def test_verificar_FRP_simbolico(Imm, esFRP):
+    """Con otros símbolos, o si no es racional en s, se usa la prueba simbólica."""
+
+    diag = verificar_FRP(Imm)
+
+    assert diag['metodo'] == 'simbolico'
+    assert diag['FRP'] == esFRP
+    assert diag['condicion'] == (None if esFRP else 'simbolico')
+    assert isFRP(Imm) == esFRP
+
+
+@pytest.fixture
+def cache_vacio():
+    """Cache de remociones vacío, que se restituye a su capacidad original."""
+
+    maxsize = remociones_cache_info()['maxsize']
+    remociones_cache_clear()
+
+    yield
+
+    remociones_cache_clear(maxsize=maxsize)
+
+
+def _remocion_contada():
+    """Remoción de prueba memoizada, junto con la lista de imitancias que calculó."""
+
+    llamadas = []
+
+    @_memoizar_remocion
+    def remover(imit, kk=1):
+        llamadas.append(imit)
+        return [imit - kk, {'k': kk}]
+
+    return remover, llamadas
+
+
+def test_cache_remociones_aciertos(cache_vacio):
+    """Las llamadas repetidas se resuelven en el cache y se cuentan aciertos y fallos."""
+
+    remover, llamadas = _remocion_contada()
+
+    ZZ = (2*s**4 + 20*s**2 + 18)/(s**3 + 4*s)
+
+    assert remover(ZZ) == remover(ZZ) == remover(ZZ, kk=1)
+    assert len(llamadas) == 1
+    assert remociones_cache_info() == {'hits': 2, 'misses': 1, 'currsize': 1, 'maxsize': 256}
+
+    # otros parámetros son otra entrada
+    remover(ZZ, 2)
+
+    assert len(llamadas) == 2
+    assert remociones_cache_info()['currsize'] == 2
+
+    # también para las funciones de la biblioteca
+    assert remover_polo_infinito(ZZ) == remover_polo_infinito(ZZ)
+    assert remociones_cache_info()['hits'] == 3
+
+
+def test_cache_remociones_lru(cache_vacio):
+    """Con el cache lleno se descarta el resultado usado menos recientemente."""
+
+    remociones_cache_clear(maxsize=2)
+    remover, llamadas = _remocion_contada()
+
+    remover(s + 1)
+    remover(s + 2)
+    # s + 1 pasa a ser el más reciente
+    remover(s + 1)
+    remover(s + 3)
+
+    assert remociones_cache_info()['currsize'] == 2
+    assert len(llamadas) == 3
+
+    remover(s + 1)
+    remover(s + 3)
+    assert len(llamadas) == 3
+
+    # s + 2 se había descartado
+    remover(s + 2)
+    assert llamadas == [s + 1, s + 2, s + 3, s + 2]
+
+
+def test_cache_remociones_deshabilitado(cache_vacio):
+    """Con maxsize=0 el cache no guarda nada y siempre se calcula."""
+
+    remociones_cache_clear(maxsize=0)
+    remover, llamadas = _remocion_contada()
+
+    remover(s + 1)
+    remover(s + 1)
+
+    assert len(llamadas) == 2
+    assert remociones_cache_info() == {'hits': 0, 'misses': 0, 'currsize': 0, 'maxsize': 0}
+
+
+def test_cache_remociones_forma_canonica(cache_vacio):
+    """Expresiones distintas de la misma función racional comparten la entrada."""
+
+    ZZ = (s**2 + 1)/(s**3 + 2*s)
+    equivalentes = [ZZ, sp.expand(ZZ), (s**2 + 1)*(s + 1)/((s**3 + 2*s)*(s + 1)), 1/(s + 1/(s + 1/s))]
+
+    assert len({_forma_canonica(this_Z) for this_Z in equivalentes}) == 1
+    assert _forma_canonica(ZZ) != _forma_canonica((s**2 + 2)/(s**3 + 2*s))
+
+    remover, llamadas = _remocion_contada()
+
+    for this_Z in equivalentes:
+        remover(this_Z)
+
+    assert len(llamadas) == 1
+
+
+def test_cache_remociones_copias(cache_vacio):
+    """Las listas y diccionarios devueltos son copias: modificarlos no altera el cache."""
+
+    remover, _ = _remocion_contada()
+
+    resultado = remover(s + 1)
+    resultado[0] = None
+    resultado.append(None)
+
+    assert remover(s + 1) == [s, {'k': 1}]
+
+    diag = verificar_FRP((s + 2)/(s + 1))
+    diag['FRP'] = False
+    diag.clear()
+
+    assert verificar_FRP((s + 2)/(s + 1))['FRP']
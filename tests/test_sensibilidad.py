@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+"""Tests de las sensibilidades analíticas, contrastadas con diferencias finitas."""
+
+import numpy as np
+import pytest
+
+from pytc2.general import s
+from pytc2.sintesis_dipolo import evaluar_cauer, _elementos_cauer
+from pytc2.sensibilidad import sensibilidad_sos, sensibilidad_cauer, _cauer_polinomio
+
+
+WW = np.logspace(-1, 1, 13)
+
+# paso relativo de las diferencias finitas centradas
+HH = 1e-6
+
+
+def _dif_finita(ff, valores, ee):
+    """x . d(ln f)/dx respecto del elemento ee, con f compleja."""
+
+    vp = list(valores)
+    vm = list(valores)
+    vp[ee] = valores[ee] * (1 + HH)
+    vm[ee] = valores[ee] * (1 - HH)
+
+    return np.log(ff(vp) / ff(vm)) / (2 * HH)
+
+
+def test_sensibilidad_sos():
+
+    mySOS = np.array([[0., 0.3, 1., 1., 0.2, 1.],
+                      [1., 0., 2., 0., 1., 3.],
+                      [0., 0., 2., 1., 1., 0.5]])
+
+    def transferencia(coefs):
+        sos = np.reshape(coefs, (-1, 6))
+        return np.prod([np.polyval(this_sos[:3], 1j*WW) / np.polyval(this_sos[3:], 1j*WW) for this_sos in sos], axis=0)
+
+    def w0_Q(coefs):
+        _, _, _, a2, a1, a0 = coefs[:6]
+        return np.array([np.sqrt(a0/a2), np.sqrt(a0*a2)/a1])
+
+    sens = sensibilidad_sos(mySOS, WW)
+    coefs = list(mySOS.ravel())
+
+    for ee, this_coef in enumerate(coefs):
+
+        if this_coef == 0:
+            assert np.all(sens['modulo'][ee] == 0) and np.all(sens['Q'][ee] == 0)
+            continue
+
+        esperado = _dif_finita(transferencia, coefs, ee)
+
+        np.testing.assert_allclose(sens['modulo'][ee], esperado.real, atol=1e-6)
+        np.testing.assert_allclose(sens['fase'][ee], esperado.imag, atol=1e-6)
+
+        if ee < 6:
+            np.testing.assert_allclose([sens['w0'][ee, 0], sens['Q'][ee, 0]],
+                                       _dif_finita(w0_Q, coefs, ee).real, atol=1e-6)
+
+
+@pytest.mark.parametrize('ko, kwargs', [
+    ([3*s/2, 4*s/3, s/2, 1], {}),
+    ([1/(2*s), 3/(4*s), 2/s, 1], {}),
+    ([1., 2., 3., 1.5, 0.7], {'isRC': True}),
+    ([0., 2., 3., 1.5], {'isRC': True, 'remover_en_inf': False}),
+    ])
+def test_sensibilidad_cauer(ko, kwargs):
+
+    sens = sensibilidad_cauer(ko, WW, **kwargs)
+
+    assert sens['modulo'].shape == (len(ko), WW.size)
+
+    def transferencia(valores):
+        return evaluar_cauer(valores, WW, **kwargs)[1]
+
+    def w0_Q(valores):
+        kk, pp = _elementos_cauer(valores, kwargs.get('remover_en_inf', True), kwargs.get('isRC', False))
+        polos = np.roots(_cauer_polinomio(np.real(kk), pp))
+        polos = np.sort_complex(polos[polos.imag >= 0])[::-1]
+        return np.concatenate((np.abs(polos), np.abs(polos) / (-2*polos.real)))
+
+    cant_polos = len(sens['polos'])
+
+    for ee, this_ko in enumerate(ko):
+
+        if this_ko == 0:
+            assert np.all(sens['modulo'][ee] == 0)
+            continue
+
+        esperado = _dif_finita(transferencia, ko, ee)
+
+        np.testing.assert_allclose(sens['modulo'][ee], esperado.real, atol=1e-5)
+        np.testing.assert_allclose(sens['fase'][ee], esperado.imag, atol=1e-5)
+
+        esperado = _dif_finita(w0_Q, ko, ee).real
+
+        np.testing.assert_allclose(sens['w0'][ee], esperado[:cant_polos], atol=1e-5)
+        np.testing.assert_allclose(sens['Q'][ee], esperado[cant_polos:], atol=1e-5)
+
+
+def test_polos_cauer():
+    """Los polos son los de la transferencia: T(s) = 1/(s^3 + 2s^2 + 2s + 1)."""
+
+    sens = sensibilidad_cauer([3*s/2, 4*s/3, s/2, 1], WW)
+
+    np.testing.assert_allclose(sens['polos'], [-0.5 + 1j*np.sqrt(3)/2, -1.], atol=1e-12)
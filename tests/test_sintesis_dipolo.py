@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+"""Tests de la síntesis numérica de dipolos, contrastada con la simbólica."""
+
+import random
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pytc2.general import s
+from pytc2.sintesis_dipolo import cauer_LC, cauer_RC, cauer_LC_num, cauer_RC_num, foster, evaluar_cauer, evaluar_foster
+
+
+def _ladder(ks, elementos):
+    """Inmitancia ko_0.e_0 + 1/(ko_1.e_1 + 1/(...)) como par de sp.Poly."""
+
+    num = sp.Poly(ks[-1] * elementos[-1], s) if elementos[-1] != 1/s else sp.Poly(ks[-1], s)
+    den = sp.Poly(1, s) if elementos[-1] != 1/s else sp.Poly(s, s)
+
+    for kk, ee in zip(ks[-2::-1], elementos[-2::-1]):
+
+        if ee == 1/s:
+            num, den = sp.Poly(kk, s) * num + sp.Poly(s, s) * den, sp.Poly(s, s) * num
+        else:
+            num, den = sp.Poly(kk * ee, s) * num + den, num
+
+    return num, den
+
+
+def _coeffs(poly):
+
+    return np.array(poly.all_coeffs(), dtype=np.float64)
+
+
+def _ko_simbolico(ko, isRC):
+    """ko de cauer_LC / cauer_RC en la convención de las versiones numéricas."""
+
+    valores = [float(kk.subs(s, 1)) for kk in ko]
+
+    if isRC and ko[0].has(s):
+        valores = [0.] + valores
+
+    return np.array(valores)
+
+
+def _elementos(isRC, remover_en_inf, nn, polo_primero):
+
+    polo = s if remover_en_inf else 1/s
+
+    if not isRC:
+        return [polo] * nn
+
+    return [polo if (ii % 2 == 0) == polo_primero else 1 for ii in range(nn)]
+
+
+CASOS = [(isRC, remover_en_inf, nn, polo_primero)
+         for isRC in (False, True)
+         for remover_en_inf in (True, False)
+         for nn in (1, 2, 3, 5, 8)
+         for polo_primero in ((True, False) if isRC else (True,))]
+
+
+@pytest.mark.parametrize('isRC, remover_en_inf, nn, polo_primero', CASOS)
+def test_cauer_num_igual_simbolico(isRC, remover_en_inf, nn, polo_primero):
+    """Las expansiones numéricas coinciden con cauer_LC / cauer_RC."""
+
+    rnd = random.Random(nn)
+    ks = [sp.Rational(rnd.randint(1, 9), rnd.randint(1, 4)) for _ in range(nn)]
+
+    num, den = _ladder(ks, _elementos(isRC, remover_en_inf, nn, polo_primero))
+
+    if isRC:
+        ko, _, _ = cauer_RC(num.as_expr() / den.as_expr(), remover_en_inf=remover_en_inf)
+        ko_num = cauer_RC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+    else:
+        ko, _, _ = cauer_LC(num.as_expr() / den.as_expr(), remover_en_inf=remover_en_inf)
+        ko_num = cauer_LC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+
+    np.testing.assert_allclose(ko_num, _ko_simbolico(ko, isRC), rtol=1e-9)
+
+
+@pytest.mark.parametrize('isRC, remover_en_inf', [(False, True), (False, False), (True, True), (True, False)])
+def test_cauer_num_igual_remociones(monkeypatch, isRC, remover_en_inf):
+    """También coinciden con las remociones simbólicas, sin el camino exacto."""
+
+    import pytc2.sintesis_dipolo as sd
+
+    monkeypatch.setattr(sd, '_cauer_racional', lambda *args, **kwargs: None)
+
+    ks = [sp.Rational(3, 2), sp.Integer(2), sp.Rational(1, 3)]
+    num, den = _ladder(ks, _elementos(isRC, remover_en_inf, len(ks), True))
+
+    if isRC:
+        ko, _, _ = sd.cauer_RC(num.as_expr() / den.as_expr(), remover_en_inf=remover_en_inf)
+        ko_num = cauer_RC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+    else:
+        ko, _, _ = sd.cauer_LC(num.as_expr() / den.as_expr(), remover_en_inf=remover_en_inf)
+        ko_num = cauer_LC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+
+    np.testing.assert_allclose(ko_num, _ko_simbolico(ko, isRC), rtol=1e-9)
+
+
+def test_cauer_LC_num_ejemplo():
+    """Ejemplo de los docstrings."""
+
+    ko, _, _ = cauer_LC((2*s**4 + 20*s**2 + 18)/(s**3 + 4*s))
+
+    np.testing.assert_allclose(cauer_LC_num([2, 0, 20, 0, 18], [1, 0, 4, 0]), _ko_simbolico(ko, False))
+
+
+def test_cauer_LC_num_precision_extendida():
+    """Una escalera mal condicionada en punto flotante se resuelve con mpmath."""
+
+    ks = [2, 3, 8, 6, 5, 5, 2, 7, 9, 1, 4, 3, 3, 8, 1, 6]
+    num, den = _ladder([sp.Integer(kk) for kk in ks], [s] * len(ks))
+
+    with pytest.raises(ValueError, match='mal condicionada'):
+        cauer_LC_num(_coeffs(num), _coeffs(den))
+
+    ko, _, _ = cauer_LC(num.as_expr() / den.as_expr())
+
+    np.testing.assert_allclose(cauer_LC_num(_coeffs(num), _coeffs(den), dps=50), _ko_simbolico(ko, False), rtol=1e-12)
+
+
+@pytest.mark.parametrize('num, den', [
+    ([1, 2, 1], [1, 0]),        # tiene pérdidas: no es LC
+    ([1, 0, 1], [1, 0, 4, 0]),  # sin polo en infinito
+    ([1, 0, 4, 0], [-1, 0, 1]), # elemento negativo
+    ])
+def test_cauer_LC_num_no_LC(num, den):
+    """Las inmitancias que no son LC se rechazan."""
+
+    with pytest.raises(ValueError):
+        cauer_LC_num(num, den)
+
+
+@pytest.mark.parametrize('isRC, remover_en_inf, nn, polo_primero', CASOS)
+def test_evaluar_cauer_igual_simbolico(isRC, remover_en_inf, nn, polo_primero):
+    """La escalera evaluada numéricamente coincide con la inmitancia en s = jw."""
+
+    rnd = random.Random(nn)
+    ks = [sp.Rational(rnd.randint(1, 9), rnd.randint(1, 4)) for _ in range(nn)]
+
+    num, den = _ladder(ks, _elementos(isRC, remover_en_inf, nn, polo_primero))
+    imm = num.as_expr() / den.as_expr()
+
+    ww = np.array([0.1, 0.37, 1.3, 4.1, 20.])
+    esperado = np.array([complex(imm.subs(s, sp.I * sp.Float(float(w)))) for w in ww])
+
+    if isRC:
+        ko, _, _ = cauer_RC(imm, remover_en_inf=remover_en_inf)
+        ko_num = cauer_RC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+    else:
+        ko, _, _ = cauer_LC(imm, remover_en_inf=remover_en_inf)
+        ko_num = cauer_LC_num(_coeffs(num), _coeffs(den), remover_en_inf=remover_en_inf)
+
+    imm_s, TT_s = evaluar_cauer(ko, ww)
+    imm_n, TT_n = evaluar_cauer(ko_num, ww, remover_en_inf=remover_en_inf, isRC=isRC)
+
+    np.testing.assert_allclose(imm_s, esperado, rtol=1e-9)
+    np.testing.assert_allclose(imm_n, esperado, rtol=1e-9)
+    np.testing.assert_allclose(TT_n, TT_s, rtol=1e-9)
+
+
+def test_evaluar_cauer_transferencia():
+    """Transferencia de una escalera L - C - L cargada con 1 Ohm."""
+
+    ww = np.array([0.3, 0.7, 2.])
+    ss = 1j * ww
+
+    _, TT = evaluar_cauer([s, 2*s, s, 1], ww)
+
+    # V_carga / V_entrada = 1 / (A + B/R) de la escalera sin la carga
+    np.testing.assert_allclose(TT, 1 / (2*ss**3 + 2*ss**2 + 2*ss + 1))
+
+
+@pytest.mark.parametrize('imm, isRC', [
+    ((2*s**4 + 20*s**2 + 18)/(s**3 + 4*s), False),
+    ((s**2 + 4*s + 3)/(s**2 + 2*s), True),
+    ])
+def test_evaluar_foster_igual_simbolico(imm, isRC):
+    """La expansión de Foster evaluada numéricamente coincide con imm en s = jw."""
+
+    ww = np.array([0.1, 0.37, 1.3, 4.1, 20.])
+    esperado = np.array([complex(imm.subs(s, sp.I * sp.Float(float(w)))) for w in ww])
+
+    k0, koo, ki, kk, _ = foster(imm)
+
+    np.testing.assert_allclose(evaluar_foster(k0, koo, ki, kk, ww, isRC=isRC), esperado, rtol=1e-9)
+
+
+
+FOSTER_CASOS = [
+    (2*s**4 + 20*s**2 + 18)/(s**3 + 4*s),                        # LC, polos en 0, jw e infinito
+    s*(s**2 + 4)/((s**2 + 1)*(s**2 + 9)),                        # LC, sólo polos en jw
+    sp.Rational(15, 2)*s/(s**2 + 4),
+    (s + 2)*(s + 4)/(s*(s + 3)),                                 # RC, polo en el origen
+    (s + 1)*(s + 3)/((s + 2)*(s + 4)),                           # RL
+    (3*s + 1)*(s + sp.Rational(5, 2))/((s + sp.Rational(1, 3))*(2*s + 7)),
+    7.5*s/(s**2 + 4.0),                                          # coeficientes de punto flotante
+    (s + 1.0)*(s + 3.0)/((s + 2.0)*(s + 4.0)),
+    (2.*s**4 + 20.*s**2 + 18.)/(s**3 + 4.*s),
+    ]
+
+
+@pytest.mark.parametrize('imm', FOSTER_CASOS)
+def test_foster_igual_apart(monkeypatch, imm):
+    """foster devuelve lo mismo, y en el mismo orden, que por sp.apart."""
+
+    import pytc2.sintesis_dipolo as sd
+
+    rapido = sd.foster(imm)
+
+    monkeypatch.setattr(sd, '_foster_residuos', lambda imm: None)
+
+    assert rapido == sd.foster(imm)
@@ -0,0 +1,615 @@
+#!/usr/bin/env python
+
+"""Tests de sistemas_lineales: factorización en SOS analógicas, cache de singularidades y respuestas."""
+
+import gc
+
+import numpy as np
+import pytest
+from scipy import signal as sig
+import sympy as sp
+
+import pytc2.sistemas_lineales as sl
+
+
+def _secciones(zz, pp):
+    """SOS sin ganancia, con el apareamiento de zpk2sos_analog."""
+
+    n_sections = (len(pp) + 1) // 2
+
+    p_sos, z_sos = sl._zpk_pairing(np.concatenate(sl._cplxreal(zz)), np.concatenate(sl._cplxreal(pp)), n_sections)
+    p_sos = np.reshape(p_sos[::-1], (n_sections, 2))
+    z_sos = np.reshape(z_sos[::-1], (n_sections, 2))
+
+    sos = np.zeros((n_sections, 6))
+
+    for si in range(n_sections):
+        num, den = sig.zpk2tf(z_sos[si, ~np.isnan(z_sos[si])], p_sos[si, ~np.isnan(p_sos[si])], 1)
+        sos[si] = np.concatenate((np.zeros(3 - len(num)), num, np.zeros(3 - len(den)), den))
+
+    return sos, z_sos, p_sos
+
+
+PROTOTIPOS = [
+    sig.butter(11, [1, 2], 'bandpass', analog=True, output='zpk'),
+    sig.cheby1(10, 1, [1, 2], 'bandpass', analog=True, output='zpk'),
+    sig.ellip(10, 0.5, 40, [1, 2], 'bandpass', analog=True, output='zpk'),
+    sig.bessel(11, [1, 2], 'bandpass', analog=True, output='zpk'),
+    sig.cheby2(7, 40, 1, 'highpass', analog=True, output='zpk'),
+    ]
+
+
+@pytest.mark.parametrize('zpk', PROTOTIPOS)
+def test_sos_prefix_peaks_grilla_densa(zpk):
+    """Los máximos de las cascadas parciales coinciden con los de una grilla densa."""
+
+    zz, pp, _ = zpk
+    sos, z_sos, p_sos = _secciones(zz, pp)
+
+    ww = np.logspace(-3, 3, 200000)
+    H_sos, _ = sl.sosfreqs_analog(sos, ww)
+    referencia = np.max(np.cumprod(np.abs(H_sos), axis=-1), axis=0)
+
+    mmi = sl._sos_prefix_peaks(sos, z_sos, p_sos)
+
+    np.testing.assert_array_less(np.abs(20 * np.log10(mmi / referencia)), 0.05)
+
+
+def _apareamiento_original(z, p, n_sections):
+    """El apareamiento de zpk2sos_analog recorriendo los arrays con np.delete."""
+
+    with np.errstate(divide='ignore'):
+        qq = 1 / (2*np.cos(np.pi - np.angle(p)))
+
+    p_sos = np.zeros((n_sections, 2), np.complex128)
+    z_sos = np.zeros_like(p_sos)
+
+    one_z_per_section = n_sections == z.shape[0]
+
+    for si in range(n_sections):
+
+        p1_idx = np.argmax(qq)
+        p1 = p[p1_idx]
+        p = np.delete(p, p1_idx)
+        qq = np.delete(qq, p1_idx)
+
+        if np.isreal(p1) and np.isreal(p).sum() == 0:
+
+            if z.size == 0:
+                z1 = np.nan
+            else:
+                z1_idx = sl._nearest_real_complex_idx(z, p1, 'real')
+                z1 = z[z1_idx]
+                z = np.delete(z, z1_idx)
+
+            p2 = z2 = np.nan
+
+        else:
+
+            if z.size == 0:
+                z1 = np.nan
+            else:
+                z1_idx = np.argmin(np.abs(p1 - z))
+                z1 = z[z1_idx]
+                z = np.delete(z, z1_idx)
+
+            if np.isnan(z1):
+
+                z2 = np.nan
+
+                if np.isreal(p1):
+                    idx = np.nonzero(np.isreal(p))[0]
+                    p2_idx = idx[np.argmax(qq)]
+                    p2 = p[p2_idx]
+                    p = np.delete(p, p2_idx)
+                else:
+                    p2 = p1.conj()
+
+            elif np.isreal(p1):
+
+                if np.isreal(z1):
+                    idx = np.nonzero(np.isreal(p))[0]
+                    p2_idx = idx[np.argmin(np.abs(np.abs(p[idx]) - 1))]
+                    p2 = p[p2_idx]
+
+                    if one_z_per_section or len(z) == 0:
+                        z2 = np.nan
+                    else:
+                        z2_idx = sl._nearest_real_complex_idx(z, p2, 'real')
+                        z2 = z[z2_idx]
+                        z = np.delete(z, z2_idx)
+                else:
+                    z2 = z1.conj()
+                    p2_idx = sl._nearest_real_complex_idx(p, z1, 'real')
+                    p2 = p[p2_idx]
+
+                p = np.delete(p, p2_idx)
+
+            else:
+
+                p2 = p1.conj()
+
+                if np.isreal(z1):
+                    if one_z_per_section or len(z) == 0:
+                        z2 = np.nan
+                    else:
+                        z2_idx = sl._nearest_real_complex_idx(z, p1, 'real')
+                        z2 = z[z2_idx]
+                        z = np.delete(z, z2_idx)
+                else:
+                    z2 = z1.conj()
+
+        p_sos[si] = [p1, p2]
+        z_sos[si] = [z1, z2]
+
+    assert len(p) == 0
+
+    return p_sos, z_sos
+
+
+def _casos_apareamiento():
+
+    casos = []
+
+    for orden in (1, 2, 3, 4, 5, 8, 11):
+        for banda in ('lowpass', 'highpass', 'bandpass', 'bandstop'):
+            wn = 1 if banda in ('lowpass', 'highpass') else [1, 3]
+            casos += [sig.butter(orden, wn, banda, analog=True, output='zpk'),
+                      sig.cheby1(orden, 1, wn, banda, analog=True, output='zpk'),
+                      sig.cheby2(orden, 40, wn, banda, analog=True, output='zpk'),
+                      sig.ellip(orden, 0.5, 40, wn, banda, analog=True, output='zpk'),
+                      sig.bessel(orden, wn, banda, analog=True, output='zpk')]
+
+    # polos y ceros repetidos o equidistantes, reales y complejos
+    rng = np.random.default_rng(0)
+
+    for _ in range(200):
+
+        n_real = rng.integers(0, 6)
+        n_cplx = rng.integers(0, 5)
+        pp = np.concatenate((-rng.integers(1, 4, n_real).astype(float),
+                             -rng.integers(1, 3, n_cplx) + 1j * rng.integers(1, 3, n_cplx)))
+        pp = np.concatenate((pp, np.conj(pp[pp.imag != 0])))
+
+        if pp.size == 0:
+            continue
+
+        nz_cplx = rng.integers(0, pp.size // 2 + 1)
+        nz_real = rng.integers(0, pp.size - 2 * nz_cplx + 1)
+        zz = rng.choice([1j, 2j, -1 + 1j], nz_cplx)
+        zz = np.concatenate((rng.choice([0., -1., -2., 1.], nz_real), zz, np.conj(zz)))
+
+        casos += [(zz, pp, 1.)]
+
+    return casos
+
+
+@pytest.mark.parametrize('zpk', _casos_apareamiento())
+def test_zpk_pairing_igual_original(zpk):
+    """_zpk_pairing forma las mismas secciones que el recorrido original."""
+
+    zz, pp, _ = zpk
+
+    z = np.concatenate(sl._cplxreal(zz))
+    p = np.concatenate(sl._cplxreal(pp))
+    n_sections = (len(pp) + 1) // 2
+
+    try:
+        esperado = _apareamiento_original(z, p, n_sections)
+    except (ValueError, IndexError, AssertionError) as error:
+        with pytest.raises(type(error)):
+            sl._zpk_pairing(z, p, n_sections)
+        return
+
+    for obtenido, this_esperado in zip(sl._zpk_pairing(z, p, n_sections), esperado):
+        np.testing.assert_array_equal(obtenido, this_esperado)
+
+
+def _error_interpolacion(this_sys, data, ww):
+    """Error [dB] de interpolar el módulo de data en ww, lejos de los ceros de transmisión."""
+
+    _, mag, _ = this_sys.bode(ww)
+    mag_interp = np.interp(np.log(ww), np.log(data['freq']), data['mag'])
+
+    bValid = mag > np.max(mag) - 60
+
+    return np.max(np.abs(mag_interp - mag)[bValid])
+
+
+@pytest.mark.parametrize('zpk', PROTOTIPOS)
+def test_analyze_sys_data_grilla_adaptiva(zpk):
+    """Por defecto se usa la grilla adaptiva, con menos puntos y no peor que la fija de 1000 puntos."""
+
+    zz, pp, kk = zpk
+    this_sys = sig.ZerosPolesGain(zz, pp, kk)
+    tol = 0.05
+
+    adaptiva = sl.analyze_sys_data(this_sys, tol=tol)[0]
+    fija = sl.analyze_sys_data(this_sys, npoints=1000)[0]
+
+    np.testing.assert_array_equal(adaptiva['freq'], sl.adaptive_freq_grid(zz, pp, tol=tol))
+    assert adaptiva['freq'].size < 1000
+    assert fija['freq'].size == 1000
+
+    w_lo = max(adaptiva['freq'][0], fija['freq'][0])
+    w_hi = min(adaptiva['freq'][-1], fija['freq'][-1])
+    ww = np.logspace(np.log10(w_lo), np.log10(w_hi), 200000)
+
+    error_adaptiva = _error_interpolacion(this_sys, adaptiva, ww)
+    error_fija = _error_interpolacion(this_sys, fija, ww)
+
+    assert error_adaptiva <= max(2 * tol, error_fija)
+
+    # el retardo de grupo se calcula sobre la misma grilla
+    assert adaptiva['group_delay'].shape == adaptiva['freq'].shape
+
+
+@pytest.mark.parametrize('mode', ['roots', 'response'])
+@pytest.mark.parametrize('zpk', PROTOTIPOS)
+def test_verify_sos(zpk, mode):
+    """_verify_sos acepta la factorización correcta y detecta ceros, polos o ganancia distintos."""
+
+    zz, pp, kk = zpk
+    sos = sl.zpk2sos_analog(zz, pp, kk, verify=None)
+
+    sl._verify_sos(sos, zz, pp, kk, mode=mode)
+
+    # un cero de más, polos desplazados y otra ganancia
+    errores = [((np.concatenate((zz, [-1.])), pp, kk), 'Zeros'),
+               ((zz, pp * 1.001, kk), 'Poles'),
+               ((zz, pp, kk * 1.001), 'Gain')]
+
+    for (this_zz, this_pp, this_kk), que in errores:
+
+        with pytest.raises(ValueError, match=que if mode == 'roots' else 'frequency response'):
+            sl._verify_sos(sos, this_zz, this_pp, this_kk, mode=mode)
+
+
+def test_same_roots():
+    """Las raíces se comparan como multiconjuntos, con más tolerancia para las múltiples."""
+
+    aa = np.array([-1., -1. + 1j, -1. - 1j, -2.])
+
+    assert sl._same_roots(aa, aa[::-1], 1e-6)
+    assert not sl._same_roots(aa, aa[:-1], 1e-6)
+    assert not sl._same_roots(aa, np.array([-1., -1. + 1j, -1. + 1j, -2.]), 1e-6)
+
+    # raíz doble con el error de redondeo de su multiplicidad
+    doble = np.array([-1., -1.])
+    assert sl._same_roots(doble + np.array([1e-4, -1e-4]), doble, 1e-6)
+    assert not sl._same_roots(np.array([-1., -1.1]), doble, 1e-6)
+
+
+@pytest.mark.parametrize('verify', [True, False, 'roots', 'response', None])
+def test_zpk2sos_analog_verify(verify):
+    """La verificación no altera las SOS, y True/False equivalen a 'roots'/None."""
+
+    zz, pp, kk = PROTOTIPOS[2]
+
+    sos = sl.zpk2sos_analog(zz, pp, kk, verify=verify)
+
+    np.testing.assert_array_equal(sos, sl.zpk2sos_analog(zz, pp, kk, verify=None))
+
+
+def test_zpk2sos_analog_verify_invalido():
+    """Un modo de verificación desconocido se rechaza."""
+
+    zz, pp, kk = PROTOTIPOS[0]
+
+    with pytest.raises(ValueError, match='verify must be one of'):
+        sl.zpk2sos_analog(zz, pp, kk, verify='poles')
+
+
+def _polymul_secuencial(polys):
+    """Producto de las filas de polys con np.polymul, una tras otra, completado a N.(L-1)+1 coeficientes."""
+
+    prod = np.ones(1)
+
+    for pp in polys:
+        prod = np.polymul(prod, pp)
+
+    largo = len(polys) * (polys.shape[-1] - 1) + 1
+
+    return np.concatenate((np.zeros(largo - prod.size), prod))
+
+
+@pytest.mark.parametrize('forma', [(1,), (2,), (5,), (8,), (3, 7), (2, 3, 4)])
+def test_sos2tf_coeffs_igual_polymul(forma):
+    """Los coeficientes de cada cascada de la pila coinciden con los productos sucesivos de np.polymul."""
+
+    rng = np.random.default_rng(len(forma) * 10 + forma[-1])
+
+    mySOS = rng.uniform(0.1, 2., size=forma + (6,))
+    # algunas secciones de primer orden y de ganancia pura
+    mySOS[..., 0][rng.random(forma) < 0.3] = 0.
+    mySOS[..., 3][rng.random(forma) < 0.3] = 0.
+
+    num, den = sl.sos2tf_coeffs(mySOS)
+
+    assert num.shape == den.shape == forma[:-1] + (2 * forma[-1] + 1,)
+
+    for idx in np.ndindex(*forma[:-1]):
+        for coeffs, polys in ((num, mySOS[idx][:, :3]), (den, mySOS[idx][:, 3:])):
+
+            referencia = _polymul_secuencial(polys)
+
+            np.testing.assert_allclose(coeffs[idx], referencia, rtol=1e-12, atol=1e-14 * np.max(np.abs(referencia)))
+
+
+def test_sos2tf_coeffs_butter_alto_orden():
+    """Para un Butterworth de orden 40 se recupera el denominador de las raíces."""
+
+    _, pp, _ = sig.buttap(40)
+    sos = sl.zpk2sos_analog([], pp, 1.)
+
+    _, den = sl.sos2tf_coeffs(sos)
+
+    referencia = _polymul_secuencial(sos[:, 3:])
+
+    np.testing.assert_allclose(den, referencia, rtol=1e-10)
+    np.testing.assert_allclose(den / den[np.flatnonzero(den)[0]], np.real(np.poly(pp))[-den.size:], rtol=1e-8)
+
+
+def test_zpk_data_cache():
+    """La segunda llamada se resuelve en el cache, con arrays de sólo lectura."""
+
+    sl.zpk_cache_clear()
+
+    H = sig.TransferFunction([1.], [1., 1/5, 1.])
+
+    zpk = sl.zpk_data(H)
+
+    assert sl.zpk_cache_info() == {'hits': 0, 'misses': 1, 'currsize': 1}
+    assert sl.zpk_data(H) is zpk
+    assert sl.zpk_cache_info() == {'hits': 1, 'misses': 1, 'currsize': 1}
+
+    for key in ('zeros', 'poles', 'w0', 'Q', 'w0_zeros', 'Q_zeros'):
+        assert not zpk[key].flags.writeable
+        with pytest.raises(ValueError):
+            zpk[key][...] = 0
+
+
+def test_zpk_data_cache_modificado():
+    """Si se modifican los coeficientes, las raíces se vuelven a calcular."""
+
+    sl.zpk_cache_clear()
+
+    H = sig.TransferFunction([1.], [1., 1/5, 1.])
+    sl.zpk_data(H)
+
+    H.den = [1., 1., 1.]
+    zpk = sl.zpk_data(H)
+
+    assert sl.zpk_cache_info()['misses'] == 2
+    np.testing.assert_allclose(zpk['Q'], [1., 1.])
+
+    # matriz de SOS modificada en el lugar
+    mySOS = np.array([[0., 0., 1., 1., 1/5, 1.], [0., 0., 1., 1., 1., 1.]])
+    sl.zpk_data(mySOS)
+
+    mySOS[0, 4] = np.sqrt(2)
+    zpk = sl.zpk_data(mySOS)
+
+    assert sl.zpk_cache_info()['misses'] == 4
+    np.testing.assert_allclose(np.sort(zpk['Q']), [1/np.sqrt(2)] * 2 + [1.] * 2)
+
+    sl.zpk_data(mySOS)
+    assert sl.zpk_cache_info()['hits'] == 1
+
+
+def test_zpk_data_cache_recoleccion():
+    """Las entradas se descartan cuando el sistema deja de existir."""
+
+    sl.zpk_cache_clear()
+
+    H = sig.TransferFunction([1.], [1., 1., 1.])
+    mySOS = np.array([[0., 0., 1., 1., 1., 1.]])
+
+    sl.zpk_data(H)
+    sl.zpk_data(mySOS)
+
+    assert sl.zpk_cache_info()['currsize'] == 2
+
+    del H, mySOS
+    gc.collect()
+
+    assert sl.zpk_cache_info()['currsize'] == 0
+
+
+def test_analyze_sys_data_raices_una_vez():
+    """analyze_sys_data busca las raíces una única vez por sistema."""
+
+    sl.zpk_cache_clear()
+
+    all_sys = [sig.TransferFunction([1.], [1., np.sqrt(2), 1.]),
+               sig.TransferFunction([1., 0., 1.], [1., 1/5, 1.]),
+               sl.zpk2sos_analog(*PROTOTIPOS[2])]
+
+    sl.analyze_sys_data(all_sys)
+
+    info = sl.zpk_cache_info()
+
+    assert info['misses'] == len(all_sys)
+    assert info['hits'] > 0
+
+    # una segunda vez, todo sale del cache
+    sl.analyze_sys_data(all_sys)
+
+    assert sl.zpk_cache_info()['misses'] == len(all_sys)
+
+
+def test_group_delay_zpk_digital():
+    """El retardo de grupo de un filtro digital coincide con scipy.signal.group_delay."""
+
+    zz, pp, kk = sig.ellip(8, 0.5, 60, 0.3, output='zpk')
+    bb, aa = sig.zpk2tf(zz, pp, kk)
+
+    ww = np.linspace(0.01, np.pi - 0.01, 2000)
+
+    _, referencia = sig.group_delay((bb, aa), w=ww)
+
+    # junto a los ceros sobre el círculo unitario la referencia pierde precisión
+    bValid = np.all(np.abs(ww[:, np.newaxis] - np.abs(np.angle(zz))) > 1e-3, axis=1)
+
+    gd = sl.group_delay_zpk(zz, pp, ww, digital=True)
+
+    np.testing.assert_allclose(gd[bValid], referencia[bValid], rtol=1e-6, atol=1e-6 * np.max(np.abs(referencia)))
+
+
+def test_group_delay_zpk_ceros_jw():
+    """Con ceros sobre el eje jω, coincide con la derivada de la fase en una grilla densa."""
+
+    zz, pp, kk = sig.ellip(7, 0.5, 50, 1, analog=True, output='zpk')
+
+    ww = np.logspace(-1, 1, 400000)
+    _, hh = sig.freqs_zpk(zz, pp, kk, worN=ww)
+
+    # los ceros sobre el eje jω hacen saltar la fase en π
+    fase = np.unwrap(2 * np.angle(hh)) / 2
+    referencia = -np.gradient(fase, ww)
+
+    # se descartan los puntos en torno a los ceros
+    bValid = np.all(np.abs(ww[:, np.newaxis] - np.abs(zz.imag)) > 1e-3, axis=1)
+
+    gd = sl.group_delay_zpk(zz, pp, ww)
+
+    np.testing.assert_allclose(gd[bValid], referencia[bValid], rtol=0, atol=1e-6 * np.max(gd))
+
+
+@pytest.mark.parametrize('digital', [False, True])
+def test_group_delay_zpk_pila(digital):
+    """Una pila de filtros de distinto orden completada con NaN equivale a evaluarlos por separado."""
+
+    if digital:
+        filtros = [sig.butter(3, 0.2, output='zpk'),
+                   sig.cheby1(6, 1, 0.4, output='zpk'),
+                   sig.ellip(5, 0.5, 40, [0.2, 0.5], 'bandpass', output='zpk')]
+        ww = np.linspace(0, np.pi, 500)
+    else:
+        filtros = [sig.butter(3, 1, analog=True, output='zpk'),
+                   sig.cheby2(6, 40, 2, analog=True, output='zpk'),
+                   sig.ellip(5, 0.5, 40, [1, 2], 'bandpass', analog=True, output='zpk')]
+        ww = np.logspace(-2, 2, 500)
+
+    def pila(all_rr):
+        rr = np.full((len(all_rr), max(len(this_rr) for this_rr in all_rr)), np.nan, dtype=complex)
+        for ii, this_rr in enumerate(all_rr):
+            rr[ii, :len(this_rr)] = this_rr
+        return rr
+
+    ZZ = pila([zz for zz, _, _ in filtros])
+    PP = pila([pp for _, pp, _ in filtros])
+
+    gd = sl.group_delay_zpk(ZZ, PP, ww, digital=digital)
+
+    assert gd.shape == (len(filtros), ww.size)
+
+    for this_gd, (zz, pp, _) in zip(gd, filtros):
+        np.testing.assert_allclose(this_gd, sl.group_delay_zpk(zz, pp, ww, digital=digital), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('forma', [(4,), (3, 5), (2, 3, 4)])
+def test_sosfreqs_analog_igual_freqs(forma):
+    """La respuesta de cada sección de una pila, y la de su cascada, coinciden con scipy.signal.freqs."""
+
+    rng = np.random.default_rng(forma[-1] + 10 * len(forma))
+
+    mySOS = rng.uniform(0.1, 2., size=forma + (6,))
+    # secciones de primer orden, con ceros adelante en numerador y denominador
+    mySOS[..., 0][rng.random(forma) < 0.4] = 0.
+    mySOS[..., 3][rng.random(forma) < 0.4] = 0.
+    mySOS[..., :2][rng.random(forma) < 0.2] = 0.
+
+    ww = np.logspace(-2, 2, 300)
+
+    H_sos, H = sl.sosfreqs_analog(mySOS, ww)
+
+    assert H_sos.shape == forma[:-1] + (ww.size, forma[-1])
+    assert H.shape == forma[:-1] + (ww.size,)
+
+    for idx in np.ndindex(*forma[:-1]):
+
+        cascada = np.ones(ww.size, dtype=complex)
+
+        for si, this_sos in enumerate(mySOS[idx]):
+
+            _, referencia = sig.freqs(this_sos[:3], this_sos[3:], worN=ww)
+
+            np.testing.assert_allclose(H_sos[idx][:, si], referencia, rtol=1e-12)
+            cascada *= referencia
+
+        np.testing.assert_allclose(H[idx], cascada, rtol=1e-12)
+
+
+def test_sosfreqs_analog_zpk2sos():
+    """Para una factorización de zpk2sos_analog, la cascada coincide con scipy.signal.freqs_zpk."""
+
+    zz, pp, kk = PROTOTIPOS[2]
+    sos = sl.zpk2sos_analog(zz, pp, kk)
+
+    ww = np.logspace(-1, 1, 1000)
+
+    _, referencia = sig.freqs_zpk(zz, pp, kk, worN=ww)
+
+    np.testing.assert_allclose(sl.sosfreqs_analog(sos, ww)[1], referencia, rtol=1e-8, atol=1e-12)
+
+
+# numerador y denominador de segundo orden, con coeficientes racionales
+BICUADRATICAS = [
+    ([1], [1, sp.Rational(1, 5), 1]),
+    ([1, 0], [1, sp.Rational(1, 3), 4]),
+    ([1, 0, 9], [1, 2, 4]),
+    ([1, 0, 0], [2, 1, 8]),
+    ]
+
+
+def test_analyze_sys_data_resultados():
+    """Singularidades, omega_0, Q y respuesta coinciden con tf2zpk, parametrize_sos y bode."""
+
+    from pytc2.general import s
+
+    all_sys = [sig.TransferFunction(np.array(num, dtype=float), np.array(den, dtype=float)) for num, den in BICUADRATICAS]
+
+    all_data = sl.analyze_sys_data(all_sys, sys_name=['lp', 'bp', 'notch', 'hp'])
+
+    assert [this_data['name'] for this_data in all_data] == ['lp', 'bp', 'notch', 'hp']
+
+    for this_data, this_sys, (num, den) in zip(all_data, all_sys, BICUADRATICAS):
+
+        zz, pp, kk = sig.tf2zpk(this_sys.num, this_sys.den)
+
+        assert sl._same_roots(this_data['zeros'], zz, 1e-8)
+        assert sl._same_roots(this_data['poles'], pp, 1e-8)
+        np.testing.assert_allclose(this_data['gain'], kk)
+        assert this_data['dt'] is None
+
+        _, _, _, _, w_od, Q_d, _ = sl.parametrize_sos(sp.Poly(sum(cc * s**ii for ii, cc in enumerate(num[::-1])), s),
+                                                       sp.Poly(sum(cc * s**ii for ii, cc in enumerate(den[::-1])), s))
+
+        np.testing.assert_allclose(this_data['w0'], [float(w_od)] * 2)
+        np.testing.assert_allclose(this_data['Q'], [float(Q_d)] * 2)
+
+        _, mag, phase = this_sys.bode(this_data['freq'])
+
+        np.testing.assert_allclose(this_data['mag'], mag, rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(this_data['phase'], phase * np.pi / 180, rtol=1e-10, atol=1e-10)
+
+
+def test_analyze_sys_data_sos():
+    """Para una matriz de SOS, la cascada coincide con bode de la transferencia completa."""
+
+    zz, pp, kk = PROTOTIPOS[1]
+    sos = sl.zpk2sos_analog(zz, pp, kk)
+
+    this_data = sl.analyze_sys_data(sos)[0]
+
+    assert sl._same_roots(this_data['zeros'], zz, 1e-8)
+    assert sl._same_roots(this_data['poles'], pp, 1e-8)
+
+    _, mag, phase = sig.ZerosPolesGain(zz, pp, kk).bode(this_data['freq'])
+
+    np.testing.assert_allclose(this_data['mag'], mag, atol=1e-6)
+    np.testing.assert_allclose(this_data['phase'], phase * np.pi / 180, atol=1e-6)
+
+    assert this_data['sos_mag'].shape == this_data['sos_phase'].shape == (this_data['freq'].size, sos.shape[0])
+    np.testing.assert_allclose(np.sum(this_data['sos_mag'], axis=1), this_data['mag'], atol=1e-9)
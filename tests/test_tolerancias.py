@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+"""Tests del análisis de Monte-Carlo de tolerancias."""
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pytc2.general import s
+from pytc2.sintesis_dipolo import cauer_LC, cauer_LC_num, cauer_RC_num, evaluar_cauer, _elementos_cauer
+from pytc2.tolerancias import muestras_tolerancia, montecarlo_cauer, montecarlo_sos, _cumple_plantilla, _mod2_cauer
+
+
+# Butterworth de 3er orden: 1/(s^2 + s + 1) . 1/(s + 1)
+SOS_BUTTER = np.array([[0., 0., 1., 1., 1., 1.],
+                       [0., 0., 1., 0., 1., 1.]])
+
+WW = np.logspace(-1, 1, 200)
+
+PLANTILLA = {'filter_type': 'lowpass', 'fpass': 0.5, 'ripple': 1., 'fstop': 4., 'attenuation': 30}
+
+
+def test_sin_tolerancia_igual_nominal():
+    """Con tolerancia nula, las envolventes coinciden con la respuesta nominal."""
+
+    ko, _, _ = cauer_LC((s**4 + 4*s**2 + 3)/(s**3 + 2*s))
+    _, TT = evaluar_cauer(ko, WW)
+
+    res = montecarlo_cauer(ko, WW, tol = 0., n_muestras = 10, seed = 0)
+
+    np.testing.assert_allclose(res['mag_min'], 20*np.log10(np.abs(TT)))
+    np.testing.assert_allclose(res['mag_max'], res['mag_min'])
+
+    res = montecarlo_sos(SOS_BUTTER, WW, tol = 0., n_muestras = 10, plantilla = PLANTILLA, seed = 0)
+    HH = 1 / ((1j*WW)**2 + 1j*WW + 1) / (1j*WW + 1)
+
+    np.testing.assert_allclose(res['mag_media'], 20*np.log10(np.abs(HH)))
+    assert res['rendimiento'] == 1.
+
+
+@pytest.mark.parametrize('isRC, remover_en_inf', [(False, True), (False, False), (True, True), (True, False)])
+def test_mod2_cauer_igual_evaluar_cauer(isRC, remover_en_inf):
+    """Cada fila de elementos perturbados da la misma transferencia que evaluar_cauer con esos elementos."""
+
+    if isRC:
+        # Z = (s + 1)(s + 3)/(s (s + 2)), con la expansión en DC comenzando por el polo
+        ko = cauer_RC_num([1., 4., 3.], [1., 2., 0.], remover_en_inf = remover_en_inf)
+    else:
+        ko = cauer_LC_num([1., 0., 4., 0., 3.], [1., 0., 2., 0.], remover_en_inf = remover_en_inf)
+
+    kk, pp = _elementos_cauer(ko, remover_en_inf, isRC)
+
+    # con w = 0, donde los elementos k/s tienen un polo
+    ww = np.concatenate(([0.], WW))
+
+    muestras = muestras_tolerancia(kk, tol = 0.2, n_muestras = 5, rng = np.random.default_rng(0))
+
+    mod2 = _mod2_cauer(muestras, ww, pp)
+
+    assert mod2.shape == (5, ww.size)
+
+    for this_mod2, this_kk in zip(mod2, muestras):
+
+        _, TT = evaluar_cauer([sp.Float(float(this_k)) * s**this_p for this_k, this_p in zip(this_kk, pp)], ww)
+
+        np.testing.assert_allclose(this_mod2, np.abs(TT)**2, rtol = 1e-12)
+
+
+def test_envolventes_y_rendimiento():
+    """Las envolventes contienen a la respuesta nominal y el rendimiento baja con la tolerancia."""
+
+    HH = 20*np.log10(np.abs(1 / ((1j*WW)**2 + 1j*WW + 1) / (1j*WW + 1)))
+
+    rend = []
+
+    for tol in (0.01, 0.1, 0.3):
+
+        res = montecarlo_sos(SOS_BUTTER, WW, tol = tol, n_muestras = 5000, plantilla = PLANTILLA, chunk = 1000, seed = 1)
+
+        assert np.all(res['mag_min'] <= HH + 1e-9) and np.all(res['mag_max'] >= HH - 1e-9)
+        assert res['cumple'].shape == (5000,)
+        assert res['rendimiento'] == np.mean(res['cumple'])
+
+        rend += [res['rendimiento']]
+
+    assert rend[0] >= rend[1] >= rend[2] and rend[2] < 1.
+
+
+def test_resultados_no_dependen_del_chunk_ni_del_pool():
+    """Con la misma semilla, el resultado no depende del reparto en procesos."""
+
+    kwargs = dict(tol = 0.1, n_muestras = 3000, plantilla = PLANTILLA, chunk = 700, seed = 2)
+
+    serie = montecarlo_sos(SOS_BUTTER, WW, **kwargs)
+    pool = montecarlo_sos(SOS_BUTTER, WW, n_procesos = 2, **kwargs)
+
+    np.testing.assert_array_equal(serie['cumple'], pool['cumple'])
+    np.testing.assert_allclose(serie['mag_media'], pool['mag_media'])
+
+
+@pytest.mark.parametrize('filter_type, fpass, fstop, esperado', [
+    ('lowpass', 1., 2., [True, False, False, False]),
+    ('highpass', 2., 1., [False, True, False, False]),
+    ('bandpass', [1., 2.], [0.5, 3.], [False, False, True, False]),
+    ('bandstop', [0.5, 3.], [1., 2.], [False, False, False, True]),
+    ])
+def test_cumple_plantilla(filter_type, fpass, fstop, esperado):
+
+    ww = np.array([0.5, 1., 1.5, 2., 3.])
+    mag_db = np.array([[0., 0., -50., -50., -50.],
+                       [-50., -50., -50., 0., 0.],
+                       [-50., 0., 0., 0., -50.],
+                       [0., -50., -50., -50., 0.]])
+
+    plantilla = {'filter_type': filter_type, 'fpass': fpass, 'ripple': 1., 'fstop': fstop, 'attenuation': 40}
+
+    assert list(_cumple_plantilla(mag_db, ww, plantilla)) == esperado
+
+
+def test_muestras_tolerancia():
+
+    mm = muestras_tolerancia([1., 10.], tol = [0.1, 0.01], n_muestras = 1000, distribucion = 'normal',
+                             rng = np.random.default_rng(0))
+
+    assert mm.shape == (1000, 2)
+    np.testing.assert_allclose(np.std(mm / [1., 10.], axis = 0), [0.1/3, 0.01/3], rtol = 0.1)
+
+    with pytest.raises(ValueError):
+        muestras_tolerancia([1.], distribucion = 'gauss')